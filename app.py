@@ -6,6 +6,8 @@ import sys
 import logging
 from typing import Dict, Any
 
+import streamlit as st
+
 from src.service_factory import ServiceFactory
 
 
@@ -18,11 +20,35 @@ def get_config() -> Dict[str, Any]:
         'db_path': os.environ.get('DB_PATH', './data/db.sqlite'),
         'api_rate_limit': float(os.environ.get('API_RATE_LIMIT', '2.0')),
         'log_dir': os.environ.get('LOG_DIR', 'logs'),
-        'use_plotly': os.environ.get('USE_PLOTLY', 'True').lower() == 'true'  # 環境変数で切り替え可能
+        'use_plotly': os.environ.get('USE_PLOTLY', 'True').lower() == 'true',  # 環境変数で切り替え可能
+        'cache_max_bytes': int(os.environ['CACHE_MAX_BYTES']) if os.environ.get('CACHE_MAX_BYTES') else None,
+        'cache_max_entries': int(os.environ['CACHE_MAX_ENTRIES']) if os.environ.get('CACHE_MAX_ENTRIES') else None,
+        'cache_eviction_policy': os.environ.get('CACHE_EVICTION_POLICY', 'lru'),
+        'cache_write_behind': os.environ.get('CACHE_WRITE_BEHIND', 'True').lower() == 'true',
+        'cache_soft_ttl_hours': float(os.environ.get('CACHE_SOFT_TTL_HOURS', '24')),
+        'cache_shared_frames': os.environ.get('CACHE_SHARED_FRAMES', 'False').lower() == 'true',
+        'cache_shared_frames_max_attached': int(os.environ.get('CACHE_SHARED_FRAMES_MAX_ATTACHED', '32')),
+        'storage_backend': os.environ.get('STORAGE_BACKEND', 'local'),
+        'redis_url': os.environ.get('REDIS_URL', 'redis://localhost:6379/0'),
+        'redis_pitch_data_ttl_seconds': int(os.environ['REDIS_PITCH_DATA_TTL_SECONDS']) if os.environ.get('REDIS_PITCH_DATA_TTL_SECONDS') else None,
+        'analysis_memo': os.environ.get('ANALYSIS_MEMO', 'True').lower() == 'true',
+        'analysis_memo_max_entries': int(os.environ.get('ANALYSIS_MEMO_MAX_ENTRIES', '5000')),
+        'analysis_memo_max_bytes': int(os.environ['ANALYSIS_MEMO_MAX_BYTES']) if os.environ.get('ANALYSIS_MEMO_MAX_BYTES') else None
     }
     
     return config
 
+@st.cache_resource
+def get_service_factory(config: Dict[str, Any]) -> ServiceFactory:
+    """
+    再実行間で共有するサービスファクトリを取得
+    
+    Streamlitは操作のたびにmainを再実行するため、ファクトリ（リポジトリの書き込みスレッド、
+    バックグラウンド更新、APIクライアント）をプロセス内で1つにする
+    キャッシュがクリアされた場合もServiceFactory.sharedが同じインスタンスを返す
+    """
+    return ServiceFactory.shared(config)
+
 def main() -> None:
     """Streamlitアプリケーションのメイン関数"""
     config = get_config()
@@ -49,8 +75,8 @@ def main() -> None:
         else:
             logger.info("Matplotlibベースのアプリケーションを起動します")
         
-        # サービスファクトリの初期化
-        factory = ServiceFactory(config)
+        # サービスファクトリの取得（再実行間で共有）
+        factory = get_service_factory(config)
         
         # Streamlitアプリの作成と実行
         app = factory.create_streamlit_app()
@@ -1,7 +1,7 @@
 """
 分析結果を格納するデータクラス
 """
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Dict, Any, Optional
 import pandas as pd
 import logging
@@ -31,9 +31,16 @@ class AnalysisResult:
     # 全体パフォーマンスサマリー
     performance_summary: Dict[str, Any] = None
     
+    # 球種別の得点価値（RunValueCube.to_dictの形式）
+    run_value_analysis: Dict[str, Any] = field(default_factory=dict)
+    
     # エラー情報
     error: Optional[str] = None
     
+    # データ取得元やキャッシュ状態などのメタデータ
+    # {'data_source': 'cache' | 'api', 'cached_at': ISO日時, 'stale': bool, 'refreshing': bool}
+    metadata: Dict[str, Any] = field(default_factory=dict)
+    
     @property
     def is_valid(self) -> bool:
         """有効な分析結果かどうか"""
@@ -42,6 +49,11 @@ class AnalysisResult:
                self.pitch_type_analysis and \
                self.performance_summary is not None
     
+    @property
+    def is_refreshing(self) -> bool:
+        """元データをバックグラウンドで更新中かどうか"""
+        return bool(self.metadata.get('refreshing'))
+    
     def ensure_pitch_types_translated(self):
         """
         球種名が日本語に変換されていることを確認
@@ -64,6 +76,11 @@ class AnalysisResult:
             self.batted_ball_analysis = translate_pitch_types_in_dataframe(self.batted_ball_analysis)
             logger.debug("被打球分析の球種名を変換")
         
+        # 得点価値
+        if self.run_value_analysis:
+            self.run_value_analysis = translate_pitch_types_in_data(self.run_value_analysis)
+            logger.debug("得点価値の球種名を変換")
+        
         # パフォーマンスサマリー
         if self.performance_summary:
             self.performance_summary = translate_pitch_types_in_data(self.performance_summary)
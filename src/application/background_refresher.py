@@ -0,0 +1,79 @@
+"""
+期限切れのキャッシュをバックグラウンドで更新するワーカー
+"""
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Hashable, Set
+
+
+class BackgroundRefresher:
+    """
+    キャッシュ更新ジョブをバックグラウンドで実行するクラス
+
+    同じキーの更新が実行中または待機中の場合は重複して登録しない
+    ジョブはAPIクライアントのレート制限を共有するため、ワーカー数は少なく保つ
+    """
+
+    def __init__(self, max_workers: int = 1):
+        """
+        Parameters:
+        -----------
+        max_workers : int
+            同時に実行する更新ジョブの数
+        """
+        self.logger = logging.getLogger(__name__)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='cache-refresh')
+        self._in_flight: Set[Hashable] = set()
+        self._lock = threading.Lock()
+
+    def schedule(self, key: Hashable, job: Callable[[], None]) -> bool:
+        """
+        更新ジョブを登録
+
+        Parameters:
+        -----------
+        key : Hashable
+            更新対象を識別するキー
+        job : Callable[[], None]
+            更新処理
+
+        Returns:
+        --------
+        bool
+            新たに登録した場合はTrue、既に更新中の場合はFalse
+        """
+        with self._lock:
+            if key in self._in_flight:
+                return False
+            self._in_flight.add(key)
+
+        def run():
+            try:
+                job()
+                self.logger.info(f"バックグラウンド更新が完了しました: {key}")
+            except Exception as e:
+                self.logger.error(f"バックグラウンド更新中にエラーが発生しました ({key}): {e}")
+            finally:
+                with self._lock:
+                    self._in_flight.discard(key)
+
+        try:
+            self._executor.submit(run)
+        except RuntimeError:
+            # シャットダウン後は更新しない
+            with self._lock:
+                self._in_flight.discard(key)
+            return False
+
+        self.logger.info(f"バックグラウンド更新を登録しました: {key}")
+        return True
+
+    def is_refreshing(self, key: Hashable) -> bool:
+        """指定したキーの更新が実行中または待機中かどうか"""
+        with self._lock:
+            return key in self._in_flight
+
+    def shutdown(self, wait: bool = True) -> None:
+        """ワーカーを停止"""
+        self._executor.shutdown(wait=wait)
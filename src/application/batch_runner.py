@@ -0,0 +1,261 @@
+"""
+多数の投手・試合をまとめて分析するバッチ処理
+
+試合ごとの分析をProcessPoolExecutorのワーカープロセスに振り分け、完了した順に結果を返す
+投球データはメインプロセスで読み込んでメモリマップドArrowファイルとして公開し、
+ワーカーにはキーだけを渡す（大きなDataFrameをpickleしてプロセス間で送らない）
+同時に処理中の試合数を制限するため、試合数が増えてもメモリ使用量は一定に保たれる
+"""
+import os
+import shutil
+import logging
+import tempfile
+from concurrent.futures import Future, ProcessPoolExecutor, FIRST_COMPLETED, wait
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import pandas as pd
+
+from src.domain.entities import Game
+from src.domain.pitch_analyzer import PitchAnalyzer
+from src.infrastructure import shared_frame_store
+from src.infrastructure.shared_frame_store import SharedFrameStore
+from src.application.analysis_result import AnalysisResult
+from src.application.usecases import PitcherGameAnalysisUseCase
+
+
+# 進捗コールバック: (完了した試合数, 全試合数, 完了した試合の分析結果)
+ProgressCallback = Callable[[int, int, AnalysisResult], None]
+
+# ワーカープロセスごとのシーズン別の分析クラスと共有フレームストア（_init_workerで設定）
+_worker_analyzers: Dict[int, PitchAnalyzer] = {}
+_worker_store: Optional[SharedFrameStore] = None
+
+
+def _init_worker(analyzers: Dict[int, PitchAnalyzer], shared_dir: Optional[str]) -> None:
+    """ワーカープロセスの初期化"""
+    global _worker_analyzers, _worker_store
+    _worker_analyzers = analyzers
+    _worker_store = SharedFrameStore(shared_dir) if shared_dir is not None else None
+
+
+def _analyze_in_worker(season: int, key: Optional[str], data: Optional[pd.DataFrame]) -> Dict[str, Any]:
+    """
+    ワーカープロセスで1試合を分析（試合のシーズンの期待打率・期待wOBAの表を使う）
+
+    共有フレームストアを使う場合はkeyで公開済みのフレームを参照し、使わない場合はdataを直接受け取る
+    """
+    analyzer = _worker_analyzers[season]
+    if key is None:
+        return analyzer.analyze_all(data)
+
+    data = _worker_store.attach(key)
+    if data is None:
+        raise RuntimeError(f"共有フレームが見つかりません: {key}")
+    try:
+        return analyzer.analyze_all(data)
+    finally:
+        _worker_store.release(key)
+
+
+def _season(game: Game) -> int:
+    """試合のシーズン年"""
+    return int(game.date[:4])
+
+
+class BatchAnalysisRunner:
+    """投手・試合の組み合わせをプロセスプールで並列に分析するクラス"""
+
+    def __init__(
+        self,
+        use_case: PitcherGameAnalysisUseCase,
+        max_workers: Optional[int] = None,
+        max_in_flight: Optional[int] = None,
+        shared_dir: Optional[str] = None
+    ):
+        """
+        Parameters:
+        -----------
+        use_case : PitcherGameAnalysisUseCase
+            投球データの読み込みと投手情報の取得に使うユースケース
+            分析には試合のシーズンのuse_case.analyzer_for_seasonを使い、use_case.memoがあれば分析済みのデータは再計算しない
+        max_workers : Optional[int]
+            ワーカープロセス数。Noneの場合はCPUコア数
+        max_in_flight : Optional[int]
+            同時に処理中（読み込み済みで結果待ち）にする試合数の上限。Noneの場合はワーカー数の2倍
+        shared_dir : Optional[str]
+            投球データを公開するディレクトリ。Noneの場合は実行ごとに一時ディレクトリを作成して削除する
+            pyarrowがない環境では共有せず、投球データをワーカーに直接渡す
+        """
+        self.use_case = use_case
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_in_flight = max(max_in_flight or self.max_workers * 2, 1)
+        self.shared_dir = shared_dir
+        self.logger = logging.getLogger(__name__)
+
+        self._pitcher_names: Dict[str, str] = {}
+
+    def run(self, games: Iterable[Game], progress_callback: Optional[ProgressCallback] = None) -> List[AnalysisResult]:
+        """
+        すべての試合を分析して結果のリストを返す（完了した順）
+
+        Parameters:
+        -----------
+        games : Iterable[Game]
+            分析する試合（pitcher_id, date, game_pkを使用）
+        progress_callback : Optional[ProgressCallback]
+            1試合完了するごとに呼び出す関数
+
+        Returns:
+        --------
+        List[AnalysisResult]
+            分析結果のリスト
+        """
+        return list(self.iter_results(games, progress_callback))
+
+    def iter_results(self, games: Iterable[Game],
+                     progress_callback: Optional[ProgressCallback] = None) -> Iterator[AnalysisResult]:
+        """
+        試合を分析し、完了した順に結果を返す
+
+        結果を受け取った側で保存・破棄すれば、保持する結果は処理中の試合分だけになる
+
+        Parameters:
+        -----------
+        games : Iterable[Game]
+            分析する試合（pitcher_id, date, game_pkを使用）
+        progress_callback : Optional[ProgressCallback]
+            1試合完了するごとに呼び出す関数
+
+        Yields:
+        -------
+        AnalysisResult
+            1試合の分析結果（データ取得や分析に失敗した試合はerrorを設定した結果）
+        """
+        games = list(games)
+        total = len(games)
+        completed = 0
+
+        use_shared = shared_frame_store.is_available()
+        created_dir = None
+        shared_dir = self.shared_dir
+        if use_shared and shared_dir is None:
+            shared_dir = created_dir = tempfile.mkdtemp(prefix='pitch_batch_')
+        store = SharedFrameStore(shared_dir) if use_shared else None
+
+        self.logger.info(f"{total}試合を{self.max_workers}プロセスで分析します")
+
+        memo = self.use_case.memo
+        # シーズンごとの分析クラス（期待値の表が異なるため、メモ化のキーもシーズンごとのcache_versionを使う）
+        analyzers = {season: self.use_case.analyzer_for_season(season) for season in {_season(g) for g in games}}
+        # 処理中のタスク: (試合, 投球データ, 共有フレームのキー, メモ化のキー)
+        # 投球データは結果の作成（パーセンタイル・得点価値）に使うため、結果を回収するまで保持する
+        pending: Dict[Future, Tuple[Game, pd.DataFrame, Optional[str], Optional[str]]] = {}
+
+        def finish(result: AnalysisResult) -> AnalysisResult:
+            nonlocal completed
+            completed += 1
+            if progress_callback is not None:
+                progress_callback(completed, total, result)
+            return result
+
+        def collect(done: Iterable[Future]) -> Iterator[AnalysisResult]:
+            for future in done:
+                game, pitch_data, key, memo_key = pending.pop(future)
+                if key is not None:
+                    store.unpublish(key)
+                if memo_key is not None and future.exception() is None:
+                    memo.put(memo_key, future.result())
+                yield finish(self._to_result(game, pitch_data, future))
+
+        try:
+            with ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                initializer=_init_worker,
+                initargs=(analyzers, shared_dir if use_shared else None)
+            ) as executor:
+                for index, game in enumerate(games):
+                    # 処理中の試合数が上限に達していれば、いずれかが完了するまで待つ
+                    while len(pending) >= self.max_in_flight:
+                        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                        yield from collect(done)
+
+                    try:
+                        pitch_data = self.use_case.load_pitch_data(game.pitcher_id, game.date, game.game_pk)
+                    except Exception as e:
+                        pitch_data = None
+                        error_msg = f"データ取得中にエラーが発生しました: {str(e)}"
+                    else:
+                        error_msg = f"投手ID {game.pitcher_id} の{game.date}の試合データが取得できませんでした"
+
+                    if pitch_data is None:
+                        self.logger.error(error_msg)
+                        yield finish(self._error_result(game, error_msg))
+                        continue
+
+                    # 分析済みのデータはワーカーに渡さずに保存済みの結果を使う
+                    memo_key = None
+                    if memo is not None:
+                        memo_key = memo.make_key(pitch_data, 'analyze_all', analyzers[_season(game)].cache_version)
+                        analysis = memo.get(memo_key)
+                        if analysis is not None:
+                            yield finish(self._build_result(game, pitch_data, analysis))
+                            continue
+
+                    if use_shared:
+                        key = f"batch_{os.getpid()}_{index}"
+                        store.publish(key, pitch_data)
+                        future = executor.submit(_analyze_in_worker, _season(game), key, None)
+                    else:
+                        key = None
+                        future = executor.submit(_analyze_in_worker, _season(game), None, pitch_data)
+                    pending[future] = (game, pitch_data, key, memo_key)
+
+                while pending:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    yield from collect(done)
+        finally:
+            if created_dir is not None:
+                shutil.rmtree(created_dir, ignore_errors=True)
+
+        self.logger.info(f"{completed}試合の分析が完了しました")
+
+    def _pitcher_name(self, pitcher_id: str) -> str:
+        """投手名（見つからない場合は'Unknown'）"""
+        if pitcher_id not in self._pitcher_names:
+            pitcher = self.use_case.repository.get_pitcher_info(pitcher_id)
+            self._pitcher_names[pitcher_id] = pitcher.name if pitcher is not None else "Unknown"
+        return self._pitcher_names[pitcher_id]
+
+    def _to_result(self, game: Game, pitch_data: pd.DataFrame, future: Future) -> AnalysisResult:
+        """完了したタスクから分析結果を作成"""
+        try:
+            analysis = future.result()
+        except Exception as e:
+            error_msg = f"データ分析中にエラーが発生しました: {str(e)}"
+            self.logger.error(error_msg)
+            return self._error_result(game, error_msg)
+
+        return self._build_result(game, pitch_data, analysis)
+
+    def _build_result(self, game: Game, pitch_data: pd.DataFrame, analysis: Dict[str, Any]) -> AnalysisResult:
+        """analyze_allの結果から分析結果を作成（analyze_gameと同じくパーセンタイルと得点価値を含める）"""
+        try:
+            return self.use_case.build_analysis_result(
+                game.pitcher_id, self._pitcher_name(game.pitcher_id), game.date,
+                pitch_data, analysis, {'data_source': 'batch'}
+            )
+        except Exception as e:
+            error_msg = f"データ分析中にエラーが発生しました: {str(e)}"
+            self.logger.error(error_msg)
+            return self._error_result(game, error_msg)
+
+    def _error_result(self, game: Game, error_msg: str) -> AnalysisResult:
+        """エラーの分析結果を作成"""
+        return AnalysisResult(
+            pitcher_id=game.pitcher_id,
+            pitcher_name=self._pitcher_name(game.pitcher_id),
+            game_date=game.date,
+            inning_analysis={},
+            pitch_type_analysis={},
+            error=error_msg
+        )
@@ -3,14 +3,26 @@
 各コンポーネントを連携させ、アプリケーションのビジネスロジックを実装
 """
 import logging
-from typing import List, Dict, Any, Optional
+import pandas as pd
+from datetime import datetime, timedelta
+from typing import List, Dict, Any, Optional, Type
 
 from src.domain.entities import Pitcher, Game
 from src.domain.pitch_analyzer import PitchAnalyzer
+from src.domain.incremental_analyzer import IncrementalPitchAnalyzer
+from src.domain.game_cube import CubeT
+from src.domain.league_baseline import LeagueBaseline
+from src.domain.expected_outcomes import ExpectedOutcomeTable
+from src.domain.sketches import SketchCube
+from src.domain.run_values import RunValueCube
+from src.domain.tunneling import TunnelCube
 from src.domain.pitch_utils import translate_pitch_types_in_data, translate_pitch_types_in_dataframe
 from src.infrastructure.baseball_savant_client import BaseballSavantClient
-from src.infrastructure.data_repository import DataRepository
+from src.infrastructure.storage_backend import StorageBackend
+from src.infrastructure.analysis_memo import AnalysisMemo
+from src.infrastructure.artifact_store import GameArtifactStore
 from src.application.analysis_result import AnalysisResult
+from src.application.background_refresher import BackgroundRefresher
 
 class PitcherGameAnalysisUseCase:
     """
@@ -23,23 +35,50 @@ class PitcherGameAnalysisUseCase:
     def __init__(
         self,
         client: BaseballSavantClient,
-        repository: DataRepository,
-        analyzer: PitchAnalyzer
+        repository: StorageBackend,
+        analyzer: PitchAnalyzer,
+        refresher: Optional[BackgroundRefresher] = None,
+        soft_ttl: timedelta = timedelta(hours=24),
+        memo: Optional[AnalysisMemo] = None,
+        artifact_store: Optional[GameArtifactStore] = None
     ):
         """
         Parameters:
         -----------
         client : BaseballSavantClient
             Baseball Savantクライアント
-        repository : DataRepository
-            データリポジトリ
+        repository : StorageBackend
+            データリポジトリ（ストレージバックエンド）
         analyzer : PitchAnalyzer
-            投球分析ツール
+            投球分析ツール。期待打率・期待wOBAの表は試合のシーズンのものに置き換えて使う
+            （artifact_storeがない場合や表が1つも保存されていない場合はanalyzerの表を使う）
+        refresher : Optional[BackgroundRefresher]
+            キャッシュのバックグラウンド更新ワーカー。Noneの場合は更新しない
+        soft_ttl : timedelta
+            この期間を過ぎたキャッシュはそのまま返しつつバックグラウンドで更新する
+        memo : Optional[AnalysisMemo]
+            分析結果のメモ化に使うキャッシュ。Noneの場合は毎回分析する
+        artifact_store : Optional[GameArtifactStore]
+            試合ごとの集計（キューブ）とリーグ全体の分布・期待値の表の保存先。Noneの場合は毎回投球データから集計し、
+            パーセンタイルは付けない
         """
         self.client = client
         self.repository = repository
         self.analyzer = analyzer
+        self.refresher = refresher
+        self.soft_ttl = soft_ttl
+        self.memo = memo
+        self.artifact_store = artifact_store
         self.logger = logging.getLogger(__name__)
+        
+        # 試合中の試合ごとの逐次集計（キー: (投手ID, 試合日)）
+        self._live_analyzers: Dict[tuple, IncrementalPitchAnalyzer] = {}
+        
+        # 読み込んだリーグ全体の分布（キー: シーズン。保存されていないシーズンはNone）
+        self._league_baselines: Dict[int, Optional[LeagueBaseline]] = {}
+        
+        # シーズンごとに使う期待打率・期待wOBAの表（キー: シーズン。表がないシーズンは最新の表）
+        self._expected_outcomes: Dict[int, Optional[ExpectedOutcomeTable]] = {}
     
     def search_pitchers(self, name: str) -> List[Pitcher]:
         """
@@ -70,6 +109,9 @@ class PitcherGameAnalysisUseCase:
         """
         投手IDからその年の試合一覧を取得
         
+        一度APIから取得したシーズンはキャッシュの試合一覧をすぐに返し、古くなっていればバックグラウンドで更新する
+        一度も取得していないシーズンだけAPIから取得するまで待つ
+        
         Parameters:
         -----------
         pitcher_id : str
@@ -84,27 +126,94 @@ class PitcherGameAnalysisUseCase:
         """
         self.logger.info(f"投手ID {pitcher_id} の{season}シーズンの試合を取得します")
         
-        # リポジトリからキャッシュされた試合一覧を取得
-        cached_games = self.repository.get_games_by_pitcher(pitcher_id)
-        
-        # キャッシュから当該シーズンの試合だけ抽出
-        season_games = [g for g in cached_games if g.date.startswith(str(season))]
+        # リポジトリからキャッシュされた当該シーズンの試合一覧を取得（seasonのインデックスを使う）
+        season_games = self.repository.get_games_by_pitcher(pitcher_id, season=season)
         
-        # キャッシュが十分でない場合、APIから取得
-        if len(season_games) < 5:  # 5試合未満の場合は更新
-            self.logger.info(f"キャッシュ不十分: APIから試合データを取得します")
+        # 一度もAPIから取得していないシーズンは、APIから取得するまで待つ
+        fetched_at = self.repository.get_game_list_fetched_at(pitcher_id, season)
+        if fetched_at is None:
+            self.logger.info(f"試合一覧が未取得: APIから試合データを取得します")
             api_games = self.client.get_pitcher_games(pitcher_id, season)
             
             # リポジトリに保存
             for game in api_games:
                 self.repository.save_game_info(game)
+            self.repository.record_game_list_fetch(pitcher_id, season)
             
             return api_games
         
+        # 取得済みの試合一覧は試合数によらずキャッシュから返す
         self.logger.info(f"キャッシュから{len(season_games)}試合分のデータを取得しました")
+        
+        # 古くなった試合一覧はそのまま返し、バックグラウンドで更新する
+        if self.refresher is not None and self._is_stale(fetched_at):
+            self.refresher.schedule(
+                self._games_refresh_key(pitcher_id, season),
+                lambda: self._refresh_games(pitcher_id, season)
+            )
+        
         return season_games
     
-    def analyze_game(self, pitcher_id: str, game_date: str) -> AnalysisResult:
+    def is_refreshing_games(self, pitcher_id: str, season: int) -> bool:
+        """
+        試合一覧をバックグラウンドで更新中かどうか
+        
+        Parameters:
+        -----------
+        pitcher_id : str
+            投手ID
+        season : int
+            シーズン年
+        """
+        return self.refresher is not None and \
+            self.refresher.is_refreshing(self._games_refresh_key(pitcher_id, season))
+    
+    def _is_stale(self, cached_at: Optional[datetime]) -> bool:
+        """キャッシュがソフトTTLを過ぎているかどうか（日時が不明な場合も古いとみなす）"""
+        return cached_at is None or datetime.now() - cached_at > self.soft_ttl
+    
+    @staticmethod
+    def _games_refresh_key(pitcher_id: str, season: int) -> tuple:
+        """試合一覧の更新ジョブのキー"""
+        return ('games', pitcher_id, int(season))
+    
+    @staticmethod
+    def _pitch_data_refresh_key(pitcher_id: str, game_date: str) -> tuple:
+        """投球データの更新ジョブのキー"""
+        return ('pitch_data', pitcher_id, game_date)
+    
+    def _refresh_games(self, pitcher_id: str, season: int) -> None:
+        """試合一覧をAPIから取得し直してキャッシュを更新"""
+        api_games = self.client.get_pitcher_games(pitcher_id, season)
+        if not api_games:
+            return
+        
+        for game in api_games:
+            self.repository.save_game_info(game)
+        self.repository.record_game_list_fetch(pitcher_id, season)
+    
+    def _fetch_pitch_data(self, pitcher_id: str, game_date: str, game_pk: Optional[int] = None):
+        """
+        APIから投球データを取得
+        
+        game_pkが分かっている場合は日付範囲ではなくgame_pkで問い合わせる
+        """
+        if game_pk is None:
+            game_pk = self.repository.get_game_pk(pitcher_id, game_date)
+        
+        if game_pk:
+            return self.client.get_pitch_data(pitcher_id, game_date, game_pk=int(game_pk))
+        return self.client.get_pitch_data(pitcher_id, game_date)
+    
+    def _refresh_pitch_data(self, pitcher_id: str, game_date: str, game_pk: Optional[int] = None) -> None:
+        """投球データをAPIから取得し直してキャッシュを更新"""
+        pitch_data = self._fetch_pitch_data(pitcher_id, game_date, game_pk)
+        if pitch_data is None or pitch_data.empty:
+            return
+        
+        self.repository.save_pitch_data(pitcher_id, game_date, pitch_data)
+    
+    def analyze_game(self, pitcher_id: str, game_date: str, game_pk: Optional[int] = None) -> AnalysisResult:
         """
         特定試合の分析を実行
         
@@ -114,6 +223,8 @@ class PitcherGameAnalysisUseCase:
             投手ID
         game_date : str
             試合日（YYYY-MM-DD形式）
+        game_pk : Optional[int]
+            試合ID。Noneの場合は保存済みの試合情報から探す
             
         Returns:
         --------
@@ -138,12 +249,29 @@ class PitcherGameAnalysisUseCase:
         
         # キャッシュからデータ取得を試みる
         pitch_data = self.repository.get_cached_pitch_data(pitcher_id, game_date)
+        metadata = {'data_source': 'cache', 'stale': False, 'refreshing': False}
+        
+        # 古くなったキャッシュはそのまま使い、バックグラウンドで更新する
+        if pitch_data is not None and self.refresher is not None:
+            cached_at = self.repository.get_pitch_data_cached_at(pitcher_id, game_date)
+            if cached_at is not None:
+                metadata['cached_at'] = cached_at.isoformat()
+            
+            if self._is_stale(cached_at):
+                refresh_key = self._pitch_data_refresh_key(pitcher_id, game_date)
+                self.refresher.schedule(
+                    refresh_key,
+                    lambda: self._refresh_pitch_data(pitcher_id, game_date, game_pk)
+                )
+                metadata['stale'] = True
+                metadata['refreshing'] = self.refresher.is_refreshing(refresh_key)
         
         # キャッシュになければAPIから取得
         if pitch_data is None:
+            metadata['data_source'] = 'api'
             try:
                 self.logger.info(f"キャッシュにデータがないため、APIから取得します")
-                pitch_data = self.client.get_pitch_data(pitcher_id, game_date)
+                pitch_data = self._fetch_pitch_data(pitcher_id, game_date, game_pk)
                 
                 if pitch_data is None or pitch_data.empty:
                     error_msg = f"投手ID {pitcher_id} の{game_date}の試合データが取得できませんでした"
@@ -174,20 +302,10 @@ class PitcherGameAnalysisUseCase:
         
         # 各種分析を実行
         try:
-            inning_analysis = self.analyzer.analyze_by_inning(pitch_data)
-            pitch_type_analysis = self.analyzer.analyze_by_pitch_type(pitch_data)
-            batted_ball_analysis = self.analyzer.analyze_batted_balls(pitch_data)
-            performance_summary = self.analyzer.get_performance_summary(pitch_data)
-            
-            # 分析結果を作成
-            result = AnalysisResult(
-                pitcher_id=pitcher_id,
-                pitcher_name=pitcher.name,
-                game_date=game_date,
-                inning_analysis=inning_analysis,
-                pitch_type_analysis=pitch_type_analysis,
-                batted_ball_analysis=batted_ball_analysis,
-                performance_summary=performance_summary
+            # 結果フラグと集計を共有して4種類の分析をまとめて実行
+            analysis = self.analyze_pitch_data(pitch_data, season=int(game_date[:4]))
+            result = self.build_analysis_result(
+                pitcher_id, pitcher.name, game_date, pitch_data, analysis, metadata
             )
             
             self.logger.info(f"分析が正常に完了しました")
@@ -203,4 +321,545 @@ class PitcherGameAnalysisUseCase:
                 inning_analysis={},
                 pitch_type_analysis={},
                 error=error_msg
-            )
\ No newline at end of file
+            )
+    
+    def analyze_pitch_data(self, pitch_data: pd.DataFrame, season: Optional[int] = None) -> Dict[str, Any]:
+        """
+        投球データの分析をまとめて実行（PitchAnalyzer.analyze_allと同じ形式）
+        
+        seasonを指定した場合はそのシーズンの期待打率・期待wOBAの表で分析する
+        メモ化が有効な場合、同じ内容のデータを同じ表で分析済みであれば保存済みの結果を返す
+        """
+        analyzer = self.analyzer if season is None else self.analyzer_for_season(season)
+        if self.memo is None:
+            return analyzer.analyze_all(pitch_data)
+        
+        return self.memo.get_or_compute(
+            pitch_data, 'analyze_all', analyzer.cache_version, analyzer.analyze_all
+        )
+    
+    def build_analysis_result(self, pitcher_id: str, pitcher_name: str, game_date: str,
+                              pitch_data: pd.DataFrame, analysis: Dict[str, Any],
+                              metadata: Optional[Dict[str, Any]] = None) -> AnalysisResult:
+        """
+        analyze_allの結果から1試合の分析結果を作成
+        
+        球種別の分析には試合のシーズンのリーグ内パーセンタイルを付け、得点価値の分析を追加する
+        （analyze_gameとバッチ処理で同じ内容の結果にするため、分析結果はこのメソッドで作成する）
+        
+        Parameters:
+        -----------
+        pitcher_id : str
+            投手ID
+        pitcher_name : str
+            投手名
+        game_date : str
+            試合日（YYYY-MM-DD形式）
+        pitch_data : pd.DataFrame
+            分析した投球データ
+        analysis : Dict[str, Any]
+            analyze_pitch_data（PitchAnalyzer.analyze_all）の結果
+        metadata : Optional[Dict[str, Any]]
+            分析結果に付けるメタデータ
+            
+        Returns:
+        --------
+        AnalysisResult
+            分析結果
+        """
+        pitch_type_analysis = analysis['pitch_type_analysis']
+        
+        # リーグ全体の分布があれば球種ごとのパーセンタイルを付ける
+        baseline = self.get_league_baseline(int(game_date[:4]))
+        if baseline is not None:
+            pitch_type_analysis = self.analyzer.annotate_percentiles(pitch_data, pitch_type_analysis, baseline)
+        
+        return AnalysisResult(
+            pitcher_id=pitcher_id,
+            pitcher_name=pitcher_name,
+            game_date=game_date,
+            inning_analysis=analysis['inning_analysis'],
+            pitch_type_analysis=pitch_type_analysis,
+            batted_ball_analysis=analysis['batted_ball_analysis'],
+            performance_summary=analysis['performance_summary'],
+            run_value_analysis=self.analyzer.analyze_run_values(pitch_data),
+            metadata=metadata or {}
+        )
+    
+    def analyze_live_game(self, pitcher_id: str, game_date: str, game_pk: Optional[int] = None) -> AnalysisResult:
+        """
+        試合中の試合をAPIから取得し直して分析
+        
+        前回の呼び出しまでの集計を保持し、新しく届いた投球だけを追加で集計する
+        
+        Parameters:
+        -----------
+        pitcher_id : str
+            投手ID
+        game_date : str
+            試合日（YYYY-MM-DD形式）
+        game_pk : Optional[int]
+            試合ID。Noneの場合は保存済みの試合情報から探す
+            
+        Returns:
+        --------
+        AnalysisResult
+            分析結果。metadataに今回追加した投球数（'new_pitches'）を含む
+        """
+        pitcher = self.repository.get_pitcher_info(pitcher_id)
+        pitcher_name = pitcher.name if pitcher is not None else "Unknown"
+        
+        key = (pitcher_id, game_date)
+        live = self._live_analyzers.get(key)
+        if live is None:
+            live = self._live_analyzers[key] = IncrementalPitchAnalyzer(self.analyzer_for_season(int(game_date[:4])))
+        
+        try:
+            pitch_data = self._fetch_pitch_data(pitcher_id, game_date, game_pk)
+            new_pitches = 0
+            if pitch_data is not None and not pitch_data.empty:
+                new_pitches = live.update(pitch_data)
+                if new_pitches:
+                    self.repository.save_pitch_data(pitcher_id, game_date, pitch_data)
+            
+            analysis = live.results()
+        except Exception as e:
+            error_msg = f"試合中のデータ分析中にエラーが発生しました: {str(e)}"
+            self.logger.error(error_msg)
+            return AnalysisResult(
+                pitcher_id=pitcher_id,
+                pitcher_name=pitcher_name,
+                game_date=game_date,
+                inning_analysis={},
+                pitch_type_analysis={},
+                error=error_msg
+            )
+        
+        self.logger.info(f"投手ID {pitcher_id} の{game_date}の試合に{new_pitches}球を追加しました")
+        return AnalysisResult(
+            pitcher_id=pitcher_id,
+            pitcher_name=pitcher_name,
+            game_date=game_date,
+            inning_analysis=analysis['inning_analysis'],
+            pitch_type_analysis=analysis['pitch_type_analysis'],
+            batted_ball_analysis=analysis['batted_ball_analysis'],
+            performance_summary=analysis['performance_summary'],
+            metadata={'data_source': 'live', 'new_pitches': new_pitches, 'total_pitches': live.pitch_count}
+        )
+    
+    def end_live_game(self, pitcher_id: str, game_date: str) -> None:
+        """試合終了後に逐次集計を破棄する"""
+        self._live_analyzers.pop((pitcher_id, game_date), None)
+    
+    def load_pitch_data(self, pitcher_id: str, game_date: str, game_pk: Optional[int] = None) -> Optional[pd.DataFrame]:
+        """
+        投球データをキャッシュから取得し、なければAPIから取得してキャッシュに保存
+        
+        Parameters:
+        -----------
+        pitcher_id : str
+            投手ID
+        game_date : str
+            試合日（YYYY-MM-DD形式）
+        game_pk : Optional[int]
+            試合ID。Noneの場合は保存済みの試合情報から探す
+            
+        Returns:
+        --------
+        Optional[pd.DataFrame]
+            投球データ。取得できなかった場合はNone（APIのエラーはそのまま送出する）
+        """
+        pitch_data = self.repository.get_cached_pitch_data(pitcher_id, game_date)
+        if pitch_data is not None:
+            return pitch_data
+        
+        pitch_data = self._fetch_pitch_data(pitcher_id, game_date, game_pk)
+        if pitch_data is None or pitch_data.empty:
+            return None
+        
+        self.repository.save_pitch_data(pitcher_id, game_date, pitch_data)
+        return pitch_data
+    
+    def load_season_pitch_data(self, pitcher_id: str, season: int) -> pd.DataFrame:
+        """
+        保存済みの試合一覧の投球データ（キャッシュになければAPIから取得）を結合
+        
+        Parameters:
+        -----------
+        pitcher_id : str
+            投手ID
+        season : int
+            シーズン年
+            
+        Returns:
+        --------
+        pd.DataFrame
+            1シーズン分の投球データ（game_dateを含む）。データがない場合は空のデータフレーム
+        """
+        games = self.repository.get_games_by_pitcher(pitcher_id, season=season)
+        self.logger.info(f"投手ID {pitcher_id} の{season}年の{len(games)}試合のデータを読み込みます")
+        
+        frames = []
+        for game in games:
+            try:
+                pitch_data = self.load_pitch_data(pitcher_id, game.date, game.game_pk)
+            except Exception as e:
+                self.logger.error(f"{game.date}の試合データの取得中にエラーが発生しました: {str(e)}")
+                continue
+            
+            if pitch_data is None:
+                continue
+            
+            # 試合を識別できるよう試合日を付与（Statcastのデータには元から含まれる）
+            if 'game_date' not in pitch_data.columns:
+                pitch_data = pitch_data.assign(game_date=game.date)
+            frames.append(pitch_data)
+        
+        if not frames:
+            return pd.DataFrame()
+        
+        return pd.concat(frames, ignore_index=True)
+    
+    def aggregate_season(self, pitcher_id: str, season: int) -> pd.DataFrame:
+        """
+        投手の1シーズン分の試合をまとめて集計
+        
+        保存済みの試合一覧の投球データ（キャッシュになければAPIから取得）を結合し、
+        1回の集計で試合×球種・試合×イニング・シーズン合計などを求める
+        
+        Parameters:
+        -----------
+        pitcher_id : str
+            投手ID
+        season : int
+            シーズン年
+            
+        Returns:
+        --------
+        pd.DataFrame
+            PitchAnalyzer.aggregate_gamesの集計表。データがない場合は空のデータフレーム
+        """
+        season_data = self.load_season_pitch_data(pitcher_id, season)
+        if season_data.empty:
+            return pd.DataFrame()
+        
+        return self.analyzer.aggregate_games(season_data)
+    
+    def analyze_season_fatigue(self, pitcher_id: str, season: int, window: int = 10) -> Dict[str, Any]:
+        """
+        1シーズン分の巡目別・球数帯別の成績と、試合ごとの球速低下をまとめて分析
+        
+        Parameters:
+        -----------
+        pitcher_id : str
+            投手ID
+        season : int
+            シーズン年
+        window : int
+            球速・空振り率の移動平均の球数
+            
+        Returns:
+        --------
+        Dict[str, Any]
+            PitchAnalyzer.analyze_fatigueの結果（velocity_dropのキーはgame_pk、ない場合は試合日）
+        """
+        season_data = self.load_season_pitch_data(pitcher_id, season)
+        if season_data.empty:
+            return {'error': f"投手ID {pitcher_id} の{season}年の投球データがありません"}
+        
+        return self.analyzer.analyze_fatigue(season_data, window=window)
+    
+    def get_league_baseline(self, season: int) -> Optional[LeagueBaseline]:
+        """
+        保存済みのリーグ全体の分布を取得（一度読み込んだシーズンはメモリに保持する）
+        
+        Parameters:
+        -----------
+        season : int
+            シーズン年
+            
+        Returns:
+        --------
+        Optional[LeagueBaseline]
+            リーグ全体の分布。保存先がない場合や、そのシーズンの分布が保存されていない場合はNone
+        """
+        if self.artifact_store is None:
+            return None
+        
+        if season not in self._league_baselines:
+            baseline = None
+            arrays = self.artifact_store.load_season(LeagueBaseline.KIND, LeagueBaseline.VERSION, season)
+            if arrays is not None:
+                try:
+                    baseline = LeagueBaseline.from_arrays(arrays)
+                except (KeyError, ValueError) as e:
+                    self.logger.warning(f"{season}年のリーグ全体の分布を読み込めませんでした: {str(e)}")
+            self._league_baselines[season] = baseline
+        
+        return self._league_baselines[season]
+    
+    def save_league_baseline(self, baseline: LeagueBaseline) -> None:
+        """
+        リーグ全体の分布を保存（同じシーズンの分布は置き換える）
+        
+        Raises:
+        -------
+        ValueError
+            保存先が設定されていない場合
+        """
+        if self.artifact_store is None:
+            raise ValueError("リーグ全体の分布の保存先が設定されていません")
+        
+        self.artifact_store.save_season(
+            LeagueBaseline.KIND, LeagueBaseline.VERSION, baseline.season, baseline.to_arrays()
+        )
+        self._league_baselines[baseline.season] = baseline
+    
+    def save_expected_outcomes(self, table: ExpectedOutcomeTable) -> None:
+        """
+        被打球の期待打率・期待wOBAの表を保存し、以降のそのシーズンの試合の分析で使う
+        
+        最新のシーズンの表はanalyzerの表にもする（シーズンを指定しない分析と、表がないシーズンの分析で使う）
+        
+        Raises:
+        -------
+        ValueError
+            保存先が設定されていない場合
+        """
+        if self.artifact_store is None:
+            raise ValueError("期待打率・期待wOBAの表の保存先が設定されていません")
+        
+        self.artifact_store.save_season(
+            ExpectedOutcomeTable.KIND, ExpectedOutcomeTable.VERSION, table.season, table.to_arrays()
+        )
+        # 最新の表で代用していたシーズンがあるため、読み込んだ表は選び直す
+        self._expected_outcomes.clear()
+        self._expected_outcomes[table.season] = table
+        latest = self.analyzer.expected_outcomes
+        if latest is None or table.season >= latest.season:
+            self.analyzer.expected_outcomes = table
+    
+    def get_expected_outcomes(self, season: int) -> Optional[ExpectedOutcomeTable]:
+        """
+        シーズンの分析に使う被打球の期待打率・期待wOBAの表を取得（一度読み込んだシーズンはメモリに保持する）
+        
+        そのシーズンの表が保存されていない場合は、保存済みの最新のシーズンの表を使う
+        
+        Parameters:
+        -----------
+        season : int
+            シーズン年
+            
+        Returns:
+        --------
+        Optional[ExpectedOutcomeTable]
+            期待値の表。保存先がない場合や表が1つも保存されていない場合はanalyzerの表（ない場合はNone）
+        """
+        if self.artifact_store is None:
+            return self.analyzer.expected_outcomes
+        
+        if season not in self._expected_outcomes:
+            table = self._load_expected_outcomes(season)
+            if table is None:
+                seasons = self.artifact_store.list_seasons(ExpectedOutcomeTable.KIND, ExpectedOutcomeTable.VERSION)
+                if seasons and seasons[-1] != season:
+                    table = self._load_expected_outcomes(seasons[-1])
+            self._expected_outcomes[season] = table if table is not None else self.analyzer.expected_outcomes
+        
+        return self._expected_outcomes[season]
+    
+    def _load_expected_outcomes(self, season: int) -> Optional[ExpectedOutcomeTable]:
+        """保存済みの期待値の表を読み込む（ない場合や読み込めない場合はNone）"""
+        arrays = self.artifact_store.load_season(ExpectedOutcomeTable.KIND, ExpectedOutcomeTable.VERSION, season)
+        if arrays is None:
+            return None
+        try:
+            return ExpectedOutcomeTable.from_arrays(arrays)
+        except (KeyError, ValueError) as e:
+            self.logger.warning(f"{season}年の期待打率・期待wOBAの表を読み込めませんでした: {str(e)}")
+            return None
+    
+    def analyzer_for_season(self, season: int) -> PitchAnalyzer:
+        """
+        シーズンの期待打率・期待wOBAの表で分析する分析クラス
+        
+        分析結果のメモ化のキーにはこの分析クラスのcache_version（表のfingerprintを含む）を使うこと
+        """
+        if self.artifact_store is None:
+            return self.analyzer
+        
+        table = self.get_expected_outcomes(season)
+        current = self.analyzer.expected_outcomes
+        if table is current or (table is not None and current is not None and table.fingerprint == current.fingerprint):
+            return self.analyzer
+        return self.analyzer.with_expected_outcomes(table)
+    
+    def get_game_cube(self, cube_class: Type[CubeT], pitcher_id: str, game: Game) -> Optional[CubeT]:
+        """
+        1試合分の集計（キューブ）を取得
+        
+        保存済みの集計があり、集計後に新しい投球データがキャッシュされていなければそれを使い、
+        なければ投球データから集計して保存する
+        （容量制限などで投球データのキャッシュが削除された試合も、保存済みの集計をそのまま使う）
+        
+        Parameters:
+        -----------
+        cube_class : Type[GameCube]
+            集計のクラス（ZoneGridCubeなど）
+        pitcher_id : str
+            投手ID
+        game : Game
+            試合（date, game_pkを使用）
+            
+        Returns:
+        --------
+        Optional[GameCube]
+            1試合分の集計。投球データが取得できなかった場合はNone
+        """
+        store = self.artifact_store
+        if store is not None:
+            stored = store.load_with_metadata(cube_class.KIND, cube_class.VERSION, pitcher_id, game.date)
+            if stored is not None:
+                arrays, metadata = stored
+                cached_at = self.repository.get_pitch_data_cached_at(pitcher_id, game.date)
+                if not self._is_newer_source(cached_at, metadata.get('source_cached_at', '')):
+                    try:
+                        return cube_class.from_arrays(arrays)
+                    except (KeyError, ValueError) as e:
+                        self.logger.warning(f"保存済みの集計を使えないため再集計します: {str(e)}")
+        
+        pitch_data = self.load_pitch_data(pitcher_id, game.date, game.game_pk)
+        if pitch_data is None:
+            return None
+        
+        cube = cube_class.from_pitches(pitch_data)
+        if store is not None:
+            # 投球データをAPIから取得した場合はここで保存されたキャッシュ日時を記録する
+            cached_at = self.repository.get_pitch_data_cached_at(pitcher_id, game.date)
+            store.save(
+                cube_class.KIND, cube_class.VERSION, pitcher_id, game.date, cube.to_arrays(),
+                metadata={'source_cached_at': cached_at.isoformat() if cached_at is not None else ''}
+            )
+        return cube
+    
+    @staticmethod
+    def _is_newer_source(cached_at: Optional[datetime], source_cached_at: str) -> bool:
+        """
+        集計元より新しい投球データがキャッシュされているかどうか
+        
+        キャッシュがない場合は新しいデータがないとみなし、集計元のキャッシュ日時が不明な場合は新しいとみなす
+        """
+        if cached_at is None:
+            return False
+        if not source_cached_at:
+            return True
+        try:
+            return cached_at > datetime.fromisoformat(source_cached_at)
+        except ValueError:
+            return True
+    
+    def aggregate_cube(self, cube_class: Type[CubeT], pitcher_id: str, season: Optional[int] = None,
+                       start_date: Optional[str] = None, end_date: Optional[str] = None) -> CubeT:
+        """
+        保存済みの試合一覧の集計（キューブ）を足し合わせる
+        
+        Parameters:
+        -----------
+        cube_class : Type[GameCube]
+            集計のクラス（ZoneGridCubeなど）
+        pitcher_id : str
+            投手ID
+        season : Optional[int]
+            シーズン年。Noneの場合はすべての試合
+        start_date, end_date : Optional[str]
+            対象とする試合日の範囲（YYYY-MM-DD形式、両端を含む）
+            
+        Returns:
+        --------
+        GameCube
+            期間内の試合を足し合わせた集計（試合がない場合は投球のない集計）
+        """
+        games = self.repository.get_games_by_pitcher(pitcher_id, season=season)
+        games = [
+            g for g in games
+            if (start_date is None or g.date >= start_date) and (end_date is None or g.date <= end_date)
+        ]
+        self.logger.info(f"投手ID {pitcher_id} の{len(games)}試合の{cube_class.KIND}を集計します")
+        
+        cubes = []
+        for game in games:
+            try:
+                cube = self.get_game_cube(cube_class, pitcher_id, game)
+            except Exception as e:
+                self.logger.error(f"{game.date}の試合の集計中にエラーが発生しました: {str(e)}")
+                continue
+            if cube is not None:
+                cubes.append(cube)
+        
+        return cube_class.merge_all(cubes)
+    
+    def aggregate_run_values(self, pitcher_id: str, season: Optional[int] = None,
+                             start_date: Optional[str] = None, end_date: Optional[str] = None) -> Dict[str, Any]:
+        """
+        期間内の球種別の得点価値を、試合ごとの集計（RunValueCube）を足し合わせて求める
+        
+        Parameters:
+        -----------
+        pitcher_id : str
+            投手ID
+        season : Optional[int]
+            シーズン年。Noneの場合はすべての試合
+        start_date, end_date : Optional[str]
+            対象とする試合日の範囲（YYYY-MM-DD形式、両端を含む）
+            
+        Returns:
+        --------
+        Dict[str, Any]
+            RunValueCube.to_dictの形式の辞書
+        """
+        cube = self.aggregate_cube(RunValueCube, pitcher_id, season=season, start_date=start_date, end_date=end_date)
+        return cube.to_dict()
+    
+    def aggregate_tunneling(self, pitcher_id: str, season: Optional[int] = None,
+                            start_date: Optional[str] = None, end_date: Optional[str] = None) -> Dict[str, Any]:
+        """
+        期間内の球種の組ごとのトンネルを、試合ごとの集計（TunnelCube）を足し合わせて求める
+        
+        Parameters:
+        -----------
+        pitcher_id : str
+            投手ID
+        season : Optional[int]
+            シーズン年。Noneの場合はすべての試合
+        start_date, end_date : Optional[str]
+            対象とする試合日の範囲（YYYY-MM-DD形式、両端を含む）
+            
+        Returns:
+        --------
+        Dict[str, Any]
+            TunnelCube.to_dictの形式の辞書
+        """
+        cube = self.aggregate_cube(TunnelCube, pitcher_id, season=season, start_date=start_date, end_date=end_date)
+        return cube.to_dict()
+    
+    def summarize_period(self, pitcher_id: str, season: Optional[int] = None,
+                         start_date: Optional[str] = None, end_date: Optional[str] = None) -> Dict[str, Any]:
+        """
+        期間内の球速・回転数の分位数と対戦打者数を、試合ごとのスケッチを合わせて近似的に求める
+        
+        Parameters:
+        -----------
+        pitcher_id : str
+            投手ID
+        season : Optional[int]
+            シーズン年。Noneの場合はすべての試合（通算）
+        start_date, end_date : Optional[str]
+            対象とする試合日の範囲（YYYY-MM-DD形式、両端を含む）
+            
+        Returns:
+        --------
+        Dict[str, Any]
+            SketchCube.summaryの結果
+        """
+        sketch = self.aggregate_cube(SketchCube, pitcher_id, season=season, start_date=start_date, end_date=end_date)
+        return sketch.summary()
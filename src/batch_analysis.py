@@ -0,0 +1,103 @@
+"""
+複数の投手・試合をまとめて分析するバッチ処理のコマンド
+
+使用例:
+    python -m src.batch_analysis --pitcher 660271 --pitcher 543037 --season 2024
+    python -m src.batch_analysis --pitcher 660271 --season 2024 --workers 16 --max-in-flight 32
+"""
+import sys
+import argparse
+import logging
+from typing import Dict, Any, List, Optional
+
+from src.application.analysis_result import AnalysisResult
+from src.service_factory import ServiceFactory
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """コマンドライン引数を解析"""
+    parser = argparse.ArgumentParser(description='MLB投手分析ツール バッチ分析')
+
+    parser.add_argument('--pitcher', action='append', required=True,
+                        help='対象の投手ID（複数指定可）')
+
+    parser.add_argument('--season', type=int, required=True,
+                        help='対象のシーズン年')
+
+    parser.add_argument('--workers', type=int, default=None,
+                        help='ワーカープロセス数（省略時はCPUコア数）')
+
+    parser.add_argument('--max-in-flight', type=int, default=None,
+                        help='同時に処理中にする試合数の上限（省略時はワーカー数の2倍）')
+
+    parser.add_argument('--cache-dir', default='./data',
+                        help='キャッシュディレクトリのパス')
+
+    parser.add_argument('--db-path', default='./data/db.sqlite',
+                        help='SQLiteデータベースのパス')
+
+    parser.add_argument('--api-rate-limit', type=float, default=2.0,
+                        help='API呼び出しの最小間隔（秒）')
+
+    parser.add_argument('--log-level', default='INFO',
+                        choices=['DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL'],
+                        help='ログレベルを設定')
+
+    return parser.parse_args(argv)
+
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    """
+    対象の投手のシーズン全試合を分析
+
+    Returns:
+    --------
+    Dict[str, Any]
+        分析した試合数と失敗した試合数
+    """
+    factory = ServiceFactory({
+        'log_level': args.log_level,
+        'cache_dir': args.cache_dir,
+        'db_path': args.db_path,
+        'api_rate_limit': args.api_rate_limit,
+        'batch_max_workers': args.workers,
+        'batch_max_in_flight': args.max_in_flight,
+        'log_dir': 'logs'
+    })
+    try:
+        use_case = factory.create_pitcher_game_analysis_use_case()
+        runner = factory.create_batch_runner()
+
+        games = []
+        for pitcher_id in args.pitcher:
+            games.extend(use_case.get_pitcher_games(pitcher_id, args.season))
+
+        def report_progress(completed: int, total: int, result: AnalysisResult) -> None:
+            status = 'エラー' if result.error else 'OK'
+            logging.info(f"[{completed}/{total}] {result.pitcher_name} {result.game_date}: {status}")
+
+        report = {'analyzed': 0, 'failed': 0}
+        for result in runner.iter_results(games, progress_callback=report_progress):
+            report['failed' if result.error else 'analyzed'] += 1
+    finally:
+        # 取得した投球データの書き込みを完了させる
+        factory.close()
+    return report
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """メイン関数"""
+    args = parse_args(argv)
+
+    try:
+        report = run(args)
+    except Exception as e:
+        logging.error(f"バッチ分析中にエラーが発生しました: {e}", exc_info=True)
+        sys.exit(1)
+
+    for key, value in report.items():
+        print(f"{key}: {value}")
+
+
+if __name__ == "__main__":
+    main()
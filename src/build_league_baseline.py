@@ -0,0 +1,102 @@
+"""
+リーグ全体の投球データ（Statcastの一括ダウンロードのCSV/Parquet）から
+シーズンごとのリーグ全体の分布と、被打球の期待打率・期待wOBAの表を作成して保存するコマンド
+
+使用例:
+    python -m src.build_league_baseline statcast_2024.csv
+    python -m src.build_league_baseline statcast_2023.parquet statcast_2024.parquet --season 2024
+"""
+import sys
+import argparse
+import logging
+from typing import Dict, Any, List, Optional
+
+import pandas as pd
+
+from src.domain.league_baseline import LeagueBaseline, season_of
+from src.domain.expected_outcomes import ExpectedOutcomeTable
+from src.service_factory import ServiceFactory
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """コマンドライン引数を解析"""
+    parser = argparse.ArgumentParser(description='MLB投手分析ツール リーグ全体の分布・期待値の表の作成')
+
+    parser.add_argument('files', nargs='+',
+                        help='リーグ全体の投球データのファイル（.csvまたは.parquet）')
+
+    parser.add_argument('--season', type=int, action='append', default=None,
+                        help='作成するシーズン年（複数指定可。省略時はデータに含まれるすべてのシーズン）')
+
+    parser.add_argument('--cache-dir', default='./data',
+                        help='キャッシュディレクトリのパス')
+
+    parser.add_argument('--db-path', default='./data/db.sqlite',
+                        help='SQLiteデータベースのパス')
+
+    parser.add_argument('--log-level', default='INFO',
+                        choices=['DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL'],
+                        help='ログレベルを設定')
+
+    return parser.parse_args(argv)
+
+
+def read_pitch_file(path: str) -> pd.DataFrame:
+    """投球データのファイルを読み込む（拡張子で形式を判定）"""
+    if path.endswith('.parquet'):
+        return pd.read_parquet(path)
+    return pd.read_csv(path, low_memory=False)
+
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    """
+    ファイルの投球データからシーズンごとの分布を作成して保存
+
+    Returns:
+    --------
+    Dict[str, Any]
+        {シーズン: 分布を作成した(球種, 指標)の数と期待値の表のもとにした打球数}
+    """
+    factory = ServiceFactory({
+        'log_level': args.log_level,
+        'cache_dir': args.cache_dir,
+        'db_path': args.db_path,
+        'log_dir': 'logs'
+    })
+    use_case = factory.create_pitcher_game_analysis_use_case()
+
+    data = pd.concat([read_pitch_file(path) for path in args.files], ignore_index=True)
+    logging.info(f"{len(data)}球の投球データを読み込みました")
+
+    seasons = args.season or sorted(int(season) for season in season_of(data).dropna().unique())
+
+    report = {}
+    for season in seasons:
+        baseline = LeagueBaseline.build(data, season)
+        use_case.save_league_baseline(baseline)
+        logging.info(f"{season}年の分布を保存しました（球種: {', '.join(baseline.pitch_types())}）")
+
+        table = ExpectedOutcomeTable.build(data, season)
+        use_case.save_expected_outcomes(table)
+        logging.info(f"{season}年の期待打率・期待wOBAの表を保存しました（打球数: {int(table.batted_balls.sum())}）")
+
+        report[season] = {'distributions': len(baseline.quantiles), 'batted_balls': int(table.batted_balls.sum())}
+    return report
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """メイン関数"""
+    args = parse_args(argv)
+
+    try:
+        report = run(args)
+    except Exception as e:
+        logging.error(f"リーグ全体の分布の作成中にエラーが発生しました: {e}", exc_info=True)
+        sys.exit(1)
+
+    for season, count in report.items():
+        print(f"{season}: {count}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+キャッシュのメンテナンス用コマンド
+
+使用例:
+    python -m src.cache_maintenance stats
+    python -m src.cache_maintenance evict --max-bytes 500000000 --policy lfu
+    python -m src.cache_maintenance compact --min-games 2
+    python -m src.cache_maintenance maintain --max-entries 1000
+    python -m src.cache_maintenance export bundle.tar.gz --pitcher 660271 --season 2024
+    python -m src.cache_maintenance import bundle.tar.gz
+"""
+import sys
+import argparse
+import logging
+from typing import Dict, Any, List, Optional
+
+from src.infrastructure.data_repository import DataRepository
+from src.infrastructure.cache_bundle import export_cache_bundle, import_cache_bundle
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """コマンドライン引数を解析"""
+    parser = argparse.ArgumentParser(description='MLB投手分析ツール キャッシュメンテナンス')
+
+    parser.add_argument('--cache-dir', default='./data',
+                        help='キャッシュディレクトリのパス')
+
+    parser.add_argument('--db-path', default='./data/db.sqlite',
+                        help='SQLiteデータベースのパス')
+
+    parser.add_argument('--log-level', default='INFO',
+                        choices=['DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL'],
+                        help='ログレベルを設定')
+
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    subparsers.add_parser('stats', help='キャッシュの使用状況を表示')
+
+    evict_parser = subparsers.add_parser('evict', help='容量制限を超えたキャッシュを削除')
+    compact_parser = subparsers.add_parser('compact', help='試合単位のファイルをシーズン単位にまとめる')
+    maintain_parser = subparsers.add_parser('maintain', help='削除とまとめを続けて実行')
+
+    for sub in (evict_parser, maintain_parser):
+        sub.add_argument('--max-bytes', type=int, default=None,
+                         help='キャッシュの最大合計サイズ（バイト）')
+        sub.add_argument('--max-entries', type=int, default=None,
+                         help='キャッシュの最大試合数')
+        sub.add_argument('--policy', default='lru', choices=list(DataRepository.EVICTION_POLICIES),
+                         help='エビクションポリシー')
+
+    for sub in (compact_parser, maintain_parser):
+        sub.add_argument('--min-games', type=int, default=2,
+                         help='パーティションにまとめる最小試合数')
+
+    export_parser = subparsers.add_parser('export', help='キャッシュをバンドルに書き出す')
+    export_parser.add_argument('bundle', help='書き出すバンドルのパス（tar.gz）')
+    export_parser.add_argument('--pitcher', action='append', default=None,
+                               help='対象の投手ID（複数指定可）')
+    export_parser.add_argument('--season', type=int, action='append', default=None,
+                               help='対象のシーズン年（複数指定可）')
+
+    import_parser = subparsers.add_parser('import', help='バンドルをキャッシュに取り込む')
+    import_parser.add_argument('bundle', help='取り込むバンドルのパス（tar.gz）')
+    import_parser.add_argument('--overwrite', action='store_true',
+                               help='取り込み先の方が新しいキャッシュも上書きする')
+
+    return parser.parse_args(argv)
+
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    """
+    サブコマンドを実行
+
+    Returns:
+    --------
+    Dict[str, Any]
+        実行後のキャッシュ使用状況と処理件数
+    """
+    repository = DataRepository(cache_dir=args.cache_dir, db_path=args.db_path)
+
+    # 旧バージョンで保存されたエントリもエビクションの対象にする
+    repository.sync_cache_access_log()
+
+    report: Dict[str, Any] = {}
+
+    if args.command in ('evict', 'maintain'):
+        evicted = repository.enforce_cache_quota(
+            max_bytes=args.max_bytes,
+            max_entries=args.max_entries,
+            policy=args.policy
+        )
+        report['evicted'] = len(evicted)
+
+    if args.command in ('compact', 'maintain'):
+        report['compacted'] = repository.compact_cache(min_games=args.min_games)
+
+    if args.command == 'export':
+        manifest = export_cache_bundle(
+            repository, args.bundle, pitcher_ids=args.pitcher, seasons=args.season
+        )
+        report['exported'] = len(manifest['pitch_data'])
+
+    if args.command == 'import':
+        report.update(import_cache_bundle(repository, args.bundle, overwrite=args.overwrite))
+        repository.sync_cache_access_log()
+
+    report.update(repository.get_cache_stats())
+    return report
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """メイン関数"""
+    args = parse_args(argv)
+
+    logging.basicConfig(
+        level=getattr(logging, args.log_level),
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+    try:
+        report = run(args)
+    except Exception as e:
+        logging.error(f"キャッシュメンテナンス中にエラーが発生しました: {e}", exc_info=True)
+        sys.exit(1)
+
+    for key, value in report.items():
+        print(f"{key}: {value}")
+
+
+if __name__ == "__main__":
+    main()
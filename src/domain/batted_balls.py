@@ -0,0 +1,230 @@
+"""
+被打球の分類（打球の種類・方向・飛距離・結果）
+
+打球ごとの判定をPythonのループやapplyで行わず、配列演算でまとめて計算する
+シーズン全体の数千球でも描画や集計の前処理がすぐに終わる
+
+座標はStatcastの打球座標（hc_x, hc_y）を本塁を原点とするフィート単位の座標に変換する
+x軸は一塁側（ライト方向）が正、y軸はセンター方向が正、スプレー角はセンターを0度とし
+ライト方向を正、レフト方向を負とする
+"""
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.domain.pitch_outcomes import EVENT_CODES, event_codes
+
+
+# 打球座標（hc_x, hc_y）における本塁の位置
+HOME_PLATE_HC: Tuple[float, float] = (125.42, 198.27)
+
+# 打球座標1単位あたりのフィート
+HC_FEET_PER_UNIT = 2.5
+
+# 打球の種類（打球角度の区切りは10度・25度・50度）
+HIT_TYPE_LABELS: List[str] = ['ground_ball', 'line_drive', 'fly_ball', 'popup']
+LAUNCH_ANGLE_BOUNDARIES: List[float] = [10.0, 25.0, 50.0]
+
+# 打球方向（打者の利き腕を基準とする）。センターはスプレー角が±15度以内
+DIRECTION_LABELS: List[str] = ['pull', 'center', 'oppo']
+CENTER_HALF_ANGLE = 15.0
+
+# 内野・外野（本塁からの距離がこの値未満を内野とする）
+DEPTH_LABELS: List[str] = ['infield', 'outfield']
+INFIELD_MAX_DISTANCE = 150.0
+
+
+def _labels_from_codes(codes: np.ndarray, labels: List[str]) -> np.ndarray:
+    """コードの配列をラベルの配列に変換（コード-1はNone）"""
+    lookup = np.array(labels + [None], dtype=object)
+    return lookup[codes]
+
+
+def launch_angle_codes(launch_angle: np.ndarray) -> np.ndarray:
+    """
+    打球角度から打球の種類（HIT_TYPE_LABELSの位置）を判定
+
+    Parameters:
+    -----------
+    launch_angle : np.ndarray
+        打球角度（度）
+
+    Returns:
+    --------
+    np.ndarray
+        int8の配列（打球角度が欠損値の場合は-1）
+    """
+    angle = np.asarray(launch_angle, dtype=float)
+    low, middle, high = LAUNCH_ANGLE_BOUNDARIES
+    return np.select(
+        [angle < low, angle < middle, angle < high, angle >= high],
+        [0, 1, 2, 3],
+        default=-1
+    ).astype(np.int8)
+
+
+def spray_coordinates(hc_x: np.ndarray, hc_y: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    打球座標をフィールド座標・スプレー角・本塁からの距離に変換
+
+    Parameters:
+    -----------
+    hc_x, hc_y : np.ndarray
+        Statcastの打球座標
+
+    Returns:
+    --------
+    Dict[str, np.ndarray]
+        'field_x', 'field_y'（フィート）, 'spray_angle'（度）, 'spray_distance'（フィート）
+        座標が欠損値の打球はいずれもNaN
+    """
+    x = (np.asarray(hc_x, dtype=float) - HOME_PLATE_HC[0]) * HC_FEET_PER_UNIT
+    y = (HOME_PLATE_HC[1] - np.asarray(hc_y, dtype=float)) * HC_FEET_PER_UNIT
+    return {
+        'field_x': x,
+        'field_y': y,
+        'spray_angle': np.degrees(np.arctan2(x, y)),
+        'spray_distance': np.hypot(x, y)
+    }
+
+
+def direction_codes(spray_angle: np.ndarray, stand: np.ndarray) -> np.ndarray:
+    """
+    スプレー角と打者の左右から打球方向（DIRECTION_LABELSの位置）を判定
+
+    右打者はレフト方向、左打者はライト方向への打球をプル（引っ張り）とする
+
+    Parameters:
+    -----------
+    spray_angle : np.ndarray
+        スプレー角（度）
+    stand : np.ndarray
+        打者の左右（'R' または 'L'）
+
+    Returns:
+    --------
+    np.ndarray
+        int8の配列（スプレー角が欠損値または打者の左右が不明の場合は-1）
+    """
+    angle = np.asarray(spray_angle, dtype=float)
+    stand = np.asarray(stand, dtype=object)
+
+    # 左打者は左右を反転し、負の角度をプル側にそろえる
+    pull_side_angle = np.where(stand == 'L', -angle, angle)
+    known = (stand == 'R') | (stand == 'L')
+
+    return np.select(
+        [~known | np.isnan(angle), pull_side_angle < -CENTER_HALF_ANGLE, pull_side_angle > CENTER_HALF_ANGLE],
+        [-1, 0, 2],
+        default=1
+    ).astype(np.int8)
+
+
+def depth_codes(distance: np.ndarray) -> np.ndarray:
+    """
+    本塁からの距離から内野・外野（DEPTH_LABELSの位置）を判定
+
+    Parameters:
+    -----------
+    distance : np.ndarray
+        本塁からの距離（フィート）
+
+    Returns:
+    --------
+    np.ndarray
+        int8の配列（距離が欠損値の場合は-1）
+    """
+    distance = np.asarray(distance, dtype=float)
+    return np.select(
+        [np.isnan(distance), distance < INFIELD_MAX_DISTANCE],
+        [-1, 0],
+        default=1
+    ).astype(np.int8)
+
+
+def add_batted_ball_features(batted_balls: pd.DataFrame) -> pd.DataFrame:
+    """
+    被打球データに分類結果の列を追加
+
+    Parameters:
+    -----------
+    batted_balls : pd.DataFrame
+        被打球のデータ（launch_angle, hc_x, hc_y, hit_distance_sc, stand, bb_type, eventsがあれば使用）
+
+    Returns:
+    --------
+    pd.DataFrame
+        以下の列を追加したデータフレーム（元のデータは変更しない）
+        hit_type（bb_typeがなければ打球角度から判定）, field_x, field_y, spray_angle, spray_distance,
+        direction（pull/center/oppo）, depth（infield/outfield）, result_code（EVENT_CODES）
+    """
+    n = len(batted_balls)
+
+    def column(name: str) -> np.ndarray:
+        if name in batted_balls.columns:
+            return pd.to_numeric(batted_balls[name], errors='coerce').to_numpy(dtype=float)
+        return np.full(n, np.nan)
+
+    features = spray_coordinates(column('hc_x'), column('hc_y'))
+
+    if 'bb_type' in batted_balls.columns:
+        features['hit_type'] = batted_balls['bb_type'].to_numpy()
+    else:
+        features['hit_type'] = _labels_from_codes(launch_angle_codes(column('launch_angle')), HIT_TYPE_LABELS)
+
+    stand = batted_balls['stand'].to_numpy(dtype=object) if 'stand' in batted_balls.columns else np.full(n, None)
+    features['direction'] = _labels_from_codes(direction_codes(features['spray_angle'], stand), DIRECTION_LABELS)
+
+    # 飛距離はStatcastの推定値を優先し、ない場合は打球座標から求めた距離を使う
+    distance = column('hit_distance_sc')
+    distance = np.where(np.isnan(distance), features['spray_distance'], distance)
+    features['depth'] = _labels_from_codes(depth_codes(distance), DEPTH_LABELS)
+
+    if 'events' in batted_balls.columns:
+        features['result_code'] = event_codes(batted_balls['events'])
+    else:
+        features['result_code'] = np.full(n, EVENT_CODES['none'], dtype=np.int8)
+
+    return batted_balls.assign(**features)
+
+
+def batted_ball_points(batted_balls: pd.DataFrame) -> Dict[str, np.ndarray]:
+    """
+    描画用のフィールド座標と結果コード
+
+    add_batted_ball_featuresで追加済みの列があればそのまま使い、なければ計算する
+
+    Parameters:
+    -----------
+    batted_balls : pd.DataFrame
+        被打球データ（hc_x, hc_yまたはfield_x, field_yが必要）
+
+    Returns:
+    --------
+    Dict[str, np.ndarray]
+        'field_x', 'field_y'（フィート）, 'result_code'（EVENT_CODES。hit_resultまたはeventsから判定）
+    """
+    if 'field_x' in batted_balls.columns and 'field_y' in batted_balls.columns:
+        points = {
+            'field_x': batted_balls['field_x'].to_numpy(dtype=float),
+            'field_y': batted_balls['field_y'].to_numpy(dtype=float)
+        }
+    else:
+        coordinates = spray_coordinates(
+            pd.to_numeric(batted_balls['hc_x'], errors='coerce').to_numpy(dtype=float),
+            pd.to_numeric(batted_balls['hc_y'], errors='coerce').to_numpy(dtype=float)
+        )
+        points = {'field_x': coordinates['field_x'], 'field_y': coordinates['field_y']}
+
+    if 'result_code' in batted_balls.columns:
+        points['result_code'] = batted_balls['result_code'].to_numpy(dtype=np.int8)
+    elif 'hit_result' in batted_balls.columns:
+        points['result_code'] = event_codes(batted_balls['hit_result'])
+    elif 'events' in batted_balls.columns:
+        points['result_code'] = event_codes(batted_balls['events'])
+    else:
+        points['result_code'] = np.full(len(batted_balls), EVENT_CODES['none'], dtype=np.int8)
+
+    return points
+
@@ -0,0 +1,230 @@
+"""
+カウント（ボール・ストライク）別の集計
+
+0-0から3-2までの12通りのカウントごとに、球種の投球数・球速・投球結果を集計する
+配列の形は 球種 × カウント（× 投球結果）で、球速は合計と二乗和で保持するため、
+試合ごとの集計を足し合わせるだけでシーズンの平均・標準偏差を求められる
+"""
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.domain.game_cube import OUTCOMES, GameCube, label_codes, merge_labeled, outcome_axis_codes, pitch_type_labels
+
+
+MAX_BALLS = 3
+MAX_STRIKES = 2
+
+# カウントの軸（'ボール-ストライク'、位置はボール数 × 3 + ストライク数）
+COUNT_STATES: List[str] = [
+    f"{balls}-{strikes}" for balls in range(MAX_BALLS + 1) for strikes in range(MAX_STRIKES + 1)
+]
+
+
+def count_state_codes(data: pd.DataFrame) -> np.ndarray:
+    """
+    ボール数・ストライク数をCOUNT_STATESの位置に変換
+
+    Parameters:
+    -----------
+    data : pd.DataFrame
+        投球データ（balls, strikesを使用）
+
+    Returns:
+    --------
+    np.ndarray
+        int64の配列（欠損値や範囲外の値、カラムがない場合は-1）
+    """
+    if 'balls' not in data.columns or 'strikes' not in data.columns:
+        return np.full(len(data), -1, dtype=np.int64)
+
+    balls = pd.to_numeric(data['balls'], errors='coerce').to_numpy(dtype=float)
+    strikes = pd.to_numeric(data['strikes'], errors='coerce').to_numpy(dtype=float)
+    valid = (balls >= 0) & (balls <= MAX_BALLS) & (strikes >= 0) & (strikes <= MAX_STRIKES)
+
+    codes = np.full(len(data), -1, dtype=np.int64)
+    codes[valid] = (balls[valid] * (MAX_STRIKES + 1) + strikes[valid]).astype(np.int64)
+    return codes
+
+
+class CountStateCube(GameCube):
+    """
+    球種 × カウント の投球数・投球結果・球速
+
+    - pitches[球種, カウント, 投球結果]: 投球数
+    - speed_n / speed_sum / speed_sq_sum[球種, カウント]: 球速がある投球数・合計・二乗和
+    """
+
+    KIND = 'count_state'
+    VERSION = 1
+
+    def __init__(self, pitch_types: List[str], pitches: np.ndarray,
+                 speed_n: np.ndarray, speed_sum: np.ndarray, speed_sq_sum: np.ndarray):
+        self.pitch_types = list(pitch_types)
+        self.pitches = pitches
+        self.speed_n = speed_n
+        self.speed_sum = speed_sum
+        self.speed_sq_sum = speed_sq_sum
+
+    @classmethod
+    def empty(cls, pitch_types: Optional[List[str]] = None) -> "CountStateCube":
+        """投球のない集計"""
+        pitch_types = pitch_types or []
+        shape = (len(pitch_types), len(COUNT_STATES))
+        return cls(
+            pitch_types,
+            np.zeros(shape + (len(OUTCOMES),), dtype=np.int64),
+            np.zeros(shape, dtype=np.int64),
+            np.zeros(shape, dtype=float),
+            np.zeros(shape, dtype=float)
+        )
+
+    @classmethod
+    def from_pitches(cls, data: pd.DataFrame) -> "CountStateCube":
+        """
+        投球データから集計を作成
+
+        球種またはカウントが欠損している投球は含めない
+
+        Parameters:
+        -----------
+        data : pd.DataFrame
+            投球データ（pitch_type, balls, strikes, description, release_speedを使用）
+        """
+        pitch_types = pitch_type_labels(data)
+        cube = cls.empty(pitch_types)
+        if data.empty or not pitch_types:
+            return cube
+
+        if 'release_speed' in data.columns:
+            speed = pd.to_numeric(data['release_speed'], errors='coerce').to_numpy(dtype=float)
+        else:
+            speed = np.full(len(data), np.nan)
+
+        codes = pd.DataFrame({
+            'pitch_type': label_codes(data['pitch_type'], pitch_types),
+            'count_state': count_state_codes(data),
+            'outcome': outcome_axis_codes(data),
+            'speed': speed,
+            'speed_sq': speed * speed
+        })
+        codes = codes[(codes['pitch_type'] >= 0) & (codes['count_state'] >= 0)]
+        if codes.empty:
+            return cube
+
+        # 球種・カウント・投球結果の組み合わせごとに1回のgroupbyで集計
+        grouped = codes.groupby(['pitch_type', 'count_state', 'outcome'], sort=False).agg(
+            pitches=('speed', 'size'),
+            speed_n=('speed', 'count'),
+            speed_sum=('speed', 'sum'),
+            speed_sq_sum=('speed_sq', 'sum')
+        )
+        pitch_type_index = grouped.index.get_level_values('pitch_type').to_numpy()
+        count_index = grouped.index.get_level_values('count_state').to_numpy()
+        outcome_index = grouped.index.get_level_values('outcome').to_numpy()
+
+        cube.pitches[pitch_type_index, count_index, outcome_index] = grouped['pitches'].to_numpy()
+        # 球速は投球結果をまたいで合計する
+        np.add.at(cube.speed_n, (pitch_type_index, count_index), grouped['speed_n'].to_numpy())
+        np.add.at(cube.speed_sum, (pitch_type_index, count_index), grouped['speed_sum'].to_numpy())
+        np.add.at(cube.speed_sq_sum, (pitch_type_index, count_index), grouped['speed_sq_sum'].to_numpy())
+        return cube
+
+    def merge(self, other: "CountStateCube") -> "CountStateCube":
+        pitch_types, arrays = merge_labeled(
+            self.pitch_types, (self.pitches, self.speed_n, self.speed_sum, self.speed_sq_sum),
+            other.pitch_types, (other.pitches, other.speed_n, other.speed_sum, other.speed_sq_sum)
+        )
+        return CountStateCube(pitch_types, *arrays)
+
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        return {
+            'pitch_types': np.array(self.pitch_types, dtype=str),
+            'count_states': np.array(COUNT_STATES, dtype=str),
+            'pitches': self.pitches,
+            'speed_n': self.speed_n,
+            'speed_sum': self.speed_sum,
+            'speed_sq_sum': self.speed_sq_sum
+        }
+
+    @classmethod
+    def from_arrays(cls, arrays: Dict[str, np.ndarray]) -> "CountStateCube":
+        if arrays['count_states'].tolist() != COUNT_STATES:
+            raise ValueError("カウントの軸が現在の設定と異なります")
+        return cls(
+            [str(p) for p in arrays['pitch_types']],
+            arrays['pitches'], arrays['speed_n'], arrays['speed_sum'], arrays['speed_sq_sum']
+        )
+
+    def table(self) -> pd.DataFrame:
+        """
+        カウント × 球種 の集計表
+
+        Returns:
+        --------
+        pd.DataFrame
+            (count_state, pitch_type)のMultiIndexを持つデータフレーム（投球がない組み合わせは含めない）
+            列: pitches, usage_percentage（カウント内の割合）, velocity_mean, velocity_std,
+            strike_percentage, swinging_strike_percentage, ball_percentage, in_play_percentage,
+            whiff_percentage（空振り / スイング）
+        """
+        by_outcome = {outcome: self.pitches[:, :, i].T.astype(float) for i, outcome in enumerate(OUTCOMES)}
+        pitches = self.pitches.sum(axis=2).T.astype(float)
+        swings = by_outcome['swinging_strike'] + by_outcome['foul'] + by_outcome['in_play']
+        strikes = by_outcome['called_strike'] + by_outcome['swinging_strike'] + by_outcome['foul']
+
+        speed_n = self.speed_n.T.astype(float)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            velocity_mean = np.where(speed_n > 0, self.speed_sum.T / speed_n, np.nan)
+            # 標本標準偏差（球速が1球以下の場合はNaN）
+            variance = (self.speed_sq_sum.T - speed_n * velocity_mean ** 2) / (speed_n - 1)
+            velocity_std = np.where(speed_n > 1, np.sqrt(np.clip(variance, 0, None)), np.nan)
+
+            def percentage(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+                return np.where(denominator > 0, numerator / denominator * 100, np.nan)
+
+            columns = {
+                'pitches': pitches.astype(np.int64),
+                'usage_percentage': percentage(pitches, pitches.sum(axis=1, keepdims=True)),
+                'velocity_mean': velocity_mean,
+                'velocity_std': velocity_std,
+                'strike_percentage': percentage(strikes, pitches),
+                'swinging_strike_percentage': percentage(by_outcome['swinging_strike'], pitches),
+                'ball_percentage': percentage(by_outcome['ball'], pitches),
+                'in_play_percentage': percentage(by_outcome['in_play'], pitches),
+                'whiff_percentage': percentage(by_outcome['swinging_strike'], swings)
+            }
+
+        index = pd.MultiIndex.from_product([COUNT_STATES, self.pitch_types], names=['count_state', 'pitch_type'])
+        table = pd.DataFrame({name: values.ravel() for name, values in columns.items()}, index=index)
+        return table[table['pitches'] > 0]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        カウントごとの球種別の集計を辞書に変換
+
+        Returns:
+        --------
+        Dict[str, Any]
+            {
+                'count_states': ['0-0', '0-1', ...],   # 投球があるカウント
+                'pitch_types': ['FF', 'SL', ...],
+                'by_count': {
+                    '0-0': {'pitches': 30, 'pitch_types': {'FF': {'pitches': 18, 'usage_percentage': 60.0, ...}}},
+                    ...
+                }
+            }
+        """
+        table = self.table()
+        by_count: Dict[str, Any] = {}
+        for (count_state, pitch_type), row in zip(table.index, table.to_dict('records')):
+            entry = by_count.setdefault(count_state, {'pitches': 0, 'pitch_types': {}})
+            entry['pitches'] += int(row['pitches'])
+            entry['pitch_types'][pitch_type] = {**row, 'pitches': int(row['pitches'])}
+
+        return {
+            'count_states': [c for c in COUNT_STATES if c in by_count],
+            'pitch_types': self.pitch_types,
+            'by_count': by_count
+        }
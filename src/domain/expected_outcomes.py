@@ -0,0 +1,238 @@
+"""
+打球速度 × 打球角度ごとの期待打率（xBA）・期待wOBA（xwOBA）の表
+
+リーグ全体の打球データを打球速度・打球角度の区間（ビン）に分け、ビンごとの安打率と
+wOBAの平均を小さな配列として保持する。打球ごとの期待値はnp.digitizeで求めたビンの
+位置で配列を引くだけなので、1試合でもシーズン全体でも一度の配列演算で求められる
+
+打球が少ないビンの値は、周囲をまとめた粗いビンの値（さらにリーグ全体の値）に近づけて安定させる
+"""
+from typing import Any, Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.domain.league_baseline import season_of
+from src.domain.pitch_outcomes import EVENT_CODES, event_codes, get_flag, with_outcome_flags
+
+
+# 打球速度（mph）と打球角度（度）のビンの境界。範囲外の値は両端のビンに含める
+SPEED_EDGES = np.arange(40.0, 122.0, 2.0)
+ANGLE_EDGES = np.arange(-90.0, 92.0, 2.0)
+
+# 粗いビンにまとめる細かいビンの数（打球速度, 打球角度）
+COARSE_FACTOR = (4, 5)
+
+# 打球が少ないビンの値を粗いビンの値に近づける強さ（この数の打球を事前に加えたのと同じ）
+PRIOR_WEIGHT = 10.0
+
+# 打撃結果ごとのwOBAの重み（woba_valueがない場合に使う。アウトは0）
+WOBA_WEIGHTS: Dict[int, float] = {
+    EVENT_CODES['single']: 0.89,
+    EVENT_CODES['double']: 1.27,
+    EVENT_CODES['triple']: 1.62,
+    EVENT_CODES['home_run']: 2.10,
+}
+
+# 強い打球とする打球速度（mph）
+HARD_HIT_SPEED = 95.0
+
+
+def bin_codes(launch_speed: Any, launch_angle: Any) -> np.ndarray:
+    """
+    打球速度・打球角度をビンの位置（打球速度のビン × 角度のビン数 + 角度のビン）に変換
+
+    Returns:
+    --------
+    np.ndarray
+        int64の配列（打球速度か打球角度が欠損値の場合は-1）
+    """
+    speed = np.asarray(launch_speed, dtype=float)
+    angle = np.asarray(launch_angle, dtype=float)
+    speed_bins = np.clip(np.digitize(speed, SPEED_EDGES) - 1, 0, len(SPEED_EDGES) - 2)
+    angle_bins = np.clip(np.digitize(angle, ANGLE_EDGES) - 1, 0, len(ANGLE_EDGES) - 2)
+    codes = speed_bins * (len(ANGLE_EDGES) - 1) + angle_bins
+    return np.where(np.isnan(speed) | np.isnan(angle), -1, codes)
+
+
+def _smooth(totals: np.ndarray, counts: np.ndarray, prior: np.ndarray) -> np.ndarray:
+    """打球数に応じて事前の値に近づけた平均"""
+    return (totals + PRIOR_WEIGHT * prior) / (counts + PRIOR_WEIGHT)
+
+
+def _coarse_sum(values: np.ndarray) -> np.ndarray:
+    """細かいビンの配列を粗いビンごとに合計し、細かいビンの形に戻す"""
+    speed_factor, angle_factor = COARSE_FACTOR
+    speed_bins, angle_bins = values.shape
+    blocks = values.reshape(speed_bins // speed_factor, speed_factor, angle_bins // angle_factor, angle_factor)
+    coarse = blocks.sum(axis=(1, 3))
+    return np.repeat(np.repeat(coarse, speed_factor, axis=0), angle_factor, axis=1)
+
+
+class ExpectedOutcomeTable:
+    """1シーズン分の打球速度 × 打球角度ごとの期待打率・期待wOBA"""
+
+    KIND = 'expected_outcomes'
+    # ビンの境界や求め方を変更した場合は上げる
+    VERSION = 1
+
+    def __init__(self, season: int, batted_balls: np.ndarray, xba: np.ndarray, xwoba: np.ndarray):
+        """
+        Parameters:
+        -----------
+        season : int
+            シーズン年
+        batted_balls : np.ndarray
+            ビンごとの打球数（打球速度のビン × 打球角度のビン）
+        xba, xwoba : np.ndarray
+            ビンごとの期待打率・期待wOBA（batted_ballsと同じ形）
+        """
+        self.season = int(season)
+        self.batted_balls = batted_balls
+        self.xba = xba
+        self.xwoba = xwoba
+
+    @classmethod
+    def build(cls, data: pd.DataFrame, season: int) -> "ExpectedOutcomeTable":
+        """
+        リーグ全体の投球データから1シーズン分の表を作成
+
+        Parameters:
+        -----------
+        data : pd.DataFrame
+            リーグ全体の投球データ（description, events, launch_speed, launch_angleが必要。
+            woba_valueがあればwOBAはその値を使う）
+        season : int
+            シーズン年（dataに含まれる他のシーズンの投球は使わない）
+        """
+        data = data[(season_of(data) == season).fillna(False).to_numpy()]
+        data = data[get_flag(with_outcome_flags(data), 'is_in_play').to_numpy()]
+
+        codes = bin_codes(
+            pd.to_numeric(data['launch_speed'], errors='coerce'), pd.to_numeric(data['launch_angle'], errors='coerce')
+        )
+        results = event_codes(data['events']) if 'events' in data.columns else np.zeros(len(data), dtype=np.int8)
+        hits = np.isin(results, [EVENT_CODES[e] for e in ('single', 'double', 'triple', 'home_run')])
+        if 'woba_value' in data.columns:
+            woba = pd.to_numeric(data['woba_value'], errors='coerce').fillna(0).to_numpy(dtype=float)
+        else:
+            woba = np.zeros(len(data))
+            for code, weight in WOBA_WEIGHTS.items():
+                woba[results == code] = weight
+
+        valid = codes >= 0
+        shape = (len(SPEED_EDGES) - 1, len(ANGLE_EDGES) - 1)
+        size = shape[0] * shape[1]
+        counts = np.bincount(codes[valid], minlength=size).reshape(shape).astype(float)
+        hit_sums = np.bincount(codes[valid], weights=hits[valid], minlength=size).reshape(shape)
+        woba_sums = np.bincount(codes[valid], weights=woba[valid], minlength=size).reshape(shape)
+
+        def expected(totals: np.ndarray) -> np.ndarray:
+            league = totals.sum() / counts.sum() if counts.sum() > 0 else 0.0
+            coarse = _smooth(_coarse_sum(totals), _coarse_sum(counts), league)
+            return _smooth(totals, counts, coarse)
+
+        return cls(season, counts.astype(np.int64), expected(hit_sums), expected(woba_sums))
+
+    def lookup(self, launch_speed: Any, launch_angle: Any) -> Dict[str, np.ndarray]:
+        """
+        打球ごとの期待打率・期待wOBA
+
+        Parameters:
+        -----------
+        launch_speed, launch_angle : array-like
+            打球速度（mph）・打球角度（度）
+
+        Returns:
+        --------
+        Dict[str, np.ndarray]
+            'xba', 'xwoba'（打球速度か打球角度が欠損値の打球はNaN）
+        """
+        codes = bin_codes(launch_speed, launch_angle)
+        known = codes >= 0
+        result = {}
+        for name, table in (('xba', self.xba), ('xwoba', self.xwoba)):
+            values = np.full(codes.shape, np.nan)
+            values[known] = table.ravel()[codes[known]]
+            result[name] = values
+        return result
+
+    @property
+    def fingerprint(self) -> str:
+        """表を区別する文字列（シーズンと打球数）"""
+        return f"{self.season}-{int(self.batted_balls.sum())}"
+
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        """保存用に配列の辞書に変換"""
+        return {
+            'season': np.array(self.season),
+            'speed_edges': SPEED_EDGES,
+            'angle_edges': ANGLE_EDGES,
+            'batted_balls': self.batted_balls,
+            'xba': self.xba,
+            'xwoba': self.xwoba
+        }
+
+    @classmethod
+    def from_arrays(cls, arrays: Dict[str, np.ndarray]) -> "ExpectedOutcomeTable":
+        """to_arraysの結果から復元"""
+        if not (np.array_equal(arrays['speed_edges'], SPEED_EDGES) and np.array_equal(arrays['angle_edges'], ANGLE_EDGES)):
+            raise ValueError("ビンの境界が現在の設定と異なります")
+        return cls(int(arrays['season']), arrays['batted_balls'], arrays['xba'], arrays['xwoba'])
+
+
+def add_expected_outcomes(batted_balls: pd.DataFrame, table: Optional[ExpectedOutcomeTable]) -> pd.DataFrame:
+    """
+    被打球データに期待打率（xba）・期待wOBA（xwoba）の列を追加
+
+    Parameters:
+    -----------
+    batted_balls : pd.DataFrame
+        被打球データ（launch_speed, launch_angleを使用）
+    table : Optional[ExpectedOutcomeTable]
+        期待値の表。Noneの場合はどちらも欠損値
+
+    Returns:
+    --------
+    pd.DataFrame
+        xba, xwobaの列を追加したデータフレーム（元のデータは変更しない）
+    """
+    if table is None:
+        return batted_balls.assign(xba=np.nan, xwoba=np.nan)
+
+    expected = table.lookup(
+        pd.to_numeric(batted_balls['launch_speed'], errors='coerce').to_numpy(dtype=float),
+        pd.to_numeric(batted_balls['launch_angle'], errors='coerce').to_numpy(dtype=float)
+    )
+    return batted_balls.assign(**expected)
+
+
+def contact_quality(batted_balls: pd.DataFrame) -> pd.DataFrame:
+    """
+    球種別と全体の打球の質（期待値の平均・平均打球速度・強い打球の割合）
+
+    Parameters:
+    -----------
+    batted_balls : pd.DataFrame
+        add_expected_outcomesの列を持つ被打球データ（複数試合でもよい）
+
+    Returns:
+    --------
+    pd.DataFrame
+        球種をインデックスとし、最後の行を全体（'all'）とするデータフレーム
+        列: batted_balls, xba, xwoba, launch_speed_mean, hard_hit_pct
+    """
+    speed = pd.to_numeric(batted_balls['launch_speed'], errors='coerce')
+    values = pd.DataFrame({
+        'batted_balls': 1,
+        'xba': batted_balls['xba'],
+        'xwoba': batted_balls['xwoba'],
+        'launch_speed_mean': speed,
+        'hard_hit_pct': (speed >= HARD_HIT_SPEED).astype(float).where(speed.notna()) * 100
+    }, index=batted_balls.index)
+    aggregations = {'batted_balls': 'sum', 'xba': 'mean', 'xwoba': 'mean', 'launch_speed_mean': 'mean',
+                    'hard_hit_pct': 'mean'}
+
+    by_pitch_type = values.groupby(batted_balls['pitch_type']).agg(aggregations)
+    total = values.agg(aggregations).to_frame('all').T
+    return pd.concat([by_pitch_type, total]).astype({'batted_balls': np.int64})
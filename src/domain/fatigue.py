@@ -0,0 +1,315 @@
+"""
+打順の巡目・球数ごとの成績と、球速の低下（疲労）の検出
+
+投球を（試合, 打席, 打席内の投球番号）で並べ替え、同じ試合で同じ打者と何度目の対戦か
+（打順の巡目）と試合内の通算球数を配列演算で求める。巡目別・球数帯別の成績は
+pitch_aggregatesのセル集計で、球速と空振り率の推移は累積和による移動窓で計算する
+
+疲労の開始は、試合序盤の球速を基準とした片側CUSUM（累積和）で検出する
+CUSUMの漸化式 S_t = max(0, S_{t-1} + z_t) は、z の累積和 C_t から
+S_t = C_t - min(0, min_{j<=t} C_j) と求められるため、投球ごとのループは使わない
+"""
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.domain.pitch_aggregates import build_cells, metrics_table, rollup
+from src.domain.pitch_outcomes import get_flag, with_outcome_flags
+from src.domain.pitch_sequences import GAME_KEY_COLUMNS
+
+
+# 球数帯の区切り（15球ごと、105球以降は1つの帯）
+PITCH_COUNT_BUCKET_SIZE = 15
+PITCH_COUNT_BUCKET_MAX = 105
+
+# 打者が不明な場合に1巡とみなす打者数
+BATTERS_PER_ORDER = 9
+
+# 移動窓の球数
+DEFAULT_WINDOW = 10
+
+# CUSUMの基準とする試合序盤の投球数（対象球種）と、許容幅・検出閾値（基準の標準偏差に対する倍率）
+CUSUM_BASELINE_PITCHES = 15
+CUSUM_SLACK = 0.5
+CUSUM_THRESHOLD = 4.0
+# 基準の標準偏差の下限（mph）。序盤の球速がほぼ一定でも小さな揺らぎで検出しないようにする
+CUSUM_MIN_STD = 0.5
+
+
+def pitch_count_bucket_labels() -> List[str]:
+    """球数帯のラベル（'1-15', '16-30', ..., '106+'）"""
+    starts = range(1, PITCH_COUNT_BUCKET_MAX + 1, PITCH_COUNT_BUCKET_SIZE)
+    return [f"{start}-{start + PITCH_COUNT_BUCKET_SIZE - 1}" for start in starts] + [f"{PITCH_COUNT_BUCKET_MAX + 1}+"]
+
+
+def add_outing_position(data: pd.DataFrame) -> pd.DataFrame:
+    """
+    投球を試合内の順に並べ替え、巡目・通算球数・球数帯の列を追加
+
+    Parameters:
+    -----------
+    data : pd.DataFrame
+        投球データ（at_bat_number, pitch_numberが必要。batterがあれば巡目の判定に使用。
+        複数試合の場合はgame_pkかgame_date）
+
+    Returns:
+    --------
+    pd.DataFrame
+        試合・打席・投球番号の順に並べ替え、以下の列を追加したデータフレーム
+        game_index（試合の通し番号）, outing_pitch（試合内の通算球数、1始まり）,
+        times_through_order（巡目、1始まり）, pitch_count_bucket（球数帯）
+
+    Raises:
+    -------
+    ValueError
+        必要なカラムがない場合
+    """
+    missing = [column for column in ['at_bat_number', 'pitch_number'] if column not in data.columns]
+    if missing:
+        raise ValueError(f"巡目・球数の集計に必要なカラムがありません: {missing}")
+
+    game_column = next((column for column in GAME_KEY_COLUMNS if column in data.columns), None)
+    games = pd.factorize(data[game_column], sort=True)[0] if game_column else np.zeros(len(data), dtype=np.int64)
+    at_bat = pd.to_numeric(data['at_bat_number'], errors='coerce').to_numpy(dtype=float)
+    pitch_number = pd.to_numeric(data['pitch_number'], errors='coerce').to_numpy(dtype=float)
+
+    order = np.lexsort((pitch_number, at_bat, games))
+    data = data.iloc[order].reset_index(drop=True)
+    games = games[order]
+    at_bat = at_bat[order]
+
+    # 試合の先頭の位置から、試合内の通算球数を求める
+    n = len(data)
+    new_game = np.ones(n, dtype=bool)
+    new_game[1:] = games[1:] != games[:-1]
+    game_start = np.maximum.accumulate(np.where(new_game, np.arange(n), 0))
+    outing_pitch = np.arange(n) - game_start + 1
+
+    # 打席の先頭の投球だけを取り出し、同じ試合で同じ打者の何打席目かを数える
+    new_at_bat = new_game.copy()
+    new_at_bat[1:] |= at_bat[1:] != at_bat[:-1]
+    at_bat_ids = np.cumsum(new_at_bat) - 1
+    first_pitches = np.flatnonzero(new_at_bat)
+    if 'batter' in data.columns:
+        plate_appearances = pd.DataFrame({
+            'game': games[first_pitches],
+            'batter': data['batter'].to_numpy()[first_pitches]
+        })
+        times_through = plate_appearances.groupby(['game', 'batter'], dropna=False).cumcount().to_numpy() + 1
+    else:
+        # 打者が不明な場合は、試合内の対戦打者数を9人ごとに区切る
+        batters_faced = pd.Series(games[first_pitches]).groupby(games[first_pitches]).cumcount().to_numpy()
+        times_through = batters_faced // BATTERS_PER_ORDER + 1
+
+    bucket = np.minimum((outing_pitch - 1) // PITCH_COUNT_BUCKET_SIZE, PITCH_COUNT_BUCKET_MAX // PITCH_COUNT_BUCKET_SIZE)
+    return data.assign(
+        game_index=games,
+        outing_pitch=outing_pitch,
+        times_through_order=times_through[at_bat_ids],
+        pitch_count_bucket=pd.Categorical.from_codes(bucket, categories=pitch_count_bucket_labels())
+    )
+
+
+def _window_sums(values: np.ndarray, game_start: np.ndarray, window: int) -> np.ndarray:
+    """試合ごとに直近window球の合計（試合の先頭をまたがない）"""
+    cumulative = np.concatenate([[0.0], np.cumsum(values)])
+    end = np.arange(1, len(values) + 1)
+    start = np.maximum(end - window, game_start)
+    return cumulative[end] - cumulative[start]
+
+
+def rolling_trends(positioned: pd.DataFrame, window: int = DEFAULT_WINDOW,
+                   pitch_type: Optional[str] = None) -> pd.DataFrame:
+    """
+    試合内の球速と空振り率の移動平均
+
+    Parameters:
+    -----------
+    positioned : pd.DataFrame
+        add_outing_positionの結果
+    window : int
+        移動窓の球数（全球種の直近window球）
+    pitch_type : Optional[str]
+        球速の移動平均を求める球種。Noneの場合はすべての球種
+
+    Returns:
+    --------
+    pd.DataFrame
+        game_index, outing_pitch, rolling_velocity（窓内の対象球種の平均球速。ない場合はNaN）,
+        rolling_whiff_pct（窓内の空振り / スイング。スイングがない場合はNaN）
+    """
+    n = len(positioned)
+    game_index = positioned['game_index'].to_numpy()
+    game_start = np.arange(n) - positioned['outing_pitch'].to_numpy() + 1
+
+    if 'release_speed' in positioned.columns:
+        speed = pd.to_numeric(positioned['release_speed'], errors='coerce').to_numpy(dtype=float)
+    else:
+        speed = np.full(n, np.nan)
+    if pitch_type is not None and 'pitch_type' in positioned.columns:
+        speed = np.where(positioned['pitch_type'].to_numpy() == pitch_type, speed, np.nan)
+    has_speed = ~np.isnan(speed)
+
+    flags = with_outcome_flags(positioned)
+    swings = _window_sums(get_flag(flags, 'is_swing').to_numpy(dtype=float), game_start, window)
+    whiffs = _window_sums(get_flag(flags, 'is_swinging_strike').to_numpy(dtype=float), game_start, window)
+    speed_n = _window_sums(has_speed.astype(float), game_start, window)
+    speed_sum = _window_sums(np.where(has_speed, speed, 0.0), game_start, window)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return pd.DataFrame({
+            'game_index': game_index,
+            'outing_pitch': positioned['outing_pitch'].to_numpy(),
+            'rolling_velocity': np.where(speed_n > 0, speed_sum / speed_n, np.nan),
+            'rolling_whiff_pct': np.where(swings > 0, whiffs / swings * 100, np.nan)
+        })
+
+
+def detect_velocity_drop(positioned: pd.DataFrame, pitch_type: str,
+                         baseline_pitches: int = CUSUM_BASELINE_PITCHES,
+                         slack: float = CUSUM_SLACK, threshold: float = CUSUM_THRESHOLD) -> pd.DataFrame:
+    """
+    試合ごとに片側CUSUMで球速の低下の開始を検出
+
+    試合序盤のbaseline_pitches球（対象球種）の平均・標準偏差を基準とし、
+    基準を下回った分（許容幅slack×標準偏差を差し引いたもの）の累積和がthreshold×標準偏差を
+    超えた時点で検出する。開始位置は、検出時点の累積和が最後に0から増え始めた投球とする
+
+    Parameters:
+    -----------
+    positioned : pd.DataFrame
+        add_outing_positionの結果（release_speed, pitch_typeが必要）
+    pitch_type : str
+        対象の球種（通常は最も多い速球）
+    baseline_pitches : int
+        基準とする試合序盤の投球数
+    slack, threshold : float
+        許容幅と検出閾値（基準の標準偏差に対する倍率）
+
+    Returns:
+    --------
+    pd.DataFrame
+        試合ごとの行（game_index）と、baseline_velocity, onset_pitch, alarm_pitch（試合内の通算球数。
+        検出されない場合は欠損値）, velocity_drop（開始以降の平均球速の基準との差）
+    """
+    target = positioned[positioned['pitch_type'] == pitch_type]
+    speed = pd.to_numeric(target['release_speed'], errors='coerce')
+    target = target.assign(speed=speed)[speed.notna()]
+    columns = ['baseline_velocity', 'onset_pitch', 'alarm_pitch', 'velocity_drop']
+    if target.empty:
+        return pd.DataFrame(columns=columns, index=pd.Index([], name='game_index'))
+
+    games = target['game_index'].to_numpy()
+    speed = target['speed'].to_numpy(dtype=float)
+    grouped = target.groupby('game_index', sort=True)['speed']
+    order_in_game = grouped.cumcount().to_numpy()
+
+    # 序盤の投球から基準の平均・標準偏差を求める
+    early = target[order_in_game < baseline_pitches].groupby('game_index')['speed']
+    baseline = early.mean()
+    sigma = early.std().fillna(0.0).clip(lower=CUSUM_MIN_STD)
+    mu = baseline.reindex(games).to_numpy()
+    sd = sigma.reindex(games).to_numpy()
+
+    # 低下方向の片側CUSUM（試合ごとの累積和と累積最小値から求める）
+    increments = pd.Series(np.where(order_in_game >= baseline_pitches, (mu - speed) - slack * sd, 0.0))
+    cumulative = increments.groupby(games).cumsum().to_numpy()
+    running_min = np.minimum(pd.Series(cumulative).groupby(games).cummin().to_numpy(), 0.0)
+    statistic = cumulative - running_min
+    alarm = statistic > threshold * sd
+
+    # 累積和が0だった最後の投球（累積最小値を更新した投球）の次を開始位置とする
+    at_minimum = cumulative <= running_min
+    positions = np.arange(len(target))
+    last_reset = pd.Series(np.where(at_minimum, positions, -1)).groupby(games).cummax().to_numpy()
+
+    outing_pitch = target['outing_pitch'].to_numpy()
+    result = pd.DataFrame({'baseline_velocity': baseline}, index=pd.Index(baseline.index, name='game_index'))
+    result['onset_pitch'] = pd.array([pd.NA] * len(result), dtype='Int64')
+    result['alarm_pitch'] = pd.array([pd.NA] * len(result), dtype='Int64')
+    result['velocity_drop'] = np.nan
+
+    if alarm.any():
+        first_alarm = pd.Series(positions[alarm]).groupby(games[alarm]).min()
+        for game, alarm_position in first_alarm.items():
+            # 序盤の投球では累積和が0のため、開始位置は必ず基準の投球より後になる
+            onset_position = last_reset[alarm_position] + 1
+            after = (games == game) & (positions >= onset_position)
+            result.loc[game, 'onset_pitch'] = int(outing_pitch[onset_position])
+            result.loc[game, 'alarm_pitch'] = int(outing_pitch[alarm_position])
+            result.loc[game, 'velocity_drop'] = speed[after].mean() - baseline[game]
+
+    return result[columns]
+
+
+def primary_pitch_type(data: pd.DataFrame) -> Optional[str]:
+    """最も多く投げた球種（球種がない場合はNone）"""
+    if 'pitch_type' not in data.columns:
+        return None
+    counts = data['pitch_type'][data['pitch_type'] != ''].value_counts()
+    return str(counts.index[0]) if len(counts) else None
+
+
+def _metrics_by(positioned: pd.DataFrame, key: str) -> Dict[str, Dict[str, Any]]:
+    """キーごとの投球数・割合・球速（metrics_tableの行を辞書に変換）"""
+    table = metrics_table(rollup(build_cells(positioned, [key]), key))
+    table = table[table['pitches'] > 0]
+    return {str(k): row for k, row in zip(table.index, table.to_dict('records'))}
+
+
+def analyze_fatigue(data: pd.DataFrame, window: int = DEFAULT_WINDOW,
+                    pitch_type: Optional[str] = None) -> Dict[str, Any]:
+    """
+    巡目別・球数帯別の成績、球速と空振り率の推移、球速低下の検出をまとめて実行
+
+    複数試合のデータを渡した場合は、試合ごとに巡目・球数を数えたうえでまとめて集計する
+
+    Parameters:
+    -----------
+    data : pd.DataFrame
+        投球データ
+    window : int
+        移動平均の球数
+    pitch_type : Optional[str]
+        球速の推移と低下の検出に使う球種。Noneの場合は最も多い球種
+
+    Returns:
+    --------
+    Dict[str, Any]
+        {
+            'pitch_type': 'FF',
+            'by_times_through_order': {'1': {'pitches': 35, 'whiff_pct': 12.5, 'release_speed_mean': 95.1, ...}, ...},
+            'by_pitch_count': {'1-15': {...}, '16-30': {...}, ...},
+            'trend': pd.DataFrame（rolling_trendsの結果にgameの列を加えたもの）,
+            'velocity_drop': {<試合>: {'baseline_velocity': 95.3, 'onset_pitch': 78, 'alarm_pitch': 85,
+                                      'velocity_drop': -1.6}, ...}
+        }
+    """
+    positioned = add_outing_position(data)
+    pitch_type = pitch_type or primary_pitch_type(positioned)
+
+    game_column = next((column for column in GAME_KEY_COLUMNS if column in positioned.columns), None)
+    game_labels = (
+        positioned.groupby('game_index')[game_column].first().astype(object) if game_column
+        else pd.Series({0: 0}, dtype=object)
+    )
+
+    trend = rolling_trends(positioned, window, pitch_type)
+    trend.insert(0, 'game', game_labels.reindex(trend['game_index']).to_numpy())
+
+    velocity_drop: Dict[Any, Dict[str, Any]] = {}
+    if pitch_type is not None and 'release_speed' in positioned.columns:
+        drops = detect_velocity_drop(positioned, pitch_type)
+        for game_index, row in zip(drops.index, drops.to_dict('records')):
+            velocity_drop[game_labels[game_index]] = {
+                key: (None if pd.isna(value) else value) for key, value in row.items()
+            }
+
+    return {
+        'pitch_type': pitch_type,
+        'by_times_through_order': _metrics_by(positioned, 'times_through_order'),
+        'by_pitch_count': _metrics_by(positioned, 'pitch_count_bucket'),
+        'trend': trend,
+        'velocity_drop': velocity_drop
+    }
@@ -0,0 +1,170 @@
+"""
+試合ごとに保存して足し合わせられる集計（キューブ）の基底クラス
+
+投球データから1試合分の集計を作り、試合ごとに保存しておけば、
+シーズンや任意の期間の集計は生データを読み直さずに配列の和で求められる
+各キューブはラベル付きの軸（球種など）を持ち、軸のラベルが異なるキューブ同士は
+ラベルの和集合にそろえてから足し合わせる
+"""
+from typing import Dict, Iterable, List, Sequence, Tuple, Type, TypeVar
+
+import numpy as np
+import pandas as pd
+
+from src.domain.pitch_outcomes import OUTCOME_CODES, classify_outcomes
+
+
+CubeT = TypeVar('CubeT', bound='GameCube')
+
+# 投球結果の軸（OUTCOME_CODESの順で、'other'(-1)は末尾）
+OUTCOMES: List[str] = ['ball', 'called_strike', 'swinging_strike', 'foul', 'in_play', 'hit_by_pitch', 'other']
+
+
+def union_labels(*label_lists: Sequence[str]) -> List[str]:
+    """ラベルの和集合（ソート済み）"""
+    return sorted(set().union(*label_lists))
+
+
+def align_axis(array: np.ndarray, labels: Sequence[str], target_labels: Sequence[str], axis: int = 0) -> np.ndarray:
+    """
+    配列の軸をtarget_labelsの並びにそろえる（ない位置は0）
+
+    Parameters:
+    -----------
+    array : np.ndarray
+        対象の配列
+    labels : Sequence[str]
+        arrayのaxis軸のラベル
+    target_labels : Sequence[str]
+        そろえる先のラベル（labelsをすべて含むこと）
+    axis : int
+        対象の軸
+
+    Returns:
+    --------
+    np.ndarray
+        axis軸の長さがlen(target_labels)の配列
+    """
+    if list(labels) == list(target_labels):
+        return array
+
+    shape = list(array.shape)
+    shape[axis] = len(target_labels)
+    aligned = np.zeros(shape, dtype=array.dtype)
+
+    position = {label: i for i, label in enumerate(target_labels)}
+    index = [slice(None)] * array.ndim
+    index[axis] = [position[label] for label in labels]
+    aligned[tuple(index)] = array
+    return aligned
+
+
+def label_codes(values: pd.Series, labels: Sequence[str]) -> np.ndarray:
+    """
+    値をラベルの位置に変換
+
+    Parameters:
+    -----------
+    values : pd.Series
+        変換する値
+    labels : Sequence[str]
+        ラベル
+
+    Returns:
+    --------
+    np.ndarray
+        int64の配列（labelsにない値と欠損値は-1）
+    """
+    return pd.Categorical(values, categories=list(labels)).codes.astype(np.int64)
+
+
+def outcome_axis_codes(data: pd.DataFrame) -> np.ndarray:
+    """投球結果をOUTCOMESの位置に変換（descriptionがない場合はすべて'other'）"""
+    codes = classify_outcomes(data)['outcome_code'].to_numpy().astype(np.int64)
+    return np.where(codes == OUTCOME_CODES['other'], len(OUTCOMES) - 1, codes)
+
+
+def pitch_type_labels(data: pd.DataFrame) -> List[str]:
+    """投球データに含まれる球種（欠損値と空白を除く、ソート済み）"""
+    if 'pitch_type' not in data.columns:
+        return []
+    pitch_types = data['pitch_type'].dropna().unique()
+    return sorted(str(p) for p in pitch_types if str(p) != '')
+
+
+class GameCube:
+    """
+    試合ごとに保存して足し合わせられる集計の基底クラス
+
+    サブクラスはKIND（保存先の種類名）とVERSION（集計方法を変えたら上げる）を定義し、
+    from_pitches・merge・to_arrays・from_arraysを実装する
+    """
+
+    KIND: str = ''
+    VERSION: int = 1
+
+    @classmethod
+    def from_pitches(cls: Type[CubeT], data: pd.DataFrame) -> CubeT:
+        """投球データから集計を作成"""
+        raise NotImplementedError
+
+    def merge(self: CubeT, other: CubeT) -> CubeT:
+        """別の集計と足し合わせた集計を返す（元の集計は変更しない）"""
+        raise NotImplementedError
+
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        """保存用に配列の辞書に変換（文字列の配列はUnicode型、pickleは使わない）"""
+        raise NotImplementedError
+
+    @classmethod
+    def from_arrays(cls: Type[CubeT], arrays: Dict[str, np.ndarray]) -> CubeT:
+        """to_arraysの結果から復元"""
+        raise NotImplementedError
+
+    @classmethod
+    def merge_all(cls: Type[CubeT], cubes: Iterable[CubeT]) -> CubeT:
+        """
+        複数の集計を足し合わせる
+
+        Parameters:
+        -----------
+        cubes : Iterable[GameCube]
+            同じクラスの集計
+
+        Returns:
+        --------
+        GameCube
+            足し合わせた集計（空の場合は投球のない集計）
+        """
+        result = None
+        for cube in cubes:
+            result = cube if result is None else result.merge(cube)
+        return result if result is not None else cls.from_pitches(pd.DataFrame())
+
+
+def merge_labeled(a_labels: Sequence[str], a_arrays: Tuple[np.ndarray, ...],
+                  b_labels: Sequence[str], b_arrays: Tuple[np.ndarray, ...],
+                  axis: int = 0) -> Tuple[List[str], Tuple[np.ndarray, ...]]:
+    """
+    同じラベル付きの軸を持つ配列の組を、ラベルの和集合にそろえて足し合わせる
+
+    Parameters:
+    -----------
+    a_labels, b_labels : Sequence[str]
+        それぞれの配列のaxis軸のラベル
+    a_arrays, b_arrays : Tuple[np.ndarray, ...]
+        足し合わせる配列の組（同じ位置の配列同士を足す）
+    axis : int
+        ラベル付きの軸
+
+    Returns:
+    --------
+    Tuple[List[str], Tuple[np.ndarray, ...]]
+        和集合のラベルと足し合わせた配列の組
+    """
+    labels = union_labels(a_labels, b_labels)
+    merged = tuple(
+        align_axis(a, a_labels, labels, axis) + align_axis(b, b_labels, labels, axis)
+        for a, b in zip(a_arrays, b_arrays)
+    )
+    return labels, merged
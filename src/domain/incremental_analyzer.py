@@ -0,0 +1,153 @@
+"""
+試合中に届く投球データを逐次集計する分析クラス
+
+試合中はデータを取得し直すたびに全投球を分析し直す必要がないよう、
+新しく届いた投球だけを(イニング, 球種)のセル集計にして既存の集計に合成する。
+平均と偏差平方和（M2）の合成はWelford法をまとめて追加する場合に一般化したChanらの方法を使うため、
+更新の計算量は新しい投球数に比例し、結果はバッチで分析した場合と一致する
+"""
+from typing import Any, Dict, List, Optional, Set
+
+import numpy as np
+import pandas as pd
+
+from src.domain.pitch_aggregates import build_cells, merge_cells
+from src.domain.pitch_analyzer import PitchAnalyzer
+from src.domain.pitch_outcomes import with_outcome_flags
+
+
+# 同じ投球を識別するカラム（game_pkは存在する場合のみ使用）
+PITCH_KEY_COLUMNS: List[str] = ['game_pk', 'at_bat_number', 'pitch_number']
+
+# 逐次集計に必要なカラム（投球を識別できないと取得し直したデータを2重に数えるため、打席番号・球数も必須）
+REQUIRED_COLUMNS: List[str] = ['inning', 'pitch_type', 'at_bat_number', 'pitch_number']
+
+
+class IncrementalPitchAnalyzer:
+    """
+    投球データを逐次受け取り、PitchAnalyzer.analyze_allと同じ形式の結果を返すクラス
+
+    投球はgame_pk, at_bat_number, pitch_numberで識別し、取得し直した試合全体のデータを渡しても
+    集計済みの投球は無視するため、同じ投球を2重に数えることはない
+    """
+
+    def __init__(self, analyzer: Optional[PitchAnalyzer] = None):
+        """
+        Parameters:
+        -----------
+        analyzer : Optional[PitchAnalyzer]
+            結果の作成に使う分析クラス。Noneの場合は新しく作成する
+        """
+        self.analyzer = analyzer or PitchAnalyzer()
+        self.reset()
+
+    def reset(self) -> None:
+        """集計をすべて破棄する"""
+        self._cells: Optional[pd.DataFrame] = None
+        self._columns: Set[str] = set()
+        self._seen_keys: Set[tuple] = set()
+        self._batted_balls: List[pd.DataFrame] = []
+        self._max_inning = None
+        self._at_bats: Set[Any] = set()
+        self._batters: Set[Any] = set()
+
+    @property
+    def pitch_count(self) -> int:
+        """集計済みの投球数"""
+        return 0 if self._cells is None else int(self._cells['pitches'].sum())
+
+    def update(self, data: pd.DataFrame) -> int:
+        """
+        新しく届いた投球データを集計に追加
+
+        Parameters:
+        -----------
+        data : pd.DataFrame
+            投球データ（inning, pitch_type, at_bat_number, pitch_numberカラムが必要）。集計済みの投球を含んでもよい
+
+        Returns:
+        --------
+        int
+            新しく集計に追加した投球数
+
+        Raises:
+        -------
+        ValueError
+            必要なカラムがない場合
+        """
+        if data.empty:
+            return 0
+
+        missing = [column for column in REQUIRED_COLUMNS if column not in data.columns]
+        if missing:
+            raise ValueError(f"逐次集計には{', '.join(REQUIRED_COLUMNS)}のカラムが必要です（不足: {', '.join(missing)}）")
+
+        new_rows = self._new_rows(data)
+        if new_rows.empty:
+            return 0
+
+        flagged = with_outcome_flags(new_rows)
+        cells = build_cells(flagged, ['inning', 'pitch_type'])
+        self._cells = cells if self._cells is None else merge_cells(self._cells, cells)
+        self._columns.update(new_rows.columns)
+
+        # 被打球データには結果フラグの列を含めない
+        if 'description' in new_rows.columns:
+            batted_balls = self.analyzer._batted_balls_from_mask(new_rows, flagged['is_in_play'].to_numpy())
+            if not batted_balls.empty:
+                self._batted_balls.append(batted_balls)
+
+        inning = new_rows['inning'].max()
+        if pd.notna(inning):
+            self._max_inning = inning if self._max_inning is None else max(self._max_inning, inning)
+        if 'at_bat_number' in new_rows.columns:
+            self._at_bats.update(new_rows['at_bat_number'].dropna().unique())
+        if 'batter' in new_rows.columns:
+            self._batters.update(new_rows['batter'].dropna().unique())
+
+        return len(new_rows)
+
+    def _new_rows(self, data: pd.DataFrame) -> pd.DataFrame:
+        """集計済みの投球を除いた行"""
+        key_columns = [column for column in PITCH_KEY_COLUMNS if column in data.columns]
+        data = data.drop_duplicates(subset=key_columns)
+        keys = list(zip(*(data[column].tolist() for column in key_columns)))
+        is_new = np.fromiter((key not in self._seen_keys for key in keys), dtype=bool, count=len(keys))
+        self._seen_keys.update(keys)
+        return data[is_new]
+
+    def results(self) -> Dict[str, Any]:
+        """
+        現在までの集計結果を取得
+
+        Returns:
+        --------
+        Dict[str, Any]
+            PitchAnalyzer.analyze_allと同じ形式の辞書
+        """
+        if self._cells is None:
+            return self.analyzer.analyze_all(pd.DataFrame())
+
+        if self._batted_balls:
+            batted_ball_analysis = pd.concat(self._batted_balls)
+        else:
+            batted_ball_analysis = pd.DataFrame()
+
+        return {
+            'inning_analysis': self.analyzer._inning_analysis_from_cells(self._cells, self._columns),
+            'pitch_type_analysis': self.analyzer._pitch_type_analysis_from_cells(self._cells, self._columns),
+            'batted_ball_analysis': batted_ball_analysis,
+            'performance_summary': self.analyzer._performance_summary_from_cells(
+                self._cells, self._columns, self._innings_and_batters())
+        }
+
+    def _innings_and_batters(self) -> Dict[str, Any]:
+        """PitchAnalyzer._innings_and_battersと同じ形式の投球イニング数と対戦打者数"""
+        result: Dict[str, Any] = {}
+        if self._max_inning is not None:
+            result['innings_pitched'] = self._max_inning
+        if 'at_bat_number' in self._columns:
+            result['batters_faced'] = len(self._at_bats)
+        elif 'batter' in self._columns:
+            result['batters_faced'] = len(self._batters)
+        return result
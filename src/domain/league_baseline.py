@@ -0,0 +1,270 @@
+"""
+リーグ全体の球種別の分布（ベースライン）とパーセンタイルの算出
+
+リーグ全体の投球データからシーズン × 球種 × 指標ごとの分布を求め、
+等間隔の確率点における分位数のソート済み配列（QUANTILE_POINTS点）として保持する
+数十万球の生データを持たずに済み、パーセンタイルは二分探索（np.searchsorted）で
+O(log n)で求められるため、グラフごとにパーセンタイルを表示しても負荷は小さい
+"""
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.domain.pitch_outcomes import get_flag, with_outcome_flags
+
+
+# 分位数を保持する確率点の数（0%, 0.5%, ..., 100%）
+QUANTILE_POINTS = 201
+
+# 投球ごとの指標（列名: 求め方）。変化量はインチ、横の変化量は投手の左右によらないよう絶対値にする
+PITCH_METRICS: List[str] = ['release_speed', 'release_spin_rate', 'horizontal_movement', 'vertical_movement']
+
+# 投手 × 球種ごとに求める指標（空振り / 投球数）
+RATE_METRICS: List[str] = ['swinging_strike_pct']
+
+BASELINE_METRICS: List[str] = PITCH_METRICS + RATE_METRICS
+
+# 空振り率の分布に含める投手 × 球種の最小投球数
+MIN_PITCHES_FOR_RATE = 50
+
+
+def pitch_metric_values(data: pd.DataFrame) -> pd.DataFrame:
+    """
+    投球ごとの指標（PITCH_METRICS）を計算
+
+    Parameters:
+    -----------
+    data : pd.DataFrame
+        投球データ（release_speed, release_spin_rate, pfx_x, pfx_zがあれば使用）
+
+    Returns:
+    --------
+    pd.DataFrame
+        dataと同じインデックスを持つPITCH_METRICSの列（元の列がない指標は欠損値）
+    """
+    def column(name: str) -> pd.Series:
+        if name in data.columns:
+            return pd.to_numeric(data[name], errors='coerce')
+        return pd.Series(np.nan, index=data.index)
+
+    return pd.DataFrame({
+        'release_speed': column('release_speed'),
+        'release_spin_rate': column('release_spin_rate'),
+        'horizontal_movement': column('pfx_x').abs() * 12,
+        'vertical_movement': column('pfx_z') * 12,
+    }, index=data.index)
+
+
+def season_of(data: pd.DataFrame) -> pd.Series:
+    """投球のシーズン（game_year、なければgame_dateの年）"""
+    if 'game_year' in data.columns:
+        return pd.to_numeric(data['game_year'], errors='coerce').astype('Int64')
+    if 'game_date' in data.columns:
+        return pd.to_datetime(data['game_date'], errors='coerce').dt.year.astype('Int64')
+    raise ValueError("シーズンを判定するカラム（game_yearまたはgame_date）がありません")
+
+
+def _swinging_strike_pct(data: pd.DataFrame, group_keys: List[str]) -> pd.Series:
+    """グループごとの空振り率（%）"""
+    flags = with_outcome_flags(data)
+    grouped = get_flag(flags, 'is_swinging_strike').astype(float).groupby([data[k] for k in group_keys])
+    return grouped.mean() * 100
+
+
+class LeagueBaseline:
+    """1シーズン分のリーグ全体の球種 × 指標ごとの分位数"""
+
+    KIND = 'league_baseline'
+    # 指標や分位数の点数を変更した場合は上げる
+    VERSION = 1
+
+    def __init__(self, season: int, quantiles: Dict[Tuple[str, str], np.ndarray],
+                 sample_sizes: Dict[Tuple[str, str], int]):
+        """
+        Parameters:
+        -----------
+        season : int
+            シーズン年
+        quantiles : Dict[Tuple[str, str], np.ndarray]
+            (球種, 指標)ごとのQUANTILE_POINTS点の分位数（昇順）
+        sample_sizes : Dict[Tuple[str, str], int]
+            (球種, 指標)ごとの分布のもとにしたデータ数
+        """
+        self.season = int(season)
+        self.quantiles = quantiles
+        self.sample_sizes = sample_sizes
+
+    @classmethod
+    def build(cls, data: pd.DataFrame, season: int) -> "LeagueBaseline":
+        """
+        リーグ全体の投球データから1シーズン分の分布を作成
+
+        Parameters:
+        -----------
+        data : pd.DataFrame
+            リーグ全体の投球データ（pitch_typeが必要。空振り率の分布にはpitcherとdescriptionが必要）
+        season : int
+            シーズン年（dataに含まれる他のシーズンの投球は使わない）
+        """
+        data = data[(season_of(data) == season).fillna(False).to_numpy()]
+        data = data[data['pitch_type'].notna() & (data['pitch_type'] != '')]
+
+        probabilities = np.linspace(0, 1, QUANTILE_POINTS)
+        quantiles: Dict[Tuple[str, str], np.ndarray] = {}
+        sample_sizes: Dict[Tuple[str, str], int] = {}
+
+        def add(pitch_type: str, metric: str, values: np.ndarray) -> None:
+            values = values[~np.isnan(values)]
+            if len(values):
+                quantiles[(pitch_type, metric)] = np.quantile(values, probabilities)
+                sample_sizes[(pitch_type, metric)] = len(values)
+
+        metrics = pitch_metric_values(data)
+        for pitch_type, group in metrics.groupby(data['pitch_type']):
+            for metric in PITCH_METRICS:
+                add(str(pitch_type), metric, group[metric].to_numpy(dtype=float))
+
+        if 'pitcher' in data.columns and 'description' in data.columns:
+            counts = data.groupby(['pitch_type', 'pitcher']).size()
+            rates = _swinging_strike_pct(data, ['pitch_type', 'pitcher'])[counts >= MIN_PITCHES_FOR_RATE]
+            for pitch_type, group in rates.groupby(level=0):
+                add(str(pitch_type), 'swinging_strike_pct', group.to_numpy(dtype=float))
+
+        return cls(season, quantiles, sample_sizes)
+
+    @classmethod
+    def build_all(cls, data: pd.DataFrame) -> List["LeagueBaseline"]:
+        """dataに含まれるシーズンごとに分布を作成"""
+        seasons = season_of(data).dropna().unique()
+        return [cls.build(data, int(season)) for season in sorted(seasons)]
+
+    def pitch_types(self) -> List[str]:
+        """分布がある球種"""
+        return sorted({pitch_type for pitch_type, _ in self.quantiles})
+
+    def percentile(self, pitch_type: str, metric: str, values: Any) -> Any:
+        """
+        リーグ全体の分布におけるパーセンタイル（0〜100）
+
+        分位数の配列を二分探索し、隣り合う分位数の間は線形補間する
+        同じ値の分位数が続く場合はその範囲の中央の確率を返す
+
+        Parameters:
+        -----------
+        pitch_type : str
+            球種
+        metric : str
+            指標（BASELINE_METRICSの値）
+        values : float or array-like
+            パーセンタイルを求める値
+
+        Returns:
+        --------
+        float or np.ndarray
+            パーセンタイル（valuesと同じ形）。分布がない球種・指標や、値が欠損値の場合はNaN
+        """
+        scalar = np.ndim(values) == 0
+        values = np.atleast_1d(np.asarray(values, dtype=float))
+        quantiles = self.quantiles.get((pitch_type, metric))
+        if quantiles is None:
+            result = np.full(values.shape, np.nan)
+            return float(result[0]) if scalar else result
+
+        last = len(quantiles) - 1
+        left = np.searchsorted(quantiles, values, side='left')
+        right = np.searchsorted(quantiles, values, side='right')
+
+        # 分位数と一致する値は、一致する範囲の中央の位置
+        tied = (right - left) / 2.0 + left - 0.5
+
+        # 分位数の間の値は、両隣の分位数で線形補間した位置
+        upper = np.clip(left, 1, last)
+        lower_value = quantiles[upper - 1]
+        upper_value = quantiles[upper]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            between = upper - 1 + (values - lower_value) / (upper_value - lower_value)
+
+        position = np.where(right > left, tied, between)
+        position = np.clip(position, 0, last)
+        result = np.where(np.isnan(values), np.nan, position / last * 100)
+        return float(result[0]) if scalar else result
+
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        """保存用に配列の辞書に変換"""
+        keys = sorted(self.quantiles)
+        return {
+            'season': np.array(self.season),
+            'pitch_types': np.array([k[0] for k in keys], dtype=str),
+            'metrics': np.array([k[1] for k in keys], dtype=str),
+            'quantiles': np.array([self.quantiles[k] for k in keys]).reshape(len(keys), QUANTILE_POINTS),
+            'sample_sizes': np.array([self.sample_sizes[k] for k in keys], dtype=np.int64)
+        }
+
+    @classmethod
+    def from_arrays(cls, arrays: Dict[str, np.ndarray]) -> "LeagueBaseline":
+        """to_arraysの結果から復元"""
+        if arrays['quantiles'].shape[1] != QUANTILE_POINTS:
+            raise ValueError("分位数の点数が現在の設定と異なります")
+        keys = list(zip((str(p) for p in arrays['pitch_types']), (str(m) for m in arrays['metrics'])))
+        return cls(
+            int(arrays['season']),
+            {key: row for key, row in zip(keys, arrays['quantiles'])},
+            {key: int(n) for key, n in zip(keys, arrays['sample_sizes'])}
+        )
+
+
+def pitch_type_metrics(data: pd.DataFrame) -> pd.DataFrame:
+    """
+    球種ごとの指標（BASELINE_METRICS）の値
+
+    投球ごとの指標は平均、空振り率は球種全体の値を使う
+
+    Parameters:
+    -----------
+    data : pd.DataFrame
+        1試合などの投球データ
+
+    Returns:
+    --------
+    pd.DataFrame
+        球種をインデックスとし、BASELINE_METRICSを列とするデータフレーム
+    """
+    data = data[data['pitch_type'].notna() & (data['pitch_type'] != '')]
+    table = pitch_metric_values(data).groupby(data['pitch_type']).mean()
+    if 'description' in data.columns:
+        table['swinging_strike_pct'] = _swinging_strike_pct(data, ['pitch_type'])
+    else:
+        table['swinging_strike_pct'] = np.nan
+    return table
+
+
+def percentile_table(data: pd.DataFrame, baseline: LeagueBaseline,
+                     metrics: Optional[Iterable[str]] = None) -> Dict[str, Dict[str, Optional[float]]]:
+    """
+    球種ごとの指標のリーグ内パーセンタイル
+
+    Parameters:
+    -----------
+    data : pd.DataFrame
+        1試合などの投球データ
+    baseline : LeagueBaseline
+        比較するシーズンの分布
+    metrics : Optional[Iterable[str]]
+        対象の指標。Noneの場合はBASELINE_METRICS
+
+    Returns:
+    --------
+    Dict[str, Dict[str, Optional[float]]]
+        {球種: {指標: パーセンタイル}}（分布がない指標や値がない指標はNone）
+    """
+    metrics = list(metrics or BASELINE_METRICS)
+    table = pitch_type_metrics(data)
+    result: Dict[str, Dict[str, Optional[float]]] = {}
+    for pitch_type, row in zip(table.index, table.to_dict('records')):
+        percentiles = {}
+        for metric in metrics:
+            value = baseline.percentile(str(pitch_type), metric, row[metric])
+            percentiles[metric] = None if np.isnan(value) else value
+        result[str(pitch_type)] = percentiles
+    return result
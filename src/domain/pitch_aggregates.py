@@ -0,0 +1,251 @@
+"""
+投球データの共有集計（セル集計とロールアップ）
+
+キーの組み合わせ（セル）ごとに投球数・結果フラグの合計と、数値列の件数・平均・偏差平方和（M2）・最小・最大を
+1度のgroupbyで求める。イニング別・球種別・全体の集計はセルを足し合わせて導出するため、
+元のフレームを何度もグループ化する必要がない
+
+平均とM2の合成にはChanらの並列アルゴリズムを用いるため、E[x^2]-E[x]^2による桁落ちは起きない
+"""
+from typing import List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from src.domain.pitch_outcomes import FLAG_COLUMNS, with_outcome_flags
+
+
+# 平均・標準偏差などを集計する数値列
+MOMENT_COLUMNS: List[str] = ['release_speed', 'plate_x', 'plate_z', 'pfx_x', 'pfx_z']
+
+# 足し合わせで集計する列（is_strike_typeはtypeがS=strikeまたはX=in playの投球）
+COUNT_COLUMNS: List[str] = ['pitches'] + FLAG_COLUMNS + ['is_strike_type']
+
+
+def build_cells(data: pd.DataFrame, keys: List[str]) -> pd.DataFrame:
+    """
+    キーの組み合わせごとの集計値を計算
+
+    Parameters:
+    -----------
+    data : pd.DataFrame
+        投球データ（結果フラグがなければ計算する）
+    keys : List[str]
+        グループ化するカラム。欠損値も1つのキーとして残す
+
+    Returns:
+    --------
+    pd.DataFrame
+        keysをインデックスとし、COUNT_COLUMNSと、dataにある数値列ごとの
+        '<列>_n', '<列>_mean', '<列>_m2', '<列>_min', '<列>_max' を持つデータフレーム
+    """
+    data = with_outcome_flags(data)
+
+    moment_columns = [column for column in MOMENT_COLUMNS if column in data.columns]
+
+    # キーの分解は1度だけ行い、合計と数値列の統計量で共有する
+    grouped = data.groupby(keys, dropna=False)
+    sizes = grouped.size()
+    codes = grouped.ngroup().to_numpy()
+
+    def group_sum(values: pd.Series) -> np.ndarray:
+        return np.rint(np.bincount(codes, weights=values.to_numpy(dtype=float), minlength=len(sizes))).astype(np.int64)
+
+    counts = {'pitches': sizes.to_numpy()}
+    for column in FLAG_COLUMNS:
+        counts[column] = group_sum(data[column])
+    if 'type' in data.columns:
+        counts['is_strike_type'] = group_sum(data['type'].isin(['S', 'X']))
+    else:
+        counts['is_strike_type'] = np.zeros(len(sizes), dtype=np.int64)
+    cells = pd.DataFrame(counts, index=sizes.index)
+
+    if moment_columns:
+        stats = grouped[moment_columns].agg(['count', 'mean', 'var', 'min', 'max'])
+        moments = {}
+        for column in moment_columns:
+            n = stats[(column, 'count')]
+            moments[f'{column}_n'] = n
+            moments[f'{column}_mean'] = stats[(column, 'mean')]
+            # 不偏分散からM2（偏差平方和）に戻す。1件以下のセルは0
+            moments[f'{column}_m2'] = (stats[(column, 'var')] * (n - 1)).fillna(0.0)
+            moments[f'{column}_min'] = stats[(column, 'min')]
+            moments[f'{column}_max'] = stats[(column, 'max')]
+        cells = pd.concat([cells, pd.DataFrame(moments, index=cells.index)], axis=1)
+
+    return cells
+
+
+def moment_columns_of(cells: pd.DataFrame) -> List[str]:
+    """セル集計に含まれる数値列の名前"""
+    return [column for column in MOMENT_COLUMNS if f'{column}_n' in cells.columns]
+
+
+def rollup(cells: pd.DataFrame, level: Optional[Union[str, List[str]]] = None, dropna: bool = True) -> pd.DataFrame:
+    """
+    セルを指定したキーで集約
+
+    Parameters:
+    -----------
+    cells : pd.DataFrame
+        build_cellsの結果
+    level : Optional[Union[str, List[str]]]
+        集約後に残すキー（複数指定可）。Noneの場合は全体を1行に集約する
+    dropna : bool
+        Trueの場合、いずれかのキーが欠損値のセルは除外する。
+        Falseの場合は欠損値も1つのキーとして残す（同じキーを持つセル集計の合成に使用）
+
+    Returns:
+    --------
+    pd.DataFrame
+        build_cellsと同じ列を持つ集約結果
+    """
+    if level is None:
+        codes = np.zeros(len(cells), dtype=np.int64)
+        keys = pd.Index([0])
+    elif isinstance(level, str):
+        codes, keys = pd.factorize(cells.index.get_level_values(level), sort=True, use_na_sentinel=dropna)
+        keys = pd.Index(keys, name=level)
+    else:
+        arrays = [cells.index.get_level_values(name) for name in level]
+        if dropna:
+            present = np.logical_and.reduce([np.asarray(pd.notna(array)) for array in arrays])
+        else:
+            present = np.ones(len(cells), dtype=bool)
+        codes = np.full(len(cells), -1, dtype=np.int64)
+        codes[present], keys = pd.factorize(pd.MultiIndex.from_arrays([a[present] for a in arrays]), sort=True)
+        keys = pd.MultiIndex.from_tuples(list(keys), names=list(level)) if len(keys) else \
+            pd.MultiIndex.from_arrays([[] for _ in level], names=list(level))
+
+    # 欠損値のキー（コード-1）は除外する
+    valid = codes >= 0
+    codes = codes[valid]
+    size = len(keys)
+
+    # 列ごとのSeries生成（インデックスのコピー）を避けるため、まとめてndarrayに変換する
+    values = cells.to_numpy(dtype=float)[valid]
+    position = {column: i for i, column in enumerate(cells.columns)}
+
+    def group_sum(column_values: np.ndarray) -> np.ndarray:
+        return np.bincount(codes, weights=column_values, minlength=size)
+
+    result = {
+        column: np.rint(group_sum(values[:, position[column]])).astype(np.int64)
+        for column in COUNT_COLUMNS
+    }
+
+    for column in moment_columns_of(cells):
+        n = values[:, position[f'{column}_n']]
+        cell_mean = np.nan_to_num(values[:, position[f'{column}_mean']])
+        cell_m2 = values[:, position[f'{column}_m2']]
+
+        total_n = group_sum(n)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = np.where(total_n > 0, group_sum(n * cell_mean) / total_n, np.nan)
+
+        # 各セルの平均と集約後の平均のずれをM2に加える
+        deviation = np.where(n > 0, n * (cell_mean - np.nan_to_num(mean[codes])) ** 2, 0.0)
+
+        minimum = np.full(size, np.inf)
+        maximum = np.full(size, -np.inf)
+        np.fmin.at(minimum, codes, values[:, position[f'{column}_min']])
+        np.fmax.at(maximum, codes, values[:, position[f'{column}_max']])
+
+        result[f'{column}_n'] = total_n.astype(np.int64)
+        result[f'{column}_mean'] = mean
+        result[f'{column}_m2'] = group_sum(cell_m2 + deviation)
+        result[f'{column}_min'] = np.where(total_n > 0, minimum, np.nan)
+        result[f'{column}_max'] = np.where(total_n > 0, maximum, np.nan)
+
+    return pd.DataFrame(result, index=keys)
+
+
+def merge_cells(*cells: pd.DataFrame) -> pd.DataFrame:
+    """
+    同じキー構成のセル集計を合成
+
+    同じキーのセルは投球数・フラグを合計し、平均とM2はChanらの方法で合成する
+    （行を1件ずつ追加するWelford法を、まとめて追加する場合に一般化したもの）
+
+    Parameters:
+    -----------
+    *cells : pd.DataFrame
+        build_cellsの結果（キーの並びが同じもの。数値列の有無は異なってもよい）
+
+    Returns:
+    --------
+    pd.DataFrame
+        合成したセル集計
+    """
+    combined = pd.concat(cells)
+    # 一部のセル集計にしかない数値列は、ない側を件数0として扱う
+    empty_columns = [c for c in combined.columns if c.endswith('_n') or c.endswith('_m2')]
+    combined[empty_columns] = combined[empty_columns].fillna(0)
+    return rollup(combined, list(combined.index.names), dropna=False)
+
+
+def moment_stats(rolled: pd.DataFrame, column: str) -> pd.DataFrame:
+    """
+    集約結果から数値列の平均・最大・最小・標準偏差（不偏）を取り出す
+
+    Parameters:
+    -----------
+    rolled : pd.DataFrame
+        rollupの結果
+    column : str
+        数値列の名前
+
+    Returns:
+    --------
+    pd.DataFrame
+        'mean', 'max', 'min', 'std' 列を持つデータフレーム（件数が2未満のstdはNaN）
+    """
+    n = rolled[f'{column}_n']
+    return pd.DataFrame({
+        'mean': rolled[f'{column}_mean'],
+        'max': rolled[f'{column}_max'],
+        'min': rolled[f'{column}_min'],
+        'std': np.sqrt(rolled[f'{column}_m2'] / (n - 1).where(n > 1))
+    })
+
+
+def metrics_table(rolled: pd.DataFrame) -> pd.DataFrame:
+    """
+    集約結果から投球数・各種割合・数値列の統計量の表を作成
+
+    Parameters:
+    -----------
+    rolled : pd.DataFrame
+        rollupの結果
+
+    Returns:
+    --------
+    pd.DataFrame
+        rolledと同じインデックスを持つデータフレーム
+        割合（%）の列: strike_pct（見逃し・空振り・ファウル）, called_strike_pct, swinging_strike_pct,
+        ball_pct, in_play_pct, whiff_pct（空振り / スイング。スイングがない場合はNaN）
+        数値列ごとの列: '<列>_mean', '<列>_std'（release_speedは'_min', '_max'も）
+    """
+    pitches = rolled['pitches'].where(rolled['pitches'] > 0)
+    swings = rolled['is_swing'].where(rolled['is_swing'] > 0)
+    strikes = rolled['is_called_strike'] + rolled['is_swinging_strike'] + rolled['is_foul']
+
+    table = {
+        'pitches': rolled['pitches'],
+        'strike_pct': strikes / pitches * 100,
+        'called_strike_pct': rolled['is_called_strike'] / pitches * 100,
+        'swinging_strike_pct': rolled['is_swinging_strike'] / pitches * 100,
+        'ball_pct': rolled['is_ball'] / pitches * 100,
+        'in_play_pct': rolled['is_in_play'] / pitches * 100,
+        'whiff_pct': rolled['is_swinging_strike'] / swings * 100,
+    }
+
+    for column in moment_columns_of(rolled):
+        stats = moment_stats(rolled, column)
+        table[f'{column}_mean'] = stats['mean']
+        table[f'{column}_std'] = stats['std']
+        if column == 'release_speed':
+            table[f'{column}_min'] = stats['min']
+            table[f'{column}_max'] = stats['max']
+
+    return pd.DataFrame(table, index=rolled.index)
@@ -1,15 +1,53 @@
 """
 投球データの分析を担当するドメイン層のクラス
 """
+import copy
+
 import pandas as pd
 import numpy as np
-from typing import Dict, List, Any, Optional
+from typing import Collection, Dict, List, Any, Optional
 
 # 球種変換用のユーティリティをインポート
 from src.domain.pitch_utils import PITCH_TYPE_MAPPING, get_pitch_name_ja
+from src.domain.pitch_outcomes import with_outcome_flags, get_flag
+from src.domain.pitch_aggregates import build_cells, rollup, moment_stats, metrics_table
+from src.domain.batted_balls import add_batted_ball_features
+from src.domain.count_states import CountStateCube
+from src.domain.pitch_sequences import SEQUENCE_KEY_COLUMNS, analyze_sequences
+from src.domain.situational_splits import build_split_cells, split_table
+from src.domain.fatigue import analyze_fatigue
+from src.domain.league_baseline import LeagueBaseline, percentile_table
+from src.domain.run_values import RunValueCube
+from src.domain.expected_outcomes import ExpectedOutcomeTable, add_expected_outcomes, contact_quality
+from src.domain.tunneling import TUNNEL_REQUIRED_COLUMNS, TunnelCube
 
 class PitchAnalyzer:
     """投球データの分析を担当するクラス"""
+    
+    # 分析結果の計算方法や形式を変更した場合は上げる（保存済みの分析結果を無効にするため）
+    VERSION = 3
+    
+    def __init__(self, expected_outcomes: Optional[ExpectedOutcomeTable] = None):
+        """
+        Parameters:
+        -----------
+        expected_outcomes : Optional[ExpectedOutcomeTable]
+            被打球の期待打率・期待wOBAの表。Noneの場合は被打球データのxba, xwobaが欠損値になる
+        """
+        self.expected_outcomes = expected_outcomes
+    
+    @property
+    def cache_version(self) -> str:
+        """保存済みの分析結果を区別するバージョン（期待値の表を変えた場合も古い結果を使わない）"""
+        if self.expected_outcomes is None:
+            return str(self.VERSION)
+        return f"{self.VERSION}:{self.expected_outcomes.fingerprint}"
+
+    def with_expected_outcomes(self, expected_outcomes: Optional[ExpectedOutcomeTable]) -> "PitchAnalyzer":
+        """期待打率・期待wOBAの表だけを置き換えた分析クラス（試合のシーズンの表で分析するため。自身は変更しない）"""
+        analyzer = copy.copy(self)
+        analyzer.expected_outcomes = expected_outcomes
+        return analyzer
 
     def analyze_by_inning(self, data: pd.DataFrame) -> Dict[str, Any]:
         """
@@ -40,51 +78,43 @@ class PitchAnalyzer:
         if data.empty or 'inning' not in data.columns:
             return {'error': 'データが無効または必要なカラムがありません'}
         
-        # イニング別にグループ化
+        # 投球結果のフラグを1度だけ計算してイニング別にグループ化
+        data = with_outcome_flags(data)
         grouped = data.groupby('inning')
+        pitch_counts = grouped.size()
         
         # 結果を格納する辞書
         results = {
-            'innings': [],
+            'innings': [int(inning) for inning in pitch_counts.index],
             'velocity': {},
-            'pitch_count': {},
+            'pitch_count': {str(inning): int(count) for inning, count in pitch_counts.items()},
             'strike_percentage': {},
             'whiff_percentage': {},
             'pitch_type_distribution': {}
         }
         
-        # 各イニングの分析
-        for inning, group in grouped:
-            results['innings'].append(int(inning))
-            inning_str = str(inning)
-            
-            # 球速の分析
-            if 'release_speed' in group.columns:
-                results['velocity'][inning_str] = {
-                    'mean': group['release_speed'].mean(),
-                    'max': group['release_speed'].max(),
-                    'min': group['release_speed'].min(),
-                    'std': group['release_speed'].std()
-                }
-            
-            # 投球数
-            results['pitch_count'][inning_str] = len(group)
-            
-            # ストライク率
-            if 'type' in group.columns:
-                strikes = group[group['type'].isin(['S', 'X'])].shape[0]  # S=strike, X=in play
-                results['strike_percentage'][inning_str] = strikes / len(group) * 100 if len(group) > 0 else 0
-            
-            # 空振り率
-            if 'description' in group.columns:
-                swings = group[group['description'].str.contains('swing', case=False, na=False)].shape[0]
-                whiffs = group[group['description'].str.contains('swinging_strike', case=False, na=False)].shape[0]
-                results['whiff_percentage'][inning_str] = whiffs / swings * 100 if swings > 0 else 0
-            
-            # 球種分布
-            if 'pitch_type' in group.columns:
-                pitch_types = group['pitch_type'].value_counts().to_dict()
-                results['pitch_type_distribution'][inning_str] = pitch_types
+        # 球速の分析
+        if 'release_speed' in data.columns:
+            results['velocity'] = self._speed_stats(grouped['release_speed'])
+        
+        # ストライク率（S=strike, X=in play）
+        if 'type' in data.columns:
+            strikes = data['type'].isin(['S', 'X']).groupby(data['inning']).sum()
+            results['strike_percentage'] = {
+                str(inning): strikes[inning] / count * 100 for inning, count in pitch_counts.items()
+            }
+        
+        # 空振り率（空振り / スイング）
+        if 'description' in data.columns:
+            flag_sums = grouped[['is_swing', 'is_swinging_strike']].sum()
+            results['whiff_percentage'] = {
+                str(inning): row['is_swinging_strike'] / row['is_swing'] * 100 if row['is_swing'] > 0 else 0
+                for inning, row in flag_sums.iterrows()
+            }
+        
+        # 球種分布
+        if 'pitch_type' in data.columns:
+            results['pitch_type_distribution'] = self._count_distribution(data, 'inning', pitch_counts.index)
         
         return results
 
@@ -127,82 +157,244 @@ class PitchAnalyzer:
         if data.empty:
             return {'error': '有効な球種データがありません'}
         
-        # 球種でグループ化
+        # 投球結果のフラグを1度だけ計算して球種でグループ化
+        data = with_outcome_flags(data)
         grouped = data.groupby('pitch_type')
+        counts = grouped.size()
+        total_pitches = len(data)
         
         # 結果を格納する辞書
         results = {
-            'pitch_types': [],
-            'usage': {},
+            'pitch_types': list(counts.index),
+            'usage': {
+                pitch_type: {
+                    'count': int(count),
+                    'percentage': count / total_pitches * 100
+                }
+                for pitch_type, count in counts.items()
+            },
             'velocity': {},
             'effectiveness': {},
             'location': {},
             'movement': {}
         }
         
-        total_pitches = len(data)
+        # 球速
+        if 'release_speed' in data.columns:
+            results['velocity'] = self._speed_stats(grouped['release_speed'])
         
-        # 各球種の分析
-        for pitch_type, group in grouped:
-            # 球種が不明な場合はスキップ
-            if pd.isna(pitch_type) or pitch_type == '':
-                continue
-                
-            results['pitch_types'].append(pitch_type)
-            
-            # 使用率
-            count = len(group)
-            results['usage'][pitch_type] = {
-                'count': count,
-                'percentage': (count / total_pitches * 100) if total_pitches > 0 else 0
+        # 有効性（結果ベース）
+        if 'description' in data.columns:
+            flag_sums = grouped[['is_called_strike', 'is_swinging_strike', 'is_foul', 'is_ball', 'is_hit']].sum()
+            results['effectiveness'] = {
+                pitch_type: self._effectiveness(row, counts[pitch_type])
+                for pitch_type, row in flag_sums.iterrows()
             }
-            
-            # 球速
-            if 'release_speed' in group.columns:
-                results['velocity'][pitch_type] = {
-                    'mean': group['release_speed'].mean(),
-                    'max': group['release_speed'].max(),
-                    'min': group['release_speed'].min(),
-                    'std': group['release_speed'].std()
+        
+        # 投球位置
+        if all(col in data.columns for col in ['plate_x', 'plate_z']):
+            location = grouped[['plate_x', 'plate_z']].agg(['mean', 'std'])
+            results['location'] = {
+                pitch_type: {
+                    'mean_x': row[('plate_x', 'mean')],
+                    'mean_z': row[('plate_z', 'mean')],
+                    'std_x': row[('plate_x', 'std')],
+                    'std_z': row[('plate_z', 'std')]
                 }
+                for pitch_type, row in location.iterrows()
+            }
+        
+        # ボールの動き
+        if all(col in data.columns for col in ['pfx_x', 'pfx_z']):
+            movement = grouped[['pfx_x', 'pfx_z']].mean()
+            results['movement'] = {
+                pitch_type: {'horizontal': row['pfx_x'], 'vertical': row['pfx_z']}
+                for pitch_type, row in movement.iterrows()
+            }
+        
+        return results
+
+    def analyze_by_count(self, data: pd.DataFrame) -> Dict[str, Any]:
+        """
+        カウント（ボール・ストライク）別の分析を実行
+        
+        複数試合の集計は試合ごとのCountStateCubeを足し合わせて求められる
+        
+        Parameters:
+        -----------
+        data : pd.DataFrame
+            Baseball Savantから取得した投球データ
             
-            # 有効性（結果ベース）
-            if 'description' in group.columns:
-                # ストライク（見逃し、空振り、ファウル）
-                called_strikes = group[group['description'].str.contains('called_strike', case=False, na=False)].shape[0]
-                swinging_strikes = group[group['description'].str.contains('swinging_strike', case=False, na=False)].shape[0]
-                fouls = group[group['description'].str.contains('foul', case=False, na=False)].shape[0]
-                
-                # ボール
-                balls = group[group['description'].str.contains('ball', case=False, na=False)].shape[0]
-                
-                # ヒット
-                hits = group[group['description'].str.contains('hit', case=False, na=False)].shape[0]
-                
-                results['effectiveness'][pitch_type] = {
-                    'strike_percentage': ((called_strikes + swinging_strikes + fouls) / count * 100) if count > 0 else 0,
-                    'swinging_strike_percentage': (swinging_strikes / count * 100) if count > 0 else 0,
-                    'ball_percentage': (balls / count * 100) if count > 0 else 0,
-                    'hit_percentage': (hits / count * 100) if count > 0 else 0
-                }
+        Returns:
+        --------
+        Dict[str, Any]
+            CountStateCube.to_dictの形式の辞書
+        """
+        if data.empty or not all(col in data.columns for col in ['pitch_type', 'balls', 'strikes']):
+            return {'error': 'データが無効または必要なカラムがありません'}
+        
+        return CountStateCube.from_pitches(data).to_dict()
+
+    def analyze_sequences(self, data: pd.DataFrame, top_n: Optional[int] = None) -> Dict[str, Any]:
+        """
+        打席内の配球（球種の遷移と2球・3球の組み合わせ）の分析を実行
+        
+        複数試合のデータを渡せばシーズン全体を1回で集計する
+        
+        Parameters:
+        -----------
+        data : pd.DataFrame
+            Baseball Savantから取得した投球データ
+        top_n : Optional[int]
+            返す組み合わせの上限（出現回数の多い順）。Noneの場合はすべて
             
-            # 投球位置
-            if all(col in group.columns for col in ['plate_x', 'plate_z']):
-                results['location'][pitch_type] = {
-                    'mean_x': group['plate_x'].mean(),
-                    'mean_z': group['plate_z'].mean(),
-                    'std_x': group['plate_x'].std(),
-                    'std_z': group['plate_z'].std()
-                }
+        Returns:
+        --------
+        Dict[str, Any]
+            pitch_sequences.analyze_sequencesの形式の辞書
+        """
+        if data.empty or not all(col in data.columns for col in ['pitch_type'] + SEQUENCE_KEY_COLUMNS):
+            return {'error': 'データが無効または必要なカラムがありません'}
+        
+        return analyze_sequences(data, lengths=(2, 3), top_n=top_n)
+
+    def analyze_splits(self, data: pd.DataFrame, dimensions: List[str]) -> pd.DataFrame:
+        """
+        状況別（打者の左右・走者・アウト数・表裏・カウント・球種の組み合わせ）の分析を実行
+        
+        複数試合の集計は試合ごとのSplitCubeを足し合わせて求められる
+        
+        Parameters:
+        -----------
+        data : pd.DataFrame
+            Baseball Savantから取得した投球データ
+        dimensions : List[str]
+            集計する状況（例: ['stand', 'runners', 'pitch_type']）
             
-            # ボールの動き
-            if all(col in group.columns for col in ['pfx_x', 'pfx_z']):
-                results['movement'][pitch_type] = {
-                    'horizontal': group['pfx_x'].mean(),
-                    'vertical': group['pfx_z'].mean()
-                }
+        Returns:
+        --------
+        pd.DataFrame
+            dimensionsをインデックスとする集計表（situational_splits.split_tableの結果）
+        """
+        return split_table(build_split_cells(data), dimensions)
+
+    def analyze_fatigue(self, data: pd.DataFrame, window: int = 10, pitch_type: Optional[str] = None) -> Dict[str, Any]:
+        """
+        打順の巡目・球数帯ごとの成績と、球速の低下（疲労）の分析を実行
         
-        return results
+        複数試合のデータを渡せばシーズン全体を1回で集計する
+        
+        Parameters:
+        -----------
+        data : pd.DataFrame
+            Baseball Savantから取得した投球データ
+        window : int
+            球速・空振り率の移動平均の球数
+        pitch_type : Optional[str]
+            球速の推移と低下の検出に使う球種。Noneの場合は最も多い球種
+            
+        Returns:
+        --------
+        Dict[str, Any]
+            fatigue.analyze_fatigueの形式の辞書
+        """
+        if data.empty or not all(col in data.columns for col in ['at_bat_number', 'pitch_number']):
+            return {'error': 'データが無効または必要なカラムがありません'}
+        
+        return analyze_fatigue(data, window=window, pitch_type=pitch_type)
+
+    def analyze_run_values(self, data: pd.DataFrame) -> Dict[str, Any]:
+        """
+        球種別の得点価値（delta_run_expの合計を投手側から見た値）の分析を実行
+        
+        複数試合の集計は試合ごとのRunValueCubeを足し合わせて求められる
+        
+        Parameters:
+        -----------
+        data : pd.DataFrame
+            Baseball Savantから取得した投球データ
+            
+        Returns:
+        --------
+        Dict[str, Any]
+            RunValueCube.to_dictの形式の辞書
+        """
+        if data.empty or not all(col in data.columns for col in ['pitch_type', 'delta_run_exp']):
+            return {'error': 'データが無効または必要なカラムがありません'}
+        
+        return RunValueCube.from_pitches(data).to_dict()
+
+    def analyze_tunneling(self, data: pd.DataFrame) -> Dict[str, Any]:
+        """
+        同じ打席内で連続する2球のトンネル（判断点とプレートでの球の距離）の分析を実行
+        
+        複数試合の集計は試合ごとのTunnelCubeを足し合わせて求められる
+        
+        Parameters:
+        -----------
+        data : pd.DataFrame
+            Baseball Savantから取得した投球データ
+            
+        Returns:
+        --------
+        Dict[str, Any]
+            TunnelCube.to_dictの形式の辞書
+        """
+        if data.empty or not all(col in data.columns for col in TUNNEL_REQUIRED_COLUMNS):
+            return {'error': 'データが無効または必要なカラムがありません'}
+        
+        return TunnelCube.from_pitches(data).to_dict()
+
+    def analyze_contact_quality(self, data: pd.DataFrame) -> pd.DataFrame:
+        """
+        球種別と全体の打球の質（期待打率・期待wOBA・平均打球速度・強い打球の割合）の分析を実行
+        
+        複数試合のデータを渡せばシーズン全体を1回で集計する
+        
+        Parameters:
+        -----------
+        data : pd.DataFrame
+            Baseball Savantから取得した投球データ
+            
+        Returns:
+        --------
+        pd.DataFrame
+            expected_outcomes.contact_qualityの結果（被打球がない場合は空のデータフレーム）
+        """
+        batted_balls = self.analyze_batted_balls(data)
+        if batted_balls.empty or 'pitch_type' not in batted_balls.columns:
+            return pd.DataFrame()
+        
+        return contact_quality(batted_balls)
+
+    def annotate_percentiles(self, data: pd.DataFrame, pitch_type_analysis: Dict[str, Any],
+                             baseline: LeagueBaseline) -> Dict[str, Any]:
+        """
+        球種別の分析結果にリーグ内のパーセンタイルを追加
+        
+        Parameters:
+        -----------
+        data : pd.DataFrame
+            分析した投球データ
+        pitch_type_analysis : Dict[str, Any]
+            analyze_by_pitch_typeの結果
+        baseline : LeagueBaseline
+            比較するシーズンのリーグ全体の分布
+            
+        Returns:
+        --------
+        Dict[str, Any]
+            'percentiles'（{球種: {指標: パーセンタイル}}）と'percentile_season'を追加した辞書
+            （元の辞書は変更しない。エラーの結果はそのまま返す）
+        """
+        if 'error' in pitch_type_analysis or 'pitch_type' not in data.columns:
+            return pitch_type_analysis
+        
+        return {
+            **pitch_type_analysis,
+            'percentiles': percentile_table(data, baseline),
+            'percentile_season': baseline.season
+        }
 
     def analyze_batted_balls(self, data: pd.DataFrame) -> pd.DataFrame:
         """
@@ -217,7 +409,9 @@ class PitchAnalyzer:
         --------
         pd.DataFrame
             被打球データを含むデータフレーム
-            カラム: [pitch_type, launch_speed, launch_angle, hit_distance_sc, hit_type, hit_result, ...]
+            カラム: [pitch_type, launch_speed, launch_angle, hit_distance_sc, hit_type, hit_result,
+                     field_x, field_y, spray_angle, spray_distance, direction, depth, result_code,
+                     xba, xwoba, ...]
         """
         if data.empty:
             return pd.DataFrame()
@@ -226,7 +420,10 @@ class PitchAnalyzer:
         if 'description' not in data.columns:
             return pd.DataFrame()
             
-        is_batted_ball = data['description'].str.contains('hit_into_play', case=False, na=False)
+        return self._batted_balls_from_mask(data, get_flag(data, 'is_in_play').to_numpy())
+    
+    def _batted_balls_from_mask(self, data: pd.DataFrame, is_batted_ball: np.ndarray) -> pd.DataFrame:
+        """打球の行を表すマスクから被打球データを作成"""
         batted_balls = data[is_batted_ball].copy()
         
         if batted_balls.empty:
@@ -241,16 +438,11 @@ class PitchAnalyzer:
             if col not in batted_balls.columns:
                 batted_balls[col] = np.nan
         
-        # 打球の種類を追加（あれば）
-        if 'bb_type' in batted_balls.columns:
-            batted_balls['hit_type'] = batted_balls['bb_type']
-        else:
-            # 簡易的な打球分類（launch_angleに基づく）
-            batted_balls['hit_type'] = batted_balls['launch_angle'].apply(
-                lambda angle: 'ground_ball' if pd.notna(angle) and angle < 10 else 
-                             ('line_drive' if pd.notna(angle) and angle < 25 else 
-                             ('fly_ball' if pd.notna(angle) and angle < 50 else 'pop_up'))
-            )
+        # 打球の種類（bb_typeがなければ打球角度から判定）・方向・距離・結果コードを追加
+        batted_balls = add_batted_ball_features(batted_balls)
+        
+        # 打球速度 × 打球角度の表から期待打率・期待wOBAを追加
+        batted_balls = add_expected_outcomes(batted_balls, self.expected_outcomes)
         
         # 打球結果を追加
         if 'events' in batted_balls.columns:
@@ -300,7 +492,7 @@ class PitchAnalyzer:
         
         # 球速統計
         if 'release_speed' in data.columns:
-            speed_stats = data['release_speed'].describe()
+            speed_stats = data['release_speed'].agg(['mean', 'max', 'min', 'std'])
             summary['velocity'] = {
                 'average': speed_stats['mean'],
                 'max': speed_stats['max'],
@@ -310,31 +502,349 @@ class PitchAnalyzer:
         
         # 結果の集計
         if 'description' in data.columns:
-            # 各種結果のカウント
-            called_strikes = data[data['description'].str.contains('called_strike', case=False, na=False)].shape[0]
-            swinging_strikes = data[data['description'].str.contains('swinging_strike', case=False, na=False)].shape[0]
-            fouls = data[data['description'].str.contains('foul', case=False, na=False)].shape[0]
-            balls = data[data['description'].str.contains('ball', case=False, na=False)].shape[0]
-            hits = data[data['description'].str.contains('hit', case=False, na=False)].shape[0]
+            data = with_outcome_flags(data)
+            flag_sums = data[['is_called_strike', 'is_swinging_strike', 'is_foul', 'is_ball', 'is_hit']].sum()
+            summary['outcomes'] = self._outcome_counts(flag_sums, len(data))
+        
+        self._add_innings_and_batters(data, summary)
+        return summary
+
+    def analyze_all(self, data: pd.DataFrame) -> Dict[str, Any]:
+        """
+        イニング別・球種別・被打球・サマリーの分析をまとめて実行
+        
+        結果フラグの計算と(イニング, 球種)ごとのセル集計を1度だけ行い、
+        各分析はそのセルを足し合わせて導出する
+        
+        Parameters:
+        -----------
+        data : pd.DataFrame
+            Baseball Savantから取得した投球データ
             
-            summary['outcomes'] = {
-                'called_strikes': called_strikes,
-                'swinging_strikes': swinging_strikes,
-                'fouls': fouls,
-                'balls': balls,
-                'hits': hits,
-                'strike_percentage': ((called_strikes + swinging_strikes + fouls) / len(data) * 100) if len(data) > 0 else 0,
-                'ball_percentage': (balls / len(data) * 100) if len(data) > 0 else 0
+        Returns:
+        --------
+        Dict[str, Any]
+            {
+                'inning_analysis': analyze_by_inningと同じ形式,
+                'pitch_type_analysis': analyze_by_pitch_typeと同じ形式,
+                'batted_ball_analysis': analyze_batted_ballsと同じ形式,
+                'performance_summary': get_performance_summaryと同じ形式
+            }
+        """
+        if data.empty:
+            return {
+                'inning_analysis': self.analyze_by_inning(data),
+                'pitch_type_analysis': self.analyze_by_pitch_type(data),
+                'batted_ball_analysis': self.analyze_batted_balls(data),
+                'performance_summary': self.get_performance_summary(data)
+            }
+        
+        flagged = with_outcome_flags(data)
+        
+        # 被打球データには結果フラグの列を含めない
+        if 'description' in data.columns:
+            batted_ball_analysis = self._batted_balls_from_mask(data, flagged['is_in_play'].to_numpy())
+        else:
+            batted_ball_analysis = pd.DataFrame()
+        
+        # セル集計にはイニングと球種の両方が必要（ない場合は個別の分析に任せる）
+        if 'inning' not in data.columns or 'pitch_type' not in data.columns:
+            return {
+                'inning_analysis': self.analyze_by_inning(flagged),
+                'pitch_type_analysis': self.analyze_by_pitch_type(flagged),
+                'batted_ball_analysis': batted_ball_analysis,
+                'performance_summary': self.get_performance_summary(flagged)
+            }
+        
+        cells = build_cells(flagged, ['inning', 'pitch_type'])
+        
+        return {
+            'inning_analysis': self._inning_analysis_from_cells(cells, data.columns),
+            'pitch_type_analysis': self._pitch_type_analysis_from_cells(cells, data.columns),
+            'batted_ball_analysis': batted_ball_analysis,
+            'performance_summary': self._performance_summary_from_cells(
+                cells, data.columns, self._innings_and_batters(data))
+        }
+
+    def _inning_analysis_from_cells(self, cells: pd.DataFrame, columns: Collection[str]) -> Dict[str, Any]:
+        """セル集計からイニング別分析を作成（columnsは元データにあるカラム）"""
+        innings = rollup(cells, 'inning')
+        pitch_counts = innings['pitches']
+        
+        results = {
+            'innings': [int(inning) for inning in innings.index],
+            'velocity': {},
+            'pitch_count': {str(inning): int(count) for inning, count in pitch_counts.items()},
+            'strike_percentage': {},
+            'whiff_percentage': {},
+            'pitch_type_distribution': {}
+        }
+        
+        if 'release_speed' in columns:
+            results['velocity'] = self._stats_to_dict(moment_stats(innings, 'release_speed'))
+        
+        if 'type' in columns:
+            results['strike_percentage'] = {
+                str(inning): row['is_strike_type'] / row['pitches'] * 100 for inning, row in innings.iterrows()
+            }
+        
+        if 'description' in columns:
+            results['whiff_percentage'] = {
+                str(inning): row['is_swinging_strike'] / row['is_swing'] * 100 if row['is_swing'] > 0 else 0
+                for inning, row in innings.iterrows()
+            }
+        
+        # 球種分布（多い順、球種がないイニングは空の辞書）
+        distribution: Dict[str, Dict[str, int]] = {str(inning): {} for inning in innings.index}
+        cell_counts = cells['pitches'].dropna().sort_values(ascending=False, kind='stable')
+        for (inning, pitch_type), count in cell_counts.items():
+            if pd.notna(inning) and pd.notna(pitch_type):
+                distribution[str(inning)][pitch_type] = int(count)
+        results['pitch_type_distribution'] = distribution
+        
+        return results
+
+    def _pitch_type_analysis_from_cells(self, cells: pd.DataFrame, columns: Collection[str]) -> Dict[str, Any]:
+        """セル集計から球種別分析を作成（columnsは元データにあるカラム）"""
+        # 球種が空白のセルを除外（欠損値はrollupで除外される）
+        valid_cells = cells[cells.index.get_level_values('pitch_type') != '']
+        pitch_types = rollup(valid_cells, 'pitch_type')
+        pitch_types = pitch_types[pitch_types['pitches'] > 0]
+        
+        if pitch_types.empty:
+            return {'error': '有効な球種データがありません'}
+        
+        counts = pitch_types['pitches']
+        total_pitches = counts.sum()
+        
+        results = {
+            'pitch_types': list(pitch_types.index),
+            'usage': {
+                pitch_type: {
+                    'count': int(count),
+                    'percentage': count / total_pitches * 100
+                }
+                for pitch_type, count in counts.items()
+            },
+            'velocity': {},
+            'effectiveness': {},
+            'location': {},
+            'movement': {}
+        }
+        
+        if 'release_speed' in columns:
+            results['velocity'] = {
+                pitch_type: stats
+                for pitch_type, stats in zip(pitch_types.index,
+                                             self._stats_to_dict(moment_stats(pitch_types, 'release_speed')).values())
+            }
+        
+        if 'description' in columns:
+            results['effectiveness'] = {
+                pitch_type: self._effectiveness(row, row['pitches'])
+                for pitch_type, row in pitch_types.iterrows()
+            }
+        
+        if all(col in columns for col in ['plate_x', 'plate_z']):
+            location_x = moment_stats(pitch_types, 'plate_x')
+            location_z = moment_stats(pitch_types, 'plate_z')
+            results['location'] = {
+                pitch_type: {
+                    'mean_x': location_x.at[pitch_type, 'mean'],
+                    'mean_z': location_z.at[pitch_type, 'mean'],
+                    'std_x': location_x.at[pitch_type, 'std'],
+                    'std_z': location_z.at[pitch_type, 'std']
+                }
+                for pitch_type in pitch_types.index
+            }
+        
+        if all(col in columns for col in ['pfx_x', 'pfx_z']):
+            results['movement'] = {
+                pitch_type: {'horizontal': row['pfx_x_mean'], 'vertical': row['pfx_z_mean']}
+                for pitch_type, row in pitch_types.iterrows()
+            }
+        
+        return results
+
+    def _performance_summary_from_cells(self, cells: pd.DataFrame, columns: Collection[str],
+                                        innings_and_batters: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        セル集計から全体パフォーマンスのサマリーを作成
+        
+        columnsは元データにあるカラム、innings_and_battersは_innings_and_battersの結果
+        """
+        totals = rollup(cells).iloc[0]
+        total_pitches = int(totals['pitches'])
+        pitch_type_counts = cells['pitches'].groupby(level='pitch_type').sum()
+        
+        summary = {
+            'total_pitches': total_pitches,
+            'pitch_type_counts': {
+                pitch_type: int(count)
+                for pitch_type, count in pitch_type_counts.sort_values(ascending=False, kind='stable').items()
+            },
+            'velocity': {},
+            'outcomes': {},
+            'innings_pitched': 0,
+            'batters_faced': 0
+        }
+        
+        if 'release_speed' in columns:
+            speed_stats = moment_stats(totals.to_frame().T, 'release_speed').iloc[0]
+            summary['velocity'] = {
+                'average': speed_stats['mean'],
+                'max': speed_stats['max'],
+                'min': speed_stats['min'],
+                'std': speed_stats['std']
             }
         
+        if 'description' in columns:
+            summary['outcomes'] = self._outcome_counts(totals, total_pitches)
+        
+        summary.update(innings_and_batters)
+        return summary
+
+    def aggregate_games(self, data: pd.DataFrame) -> pd.DataFrame:
+        """
+        複数試合・シーズンの投球データを集計
+        
+        (シーズン, 試合, イニング, 球種)のセルを1度のgroupbyで求め、
+        試合×球種・試合×イニング・試合・シーズン×球種・シーズンの各単位に集約する
+        
+        Parameters:
+        -----------
+        data : pd.DataFrame
+            複数試合分の投球データ（game_pkまたはgame_date、inning、pitch_typeカラムが必要）
+            
+        Returns:
+        --------
+        pd.DataFrame
+            1行が1つの集計単位を表す縦長の表
+            カラム: [scope, season, game_pk（またはgame_date）, inning, pitch_type,
+                     pitches, usage_pct, strike_pct, whiff_pct, release_speed_mean, ...]
+            scopeは'game_pitch_type', 'game_inning', 'game', 'season_pitch_type', 'season'のいずれかで、
+            その単位で使わないキーの列は欠損値になる
+            usage_pctは試合内（シーズン×球種の場合はシーズン内）での球種の割合
+        """
+        game_key = 'game_pk' if 'game_pk' in data.columns else 'game_date'
+        if data.empty or game_key not in data.columns or \
+                'inning' not in data.columns or 'pitch_type' not in data.columns:
+            return pd.DataFrame()
+        
+        data = with_outcome_flags(data)
+        
+        # 空白の球種は欠損値として扱う
+        columns = {'pitch_type': data['pitch_type'].mask(data['pitch_type'] == '')}
+        if 'game_year' in data.columns:
+            columns['season'] = data['game_year']
+        elif 'game_date' in data.columns:
+            columns['season'] = pd.to_datetime(data['game_date']).dt.year
+        else:
+            columns['season'] = 0
+        data = data.assign(**columns)
+        
+        cells = build_cells(data, ['season', game_key, 'inning', 'pitch_type'])
+        
+        scopes = [
+            ('game_pitch_type', ['season', game_key, 'pitch_type']),
+            ('game_inning', ['season', game_key, 'inning']),
+            ('game', ['season', game_key]),
+            ('season_pitch_type', ['season', 'pitch_type']),
+            ('season', ['season']),
+        ]
+        
+        tables = []
+        for scope, levels in scopes:
+            rolled = rollup(cells, levels)
+            table = metrics_table(rolled)
+            
+            # 球種の割合（試合内またはシーズン内）
+            if 'pitch_type' in levels:
+                parent_levels = [level for level in levels if level != 'pitch_type']
+                totals = table['pitches'].groupby(level=parent_levels).transform('sum')
+                table.insert(1, 'usage_pct', table['pitches'] / totals * 100)
+            
+            table = table.reset_index()
+            table.insert(0, 'scope', scope)
+            tables.append(table)
+        
+        key_columns = ['scope', 'season', game_key, 'inning', 'pitch_type']
+        result = pd.concat(tables, ignore_index=True)
+        
+        # 欠損値を含むことで浮動小数点になった整数のキーを整数型に戻す
+        for column in ['season', game_key, 'inning']:
+            if pd.api.types.is_integer_dtype(data[column]):
+                result[column] = result[column].astype('Int64')
+        return result[key_columns + [c for c in result.columns if c not in key_columns]]
+
+    @staticmethod
+    def _speed_stats(speeds: "pd.core.groupby.SeriesGroupBy") -> Dict[str, Dict[str, float]]:
+        """グループごとの球速の平均・最大・最小・標準偏差"""
+        return PitchAnalyzer._stats_to_dict(speeds.agg(['mean', 'max', 'min', 'std']))
+
+    @staticmethod
+    def _stats_to_dict(stats: pd.DataFrame) -> Dict[str, Dict[str, float]]:
+        """'mean', 'max', 'min', 'std'列を持つ集計結果をキー（文字列）ごとの辞書に変換"""
+        return {
+            str(key): {'mean': row['mean'], 'max': row['max'], 'min': row['min'], 'std': row['std']}
+            for key, row in zip(stats.index, stats.to_dict('records'))
+        }
+
+    @staticmethod
+    def _count_distribution(data: pd.DataFrame, key: str, keys: pd.Index) -> Dict[str, Dict[str, int]]:
+        """キーごとの球種の投球数（多い順、球種がないキーは空の辞書）"""
+        counts = data.groupby([key, 'pitch_type']).size().sort_values(ascending=False, kind='stable')
+        distribution: Dict[str, Dict[str, int]] = {str(k): {} for k in keys}
+        for (k, pitch_type), count in counts.items():
+            distribution[str(k)][pitch_type] = int(count)
+        return distribution
+
+    @staticmethod
+    def _effectiveness(flag_sums: pd.Series, count: int) -> Dict[str, float]:
+        """フラグの合計から球種の有効性（各割合）を計算"""
+        strikes = flag_sums['is_called_strike'] + flag_sums['is_swinging_strike'] + flag_sums['is_foul']
+        return {
+            'strike_percentage': strikes / count * 100 if count > 0 else 0,
+            'swinging_strike_percentage': flag_sums['is_swinging_strike'] / count * 100 if count > 0 else 0,
+            'ball_percentage': flag_sums['is_ball'] / count * 100 if count > 0 else 0,
+            'hit_percentage': flag_sums['is_hit'] / count * 100 if count > 0 else 0
+        }
+
+    @staticmethod
+    def _outcome_counts(flag_sums: pd.Series, total: int) -> Dict[str, Any]:
+        """フラグの合計から結果の集計を作成"""
+        called_strikes = int(flag_sums['is_called_strike'])
+        swinging_strikes = int(flag_sums['is_swinging_strike'])
+        fouls = int(flag_sums['is_foul'])
+        balls = int(flag_sums['is_ball'])
+        return {
+            'called_strikes': called_strikes,
+            'swinging_strikes': swinging_strikes,
+            'fouls': fouls,
+            'balls': balls,
+            'hits': int(flag_sums['is_hit']),
+            'strike_percentage': ((called_strikes + swinging_strikes + fouls) / total * 100) if total > 0 else 0,
+            'ball_percentage': (balls / total * 100) if total > 0 else 0
+        }
+
+    @staticmethod
+    def _add_innings_and_batters(data: pd.DataFrame, summary: Dict[str, Any]) -> None:
+        """サマリーに投球イニング数と対戦打者数を追加"""
+        summary.update(PitchAnalyzer._innings_and_batters(data))
+
+    @staticmethod
+    def _innings_and_batters(data: pd.DataFrame) -> Dict[str, Any]:
+        """投球イニング数と対戦打者数（カラムがない項目は含めない）"""
+        result: Dict[str, Any] = {}
+        
         # 投球イニング数
         if 'inning' in data.columns:
-            summary['innings_pitched'] = data['inning'].max()
+            result['innings_pitched'] = data['inning'].max()
         
         # 対戦打者数
         if 'at_bat_number' in data.columns:
-            summary['batters_faced'] = data['at_bat_number'].nunique()
+            result['batters_faced'] = data['at_bat_number'].nunique()
         elif 'batter' in data.columns:
-            summary['batters_faced'] = data['batter'].nunique()
+            result['batters_faced'] = data['batter'].nunique()
         
-        return summary
\ No newline at end of file
+        return result
@@ -0,0 +1,209 @@
+"""
+投球結果（description / events）の分類
+
+文字列の部分一致を分析のたびに繰り返さないよう、フレームごとに1度だけ
+結果コードと真偽値のフラグ列に変換する。変換はユニークな値ごとに判定して
+全行に展開するため、行数が増えても文字列処理の回数は増えない
+"""
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+# descriptionから求める投球結果コード
+OUTCOME_CODES: Dict[str, int] = {
+    'other': -1,
+    'ball': 0,
+    'called_strike': 1,
+    'swinging_strike': 2,
+    'foul': 3,
+    'in_play': 4,
+    'hit_by_pitch': 5,
+}
+
+# eventsから求める打席結果コード（打席の最終球以外は'none'）
+EVENT_CODES: Dict[str, int] = {
+    'none': 0,
+    'single': 1,
+    'double': 2,
+    'triple': 3,
+    'home_run': 4,
+    'walk': 5,
+    'strikeout': 6,
+    'hit_by_pitch': 7,
+    'out': 8,
+    'other': 9,
+}
+
+# フラグ列の名前
+FLAG_COLUMNS: List[str] = [
+    'is_called_strike',
+    'is_swinging_strike',
+    'is_foul',
+    'is_ball',
+    'is_in_play',
+    'is_swing',
+    'is_hit',
+]
+
+OUTCOME_COLUMNS: List[str] = FLAG_COLUMNS + ['outcome_code', 'event_code']
+
+# 各フラグの判定（小文字化したdescriptionに対して適用）
+# is_hitは従来のサマリーの'hits'（hit_into_playとhit_by_pitch）と同じ定義
+_FLAG_RULES: Dict[str, Callable[[str], bool]] = {
+    'is_called_strike': lambda d: 'called_strike' in d,
+    'is_swinging_strike': lambda d: 'swinging_strike' in d,
+    'is_foul': lambda d: 'foul' in d,
+    'is_ball': lambda d: 'ball' in d,
+    'is_in_play': lambda d: 'hit_into_play' in d,
+    'is_swing': lambda d: 'swinging_strike' in d or 'foul' in d or 'hit_into_play' in d or d == 'missed_bunt',
+    'is_hit': lambda d: 'hit' in d,
+}
+
+
+def _outcome_code(description: str) -> int:
+    """descriptionを投球結果コードに変換"""
+    if 'hit_into_play' in description:
+        return OUTCOME_CODES['in_play']
+    if description == 'hit_by_pitch':
+        return OUTCOME_CODES['hit_by_pitch']
+    if 'swinging_strike' in description or description == 'missed_bunt':
+        return OUTCOME_CODES['swinging_strike']
+    if 'foul' in description:
+        return OUTCOME_CODES['foul']
+    if 'strike' in description:
+        return OUTCOME_CODES['called_strike']
+    if 'ball' in description or description == 'pitchout':
+        return OUTCOME_CODES['ball']
+    return OUTCOME_CODES['other']
+
+
+def _event_code(event: str) -> int:
+    """eventsを打席結果コードに変換"""
+    if event in ('single', 'double', 'triple', 'home_run', 'hit_by_pitch'):
+        return EVENT_CODES[event]
+    if event in ('walk', 'intent_walk'):
+        return EVENT_CODES['walk']
+    if event.startswith('strikeout'):
+        return EVENT_CODES['strikeout']
+    if event == 'out' or event.endswith('_out') or event.endswith('double_play') or event.endswith('triple_play') \
+            or event.startswith('sac_') or event == 'fielders_choice_out':
+        return EVENT_CODES['out']
+    return EVENT_CODES['other']
+
+
+def _factorize(values: pd.Series) -> Tuple[np.ndarray, List[str]]:
+    """値を整数コードと小文字化したユニーク値のリストに分解（欠損値のコードは-1）"""
+    codes, uniques = pd.factorize(values)
+    return codes, [str(u).lower() for u in uniques]
+
+
+def _expand(codes: np.ndarray, uniques: List[str], func: Callable[[str], object], missing, dtype) -> np.ndarray:
+    """ユニーク値ごとにfuncを適用し、全行に展開する（欠損値はmissing）"""
+    mapped = np.array([func(u) for u in uniques] + [missing], dtype=dtype)
+    # 欠損値のコード-1は末尾に追加したmissingを参照する
+    return mapped[codes]
+
+
+def event_codes(events: pd.Series) -> np.ndarray:
+    """
+    eventsを打席結果コード（EVENT_CODES）の配列に変換
+
+    Parameters:
+    -----------
+    events : pd.Series
+        eventsカラム
+
+    Returns:
+    --------
+    np.ndarray
+        int8の配列（欠損値は'none'）
+    """
+    codes, uniques = _factorize(events)
+    return _expand(codes, uniques, _event_code, EVENT_CODES['none'], np.int8)
+
+
+def classify_outcomes(data: pd.DataFrame) -> pd.DataFrame:
+    """
+    投球結果のフラグ列とコード列を計算
+
+    Parameters:
+    -----------
+    data : pd.DataFrame
+        投球データ（description, eventsカラムがあれば使用）
+
+    Returns:
+    --------
+    pd.DataFrame
+        dataと同じインデックスを持つ、OUTCOME_COLUMNSのデータフレーム
+        descriptionがない場合、フラグはすべてFalse、outcome_codeは'other'になる
+    """
+    result = {}
+
+    if 'description' in data.columns:
+        codes, uniques = _factorize(data['description'])
+        for column, rule in _FLAG_RULES.items():
+            result[column] = _expand(codes, uniques, rule, False, bool)
+        result['outcome_code'] = _expand(codes, uniques, _outcome_code, OUTCOME_CODES['other'], np.int8)
+    else:
+        for column in FLAG_COLUMNS:
+            result[column] = np.zeros(len(data), dtype=bool)
+        result['outcome_code'] = np.full(len(data), OUTCOME_CODES['other'], dtype=np.int8)
+
+    if 'events' in data.columns:
+        result['event_code'] = event_codes(data['events'])
+    else:
+        result['event_code'] = np.zeros(len(data), dtype=np.int8)
+
+    return pd.DataFrame(result, index=data.index)
+
+
+def with_outcome_flags(data: pd.DataFrame) -> pd.DataFrame:
+    """
+    フラグ列とコード列を追加したデータフレームを返す
+
+    既に追加済みの場合は計算せずにそのまま返すため、分析の入口で何度呼んでもよい
+
+    Parameters:
+    -----------
+    data : pd.DataFrame
+        投球データ
+
+    Returns:
+    --------
+    pd.DataFrame
+        OUTCOME_COLUMNSを追加したデータフレーム（元のデータは変更しない）
+    """
+    if all(column in data.columns for column in OUTCOME_COLUMNS):
+        return data
+
+    outcomes = classify_outcomes(data)
+    base = data.drop(columns=[c for c in OUTCOME_COLUMNS if c in data.columns])
+    return pd.concat([base, outcomes], axis=1)
+
+
+def get_flag(data: pd.DataFrame, column: str) -> pd.Series:
+    """
+    1つのフラグ列を取得
+
+    with_outcome_flagsで追加済みの場合はその列を、ない場合はそのフラグだけを計算して返す
+
+    Parameters:
+    -----------
+    data : pd.DataFrame
+        投球データ
+    column : str
+        FLAG_COLUMNSのいずれか
+
+    Returns:
+    --------
+    pd.Series
+        dataと同じインデックスを持つ真偽値のシリーズ
+    """
+    if column in data.columns:
+        return data[column]
+    if 'description' not in data.columns:
+        return pd.Series(False, index=data.index)
+    codes, uniques = _factorize(data['description'])
+    return pd.Series(_expand(codes, uniques, _FLAG_RULES[column], False, bool), index=data.index)
@@ -0,0 +1,199 @@
+"""
+打席内の配球（球種の並び）の集計
+
+投球を（試合, 打席, 打席内の投球番号）で並べ替え、1つずらした配列と比較して
+同じ打席内で連続する投球を求める。球種を整数コードにし、n球の並びを
+「球種数進数」の1つの整数キーにまとめることで、打席ごとのループを使わずに
+シーズン全体の遷移行列やn球の組み合わせを1回で数える
+
+結果は出現した組み合わせだけを持つ（疎な）表として返す
+"""
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from src.domain.game_cube import OUTCOMES, outcome_axis_codes
+
+
+# 投球の並び順に使うカラム（試合のカラムはgame_pk、なければgame_dateを使う）
+SEQUENCE_KEY_COLUMNS: List[str] = ['at_bat_number', 'pitch_number']
+GAME_KEY_COLUMNS: List[str] = ['game_pk', 'game_date']
+
+# 組み合わせの表示に使う区切り文字
+SEQUENCE_SEPARATOR = '-'
+
+
+class PitchSequences:
+    """
+    並べ替え済みの投球の球種コードと打席の区切り
+
+    同じデータから遷移行列と複数の長さの組み合わせを求める場合に、並べ替えを1回で済ませる
+    """
+
+    def __init__(self, data: pd.DataFrame):
+        """
+        Parameters:
+        -----------
+        data : pd.DataFrame
+            投球データ（pitch_type, at_bat_number, pitch_numberが必要。複数試合の場合はgame_pkかgame_date）
+
+        Raises:
+        -------
+        ValueError
+            必要なカラムがない場合
+        """
+        missing = [column for column in ['pitch_type'] + SEQUENCE_KEY_COLUMNS if column not in data.columns]
+        if missing:
+            raise ValueError(f"配球の集計に必要なカラムがありません: {missing}")
+
+        game_column = next((column for column in GAME_KEY_COLUMNS if column in data.columns), None)
+        game_codes = pd.factorize(data[game_column])[0] if game_column else np.zeros(len(data), dtype=np.int64)
+        at_bat = pd.to_numeric(data['at_bat_number'], errors='coerce').to_numpy(dtype=float)
+        pitch_number = pd.to_numeric(data['pitch_number'], errors='coerce').to_numpy(dtype=float)
+
+        # 試合 → 打席 → 投球番号の順に並べ替える（lexsortは最後のキーが最優先）
+        order = np.lexsort((pitch_number, at_bat, game_codes))
+        # 並べ替えた位置からdataの位置への変換
+        self.order: np.ndarray = order
+        game_codes = game_codes[order]
+        at_bat = at_bat[order]
+
+        pitch_types = data['pitch_type'].to_numpy(dtype=object)[order]
+        valid = pd.notna(pitch_types) & (pitch_types != '')
+        self.labels: List[str] = sorted({str(p) for p in pitch_types[valid]})
+        self.codes: np.ndarray = np.full(len(data), -1, dtype=np.int64)
+        self.codes[valid] = pd.Categorical(pitch_types[valid].astype(str), categories=self.labels).codes
+
+        # 打席の通し番号（前の投球と試合か打席番号が異なる位置で増やす）
+        new_at_bat = np.ones(len(data), dtype=bool)
+        new_at_bat[1:] = (game_codes[1:] != game_codes[:-1]) | (at_bat[1:] != at_bat[:-1]) | np.isnan(at_bat[1:])
+        self.at_bat_ids: np.ndarray = np.cumsum(new_at_bat) - 1
+
+        self.outcomes: np.ndarray = outcome_axis_codes(data)[order]
+
+    def ngram_keys(self, length: int) -> Dict[str, np.ndarray]:
+        """
+        同じ打席内で連続するlength球の組み合わせのキー
+
+        Parameters:
+        -----------
+        length : int
+            組み合わせの球数（1以上）
+
+        Returns:
+        --------
+        Dict[str, np.ndarray]
+            'keys'（球種コードをlen(labels)進数で並べた整数）, 'last'（組み合わせの最後の投球の位置）
+        """
+        if length < 1:
+            raise ValueError("組み合わせの球数は1以上を指定してください")
+
+        count = len(self.codes) - length + 1
+        if count <= 0:
+            return {'keys': np.array([], dtype=np.int64), 'last': np.array([], dtype=np.int64)}
+
+        base = max(len(self.labels), 1)
+        keys = np.zeros(count, dtype=np.int64)
+        valid = np.ones(count, dtype=bool)
+        for offset in range(length):
+            codes = self.codes[offset:offset + count]
+            keys = keys * base + codes
+            valid &= codes >= 0
+        # 最初と最後の投球が同じ打席なら、間の投球もすべて同じ打席
+        valid &= self.at_bat_ids[:count] == self.at_bat_ids[length - 1:]
+
+        return {'keys': keys[valid], 'last': np.flatnonzero(valid) + length - 1}
+
+    def decode(self, key: int, length: int) -> List[str]:
+        """キーを球種の並びに戻す"""
+        base = max(len(self.labels), 1)
+        codes = []
+        for _ in range(length):
+            key, code = divmod(int(key), base)
+            codes.append(self.labels[code])
+        return codes[::-1]
+
+    def transition_matrix(self) -> pd.DataFrame:
+        """
+        前の球種から次の球種への遷移回数
+
+        Returns:
+        --------
+        pd.DataFrame
+            行が前の球種、列が次の球種の遷移回数
+        """
+        size = len(self.labels)
+        keys = self.ngram_keys(2)['keys']
+        counts = np.bincount(keys, minlength=size * size).reshape(size, size)
+        return pd.DataFrame(counts, index=pd.Index(self.labels, name='previous'),
+                            columns=pd.Index(self.labels, name='next'))
+
+    def ngram_table(self, length: int) -> pd.DataFrame:
+        """
+        length球の組み合わせごとの出現回数と最後の投球の結果
+
+        Returns:
+        --------
+        pd.DataFrame
+            出現回数の多い順のデータフレーム（出現した組み合わせのみ）
+            列: sequence（'FF-SL'形式）, count, percentage（同じ長さの組み合わせ全体に対する割合）,
+            OUTCOMESの各結果の回数, whiff_percentage（空振り / スイング）
+        """
+        ngrams = self.ngram_keys(length)
+        keys, inverse, counts = np.unique(ngrams['keys'], return_inverse=True, return_counts=True)
+
+        columns: Dict[str, Any] = {
+            'sequence': [SEQUENCE_SEPARATOR.join(self.decode(key, length)) for key in keys],
+            'count': counts,
+            'percentage': counts / counts.sum() * 100 if len(counts) else np.array([], dtype=float)
+        }
+        outcome_counts = np.zeros((len(keys), len(OUTCOMES)), dtype=np.int64)
+        np.add.at(outcome_counts, (inverse, self.outcomes[ngrams['last']]), 1)
+        for i, outcome in enumerate(OUTCOMES):
+            columns[outcome] = outcome_counts[:, i]
+
+        table = pd.DataFrame(columns)
+        swings = table['swinging_strike'] + table['foul'] + table['in_play']
+        table['whiff_percentage'] = (table['swinging_strike'] / swings.where(swings > 0)) * 100
+        return table.sort_values(['count', 'sequence'], ascending=[False, True], ignore_index=True)
+
+
+def analyze_sequences(data: pd.DataFrame, lengths: Sequence[int] = (2, 3),
+                      top_n: Optional[int] = None) -> Dict[str, Any]:
+    """
+    打席内の配球を集計
+
+    Parameters:
+    -----------
+    data : pd.DataFrame
+        投球データ（複数試合を含んでもよい）
+    lengths : Sequence[int]
+        集計する組み合わせの球数
+    top_n : Optional[int]
+        各長さで返す組み合わせの上限（出現回数の多い順）。Noneの場合はすべて
+
+    Returns:
+    --------
+    Dict[str, Any]
+        {
+            'pitch_types': ['CH', 'FF', 'SL', ...],
+            'transitions': {'FF': {'SL': 12, 'FF': 8}, ...},   # 出現した遷移のみ
+            'sequences': {2: [{'sequence': 'FF-SL', 'count': 12, ...}, ...], 3: [...]}
+        }
+    """
+    sequences = PitchSequences(data)
+    matrix = sequences.transition_matrix()
+
+    transitions = {
+        previous: {next_type: int(count) for next_type, count in row.items() if count > 0}
+        for previous, row in matrix.iterrows()
+    }
+    tables = {}
+    for length in lengths:
+        table = sequences.ngram_table(length)
+        if top_n is not None:
+            table = table.head(top_n)
+        tables[length] = table.to_dict('records')
+
+    return {'pitch_types': sequences.labels, 'transitions': transitions, 'sequences': tables}
@@ -73,7 +73,7 @@ def translate_pitch_types_in_data(data: Dict[str, Any]) -> Dict[str, Any]:
             result[key] = [get_pitch_name_ja(pt) for pt in value]
         
         # usageなどの球種をキーとする辞書
-        elif key in ['usage', 'velocity', 'effectiveness', 'location', 'movement', 'pitch_type_counts'] and isinstance(value, dict):
+        elif key in ['usage', 'velocity', 'effectiveness', 'location', 'movement', 'pitch_type_counts', 'percentiles', 'run_values'] and isinstance(value, dict):
             result[key] = {}
             for pitch_code, data_value in value.items():
                 pitch_name = get_pitch_name_ja(pitch_code)
@@ -0,0 +1,215 @@
+"""
+投球ごとの得点価値（run value）の集計
+
+Statcastのdelta_run_expは、その投球の前後での得点期待値の変化（攻撃側から見た値）
+球種 × ゾーン × カウント ごとに投球数・delta_run_expがある投球数・合計を1回のgroupbyで求め、
+試合ごとに保存しておけば、シーズンの球種別の得点価値は配列の和で求められる
+
+得点価値は投手側から見た値（delta_run_expの合計の符号を反転し、正の値ほど投手に有利）として返す
+"""
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from src.domain.count_states import COUNT_STATES, count_state_codes
+from src.domain.game_cube import GameCube, label_codes, merge_labeled, pitch_type_labels
+
+
+# 不明なゾーン・カウントの軸の値（各軸の末尾）
+UNKNOWN = 'unknown'
+
+# Statcastのゾーン（1〜9がストライクゾーン内、11〜14がゾーン外）
+ZONES: List[str] = [str(zone) for zone in list(range(1, 10)) + [11, 12, 13, 14]] + [UNKNOWN]
+
+RUN_VALUE_COUNT_STATES: List[str] = COUNT_STATES + [UNKNOWN]
+
+RUN_VALUE_DIMENSIONS: List[str] = ['pitch_type', 'zone', 'count_state']
+
+
+def zone_codes(data: pd.DataFrame) -> np.ndarray:
+    """ゾーンをZONESの位置に変換（欠損値や範囲外の値、カラムがない場合は末尾のUNKNOWN）"""
+    if 'zone' not in data.columns:
+        return np.full(len(data), len(ZONES) - 1, dtype=np.int64)
+
+    zones = pd.to_numeric(data['zone'], errors='coerce')
+    codes = zones.map({float(zone): i for i, zone in enumerate(ZONES[:-1])})
+    return codes.fillna(len(ZONES) - 1).to_numpy(dtype=np.int64)
+
+
+class RunValueCube(GameCube):
+    """
+    球種 × ゾーン × カウント の得点価値
+
+    - pitches[球種, ゾーン, カウント]: 投球数
+    - run_exp_n / run_exp_sum[球種, ゾーン, カウント]: delta_run_expがある投球数・合計（攻撃側から見た値）
+    """
+
+    KIND = 'run_value'
+    VERSION = 1
+
+    def __init__(self, pitch_types: List[str], pitches: np.ndarray, run_exp_n: np.ndarray, run_exp_sum: np.ndarray):
+        self.pitch_types = list(pitch_types)
+        self.pitches = pitches
+        self.run_exp_n = run_exp_n
+        self.run_exp_sum = run_exp_sum
+
+    @classmethod
+    def empty(cls, pitch_types: Optional[List[str]] = None) -> "RunValueCube":
+        """投球のない集計"""
+        pitch_types = pitch_types or []
+        shape = (len(pitch_types), len(ZONES), len(RUN_VALUE_COUNT_STATES))
+        return cls(pitch_types, np.zeros(shape, dtype=np.int64), np.zeros(shape, dtype=np.int64),
+                   np.zeros(shape, dtype=float))
+
+    @classmethod
+    def from_pitches(cls, data: pd.DataFrame) -> "RunValueCube":
+        """
+        投球データから集計を作成
+
+        球種が欠損している投球は含めない。ゾーン・カウントが不明な投球はUNKNOWNに集計する
+
+        Parameters:
+        -----------
+        data : pd.DataFrame
+            投球データ（pitch_type, zone, balls, strikes, delta_run_expを使用）
+        """
+        pitch_types = pitch_type_labels(data)
+        cube = cls.empty(pitch_types)
+        if data.empty or not pitch_types:
+            return cube
+
+        if 'delta_run_exp' in data.columns:
+            run_exp = pd.to_numeric(data['delta_run_exp'], errors='coerce').to_numpy(dtype=float)
+        else:
+            run_exp = np.full(len(data), np.nan)
+
+        count_states = count_state_codes(data)
+        codes = pd.DataFrame({
+            'pitch_type': label_codes(data['pitch_type'], pitch_types),
+            'zone': zone_codes(data),
+            'count_state': np.where(count_states < 0, len(RUN_VALUE_COUNT_STATES) - 1, count_states),
+            'run_exp': run_exp
+        })
+        codes = codes[codes['pitch_type'] >= 0]
+        if codes.empty:
+            return cube
+
+        # 球種・ゾーン・カウントの組み合わせごとに1回のgroupbyで集計
+        grouped = codes.groupby(RUN_VALUE_DIMENSIONS, sort=False)['run_exp'].agg(['size', 'count', 'sum'])
+        index = tuple(grouped.index.get_level_values(name).to_numpy() for name in RUN_VALUE_DIMENSIONS)
+        cube.pitches[index] = grouped['size'].to_numpy()
+        cube.run_exp_n[index] = grouped['count'].to_numpy()
+        cube.run_exp_sum[index] = grouped['sum'].to_numpy()
+        return cube
+
+    def merge(self, other: "RunValueCube") -> "RunValueCube":
+        pitch_types, arrays = merge_labeled(
+            self.pitch_types, (self.pitches, self.run_exp_n, self.run_exp_sum),
+            other.pitch_types, (other.pitches, other.run_exp_n, other.run_exp_sum)
+        )
+        return RunValueCube(pitch_types, *arrays)
+
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        return {
+            'pitch_types': np.array(self.pitch_types, dtype=str),
+            'zones': np.array(ZONES, dtype=str),
+            'count_states': np.array(RUN_VALUE_COUNT_STATES, dtype=str),
+            'pitches': self.pitches,
+            'run_exp_n': self.run_exp_n,
+            'run_exp_sum': self.run_exp_sum
+        }
+
+    @classmethod
+    def from_arrays(cls, arrays: Dict[str, np.ndarray]) -> "RunValueCube":
+        if arrays['zones'].tolist() != ZONES or arrays['count_states'].tolist() != RUN_VALUE_COUNT_STATES:
+            raise ValueError("ゾーンまたはカウントの軸が現在の設定と異なります")
+        return cls(
+            [str(p) for p in arrays['pitch_types']], arrays['pitches'], arrays['run_exp_n'], arrays['run_exp_sum']
+        )
+
+    def table(self, dimensions: Sequence[str] = ('pitch_type',)) -> pd.DataFrame:
+        """
+        指定した軸ごとの得点価値
+
+        Parameters:
+        -----------
+        dimensions : Sequence[str]
+            集計する軸（RUN_VALUE_DIMENSIONSの値）。残りの軸は合計する
+
+        Returns:
+        --------
+        pd.DataFrame
+            dimensionsをインデックスとするデータフレーム（投球がない組み合わせは含めない）
+            列: pitches, run_value（投手側から見た得点価値）, run_value_per_100（delta_run_expがある100球あたり）
+
+        Raises:
+        -------
+        ValueError
+            未知の軸を指定した場合
+        """
+        dimensions = list(dimensions)
+        unknown = [d for d in dimensions if d not in RUN_VALUE_DIMENSIONS]
+        if unknown:
+            raise ValueError(f"未知の軸が指定されました: {unknown}")
+
+        axes = tuple(i for i, name in enumerate(RUN_VALUE_DIMENSIONS) if name not in dimensions)
+        pitches = self.pitches.sum(axis=axes)
+        run_exp_n = self.run_exp_n.sum(axis=axes)
+        run_value = -self.run_exp_sum.sum(axis=axes)
+
+        labels = {'pitch_type': self.pitch_types, 'zone': ZONES, 'count_state': RUN_VALUE_COUNT_STATES}
+        kept = [name for name in RUN_VALUE_DIMENSIONS if name in dimensions]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            columns = {
+                'pitches': np.ravel(pitches),
+                'run_value': np.ravel(run_value),
+                'run_value_per_100': np.ravel(np.where(run_exp_n > 0, run_value / run_exp_n * 100, np.nan))
+            }
+        if kept:
+            index = pd.MultiIndex.from_product([labels[name] for name in kept], names=kept)
+            if len(kept) == 1:
+                index = index.get_level_values(0)
+        else:
+            index = pd.RangeIndex(1)
+        table = pd.DataFrame(columns, index=index)
+        table = table[table['pitches'] > 0]
+
+        # 軸の並びをdimensionsの順にする
+        if len(kept) > 1 and kept != dimensions:
+            table = table.reorder_levels(dimensions).sort_index()
+        return table
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        球種別と全体の得点価値
+
+        Returns:
+        --------
+        Dict[str, Any]
+            {
+                'pitch_types': ['FF', 'SL', ...],
+                'run_values': {'FF': {'pitches': 50, 'run_value': 1.2, 'run_value_per_100': 2.4}, ...},
+                'total': {'pitches': 95, 'run_value': 0.8, 'run_value_per_100': 0.84}
+            }
+            run_value_per_100はdelta_run_expがない場合None
+        """
+        def row_dict(row: Dict[str, Any]) -> Dict[str, Any]:
+            per_100 = row['run_value_per_100']
+            return {
+                'pitches': int(row['pitches']),
+                'run_value': float(row['run_value']),
+                'run_value_per_100': None if pd.isna(per_100) else float(per_100)
+            }
+
+        by_pitch_type = self.table(['pitch_type'])
+        total = self.table([])
+        return {
+            'pitch_types': list(by_pitch_type.index),
+            'run_values': {
+                pitch_type: row_dict(row) for pitch_type, row in zip(by_pitch_type.index, by_pitch_type.to_dict('records'))
+            },
+            'total': row_dict(total.iloc[0].to_dict()) if not total.empty else row_dict(
+                {'pitches': 0, 'run_value': 0.0, 'run_value_per_100': np.nan}
+            )
+        }
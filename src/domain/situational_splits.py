@@ -0,0 +1,226 @@
+"""
+打者の左右・走者・アウト数などの状況別の集計（スプリット）
+
+Statcastの投球データから状況を表すカテゴリ列を作り、すべての状況の組み合わせごとの
+セル集計（pitch_aggregates.build_cells）を1回のgroupbyで求めて試合ごとの基本表とする
+任意の状況の組み合わせ（例: 打者の左右 × 得点圏）の集計は、基本表をその組み合わせで
+ロールアップして求めるため、シーズン全体でも元の投球データを読み直さない
+"""
+from typing import Any, Dict, List, Sequence
+
+import numpy as np
+import pandas as pd
+
+from src.domain.count_states import COUNT_STATES, count_state_codes
+from src.domain.game_cube import GameCube
+from src.domain.pitch_aggregates import build_cells, merge_cells, metrics_table, rollup
+
+
+STANDS: List[str] = ['L', 'R']
+
+# 走者の状況（'1_3'は一・三塁。'_'はその塁に走者がいない）
+BASE_STATES: List[str] = ['___', '1__', '_2_', '__3', '12_', '1_3', '_23', '123']
+
+# 一塁・二塁・三塁の走者の有無（一塁 × 4 + 二塁 × 2 + 三塁）からBASE_STATESの値への変換表
+_BASE_STATE_BY_BITS = np.array([
+    ''.join(mark if on else '_' for mark, on in zip('123', bits)) for bits in np.ndindex(2, 2, 2)
+], dtype=object)
+
+OUTS: List[str] = ['0', '1', '2']
+
+INNING_HALVES: List[str] = ['Top', 'Bot']
+
+# 基本表のキー（この順でセル集計のインデックスになる）
+SPLIT_DIMENSIONS: List[str] = ['pitch_type', 'stand', 'base_state', 'outs', 'inning_topbot', 'count_state']
+
+# 基本表のキーから導出する状況（元のキー, 変換表）
+RUNNERS: List[str] = ['empty', 'on_base', 'risp']
+DERIVED_DIMENSIONS: Dict[str, tuple] = {
+    'runners': ('base_state', {
+        state: 'empty' if state == '___' else ('on_base' if state == '1__' else 'risp') for state in BASE_STATES
+    }),
+}
+
+
+def _categorical(values: Any, categories: List[str]) -> pd.Categorical:
+    """カテゴリにない値は欠損値にしたカテゴリ型"""
+    return pd.Categorical(values, categories=categories)
+
+
+def _stand(data: pd.DataFrame) -> pd.Categorical:
+    return _categorical(data['stand'], STANDS)
+
+
+def _base_state(data: pd.DataFrame) -> pd.Categorical:
+    first, second, third = (data[f'on_{base}b'].notna().to_numpy(dtype=np.int64) for base in (1, 2, 3))
+    return _categorical(_BASE_STATE_BY_BITS[first * 4 + second * 2 + third], BASE_STATES)
+
+
+def _outs(data: pd.DataFrame) -> pd.Categorical:
+    outs = pd.to_numeric(data['outs_when_up'], errors='coerce')
+    return _categorical(outs.astype('Int64').astype(str), OUTS)
+
+
+def _inning_topbot(data: pd.DataFrame) -> pd.Categorical:
+    return _categorical(data['inning_topbot'], INNING_HALVES)
+
+
+def _count_state(data: pd.DataFrame) -> pd.Categorical:
+    return pd.Categorical.from_codes(count_state_codes(data), categories=COUNT_STATES)
+
+
+def _pitch_type(data: pd.DataFrame) -> pd.Categorical:
+    pitch_types = data['pitch_type'].where(data['pitch_type'] != '')
+    return pd.Categorical(pitch_types)
+
+
+# 基本表のキーの作り方（必要なカラム, 変換関数）
+_DIMENSION_BUILDERS: Dict[str, tuple] = {
+    'pitch_type': (['pitch_type'], _pitch_type),
+    'stand': (['stand'], _stand),
+    'base_state': (['on_1b', 'on_2b', 'on_3b'], _base_state),
+    'outs': (['outs_when_up'], _outs),
+    'inning_topbot': (['inning_topbot'], _inning_topbot),
+    'count_state': (['balls', 'strikes'], _count_state),
+}
+
+
+def split_keys(data: pd.DataFrame) -> pd.DataFrame:
+    """
+    基本表のキー（SPLIT_DIMENSIONS）をカテゴリ型の列として追加
+
+    必要なカラムがないキーはすべて欠損値になる
+
+    Parameters:
+    -----------
+    data : pd.DataFrame
+        投球データ
+
+    Returns:
+    --------
+    pd.DataFrame
+        キーの列を追加（同名の列は置き換え）したデータフレーム（元のデータは変更しない）
+    """
+    keys = {}
+    for dimension in SPLIT_DIMENSIONS:
+        columns, build = _DIMENSION_BUILDERS[dimension]
+        if all(column in data.columns for column in columns):
+            keys[dimension] = build(data)
+        else:
+            keys[dimension] = pd.Categorical([np.nan] * len(data))
+    return data.assign(**keys)
+
+
+def build_split_cells(data: pd.DataFrame) -> pd.DataFrame:
+    """
+    基本表（SPLIT_DIMENSIONSのすべての組み合わせごとのセル集計）を作成
+
+    Parameters:
+    -----------
+    data : pd.DataFrame
+        投球データ
+
+    Returns:
+    --------
+    pd.DataFrame
+        SPLIT_DIMENSIONSをインデックスとするbuild_cellsの結果（投球がある組み合わせのみ）
+    """
+    return build_cells(split_keys(data), SPLIT_DIMENSIONS)
+
+
+def split_table(cells: pd.DataFrame, dimensions: Sequence[str]) -> pd.DataFrame:
+    """
+    基本表を指定した状況の組み合わせで集計
+
+    Parameters:
+    -----------
+    cells : pd.DataFrame
+        build_split_cellsの結果（複数試合を合成したものでもよい）
+    dimensions : Sequence[str]
+        集計する状況（SPLIT_DIMENSIONSまたはDERIVED_DIMENSIONSの名前）
+        いずれかの状況が不明な投球は除外する
+
+    Returns:
+    --------
+    pd.DataFrame
+        dimensionsをインデックスとするmetrics_tableの結果に、usage_pct（球種を含む場合は
+        同じ状況内での球種の割合、含まない場合は全体に対する割合）を加えたデータフレーム
+
+    Raises:
+    -------
+    ValueError
+        未知の状況を指定した場合
+    """
+    dimensions = list(dimensions)
+    unknown = [d for d in dimensions if d not in SPLIT_DIMENSIONS and d not in DERIVED_DIMENSIONS]
+    if unknown:
+        raise ValueError(f"未知の状況が指定されました: {unknown}")
+
+    for dimension in dimensions:
+        if dimension in DERIVED_DIMENSIONS:
+            source, mapping = DERIVED_DIMENSIONS[dimension]
+            derived = cells.index.get_level_values(source).map(mapping)
+            cells = cells.set_index(pd.Index(derived, name=dimension), append=True)
+
+    level = dimensions[0] if len(dimensions) == 1 else (dimensions or None)
+    table = metrics_table(rollup(cells, level))
+
+    pitches = table['pitches']
+    others = [d for d in dimensions if d != 'pitch_type']
+    if 'pitch_type' in dimensions and others:
+        totals = pitches.groupby(level=others, observed=True).transform('sum')
+    else:
+        totals = pitches.sum()
+    table.insert(1, 'usage_pct', pitches / totals * 100)
+    return table
+
+
+class SplitCube(GameCube):
+    """状況別の基本表（build_split_cellsの結果）を試合ごとに保存して合成するための集計"""
+
+    KIND = 'situational_split'
+    VERSION = 1
+
+    def __init__(self, cells: pd.DataFrame):
+        self.cells = cells
+
+    @classmethod
+    def from_pitches(cls, data: pd.DataFrame) -> "SplitCube":
+        if data.empty:
+            return cls(build_split_cells(pd.DataFrame({'pitch_type': pd.Series([], dtype=object)})))
+        return cls(build_split_cells(data))
+
+    def merge(self, other: "SplitCube") -> "SplitCube":
+        return SplitCube(merge_cells(self.cells, other.cells))
+
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        arrays = {
+            'columns': np.array(self.cells.columns, dtype=str),
+            'values': self.cells.to_numpy(dtype=float)
+        }
+        # キーは文字列で保存し、欠損値は空文字列にする
+        for dimension in SPLIT_DIMENSIONS:
+            level = self.cells.index.get_level_values(dimension)
+            arrays[f'key_{dimension}'] = np.array(
+                ['' if pd.isna(value) else str(value) for value in level], dtype=str
+            )
+        return arrays
+
+    @classmethod
+    def from_arrays(cls, arrays: Dict[str, np.ndarray]) -> "SplitCube":
+        levels = []
+        for dimension in SPLIT_DIMENSIONS:
+            values = arrays[f'key_{dimension}'].astype(object)
+            values[values == ''] = np.nan
+            levels.append(values)
+        index = pd.MultiIndex.from_arrays(levels, names=SPLIT_DIMENSIONS)
+        cells = pd.DataFrame(arrays['values'], index=index, columns=[str(c) for c in arrays['columns']])
+
+        # 件数の列は整数に戻す
+        count_columns = [c for c in cells.columns if not c.endswith(('_mean', '_m2', '_min', '_max'))]
+        cells[count_columns] = cells[count_columns].astype(np.int64)
+        return cls(cells)
+
+    def table(self, dimensions: Sequence[str]) -> pd.DataFrame:
+        """指定した状況の組み合わせの集計（split_tableの結果）"""
+        return split_table(self.cells, dimensions)
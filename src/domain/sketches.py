@@ -0,0 +1,314 @@
+"""
+長期間の集計用の、足し合わせられる近似集計（スケッチ）
+
+- TDigest: 分位数（球速・回転数の中央値やパーセンタイル）の近似
+- HyperLogLog: 異なる値の数（対戦打者数）の近似
+
+どちらも保持するデータの大きさが投球数によらず一定で、試合ごとのスケッチを
+足し合わせればシーズンや通算の分位数・異なる値の数を生データなしで求められる
+"""
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from src.domain.game_cube import GameCube, pitch_type_labels
+
+
+# TDigestの圧縮パラメータ（重心の数はおよそこの値の半分以下になる）
+TDIGEST_COMPRESSION = 100
+
+# HyperLogLogのレジスタ数の指数（2^12 = 4096レジスタ、相対誤差はおよそ1.6%）
+HLL_PRECISION = 12
+
+# スケッチで集計する指標
+SKETCH_METRICS: List[str] = ['release_speed', 'release_spin_rate']
+
+
+class TDigest:
+    """
+    重心（平均値と重み）の列で分布を表す分位数のスケッチ（merging t-digest）
+
+    分布の両端ほど重心を細かく保つため、端のパーセンタイルも精度よく求められる
+    """
+
+    def __init__(self, means: Optional[np.ndarray] = None, weights: Optional[np.ndarray] = None,
+                 minimum: float = np.nan, maximum: float = np.nan,
+                 compression: int = TDIGEST_COMPRESSION):
+        """
+        Parameters:
+        -----------
+        means, weights : Optional[np.ndarray]
+            平均値の昇順に並んだ重心の平均値と重み。Noneの場合は空
+        minimum, maximum : float
+            元の値の最小値・最大値（空の場合はNaN）
+        compression : int
+            圧縮パラメータ
+        """
+        self.means = np.asarray(means if means is not None else [], dtype=float)
+        self.weights = np.asarray(weights if weights is not None else [], dtype=float)
+        self.minimum = float(minimum)
+        self.maximum = float(maximum)
+        self.compression = compression
+
+    @classmethod
+    def from_values(cls, values: Any, compression: int = TDIGEST_COMPRESSION) -> "TDigest":
+        """値の配列から作成（欠損値は除く）"""
+        values = np.asarray(values, dtype=float)
+        values = np.sort(values[~np.isnan(values)])
+        if len(values) == 0:
+            return cls(compression=compression)
+        return cls(values, np.ones(len(values)), values[0], values[-1], compression)._compress()
+
+    @property
+    def count(self) -> float:
+        """元の値の数"""
+        return float(self.weights.sum())
+
+    def _compress(self) -> "TDigest":
+        """
+        隣り合う重心をまとめて重心の数を抑える
+
+        累積の重みを分位数のスケール関数 k(q) = δ/(2π)・asin(2q-1) に変換し、
+        各重心の左端の k の整数部分が同じ重心を1つにまとめる（k の幅1につき重心1つ程度）
+        """
+        total = self.weights.sum()
+        if len(self.means) <= 1 or total == 0:
+            return self
+
+        left = (np.cumsum(self.weights) - self.weights) / total
+        scale = self.compression / (2 * np.pi) * np.arcsin(2 * left - 1)
+        buckets = np.floor(scale - scale[0]).astype(np.int64)
+
+        starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+        weights = np.add.reduceat(self.weights, starts)
+        means = np.add.reduceat(self.means * self.weights, starts) / weights
+        return TDigest(means, weights, self.minimum, self.maximum, self.compression)
+
+    def merge(self, other: "TDigest") -> "TDigest":
+        """別のスケッチと合わせたスケッチを返す（元のスケッチは変更しない）"""
+        if other.count == 0:
+            return self
+        if self.count == 0:
+            return other
+
+        means = np.concatenate([self.means, other.means])
+        weights = np.concatenate([self.weights, other.weights])
+        order = np.argsort(means, kind='stable')
+        return TDigest(
+            means[order], weights[order],
+            min(self.minimum, other.minimum), max(self.maximum, other.maximum), self.compression
+        )._compress()
+
+    def quantile(self, q: Any) -> Any:
+        """
+        分位数の近似値
+
+        Parameters:
+        -----------
+        q : float or array-like
+            確率（0〜1）
+
+        Returns:
+        --------
+        float or np.ndarray
+            分位数（qと同じ形）。空の場合はNaN
+        """
+        scalar = np.ndim(q) == 0
+        q = np.atleast_1d(np.asarray(q, dtype=float))
+        if self.count == 0:
+            result = np.full(q.shape, np.nan)
+        else:
+            # 各重心の中央の累積の重みの位置で、重心の平均値を線形補間する（両端は最小値・最大値）
+            centers = np.cumsum(self.weights) - self.weights / 2
+            positions = np.r_[0.0, centers, self.count]
+            values = np.r_[self.minimum, self.means, self.maximum]
+            result = np.interp(np.clip(q, 0, 1) * self.count, positions, values)
+        return float(result[0]) if scalar else result
+
+
+def _hash_values(values: Any) -> np.ndarray:
+    """
+    値を64ビットのハッシュ値に変換（実行ごとに変わらない）
+
+    整数で表せる値はint64にそろえてからハッシュするため、同じIDが欠損値を含むカラムで
+    float64になっていても（660271と660271.0）同じハッシュ値になる
+    """
+    values = np.asarray(values)
+    numbers = pd.to_numeric(pd.Series(values), errors='coerce').to_numpy(dtype=float)
+    if np.isfinite(numbers).all() and (numbers == np.floor(numbers)).all():
+        return pd.util.hash_array(numbers.astype(np.int64))
+    return pd.util.hash_array(values.astype(str).astype(object))
+
+
+class HyperLogLog:
+    """異なる値の数を近似するスケッチ"""
+
+    def __init__(self, registers: Optional[np.ndarray] = None, precision: int = HLL_PRECISION):
+        """
+        Parameters:
+        -----------
+        registers : Optional[np.ndarray]
+            2^precision個のレジスタ（uint8）。Noneの場合は空
+        precision : int
+            レジスタ数の指数
+        """
+        self.precision = precision
+        self.registers = (
+            np.asarray(registers, dtype=np.uint8) if registers is not None
+            else np.zeros(1 << precision, dtype=np.uint8)
+        )
+
+    @classmethod
+    def from_values(cls, values: Any, precision: int = HLL_PRECISION) -> "HyperLogLog":
+        """値の配列から作成（欠損値は除く）"""
+        values = pd.Series(values).dropna()
+        sketch = cls(precision=precision)
+        if values.empty:
+            return sketch
+
+        # 下位precisionビットでレジスタを選び、残りのビットの末尾の0の数 + 1 を記録する
+        hashes = _hash_values(values.to_numpy())
+        index = (hashes & np.uint64((1 << precision) - 1)).astype(np.int64)
+        rest = hashes >> np.uint64(precision)
+        lowest_bit = rest & (~rest + np.uint64(1))
+        max_rank = 64 - precision + 1
+        with np.errstate(divide='ignore'):
+            ranks = np.where(rest == 0, max_rank, np.log2(lowest_bit.astype(float)) + 1).astype(np.uint8)
+        np.maximum.at(sketch.registers, index, ranks)
+        return sketch
+
+    def merge(self, other: "HyperLogLog") -> "HyperLogLog":
+        """別のスケッチと合わせたスケッチを返す（元のスケッチは変更しない）"""
+        if other.precision != self.precision:
+            raise ValueError("精度の異なるHyperLogLogは合わせられません")
+        return HyperLogLog(np.maximum(self.registers, other.registers), self.precision)
+
+    def count(self) -> int:
+        """異なる値の数の近似値"""
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.sum(np.exp2(-self.registers.astype(float)))
+
+        # 値が少ない場合は空のレジスタの数から求める（linear counting）
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * m and zeros > 0:
+            estimate = m * np.log(m / zeros)
+        return int(round(estimate))
+
+
+class SketchCube(GameCube):
+    """
+    球種ごとの球速・回転数のTDigestと、対戦打者のHyperLogLog
+
+    - digests[指標][球種]: TDigest
+    - batters: 対戦打者のHyperLogLog
+    """
+
+    KIND = 'sketch'
+    VERSION = 2
+
+    def __init__(self, pitch_types: List[str], digests: Dict[str, Dict[str, TDigest]], batters: HyperLogLog):
+        self.pitch_types = list(pitch_types)
+        self.digests = digests
+        self.batters = batters
+
+    @classmethod
+    def from_pitches(cls, data: pd.DataFrame) -> "SketchCube":
+        pitch_types = pitch_type_labels(data)
+        digests: Dict[str, Dict[str, TDigest]] = {metric: {} for metric in SKETCH_METRICS}
+        for metric in SKETCH_METRICS:
+            if metric not in data.columns:
+                digests[metric] = {pitch_type: TDigest() for pitch_type in pitch_types}
+                continue
+            values = pd.to_numeric(data[metric], errors='coerce')
+            for pitch_type, group in values.groupby(data['pitch_type']):
+                if str(pitch_type) in pitch_types:
+                    digests[metric][str(pitch_type)] = TDigest.from_values(group.to_numpy())
+
+        batters = HyperLogLog.from_values(data['batter']) if 'batter' in data.columns else HyperLogLog()
+        return cls(pitch_types, digests, batters)
+
+    def merge(self, other: "SketchCube") -> "SketchCube":
+        pitch_types = sorted(set(self.pitch_types) | set(other.pitch_types))
+        digests = {
+            metric: {
+                pitch_type: self.digests[metric].get(pitch_type, TDigest()).merge(
+                    other.digests[metric].get(pitch_type, TDigest())
+                )
+                for pitch_type in pitch_types
+            }
+            for metric in SKETCH_METRICS
+        }
+        return SketchCube(pitch_types, digests, self.batters.merge(other.batters))
+
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        arrays: Dict[str, np.ndarray] = {
+            'pitch_types': np.array(self.pitch_types, dtype=str),
+            'batter_registers': self.batters.registers
+        }
+        # 球種ごとの重心をつなげ、各球種の開始位置をoffsetsに保存する
+        for metric in SKETCH_METRICS:
+            digests = [self.digests[metric][pitch_type] for pitch_type in self.pitch_types]
+            arrays[f'{metric}_means'] = np.concatenate([d.means for d in digests] + [np.array([])])
+            arrays[f'{metric}_weights'] = np.concatenate([d.weights for d in digests] + [np.array([])])
+            arrays[f'{metric}_offsets'] = np.cumsum([0] + [len(d.means) for d in digests]).astype(np.int64)
+            arrays[f'{metric}_range'] = np.array([[d.minimum, d.maximum] for d in digests], dtype=float).reshape(-1, 2)
+        return arrays
+
+    @classmethod
+    def from_arrays(cls, arrays: Dict[str, np.ndarray]) -> "SketchCube":
+        pitch_types = [str(p) for p in arrays['pitch_types']]
+        digests: Dict[str, Dict[str, TDigest]] = {}
+        for metric in SKETCH_METRICS:
+            offsets = arrays[f'{metric}_offsets']
+            means, weights, ranges = arrays[f'{metric}_means'], arrays[f'{metric}_weights'], arrays[f'{metric}_range']
+            digests[metric] = {
+                pitch_type: TDigest(
+                    means[offsets[i]:offsets[i + 1]], weights[offsets[i]:offsets[i + 1]], ranges[i, 0], ranges[i, 1]
+                )
+                for i, pitch_type in enumerate(pitch_types)
+            }
+        return cls(pitch_types, digests, HyperLogLog(arrays['batter_registers']))
+
+    def digest(self, metric: str, pitch_type: Optional[str] = None) -> TDigest:
+        """指標のTDigest（pitch_typeがNoneの場合はすべての球種を合わせたもの）"""
+        if pitch_type is not None:
+            return self.digests[metric].get(pitch_type, TDigest())
+        result = TDigest()
+        for digest in self.digests[metric].values():
+            result = result.merge(digest)
+        return result
+
+    def distinct_batters(self) -> int:
+        """対戦打者数の近似値"""
+        return self.batters.count()
+
+    def summary(self, quantiles: Sequence[float] = (0.1, 0.5, 0.9)) -> Dict[str, Any]:
+        """
+        球種ごと・全体の指標の分位数と対戦打者数
+
+        Returns:
+        --------
+        Dict[str, Any]
+            {
+                'distinct_batters': 120,
+                'pitch_types': {'FF': {'pitches': 800, 'release_speed': {'p10': 94.1, 'p50': ...}, ...}, ...},
+                'all': {'pitches': 1500, 'release_speed': {...}, ...}
+            }
+            pitchesは球速がある投球数。値がない指標の分位数はNone
+        """
+        def describe(pitch_type: Optional[str]) -> Dict[str, Any]:
+            row: Dict[str, Any] = {'pitches': int(self.digest('release_speed', pitch_type).count)}
+            for metric in SKETCH_METRICS:
+                values = np.atleast_1d(self.digest(metric, pitch_type).quantile(list(quantiles)))
+                row[metric] = {
+                    f"p{round(q * 100):g}": None if np.isnan(v) else float(v) for q, v in zip(quantiles, values)
+                }
+            return row
+
+        return {
+            'distinct_batters': self.distinct_batters(),
+            'pitch_types': {pitch_type: describe(pitch_type) for pitch_type in self.pitch_types},
+            'all': describe(None)
+        }
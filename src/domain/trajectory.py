@@ -0,0 +1,174 @@
+"""
+Statcastの初期条件からの投球の軌道の再構成
+
+Statcastは投球ごとに y = 50フィートの位置での速度（vx0, vy0, vz0）と一定の加速度（ax, ay, az）を持つ
+この位置での x, z は含まれないため、プレート到達時の位置（plate_x, plate_z）から逆算する
+（ない場合はリリース位置 release_pos_x, release_pos_z, release_extension から逆算する）
+
+座標はフィート単位で、x は捕手から見て右が正、y は本塁からマウンド方向が正、z は地面からの高さ
+すべての投球・時刻の位置をブロードキャストで一度に計算する
+"""
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+
+# 初期条件の基準位置（本塁からの距離、フィート）
+Y0 = 50.0
+
+# ホームプレートの前端（plate_x, plate_zの位置、本塁からの距離、フィート）
+PLATE_Y = 17.0 / 12.0
+
+# 投手板から本塁までの距離（フィート）
+MOUND_DISTANCE = 60.5
+
+# release_extensionがない投球に使う踏み出しの距離（フィート）
+DEFAULT_EXTENSION = 6.0
+
+KINEMATIC_COLUMNS: List[str] = ['vx0', 'vy0', 'vz0', 'ax', 'ay', 'az']
+
+
+def _column(data: pd.DataFrame, name: str) -> np.ndarray:
+    if name in data.columns:
+        return pd.to_numeric(data[name], errors='coerce').to_numpy(dtype=float)
+    return np.full(len(data), np.nan)
+
+
+class Trajectories:
+    """
+    投球ごとの初期位置・速度・加速度（それぞれ 投球数 × 3 の配列）
+
+    時刻 t（y = Y0を通過した時刻を0とする秒数）の位置は p0 + v0・t + a・t²/2
+    """
+
+    def __init__(self, p0: np.ndarray, v0: np.ndarray, acceleration: np.ndarray):
+        self.p0 = p0
+        self.v0 = v0
+        self.acceleration = acceleration
+
+    @classmethod
+    def from_pitches(cls, data: pd.DataFrame) -> "Trajectories":
+        """
+        投球データから作成
+
+        初期条件か、位置の逆算に必要なカラムがない投球は位置がNaNになる
+
+        Parameters:
+        -----------
+        data : pd.DataFrame
+            投球データ（vx0, vy0, vz0, ax, ay, azと、plate_x, plate_zまたはrelease_pos_x, release_pos_z,
+            release_extensionを使用）
+        """
+        v0 = np.column_stack([_column(data, name) for name in ['vx0', 'vy0', 'vz0']])
+        acceleration = np.column_stack([_column(data, name) for name in ['ax', 'ay', 'az']])
+        trajectories = cls(np.column_stack([np.full(len(data), np.nan), np.full(len(data), Y0),
+                                            np.full(len(data), np.nan)]), v0, acceleration)
+
+        # プレートの位置から逆算し、ない場合はリリース位置から逆算する
+        plate_time = trajectories.time_at_y(PLATE_Y)
+        release_y = MOUND_DISTANCE - _column(data, 'release_extension')
+        release_time = trajectories.time_at_y(release_y)
+        for axis, (plate_column, release_column) in ((0, ('plate_x', 'release_pos_x')), (2, ('plate_z', 'release_pos_z'))):
+            from_plate = _column(data, plate_column) - v0[:, axis] * plate_time \
+                - 0.5 * acceleration[:, axis] * plate_time ** 2
+            from_release = _column(data, release_column) - v0[:, axis] * release_time \
+                - 0.5 * acceleration[:, axis] * release_time ** 2
+            trajectories.p0[:, axis] = np.where(np.isnan(from_plate), from_release, from_plate)
+        return trajectories
+
+    def __len__(self) -> int:
+        return len(self.p0)
+
+    def take(self, indices: np.ndarray) -> "Trajectories":
+        """指定した位置の投球だけの軌道"""
+        return Trajectories(self.p0[indices], self.v0[indices], self.acceleration[indices])
+
+    def time_at_y(self, y) -> np.ndarray:
+        """
+        yの位置を通過する時刻（y = Y0を通過した時刻を0とする秒数）
+
+        Parameters:
+        -----------
+        y : float or np.ndarray
+            本塁からの距離（フィート）。配列の場合は投球ごとの値
+
+        Returns:
+        --------
+        np.ndarray
+            投球ごとの時刻（到達しない場合はNaN）
+        """
+        # 0.5・ay・t² + vy0・t + (y0 - y) = 0 の小さい方の解（桁落ちしない形）
+        distance = self.p0[:, 1] - y
+        vy0 = self.v0[:, 1]
+        ay = self.acceleration[:, 1]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            discriminant = np.sqrt(vy0 ** 2 - 2 * ay * distance)
+            return 2 * distance / (-vy0 + discriminant)
+
+    def positions(self, times: np.ndarray) -> np.ndarray:
+        """
+        時刻ごとの位置
+
+        Parameters:
+        -----------
+        times : np.ndarray
+            時刻（秒）。形が (時刻数,) ならすべての投球で共通、(投球数, 時刻数) なら投球ごとの時刻
+
+        Returns:
+        --------
+        np.ndarray
+            (投球数, 時刻数, 3) の位置（フィート）
+        """
+        times = np.asarray(times, dtype=float)
+        t = np.broadcast_to(times, (len(self), times.shape[-1]))[:, :, None]
+        return self.p0[:, None, :] + self.v0[:, None, :] * t + 0.5 * self.acceleration[:, None, :] * t ** 2
+
+    def positions_at(self, times: np.ndarray) -> np.ndarray:
+        """投球ごとに1つの時刻（投球数,）での位置（投球数 × 3）"""
+        return self.positions(np.asarray(times, dtype=float)[:, None])[:, 0, :]
+
+    def positions_at_y(self, y) -> np.ndarray:
+        """yの位置を通過するときの位置（投球数 × 3）"""
+        return self.positions_at(self.time_at_y(y))
+
+    def plate_time(self) -> np.ndarray:
+        """y = Y0からプレートの前端までの時間（秒）"""
+        return self.time_at_y(PLATE_Y)
+
+
+def trajectory_frame(data: pd.DataFrame, times: Optional[np.ndarray] = None, points: int = 20) -> pd.DataFrame:
+    """
+    描画用の軌道（投球ごとにリリースからプレートまでの位置）
+
+    Parameters:
+    -----------
+    data : pd.DataFrame
+        投球データ
+    times : Optional[np.ndarray]
+        時刻を (時刻数,)（すべての投球で共通）または (投球数, 時刻数) で指定。
+        Noneの場合は投球ごとにリリースからプレートまでを等間隔にpoints点
+    points : int
+        timesを指定しない場合の点の数
+
+    Returns:
+    --------
+    pd.DataFrame
+        列: pitch_index（dataの位置）, t, x, y, z
+    """
+    trajectories = Trajectories.from_pitches(data)
+    if times is None:
+        start = trajectories.time_at_y(MOUND_DISTANCE - _column(data, 'release_extension'))
+        start = np.where(np.isnan(start), trajectories.time_at_y(MOUND_DISTANCE - DEFAULT_EXTENSION), start)
+        end = trajectories.plate_time()
+        times = start[:, None] + (end - start)[:, None] * np.linspace(0.0, 1.0, points)[None, :]
+
+    times = np.broadcast_to(np.asarray(times, dtype=float), (len(data), np.shape(times)[-1]))
+    positions = trajectories.positions(times)
+    return pd.DataFrame({
+        'pitch_index': np.repeat(np.arange(len(data)), times.shape[1]),
+        't': times.ravel(),
+        'x': positions[:, :, 0].ravel(),
+        'y': positions[:, :, 1].ravel(),
+        'z': positions[:, :, 2].ravel()
+    })
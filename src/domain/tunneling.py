@@ -0,0 +1,189 @@
+"""
+連続する投球のトンネル（ピッチトンネル）の集計
+
+同じ打席内で連続する2球について、再構成した軌道から打者が球種を判断する位置（判断点）と
+プレートでの位置の差を求める。判断点では近く、プレートでは離れているほど打者は見分けにくい
+
+2球の組は打席内の並び（PitchSequences）から求め、軌道の計算は一定数の組ごとのブロックで行うため、
+シーズン全体でも一度に確保するメモリは組の数によらず一定になる
+距離はいずれも捕手から見た平面（x, z）での距離（インチ）
+"""
+from typing import Any, Dict, List
+
+import numpy as np
+import pandas as pd
+
+from src.domain.game_cube import GameCube, align_axis, pitch_type_labels, union_labels
+from src.domain.pitch_sequences import SEQUENCE_KEY_COLUMNS, PitchSequences
+from src.domain.trajectory import DEFAULT_EXTENSION, KINEMATIC_COLUMNS, MOUND_DISTANCE, Trajectories
+
+
+# 判断点（プレート到達のこの秒数前の位置）
+DECISION_TIME = 0.175
+
+# 1回に軌道を計算する組の数
+BLOCK_SIZE = 50000
+
+DISTANCE_COLUMNS: List[str] = ['release_distance', 'tunnel_distance', 'plate_distance']
+
+TUNNEL_REQUIRED_COLUMNS: List[str] = ['pitch_type'] + SEQUENCE_KEY_COLUMNS + KINEMATIC_COLUMNS
+
+
+def _key_positions(trajectories: Trajectories, extension: np.ndarray) -> Dict[str, np.ndarray]:
+    """リリース・判断点・プレートでの位置（それぞれ 投球数 × 3）"""
+    plate_time = trajectories.plate_time()
+    release_time = trajectories.time_at_y(MOUND_DISTANCE - extension)
+    times = np.column_stack([release_time, plate_time - DECISION_TIME, plate_time])
+    positions = trajectories.positions(times)
+    return {name: positions[:, i, :] for i, name in enumerate(['release', 'tunnel', 'plate'])}
+
+
+def tunnel_pairs(data: pd.DataFrame, block_size: int = BLOCK_SIZE) -> pd.DataFrame:
+    """
+    同じ打席内で連続する2球ごとのリリース・判断点・プレートでの距離
+
+    Parameters:
+    -----------
+    data : pd.DataFrame
+        投球データ（TUNNEL_REQUIRED_COLUMNSと、plate_x, plate_zまたはリリース位置が必要。
+        複数試合の場合はgame_pkかgame_date）
+    block_size : int
+        1回に軌道を計算する組の数
+
+    Returns:
+    --------
+    pd.DataFrame
+        列: previous_pitch_type, pitch_type, release_distance, tunnel_distance, plate_distance（インチ）
+        インデックスは2球目のdataのインデックス。軌道を再構成できない組は含めない
+    """
+    sequences = PitchSequences(data)
+    last = sequences.ngram_keys(2)['last']
+    second = sequences.order[last]
+    first = sequences.order[last - 1]
+
+    trajectories = Trajectories.from_pitches(data)
+    extension = pd.to_numeric(data['release_extension'], errors='coerce').to_numpy(dtype=float) \
+        if 'release_extension' in data.columns else np.full(len(data), np.nan)
+    extension = np.where(np.isnan(extension), DEFAULT_EXTENSION, extension)
+
+    distances = {name: np.empty(len(first)) for name in DISTANCE_COLUMNS}
+    for start in range(0, len(first), block_size):
+        block = slice(start, start + block_size)
+        first_positions = _key_positions(trajectories.take(first[block]), extension[first[block]])
+        second_positions = _key_positions(trajectories.take(second[block]), extension[second[block]])
+        for name, point in zip(DISTANCE_COLUMNS, ['release', 'tunnel', 'plate']):
+            offset = first_positions[point][:, [0, 2]] - second_positions[point][:, [0, 2]]
+            distances[name][block] = np.hypot(offset[:, 0], offset[:, 1]) * 12
+
+    pitch_types = np.array(sequences.labels + [None], dtype=object)
+    pairs = pd.DataFrame({
+        'previous_pitch_type': pitch_types[sequences.codes[last - 1]],
+        'pitch_type': pitch_types[sequences.codes[last]],
+        **distances
+    }, index=data.index[second])
+    return pairs[np.isfinite(pairs[DISTANCE_COLUMNS]).all(axis=1)]
+
+
+class TunnelCube(GameCube):
+    """
+    前の球種 × 次の球種 の連続する2球の組数と距離の合計
+
+    - pairs[前の球種, 次の球種]: 組数
+    - <DISTANCE_COLUMNS>_sum[前の球種, 次の球種]: 距離の合計（インチ）
+    """
+
+    KIND = 'tunnel'
+    VERSION = 1
+
+    def __init__(self, pitch_types: List[str], pairs: np.ndarray, sums: Dict[str, np.ndarray]):
+        self.pitch_types = list(pitch_types)
+        self.pairs = pairs
+        self.sums = sums
+
+    @classmethod
+    def empty(cls, pitch_types: List[str]) -> "TunnelCube":
+        """組のない集計"""
+        shape = (len(pitch_types), len(pitch_types))
+        return cls(pitch_types, np.zeros(shape, dtype=np.int64), {name: np.zeros(shape) for name in DISTANCE_COLUMNS})
+
+    @classmethod
+    def from_pitches(cls, data: pd.DataFrame) -> "TunnelCube":
+        pitch_types = pitch_type_labels(data)
+        cube = cls.empty(pitch_types)
+        if data.empty or not all(column in data.columns for column in TUNNEL_REQUIRED_COLUMNS):
+            return cube
+
+        pairs = tunnel_pairs(data)
+        previous = pd.Categorical(pairs['previous_pitch_type'], categories=pitch_types).codes
+        following = pd.Categorical(pairs['pitch_type'], categories=pitch_types).codes
+        np.add.at(cube.pairs, (previous, following), 1)
+        for name in DISTANCE_COLUMNS:
+            np.add.at(cube.sums[name], (previous, following), pairs[name].to_numpy())
+        return cube
+
+    def merge(self, other: "TunnelCube") -> "TunnelCube":
+        labels = union_labels(self.pitch_types, other.pitch_types)
+
+        def aligned(array: np.ndarray, pitch_types: List[str]) -> np.ndarray:
+            return align_axis(align_axis(array, pitch_types, labels, axis=0), pitch_types, labels, axis=1)
+
+        return TunnelCube(
+            labels,
+            aligned(self.pairs, self.pitch_types) + aligned(other.pairs, other.pitch_types),
+            {
+                name: aligned(self.sums[name], self.pitch_types) + aligned(other.sums[name], other.pitch_types)
+                for name in DISTANCE_COLUMNS
+            }
+        )
+
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        arrays = {'pitch_types': np.array(self.pitch_types, dtype=str), 'pairs': self.pairs}
+        for name in DISTANCE_COLUMNS:
+            arrays[f'{name}_sum'] = self.sums[name]
+        return arrays
+
+    @classmethod
+    def from_arrays(cls, arrays: Dict[str, np.ndarray]) -> "TunnelCube":
+        return cls(
+            [str(p) for p in arrays['pitch_types']], arrays['pairs'],
+            {name: arrays[f'{name}_sum'] for name in DISTANCE_COLUMNS}
+        )
+
+    def table(self) -> pd.DataFrame:
+        """
+        前の球種 × 次の球種 の平均距離
+
+        Returns:
+        --------
+        pd.DataFrame
+            (previous_pitch_type, pitch_type)のMultiIndexを持つデータフレーム（組がない組み合わせは含めない）
+            列: pairs, release_distance, tunnel_distance, plate_distance（平均、インチ）,
+            plate_to_tunnel_ratio（プレートでの距離 / 判断点での距離。大きいほど見分けにくい）
+        """
+        index = pd.MultiIndex.from_product(
+            [self.pitch_types, self.pitch_types], names=['previous_pitch_type', 'pitch_type']
+        )
+        pairs = self.pairs.ravel()
+        with np.errstate(invalid='ignore', divide='ignore'):
+            columns: Dict[str, Any] = {'pairs': pairs}
+            for name in DISTANCE_COLUMNS:
+                columns[name] = np.where(pairs > 0, self.sums[name].ravel() / pairs, np.nan)
+            columns['plate_to_tunnel_ratio'] = columns['plate_distance'] / columns['tunnel_distance']
+        table = pd.DataFrame(columns, index=index)
+        return table[table['pairs'] > 0]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        球種の組ごとの平均距離
+
+        Returns:
+        --------
+        Dict[str, Any]
+            {
+                'pitch_types': ['CH', 'FF', ...],
+                'pairs': [{'previous_pitch_type': 'FF', 'pitch_type': 'CH', 'pairs': 12,
+                           'tunnel_distance': 3.1, 'plate_distance': 9.8, ...}, ...]  # 判断点で近い順
+            }
+        """
+        table = self.table().reset_index().sort_values(['tunnel_distance', 'pairs'], ascending=[True, False])
+        return {'pitch_types': self.pitch_types, 'pairs': table.to_dict('records')}
@@ -0,0 +1,200 @@
+"""
+ストライクゾーンを基準にした投球位置のグリッド集計
+
+投球位置（plate_x, plate_z）を打者ごとのストライクゾーンで正規化し、固定のグリッドで
+球種 × 打者の左右 × 投球結果 × 横 × 縦 の投球数に集計する
+横はホームプレートの中心を0、両端を±1とし、縦はsz_botを0、sz_topを1とするため、
+打者の身長が異なる投球も同じグリッドで比較できる
+
+投球数の配列は足し合わせられるため、試合ごとの集計からシーズンの集計を求められる
+"""
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.domain.game_cube import OUTCOMES, GameCube, label_codes, merge_labeled, outcome_axis_codes, pitch_type_labels
+
+
+# ホームプレートの幅の半分（フィート）
+PLATE_HALF_WIDTH = 17.0 / 12.0 / 2.0
+
+# sz_top/sz_botがない投球に使うストライクゾーンの上端・下端（フィート）
+DEFAULT_SZ_TOP = 3.5
+DEFAULT_SZ_BOT = 1.5
+
+# グリッドの区切り（ゾーン内は横6マス・縦6マス、グリッド外の投球は端のマスに含める）
+X_EDGES: np.ndarray = np.linspace(-2.0, 2.0, 13)
+Z_EDGES: np.ndarray = np.linspace(-1.0, 2.0, 19)
+
+STANDS: List[str] = ['L', 'R']
+
+
+def normalized_location(data: pd.DataFrame) -> Dict[str, np.ndarray]:
+    """
+    投球位置をストライクゾーン基準の座標に変換
+
+    Parameters:
+    -----------
+    data : pd.DataFrame
+        投球データ（plate_x, plate_zが必要。sz_top, sz_botがあれば使用）
+
+    Returns:
+    --------
+    Dict[str, np.ndarray]
+        'x'（プレート中心0、両端±1）, 'z'（ゾーン下端0、上端1）
+    """
+    plate_x = pd.to_numeric(data['plate_x'], errors='coerce').to_numpy(dtype=float)
+    plate_z = pd.to_numeric(data['plate_z'], errors='coerce').to_numpy(dtype=float)
+
+    def zone_edge(column: str, default: float) -> np.ndarray:
+        if column not in data.columns:
+            return np.full(len(data), default)
+        values = pd.to_numeric(data[column], errors='coerce').to_numpy(dtype=float)
+        return np.where(np.isnan(values), default, values)
+
+    sz_top = zone_edge('sz_top', DEFAULT_SZ_TOP)
+    sz_bot = zone_edge('sz_bot', DEFAULT_SZ_BOT)
+    height = np.where(sz_top > sz_bot, sz_top - sz_bot, DEFAULT_SZ_TOP - DEFAULT_SZ_BOT)
+
+    return {'x': plate_x / PLATE_HALF_WIDTH, 'z': (plate_z - sz_bot) / height}
+
+
+class ZoneGridCube(GameCube):
+    """
+    球種 × 打者の左右 × 投球結果 × 横 × 縦 の投球数
+
+    counts[球種, 左右, 結果, 横, 縦] の形で保持する
+    """
+
+    KIND = 'zone_grid'
+    VERSION = 1
+
+    def __init__(self, pitch_types: List[str], counts: np.ndarray):
+        """
+        Parameters:
+        -----------
+        pitch_types : List[str]
+            球種の軸のラベル
+        counts : np.ndarray
+            形が(len(pitch_types), len(STANDS), len(OUTCOMES), len(X_EDGES) - 1, len(Z_EDGES) - 1)の投球数
+        """
+        self.pitch_types = list(pitch_types)
+        self.counts = counts
+
+    @classmethod
+    def empty(cls, pitch_types: Optional[List[str]] = None) -> "ZoneGridCube":
+        """投球のない集計"""
+        pitch_types = pitch_types or []
+        shape = (len(pitch_types), len(STANDS), len(OUTCOMES), len(X_EDGES) - 1, len(Z_EDGES) - 1)
+        return cls(pitch_types, np.zeros(shape, dtype=np.int64))
+
+    @classmethod
+    def from_pitches(cls, data: pd.DataFrame) -> "ZoneGridCube":
+        """
+        投球データから集計を作成
+
+        球種・打者の左右・投球位置のいずれかが欠損している投球は含めない
+
+        Parameters:
+        -----------
+        data : pd.DataFrame
+            投球データ（pitch_type, stand, plate_x, plate_z, descriptionを使用）
+        """
+        pitch_types = pitch_type_labels(data)
+        required = ['pitch_type', 'stand', 'plate_x', 'plate_z']
+        if data.empty or not pitch_types or any(column not in data.columns for column in required):
+            return cls.empty(pitch_types)
+
+        location = normalized_location(data)
+        pitch_type_codes = label_codes(data['pitch_type'], pitch_types)
+        stand_codes = label_codes(data['stand'], STANDS)
+        outcome_codes = outcome_axis_codes(data)
+
+        valid = (pitch_type_codes >= 0) & (stand_codes >= 0) & ~np.isnan(location['x']) & ~np.isnan(location['z'])
+
+        # グリッド外の投球は端のマスに含める
+        x = np.clip(location['x'][valid], X_EDGES[0], X_EDGES[-1])
+        z = np.clip(location['z'][valid], Z_EDGES[0], Z_EDGES[-1])
+
+        # 球種・左右・結果は整数の境界で区切り、位置と合わせて1回のヒストグラムで数える
+        def category_edges(size: int) -> np.ndarray:
+            return np.arange(size + 1) - 0.5
+
+        sample = np.column_stack([
+            pitch_type_codes[valid], stand_codes[valid], outcome_codes[valid], x, z
+        ])
+        counts, _ = np.histogramdd(sample, bins=[
+            category_edges(len(pitch_types)), category_edges(len(STANDS)), category_edges(len(OUTCOMES)),
+            X_EDGES, Z_EDGES
+        ])
+
+        return cls(pitch_types, counts.astype(np.int64))
+
+    def merge(self, other: "ZoneGridCube") -> "ZoneGridCube":
+        pitch_types, (counts,) = merge_labeled(self.pitch_types, (self.counts,), other.pitch_types, (other.counts,))
+        return ZoneGridCube(pitch_types, counts)
+
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        return {
+            'pitch_types': np.array(self.pitch_types, dtype=str),
+            'counts': self.counts,
+            'x_edges': X_EDGES,
+            'z_edges': Z_EDGES
+        }
+
+    @classmethod
+    def from_arrays(cls, arrays: Dict[str, np.ndarray]) -> "ZoneGridCube":
+        if not (np.array_equal(arrays['x_edges'], X_EDGES) and np.array_equal(arrays['z_edges'], Z_EDGES)):
+            raise ValueError("グリッドの区切りが現在の設定と異なります")
+        return cls([str(p) for p in arrays['pitch_types']], arrays['counts'])
+
+    def grid(self, pitch_type: Optional[str] = None, stand: Optional[str] = None,
+             outcomes: Optional[List[str]] = None) -> np.ndarray:
+        """
+        指定した条件の投球数のグリッド
+
+        Parameters:
+        -----------
+        pitch_type : Optional[str]
+            球種。Noneの場合はすべての球種
+        stand : Optional[str]
+            打者の左右（'L' または 'R'）。Noneの場合は両方
+        outcomes : Optional[List[str]]
+            投球結果（OUTCOMESの値）。Noneの場合はすべて
+
+        Returns:
+        --------
+        np.ndarray
+            形が(len(X_EDGES) - 1, len(Z_EDGES) - 1)の投球数
+        """
+        counts = self.counts
+        if pitch_type is not None:
+            if pitch_type not in self.pitch_types:
+                return np.zeros(counts.shape[3:], dtype=np.int64)
+            counts = counts[[self.pitch_types.index(pitch_type)]]
+        if stand is not None:
+            counts = counts[:, [STANDS.index(stand)]]
+        if outcomes is not None:
+            counts = counts[:, :, [OUTCOMES.index(outcome) for outcome in outcomes]]
+        return counts.sum(axis=(0, 1, 2))
+
+    def usage(self, pitch_type: str, stand: Optional[str] = None) -> np.ndarray:
+        """マスごとの球種の割合（%、投球がないマスはNaN）"""
+        return _ratio(self.grid(pitch_type, stand), self.grid(None, stand))
+
+    def whiff_rate(self, pitch_type: Optional[str] = None, stand: Optional[str] = None) -> np.ndarray:
+        """マスごとの空振り率（空振り / スイング、%、スイングがないマスはNaN）"""
+        swings = self.grid(pitch_type, stand, ['swinging_strike', 'foul', 'in_play'])
+        return _ratio(self.grid(pitch_type, stand, ['swinging_strike']), swings)
+
+    def called_strike_rate(self, pitch_type: Optional[str] = None, stand: Optional[str] = None) -> np.ndarray:
+        """マスごとの見逃しストライク率（見逃しストライク / 見逃し、%、見逃しがないマスはNaN）"""
+        taken = self.grid(pitch_type, stand, ['called_strike', 'ball'])
+        return _ratio(self.grid(pitch_type, stand, ['called_strike']), taken)
+
+
+def _ratio(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+    """割合（%）。分母が0の位置はNaN"""
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(denominator > 0, numerator / denominator * 100, np.nan)
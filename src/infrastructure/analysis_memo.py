@@ -0,0 +1,286 @@
+"""
+分析結果のメモ化（内容のフィンガープリントをキーとした永続キャッシュ）
+
+同じ投球データがキャッシュの読み込み・APIからの取得・画面の再実行など別々の経路から
+分析に渡されても再計算しないよう、データの内容から求めたフィンガープリントと
+分析クラスのバージョンをキーに分析結果を保存する
+
+結果はzlibで圧縮したpickleとしてSQLiteに保存し、件数・合計サイズの上限を超えた分は
+最後に参照されてから最も時間が経ったものから削除する。直近の結果は圧縮したままメモリにも保持し、
+取得のたびに復元するため、呼び出し側が結果を変更しても保存済みの結果には影響しない
+"""
+import os
+import time
+import zlib
+import pickle
+import hashlib
+import sqlite3
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+
+def schema_fingerprint(data: pd.DataFrame) -> str:
+    """
+    カラム名と型のフィンガープリント
+
+    Parameters:
+    -----------
+    data : pd.DataFrame
+        対象のデータ
+
+    Returns:
+    --------
+    str
+        16進数表記のハッシュ値
+    """
+    schema = '\n'.join(f"{column}:{dtype}" for column, dtype in data.dtypes.items())
+    return hashlib.blake2b(schema.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def frame_fingerprint(data: pd.DataFrame) -> str:
+    """
+    データの内容（カラム名・型・全ての値）のフィンガープリント
+
+    数値列はメモリ上の値をそのままハッシュし、文字列などの列は整数コードとユニーク値に分解して
+    ハッシュするため、行ごとに文字列をハッシュするより高速に求められる
+    行の順序が異なるデータは別のデータとして扱う（インデックスは含めない）
+
+    Parameters:
+    -----------
+    data : pd.DataFrame
+        対象のデータ
+
+    Returns:
+    --------
+    str
+        16進数表記のハッシュ値
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(schema_fingerprint(data).encode('ascii'))
+    digest.update(str(len(data)).encode('ascii'))
+
+    for column in data.columns:
+        series = data[column]
+        if isinstance(series.dtype, np.dtype) and series.dtype.kind in 'biufcmM':
+            digest.update(np.ascontiguousarray(series.to_numpy()).tobytes())
+        else:
+            codes, uniques = pd.factorize(series)
+            digest.update(codes.tobytes())
+            digest.update(pd.util.hash_pandas_object(pd.Series(uniques, dtype=object), index=False).to_numpy().tobytes())
+
+    return digest.hexdigest()
+
+
+class AnalysisMemo:
+    """
+    分析結果をデータの内容ごとに保存するキャッシュ
+
+    複数スレッドから利用できる（SQLiteへの接続はロックで保護する）
+    """
+
+    def __init__(self, db_path: str, max_entries: Optional[int] = 5000,
+                 max_bytes: Optional[int] = None, memory_entries: int = 64):
+        """
+        Parameters:
+        -----------
+        db_path : str
+            保存先のSQLiteデータベースのパス
+        max_entries : Optional[int]
+            保存する結果の最大件数。Noneの場合は制限しない
+        max_bytes : Optional[int]
+            保存する結果の最大合計サイズ（圧縮後のバイト数）。Noneの場合は制限しない
+        memory_entries : int
+            メモリに保持する直近の結果（圧縮済み）の件数
+        """
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.memory_entries = memory_entries
+        self.logger = logging.getLogger(__name__)
+
+        db_dir = os.path.dirname(db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('''
+        CREATE TABLE IF NOT EXISTS analysis_memo (
+            key TEXT PRIMARY KEY,
+            payload BLOB NOT NULL,
+            size INTEGER NOT NULL,
+            created_at REAL NOT NULL,
+            last_access REAL NOT NULL
+        )
+        ''')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_analysis_memo_last_access ON analysis_memo(last_access)')
+        self._conn.commit()
+
+        self._memory: "OrderedDict[str, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(data: pd.DataFrame, operation: str, version: Any) -> str:
+        """
+        データ・処理名・分析クラスのバージョンからキーを作成
+
+        Parameters:
+        -----------
+        data : pd.DataFrame
+            分析するデータ
+        operation : str
+            処理の名前（'analyze_all'など）
+        version : Any
+            分析クラスのバージョン。計算方法や結果の形式を変えた場合は古い結果を使わない
+        """
+        return f"{operation}:{version}:{frame_fingerprint(data)}"
+
+    def _remember(self, key: str, payload: bytes) -> None:
+        self._memory[key] = payload
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        保存済みの結果を取得
+
+        Returns:
+        --------
+        Optional[Any]
+            保存済みの結果。ない場合（読み込めない場合を含む）はNone
+        """
+        with self._lock:
+            payload = self._memory.get(key)
+            if payload is None:
+                row = self._conn.execute('SELECT payload FROM analysis_memo WHERE key = ?', (key,)).fetchone()
+                if row is None:
+                    self.misses += 1
+                    return None
+                payload = row[0]
+
+            try:
+                value = pickle.loads(zlib.decompress(payload))
+            except Exception as e:
+                self.logger.warning(f"保存済みの分析結果を読み込めませんでした: {key} ({e})")
+                self._conn.execute('DELETE FROM analysis_memo WHERE key = ?', (key,))
+                self._conn.commit()
+                self._memory.pop(key, None)
+                self.misses += 1
+                return None
+
+            self._conn.execute('UPDATE analysis_memo SET last_access = ? WHERE key = ?', (time.time(), key))
+            self._conn.commit()
+            self._remember(key, payload)
+            self.hits += 1
+            return value
+
+    def put(self, key: str, value: Any) -> None:
+        """
+        結果を保存し、上限を超えた分を削除
+
+        Parameters:
+        -----------
+        key : str
+            make_keyで作成したキー
+        value : Any
+            pickle可能な結果
+        """
+        payload = zlib.compress(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+        now = time.time()
+
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO analysis_memo (key, payload, size, created_at, last_access) VALUES (?, ?, ?, ?, ?)',
+                (key, payload, len(payload), now, now)
+            )
+            self._remember(key, payload)
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self) -> None:
+        """上限を超えた結果を最後に参照されてから最も時間が経ったものから削除"""
+        evicted = 0
+        if self.max_entries is not None:
+            evicted += self._conn.execute('''
+            DELETE FROM analysis_memo WHERE key IN (
+                SELECT key FROM analysis_memo ORDER BY last_access DESC LIMIT -1 OFFSET ?
+            )
+            ''', (self.max_entries,)).rowcount
+
+        if self.max_bytes is not None:
+            # 新しい順にサイズを累計し、上限を超えた位置から後ろを削除する
+            evicted += self._conn.execute('''
+            DELETE FROM analysis_memo WHERE key IN (
+                SELECT key FROM (
+                    SELECT key, SUM(size) OVER (ORDER BY last_access DESC, key) AS total FROM analysis_memo
+                ) WHERE total > ?
+            )
+            ''', (self.max_bytes,)).rowcount
+
+        # 削除した結果はメモリからも取り除く
+        if evicted and self._memory:
+            keys = list(self._memory)
+            placeholders = ','.join('?' * len(keys))
+            remaining = {row[0] for row in self._conn.execute(
+                f'SELECT key FROM analysis_memo WHERE key IN ({placeholders})', keys
+            )}
+            for key in keys:
+                if key not in remaining:
+                    del self._memory[key]
+            self.logger.debug(f"分析結果を{evicted}件削除しました")
+
+    def get_or_compute(self, data: pd.DataFrame, operation: str, version: Any,
+                       compute: Callable[[pd.DataFrame], Any]) -> Any:
+        """
+        保存済みの結果があれば返し、なければ計算して保存
+
+        Parameters:
+        -----------
+        data : pd.DataFrame
+            分析するデータ
+        operation : str
+            処理の名前
+        version : Any
+            分析クラスのバージョン
+        compute : Callable[[pd.DataFrame], Any]
+            結果を計算する関数
+
+        Returns:
+        --------
+        Any
+            分析結果
+        """
+        key = self.make_key(data, operation, version)
+        value = self.get(key)
+        if value is None:
+            value = compute(data)
+            self.put(key, value)
+        return value
+
+    def get_stats(self) -> Dict[str, Any]:
+        """保存件数・合計サイズとヒット数・ミス数"""
+        with self._lock:
+            entries, total_bytes = self._conn.execute(
+                'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM analysis_memo'
+            ).fetchone()
+        return {'entries': entries, 'total_bytes': total_bytes, 'hits': self.hits, 'misses': self.misses}
+
+    def clear(self) -> None:
+        """保存済みの結果をすべて削除"""
+        with self._lock:
+            self._conn.execute('DELETE FROM analysis_memo')
+            self._conn.commit()
+            self._memory.clear()
+
+    def close(self) -> None:
+        """データベース接続を閉じる"""
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,221 @@
+"""
+試合ごとの集計結果（キューブ）やリーグ全体の分布をnpzファイルとして保存するストア
+
+試合ごとの集計は種類・バージョン・投手ID・試合日ごとに
+<root_dir>/<種類>/v<バージョン>/<投手ID>/<試合日>.npz に保存する
+リーグ全体の分布などシーズン単位の集計は <root_dir>/<種類>/v<バージョン>/<シーズン>.npz に保存する
+集計方法を変えてバージョンを上げた場合、古いバージョンのファイルは読み込まれない
+
+配列はpickleを使わずに保存・読み込みし、書き込みはアトミックに行う
+"""
+import io
+import os
+import re
+import logging
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src.infrastructure.atomic_io import atomic_write_bytes
+
+
+# 保存時に付与するメタデータの配列名（集計の配列と衝突しないよう接頭辞を付ける）
+_META_PREFIX = '__meta_'
+
+
+def _safe_name(value: str) -> str:
+    """ファイル名に使えない文字を置き換える"""
+    return re.sub(r'[^0-9A-Za-z_.-]', '_', str(value))
+
+
+def write_npz(path: str, arrays: Dict[str, np.ndarray]) -> None:
+    """配列を圧縮したnpzファイルとしてアトミックに保存"""
+    buffer = io.BytesIO()
+    np.savez_compressed(buffer, **arrays)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    atomic_write_bytes(path, buffer.getvalue())
+
+
+def read_npz(path: str) -> Dict[str, np.ndarray]:
+    """npzファイルの配列をすべて読み込む（pickleは使わない）"""
+    with np.load(path, allow_pickle=False) as npz:
+        return {name: npz[name] for name in npz.files}
+
+
+class GameArtifactStore:
+    """試合ごとの集計結果とシーズンごとのリーグ全体の分布をファイルに保存・読み込みするストア"""
+
+    def __init__(self, root_dir: str):
+        """
+        Parameters:
+        -----------
+        root_dir : str
+            保存先のディレクトリ
+        """
+        self.root_dir = root_dir
+        self.logger = logging.getLogger(__name__)
+        os.makedirs(root_dir, exist_ok=True)
+
+    def _path(self, kind: str, version: int, pitcher_id: str, game_date: str) -> str:
+        return os.path.join(
+            self.root_dir, _safe_name(kind), f"v{int(version)}", _safe_name(pitcher_id), f"{_safe_name(game_date)}.npz"
+        )
+
+    def save(self, kind: str, version: int, pitcher_id: str, game_date: str,
+             arrays: Dict[str, np.ndarray], metadata: Optional[Dict[str, str]] = None) -> None:
+        """
+        集計結果を保存
+
+        Parameters:
+        -----------
+        kind : str
+            集計の種類
+        version : int
+            集計方法のバージョン
+        pitcher_id : str
+            投手ID
+        game_date : str
+            試合日（YYYY-MM-DD形式）
+        arrays : Dict[str, np.ndarray]
+            保存する配列（object型の配列は保存できない）
+        metadata : Optional[Dict[str, str]]
+            一緒に保存する文字列（集計元のデータのキャッシュ日時など）
+        """
+        payload = dict(arrays)
+        for name, value in (metadata or {}).items():
+            payload[f"{_META_PREFIX}{name}"] = np.array(str(value))
+
+        write_npz(self._path(kind, version, pitcher_id, game_date), payload)
+
+    def load_with_metadata(self, kind: str, version: int, pitcher_id: str,
+                           game_date: str) -> Optional[Tuple[Dict[str, np.ndarray], Dict[str, str]]]:
+        """
+        保存済みの集計結果と保存時のメタデータを1回の読み込みで取得
+
+        Returns:
+        --------
+        Optional[Tuple[Dict[str, np.ndarray], Dict[str, str]]]
+            保存した配列とメタデータ。ない場合（読み込めない場合を含む）はNone
+        """
+        path = self._path(kind, version, pitcher_id, game_date)
+        if not os.path.exists(path):
+            return None
+
+        try:
+            arrays = read_npz(path)
+        except Exception as e:
+            self.logger.warning(f"保存済みの集計結果を読み込めませんでした: {path} ({e})")
+            return None
+
+        metadata = {name[len(_META_PREFIX):]: str(value) for name, value in arrays.items() if name.startswith(_META_PREFIX)}
+        return {name: value for name, value in arrays.items() if not name.startswith(_META_PREFIX)}, metadata
+
+    def load(self, kind: str, version: int, pitcher_id: str, game_date: str) -> Optional[Dict[str, np.ndarray]]:
+        """
+        保存済みの集計結果を読み込む
+
+        Returns:
+        --------
+        Optional[Dict[str, np.ndarray]]
+            保存した配列。ない場合（読み込めない場合を含む）はNone
+        """
+        loaded = self.load_with_metadata(kind, version, pitcher_id, game_date)
+        return loaded[0] if loaded is not None else None
+
+    def load_metadata(self, kind: str, version: int, pitcher_id: str, game_date: str) -> Optional[Dict[str, str]]:
+        """
+        保存時のメタデータを読み込む
+
+        Returns:
+        --------
+        Optional[Dict[str, str]]
+            保存時に指定したメタデータ。集計結果がない場合はNone
+        """
+        loaded = self.load_with_metadata(kind, version, pitcher_id, game_date)
+        return loaded[1] if loaded is not None else None
+
+    def delete(self, kind: str, version: int, pitcher_id: str, game_date: str) -> bool:
+        """
+        保存済みの集計結果を削除
+
+        Returns:
+        --------
+        bool
+            削除した場合はTrue
+        """
+        path = self._path(kind, version, pitcher_id, game_date)
+        try:
+            os.remove(path)
+            return True
+        except FileNotFoundError:
+            return False
+
+    def list_game_dates(self, kind: str, version: int, pitcher_id: str) -> List[str]:
+        """
+        集計結果を保存済みの試合日
+
+        Returns:
+        --------
+        List[str]
+            試合日のリスト（昇順）
+        """
+        pitcher_dir = os.path.dirname(self._path(kind, version, pitcher_id, 'x'))
+        if not os.path.isdir(pitcher_dir):
+            return []
+        return sorted(name[:-len('.npz')] for name in os.listdir(pitcher_dir) if name.endswith('.npz'))
+
+    def _season_path(self, kind: str, version: int, season: int) -> str:
+        return os.path.join(self.root_dir, _safe_name(kind), f"v{int(version)}", f"{int(season)}.npz")
+
+    def save_season(self, kind: str, version: int, season: int, arrays: Dict[str, np.ndarray]) -> None:
+        """
+        シーズン単位の集計結果（リーグ全体の分布など）を保存
+
+        Parameters:
+        -----------
+        kind : str
+            集計の種類
+        version : int
+            集計方法のバージョン
+        season : int
+            シーズン年
+        arrays : Dict[str, np.ndarray]
+            保存する配列
+        """
+        write_npz(self._season_path(kind, version, season), arrays)
+
+    def load_season(self, kind: str, version: int, season: int) -> Optional[Dict[str, np.ndarray]]:
+        """
+        シーズン単位の集計結果を読み込む
+
+        Returns:
+        --------
+        Optional[Dict[str, np.ndarray]]
+            保存した配列。ない場合（読み込めない場合を含む）はNone
+        """
+        path = self._season_path(kind, version, season)
+        if not os.path.exists(path):
+            return None
+
+        try:
+            return read_npz(path)
+        except Exception as e:
+            self.logger.warning(f"保存済みの集計結果を読み込めませんでした: {path} ({e})")
+            return None
+
+    def list_seasons(self, kind: str, version: int) -> List[int]:
+        """
+        シーズン単位の集計結果を保存済みのシーズン
+
+        Returns:
+        --------
+        List[int]
+            シーズン年のリスト（昇順）
+        """
+        kind_dir = os.path.dirname(self._season_path(kind, version, 0))
+        if not os.path.isdir(kind_dir):
+            return []
+        return sorted(
+            int(name[:-len('.npz')]) for name in os.listdir(kind_dir)
+            if name.endswith('.npz') and name[:-len('.npz')].isdigit()
+        )
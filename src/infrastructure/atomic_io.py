@@ -0,0 +1,138 @@
+"""
+キャッシュファイルをクラッシュセーフに読み書きするためのユーティリティ
+"""
+import os
+import hashlib
+import tempfile
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator
+
+try:
+    import fcntl
+except ImportError:  # Windowsなどfcntlが使えない環境ではプロセス内ロックのみ
+    fcntl = None
+
+
+# プロセス内の書き込みロック（パスごと）
+_thread_locks: Dict[str, threading.Lock] = {}
+_thread_locks_guard = threading.Lock()
+
+
+def sha256_bytes(data: bytes) -> str:
+    """
+    バイト列のSHA-256チェックサムを計算
+
+    Parameters:
+    -----------
+    data : bytes
+        対象のバイト列
+
+    Returns:
+    --------
+    str
+        16進数表記のチェックサム
+    """
+    return hashlib.sha256(data).hexdigest()
+
+
+def _fsync_dir(dir_path: str) -> None:
+    """リネーム結果を永続化するためにディレクトリをfsync"""
+    if not hasattr(os, 'O_DIRECTORY'):
+        return
+    try:
+        fd = os.open(dir_path, os.O_RDONLY | os.O_DIRECTORY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def atomic_write_bytes(path: str, data: bytes, fsync: bool = True) -> None:
+    """
+    一時ファイルに書き込んでからリネームすることでアトミックに保存
+
+    読み手は置き換え前後どちらかの完全なファイルだけを参照し、
+    書きかけの内容を見ることはない
+
+    Parameters:
+    -----------
+    path : str
+        保存先のパス
+    data : bytes
+        書き込む内容
+    fsync : bool
+        リネーム前にファイルとディレクトリをfsyncするかどうか
+    """
+    dir_path = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(
+        prefix=f".{os.path.basename(path)}.", suffix='.tmp', dir=dir_path
+    )
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            if fsync:
+                os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+    if fsync:
+        _fsync_dir(dir_path)
+
+
+def read_bytes(path: str) -> bytes:
+    """
+    ファイル全体をバイト列として読み込む
+
+    Parameters:
+    -----------
+    path : str
+        読み込むファイルのパス
+
+    Returns:
+    --------
+    bytes
+        ファイルの内容
+    """
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+@contextmanager
+def write_lock(path: str) -> Iterator[None]:
+    """
+    同じパスへの書き込みを直列化するロック
+
+    読み手はロックを取得しないため、書き込み中もブロックされない
+
+    Parameters:
+    -----------
+    path : str
+        保護対象のパス（ロックファイルは「<path>.lock」）
+    """
+    lock_path = f"{path}.lock"
+
+    with _thread_locks_guard:
+        thread_lock = _thread_locks.setdefault(lock_path, threading.Lock())
+
+    with thread_lock:
+        if fcntl is None:
+            yield
+            return
+
+        with open(lock_path, 'a') as lock_file:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
@@ -6,6 +6,7 @@ import pandas as pd
 import io
 import time
 import logging
+import threading
 from datetime import datetime
 from typing import List, Dict, Optional, Any, Union
 
@@ -35,22 +36,25 @@ class BaseballSavantClient:
         })
         self.rate_limit_interval = rate_limit_interval
         self.last_request_time = 0.0
+        # バックグラウンド更新とUIからの呼び出しでレート制限を共有する
+        self._rate_limit_lock = threading.Lock()
         self.logger = logging.getLogger(__name__)
         
         # MLB StatsAPIクライアントを内部で保持
         self.mlb_stats_client = MLBStatsClient()
     
     def _wait_for_rate_limit(self) -> None:
-        """APIレート制限を遵守するための待機処理"""
-        current_time = time.time()
-        elapsed = current_time - self.last_request_time
-        
-        if elapsed < self.rate_limit_interval:
-            wait_time = self.rate_limit_interval - elapsed
-            self.logger.debug(f"レート制限のため {wait_time:.2f} 秒待機します")
-            time.sleep(wait_time)
-        
-        self.last_request_time = time.time()
+        """APIレート制限を遵守するための待機処理（スレッドセーフ）"""
+        with self._rate_limit_lock:
+            current_time = time.time()
+            elapsed = current_time - self.last_request_time
+            
+            if elapsed < self.rate_limit_interval:
+                wait_time = self.rate_limit_interval - elapsed
+                self.logger.debug(f"レート制限のため {wait_time:.2f} 秒待機します")
+                time.sleep(wait_time)
+            
+            self.last_request_time = time.time()
 
     def get_pitcher_games(self, pitcher_id: str, season: int) -> List[Game]:
         """
@@ -0,0 +1,198 @@
+"""
+キャッシュをまとめて持ち運ぶためのバンドル（圧縮アーカイブ）のエクスポートとインポート
+
+新しいノードのキャッシュをAPIを経由せずに温めるために使用する
+バンドルにはpickle形式のデータが含まれるため、信頼できる出所のものだけをインポートすること
+"""
+import io
+import json
+import pickle
+import tarfile
+import logging
+from datetime import datetime
+from dataclasses import asdict
+from typing import Any, Dict, List, Optional
+
+from src.domain.entities import Game, Pitcher
+from src.infrastructure.atomic_io import sha256_bytes
+from src.infrastructure.data_repository import DataRepository
+
+
+BUNDLE_FORMAT_VERSION = 1
+MANIFEST_NAME = 'manifest.json'
+
+logger = logging.getLogger(__name__)
+
+
+def _add_member(archive: tarfile.TarFile, name: str, payload: bytes) -> None:
+    """バイト列をアーカイブのメンバーとして追加"""
+    info = tarfile.TarInfo(name=name)
+    info.size = len(payload)
+    info.mtime = int(datetime.now().timestamp())
+    archive.addfile(info, io.BytesIO(payload))
+
+
+def export_cache_bundle(
+    repository: DataRepository,
+    bundle_path: str,
+    pitcher_ids: Optional[List[str]] = None,
+    seasons: Optional[List[int]] = None
+) -> Dict[str, Any]:
+    """
+    キャッシュされた投球データと投手・試合情報をバンドルに書き出す
+
+    Parameters:
+    -----------
+    repository : DataRepository
+        書き出し元のリポジトリ
+    bundle_path : str
+        書き出すバンドルのパス（tar.gz形式）
+    pitcher_ids : Optional[List[str]]
+        対象の投手ID。Noneの場合は全投手
+    seasons : Optional[List[int]]
+        対象のシーズン年。Noneの場合は全シーズン
+
+    Returns:
+    --------
+    Dict[str, Any]
+        バンドルのマニフェスト
+    """
+    entries = repository.list_cached_pitch_data(pitcher_ids=pitcher_ids, seasons=seasons)
+
+    manifest: Dict[str, Any] = {
+        'format_version': BUNDLE_FORMAT_VERSION,
+        'created_at': datetime.now().isoformat(),
+        'filters': {'pitcher_ids': pitcher_ids, 'seasons': seasons},
+        'pitch_data': [],
+        'pitchers': [],
+        'games': []
+    }
+
+    with tarfile.open(bundle_path, 'w:gz') as archive:
+        for entry in entries:
+            pitcher_id, game_date = entry['pitcher_id'], entry['game_date']
+            read_result = repository.read_pitch_data_payload(pitcher_id, game_date)
+            if read_result is None:
+                logger.warning(f"投球データを読み込めなかったためスキップします: {pitcher_id} {game_date}")
+                continue
+
+            cached_at, payload = read_result
+            member_name = f"pitch_data/{pitcher_id}_{game_date}.pkl"
+            _add_member(archive, member_name, payload)
+
+            manifest['pitch_data'].append({
+                'pitcher_id': pitcher_id,
+                'game_date': game_date,
+                'cached_at': cached_at,
+                'file': member_name,
+                'size_bytes': len(payload),
+                'sha256': sha256_bytes(payload)
+            })
+
+        # 投手・試合情報
+        exported_pitchers = sorted(set(pitcher_ids or []) | {e['pitcher_id'] for e in manifest['pitch_data']})
+        for pitcher_id in exported_pitchers:
+            pitcher = repository.get_pitcher_info(pitcher_id)
+            if pitcher is not None:
+                manifest['pitchers'].append(asdict(pitcher))
+
+            if seasons:
+                games = [g for season in seasons for g in repository.get_games_by_pitcher(pitcher_id, season=season)]
+            else:
+                games = repository.get_games_by_pitcher(pitcher_id)
+            manifest['games'].extend(asdict(game) for game in games)
+
+        manifest_payload = json.dumps(manifest, ensure_ascii=False, indent=2).encode('utf-8')
+        _add_member(archive, MANIFEST_NAME, manifest_payload)
+
+    logger.info(
+        f"キャッシュバンドルを書き出しました: {bundle_path} "
+        f"(投球データ {len(manifest['pitch_data'])}試合, 投手 {len(manifest['pitchers'])}人, 試合 {len(manifest['games'])}件)"
+    )
+    return manifest
+
+
+def read_bundle_manifest(bundle_path: str) -> Dict[str, Any]:
+    """
+    バンドルのマニフェストを読み込む
+
+    Parameters:
+    -----------
+    bundle_path : str
+        バンドルのパス
+
+    Returns:
+    --------
+    Dict[str, Any]
+        マニフェスト
+    """
+    with tarfile.open(bundle_path, 'r:gz') as archive:
+        manifest_file = archive.extractfile(MANIFEST_NAME)
+        if manifest_file is None:
+            raise ValueError(f"バンドルにマニフェストがありません: {bundle_path}")
+        manifest = json.load(manifest_file)
+
+    if manifest.get('format_version') != BUNDLE_FORMAT_VERSION:
+        raise ValueError(f"未対応のバンドル形式です: {manifest.get('format_version')}")
+
+    return manifest
+
+
+def import_cache_bundle(repository: DataRepository, bundle_path: str, overwrite: bool = False) -> Dict[str, int]:
+    """
+    バンドルをリポジトリに取り込む
+
+    投球データはチェックサムを検証してからpickleのまま復元する（CSVの再パースは行わない）
+    キャッシュ日時はバンドル作成元のものを引き継ぐ
+
+    Parameters:
+    -----------
+    repository : DataRepository
+        取り込み先のリポジトリ
+    bundle_path : str
+        バンドルのパス
+    overwrite : bool
+        Trueの場合、取り込み先の方が新しいキャッシュも上書きする
+
+    Returns:
+    --------
+    Dict[str, int]
+        {'imported': 取り込んだ試合数, 'skipped': 既存の方が新しいためスキップした数, 'corrupted': チェックサム不一致の数,
+         'pitchers': 投手数, 'games': 試合情報数}
+    """
+    manifest = read_bundle_manifest(bundle_path)
+    report = {'imported': 0, 'skipped': 0, 'corrupted': 0, 'pitchers': 0, 'games': 0}
+
+    # 外部キー参照のため投手→試合→投球データの順に取り込む
+    for pitcher_data in manifest['pitchers']:
+        repository.save_pitcher_info(Pitcher(**pitcher_data))
+        report['pitchers'] += 1
+
+    for game_data in manifest['games']:
+        repository.save_game_info(Game(**game_data))
+        report['games'] += 1
+
+    with tarfile.open(bundle_path, 'r:gz') as archive:
+        for entry in manifest['pitch_data']:
+            pitcher_id, game_date = entry['pitcher_id'], entry['game_date']
+
+            if not overwrite:
+                existing_cached_at = repository.get_pitch_data_cached_at(pitcher_id, game_date)
+                if existing_cached_at is not None and \
+                        existing_cached_at >= datetime.fromisoformat(entry['cached_at']):
+                    report['skipped'] += 1
+                    continue
+
+            member = archive.extractfile(entry['file'])
+            payload = member.read() if member is not None else b''
+            if sha256_bytes(payload) != entry['sha256']:
+                logger.error(f"チェックサムが一致しないためスキップします: {entry['file']}")
+                report['corrupted'] += 1
+                continue
+
+            data = pickle.loads(payload)
+            repository.save_pitch_data(pitcher_id, game_date, data, cached_at=entry['cached_at'])
+            report['imported'] += 1
+
+    logger.info(f"キャッシュバンドルを取り込みました: {bundle_path} {report}")
+    return report
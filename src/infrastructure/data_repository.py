@@ -1,15 +1,24 @@
 """
 データの永続化とキャッシュを担当するリポジトリ
 """
+import io
 import os
+import re
+import time
+import pickle
 import sqlite3
 import json
 import logging
+import threading
 import pandas as pd
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional, Any, Union
+from typing import List, Dict, Optional, Any, Union, Tuple
 
 from src.domain.entities import Pitcher, Game
+from src.infrastructure.atomic_io import atomic_write_bytes, read_bytes, sha256_bytes, write_lock
+from src.infrastructure.write_behind import WriteBehindQueue
+from src.infrastructure import shared_frame_store
 
 
 class DataRepository:
@@ -17,7 +26,48 @@ class DataRepository:
     データの永続化とキャッシュを担当
     """
     
-    def __init__(self, cache_dir: str = './data', db_path: str = './data/db.sqlite'):
+    # 書き込みと競合した読み込みのリトライ回数と間隔（秒）
+    READ_RETRIES = 3
+    READ_RETRY_INTERVAL = 0.05
+    
+    # スキーマのマイグレーション（バージョン, SQL文のリスト）
+    SCHEMA_MIGRATIONS = [
+        # v1: 試合テーブルにgame_pkとシーズンを追加し、検索用のインデックスを作成
+        (1, [
+            'ALTER TABLE games ADD COLUMN game_pk INTEGER',
+            'ALTER TABLE games ADD COLUMN season INTEGER',
+            "UPDATE games SET season = CAST(substr(date, 1, 4) AS INTEGER)",
+            'CREATE INDEX IF NOT EXISTS idx_games_pitcher_date ON games (pitcher_id, date)',
+            'CREATE INDEX IF NOT EXISTS idx_games_pitcher_season ON games (pitcher_id, season)',
+            'CREATE INDEX IF NOT EXISTS idx_games_game_pk ON games (game_pk)',
+        ]),
+    ]
+    
+    # 既にある列の追加はスキップする（マイグレーション前に新しいスキーマで作成されたテーブル向け）
+    _ADD_COLUMN = re.compile(r'ALTER TABLE (\w+) ADD COLUMN (\w+)', re.IGNORECASE)
+    
+    # 対応しているキャッシュのエビクションポリシー
+    EVICTION_POLICIES = ('lru', 'lfu')
+    
+    # シーズン単位パーティションの形式（2: 試合ごとのpickleを連結し、メタデータに位置を記録）
+    PARTITION_FORMAT = 2
+    
+    # キャッシュヒットのアクセスログはまとめて書き込む（この件数に達するか、この秒数が経過した時点）
+    ACCESS_LOG_FLUSH_HITS = 100
+    ACCESS_LOG_FLUSH_SECONDS = 30.0
+    
+    def __init__(
+        self,
+        cache_dir: str = './data',
+        db_path: str = './data/db.sqlite',
+        max_cache_bytes: Optional[int] = None,
+        max_cache_entries: Optional[int] = None,
+        eviction_policy: str = 'lru',
+        write_behind: bool = False,
+        write_behind_max_pending: int = 32,
+        shared_frames: bool = False,
+        shared_frames_max_attached: int = 32
+    ):
         """
         Parameters:
         -----------
@@ -25,9 +75,30 @@ class DataRepository:
             キャッシュディレクトリのパス
         db_path : str
             SQLiteデータベースファイルのパス
+        max_cache_bytes : Optional[int]
+            投球データキャッシュの最大合計サイズ（バイト）。Noneの場合は無制限
+        max_cache_entries : Optional[int]
+            投球データキャッシュの最大試合数。Noneの場合は無制限
+        eviction_policy : str
+            容量超過時に削除する試合の選び方（'lru': 最終アクセスが古い順, 'lfu': アクセス回数が少ない順）
+        write_behind : bool
+            Trueの場合、投球データの保存をバックグラウンドスレッドで行う（終了前にcloseを呼ぶこと）
+        write_behind_max_pending : int
+            バックグラウンド書き込みの最大待ち件数
+        shared_frames : bool
+            Trueの場合、読み込んだ投球データをメモリマップドArrowファイルとして公開し、
+            複数プロセスで共有する（pyarrowが必要）
+        shared_frames_max_attached : int
+            このプロセスで参照し続ける共有フレームの最大数。超えた場合は最後の読み込みが古いものから解放する
         """
+        if eviction_policy not in self.EVICTION_POLICIES:
+            raise ValueError(f"未対応のエビクションポリシーです: {eviction_policy}")
+        
         self.cache_dir = cache_dir
         self.db_path = db_path
+        self.max_cache_bytes = max_cache_bytes
+        self.max_cache_entries = max_cache_entries
+        self.eviction_policy = eviction_policy
         self.logger = logging.getLogger(__name__)
         
         # キャッシュディレクトリが存在しない場合は作成
@@ -35,6 +106,33 @@ class DataRepository:
         
         # データベース接続の初期化
         self._init_db()
+        
+        # アクセスログに書き込んでいないキャッシュヒット（キャッシュキー -> [投手ID, 試合日, 回数, 最終アクセス]）
+        self._pending_hits: Dict[str, List[Any]] = {}
+        self._pending_hit_count = 0
+        self._hits_flushed_at = time.monotonic()
+        self._hits_lock = threading.Lock()
+        
+        # 保存をバックグラウンドで行う場合のキュー（書き込み待ちのデータは読み込み時にも参照する）
+        self._write_queue = None
+        if write_behind:
+            self._write_queue = WriteBehindQueue(
+                self._write_pitch_data,
+                max_pending=write_behind_max_pending,
+                name='pitch-data-writer'
+            )
+        
+        # プロセス間で共有するフレームのストアと、参照中のフレーム（キャッシュキー -> 共有フレームのキー、読み込み順）
+        self._shared_frames = None
+        self.shared_frames_max_attached = shared_frames_max_attached
+        self._attached_frames: "OrderedDict[str, str]" = OrderedDict()
+        self._attached_lock = threading.Lock()
+        if shared_frames:
+            if shared_frame_store.is_available():
+                self._shared_frames = shared_frame_store.SharedFrameStore(os.path.join(cache_dir, 'shared'))
+                self._shared_frames.cleanup()
+            else:
+                self.logger.warning("pyarrowがインストールされていないため、共有フレームキャッシュを無効にします")
     
     def _init_db(self) -> None:
         """データベーススキーマの初期化"""
@@ -66,6 +164,31 @@ class DataRepository:
             )
             ''')
             
+            # 投手・シーズンごとの試合一覧の取得日時（キャッシュの鮮度判定に使用）
+            cursor.execute('''
+            CREATE TABLE IF NOT EXISTS game_list_fetches (
+                pitcher_id TEXT NOT NULL,
+                season INTEGER NOT NULL,
+                fetched_at TEXT NOT NULL,
+                PRIMARY KEY (pitcher_id, season)
+            )
+            ''')
+            
+            # キャッシュのアクセスログ（エビクションに使用）
+            cursor.execute('''
+            CREATE TABLE IF NOT EXISTS cache_access (
+                cache_key TEXT PRIMARY KEY,
+                pitcher_id TEXT NOT NULL,
+                game_date TEXT NOT NULL,
+                size_bytes INTEGER NOT NULL DEFAULT 0,
+                hits INTEGER NOT NULL DEFAULT 0,
+                last_access TEXT NOT NULL
+            )
+            ''')
+            
+            # 既存のデータベースを最新のスキーマに移行
+            self.migrate_schema(cursor)
+            
             conn.commit()
             conn.close()
             
@@ -75,10 +198,114 @@ class DataRepository:
             self.logger.error(f"データベース初期化中にエラーが発生しました: {e}")
             raise
     
-    def save_pitch_data(self, pitcher_id: str, game_date: str, data: pd.DataFrame) -> None:
+    @classmethod
+    def migrate_schema(cls, cursor: sqlite3.Cursor) -> None:
+        """
+        PRAGMA user_version に記録したスキーマバージョンに基づいてマイグレーションを適用
+        
+        同じデータベースファイルを使うSQLiteStorageBackendからも呼び出す
+        
+        Parameters:
+        -----------
+        cursor : sqlite3.Cursor
+            データベースカーソル
+        """
+        logger = logging.getLogger(__name__)
+        cursor.execute('PRAGMA user_version')
+        current_version = cursor.fetchone()[0]
+        
+        for version, statements in cls.SCHEMA_MIGRATIONS:
+            if version <= current_version:
+                continue
+            
+            # 途中で失敗しても中途半端なスキーマが残らないよう1バージョンずつトランザクションで適用
+            cursor.connection.commit()
+            cursor.execute('BEGIN')
+            try:
+                for statement in statements:
+                    match = cls._ADD_COLUMN.match(statement)
+                    if match is not None:
+                        columns = {row[1] for row in cursor.execute(f'PRAGMA table_info({match.group(1)})')}
+                        if match.group(2) in columns:
+                            continue
+                    cursor.execute(statement)
+                cursor.execute(f'PRAGMA user_version = {version}')
+                cursor.connection.commit()
+            except sqlite3.Error:
+                cursor.connection.rollback()
+                raise
+            
+            logger.info(f"データベーススキーマをバージョン{version}に移行しました")
+    
+    def _pitch_data_paths(self, pitcher_id: str, game_date: str) -> Tuple[str, str]:
+        """投球データ本体とメタデータのファイルパスを返す"""
+        base_name = f"pitch_data_{pitcher_id}_{game_date}"
+        return (
+            os.path.join(self.cache_dir, f"{base_name}.pkl"),
+            os.path.join(self.cache_dir, f"{base_name}.meta.json")
+        )
+    
+    def _partition_paths(self, pitcher_id: str, season: str) -> Tuple[str, str]:
+        """シーズン単位パーティションの本体とメタデータのファイルパスを返す"""
+        base_name = f"pitch_partition_{pitcher_id}_{season}"
+        return (
+            os.path.join(self.cache_dir, f"{base_name}.pkl"),
+            os.path.join(self.cache_dir, f"{base_name}.meta.json")
+        )
+    
+    def _read_consistent(self, file_path: str, meta_path: str) -> Optional[Tuple[Dict[str, Any], bytes]]:
+        """
+        メタデータと本体を整合性を確認しながら読み込む
+        
+        書き込みと競合した場合に備えて数回まで読み直す（ロックは取得しない）
+        
+        Returns:
+        --------
+        Optional[Tuple[Dict[str, Any], bytes]]
+            メタデータと本体のバイト列。整合性を確認できない場合はNone
+        """
+        for attempt in range(self.READ_RETRIES):
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta_data = json.load(f)
+            
+            payload = read_bytes(file_path)
+            
+            # チェックサムがない旧形式のキャッシュは検証せずに読み込む
+            expected = meta_data.get('checksum')
+            if expected is None or sha256_bytes(payload) == expected:
+                return meta_data, payload
+            
+            self.logger.debug(f"チェックサム不一致のため再読み込みします（{attempt + 1}回目）: {file_path}")
+            time.sleep(self.READ_RETRY_INTERVAL)
+        
+        self.logger.warning(f"キャッシュの整合性を確認できませんでした: {file_path}")
+        return None
+    
+    def _write_consistent(self, file_path: str, meta_path: str, payload: bytes, meta_data: Dict[str, Any]) -> None:
+        """
+        本体→メタデータの順にアトミックに置き換える
+        
+        メタデータがコミットレコードとなり、読み手はチェックサムで整合性を確認する
+        呼び出し側で書き込みロックを取得していること
+        """
+        meta_data['size_bytes'] = len(payload)
+        meta_data['checksum'] = sha256_bytes(payload)
+        meta_payload = json.dumps(meta_data, ensure_ascii=False, indent=2).encode('utf-8')
+        
+        atomic_write_bytes(file_path, payload)
+        atomic_write_bytes(meta_path, meta_payload)
+    
+    def _write_lock(self):
+        """キャッシュディレクトリ全体の書き込みロック"""
+        return write_lock(os.path.join(self.cache_dir, '.write'))
+    
+    def save_pitch_data(self, pitcher_id: str, game_date: str, data: pd.DataFrame,
+                        cached_at: Optional[str] = None) -> None:
         """
         投球データをキャッシュとして保存
         
+        write_behindが有効な場合はキューに追加してすぐに戻り、書き込みはバックグラウンドで行う
+        
         Parameters:
         -----------
         pitcher_id : str
@@ -87,44 +314,58 @@ class DataRepository:
             試合日（YYYY-MM-DD形式）
         data : pd.DataFrame
             保存する投球データ
+        cached_at : Optional[str]
+            キャッシュ日時（ISO形式）。Noneの場合は現在日時（バンドルからの取り込みで元の日時を保つために使用）
         """
         if data.empty:
             self.logger.warning("空のデータフレームは保存しません")
             return
         
+        if self._write_queue is not None:
+            self._write_queue.submit(self._cache_key(pitcher_id, game_date), pitcher_id, game_date, data, cached_at)
+            self.logger.debug(f"投球データの保存をキューに追加しました: {pitcher_id} {game_date}")
+            return
+        
+        self._write_pitch_data(pitcher_id, game_date, data, cached_at)
+    
+    def _write_pitch_data(self, pitcher_id: str, game_date: str, data: pd.DataFrame,
+                          cached_at: Optional[str] = None) -> None:
+        """投球データをシリアライズしてキャッシュファイルに書き込む"""
         try:
-            # キャッシュファイルパスの作成
-            file_name = f"pitch_data_{pitcher_id}_{game_date}.pkl"
-            file_path = os.path.join(self.cache_dir, file_name)
-            
-            # データを保存
-            data.to_pickle(file_path)
+            file_path, meta_path = self._pitch_data_paths(pitcher_id, game_date)
             
-            # メタデータの保存
-            meta_file = f"pitch_data_{pitcher_id}_{game_date}.meta.json"
-            meta_path = os.path.join(self.cache_dir, meta_file)
+            # データをシリアライズ
+            payload = pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL)
             
             meta_data = {
                 'pitcher_id': pitcher_id,
                 'game_date': game_date,
-                'cached_at': datetime.now().isoformat(),
+                'cached_at': cached_at or datetime.now().isoformat(),
                 'rows': len(data),
                 'columns': list(data.columns)
             }
             
-            with open(meta_path, 'w', encoding='utf-8') as f:
-                json.dump(meta_data, f, ensure_ascii=False, indent=2)
+            with self._write_lock():
+                self._write_consistent(file_path, meta_path, payload, meta_data)
             
             self.logger.info(f"投球データをキャッシュに保存しました: {file_path}")
             
         except Exception as e:
             self.logger.error(f"投球データの保存中にエラーが発生しました: {e}")
             raise
+        
+        self._record_cache_access(pitcher_id, game_date, size_bytes=len(payload))
+        
+        # 容量制限が設定されている場合は保存直後に適用（保存したエントリ自体は対象外）
+        if self.max_cache_bytes is not None or self.max_cache_entries is not None:
+            self.enforce_cache_quota(protect=self._cache_key(pitcher_id, game_date))
     
     def get_cached_pitch_data(self, pitcher_id: str, game_date: str, max_age_days: int = 7) -> Optional[pd.DataFrame]:
         """
         キャッシュされた投球データを取得
         
+        試合単位のファイルがなければシーズン単位のパーティションを参照する
+        
         Parameters:
         -----------
         pitcher_id : str
@@ -139,42 +380,261 @@ class DataRepository:
         Optional[pd.DataFrame]
             キャッシュされたデータ。キャッシュがない場合はNone
         """
-        # キャッシュファイルパスの作成
-        file_name = f"pitch_data_{pitcher_id}_{game_date}.pkl"
-        file_path = os.path.join(self.cache_dir, file_name)
-        
-        # メタデータファイルパス
-        meta_file = f"pitch_data_{pitcher_id}_{game_date}.meta.json"
-        meta_path = os.path.join(self.cache_dir, meta_file)
+        # 書き込み待ちのデータがあればそれを返す
+        if self._write_queue is not None:
+            pending = self._write_queue.get_pending(self._cache_key(pitcher_id, game_date))
+            if pending is not None:
+                self.logger.debug(f"書き込み待ちのデータを返します: {pitcher_id} {game_date}")
+                return pending[2]
         
-        # ファイルが存在するか確認
-        if not os.path.exists(file_path) or not os.path.exists(meta_path):
-            self.logger.debug(f"キャッシュが見つかりませんでした: {file_path}")
-            return None
+        file_path, meta_path = self._pitch_data_paths(pitcher_id, game_date)
         
         try:
-            # メタデータを読み込み
-            with open(meta_path, 'r', encoding='utf-8') as f:
-                meta_data = json.load(f)
+            data = None
+            meta_data = None
+            
+            # ファイルが存在するか確認
+            if os.path.exists(file_path) and os.path.exists(meta_path):
+                # 他のプロセスが公開済みの共有フレームがあればメモリマップで参照する
+                if self._shared_frames is not None:
+                    with open(meta_path, 'r', encoding='utf-8') as f:
+                        meta_data = json.load(f)
+                    shared_key = self._shared_frame_key(pitcher_id, game_date, meta_data)
+                    if shared_key is not None:
+                        data = self._attach_shared_frame(self._cache_key(pitcher_id, game_date), shared_key)
+                
+                if data is None:
+                    read_result = self._read_consistent(file_path, meta_path)
+                    if read_result is None:
+                        return None
+                    meta_data, payload = read_result
+                
+                cached_at = meta_data['cached_at']
+            else:
+                # パーティションからはこの試合の部分だけを読み込む
+                partition_entry = self._read_partition_entry(pitcher_id, game_date)
+                if partition_entry is None:
+                    self.logger.debug(f"キャッシュが見つかりませんでした: {file_path}")
+                    return None
+                
+                cached_at, payload = partition_entry
+                file_path = self._partition_paths(pitcher_id, game_date[:4])[0]
             
             # キャッシュの有効期限をチェック
-            cached_at = datetime.fromisoformat(meta_data['cached_at'])
-            now = datetime.now()
-            age = now - cached_at
+            age = datetime.now() - datetime.fromisoformat(cached_at)
             
             if age > timedelta(days=max_age_days):
                 self.logger.debug(f"キャッシュが古すぎます（{age.days}日）: {file_path}")
                 return None
             
-            # データを読み込み
-            data = pd.read_pickle(file_path)
-            
-            self.logger.info(f"キャッシュからデータを読み込みました: {file_path}")
-            return data
+            # データを読み込み（期限切れの場合はデシリアライズしない）
+            if data is None:
+                data = pd.read_pickle(io.BytesIO(payload))
+                if meta_data is not None:
+                    data = self._publish_shared_frame(pitcher_id, game_date, meta_data, data)
             
         except Exception as e:
             self.logger.error(f"キャッシュデータの読み込み中にエラーが発生しました: {e}")
             return None
+        
+        self._record_cache_hit(pitcher_id, game_date)
+        
+        self.logger.info(f"キャッシュからデータを読み込みました: {file_path}")
+        return data
+    
+    def _shared_frame_key(self, pitcher_id: str, game_date: str, meta_data: Dict[str, Any]) -> Optional[str]:
+        """共有フレームのキー（内容が変わればキーも変わるようチェックサムを含める）"""
+        checksum = meta_data.get('checksum')
+        if checksum is None:
+            return None
+        return f"{self._cache_key(pitcher_id, game_date)}_{checksum[:16]}"
+    
+    def _publish_shared_frame(self, pitcher_id: str, game_date: str,
+                              meta_data: Dict[str, Any], data: pd.DataFrame) -> pd.DataFrame:
+        """
+        読み込んだデータを共有フレームとして公開し、メモリマップ側のフレームを返す
+        
+        共有フレームが無効な場合や公開に失敗した場合は元のデータをそのまま返す
+        """
+        if self._shared_frames is None:
+            return data
+        
+        shared_key = self._shared_frame_key(pitcher_id, game_date, meta_data)
+        if shared_key is None:
+            return data
+        
+        try:
+            self._shared_frames.publish(shared_key, data)
+            shared_data = self._attach_shared_frame(self._cache_key(pitcher_id, game_date), shared_key)
+        except Exception as e:
+            self.logger.warning(f"共有フレームの公開に失敗しました: {e}")
+            return data
+        
+        return shared_data if shared_data is not None else data
+    
+    def _attach_shared_frame(self, cache_key: str, shared_key: str) -> Optional[pd.DataFrame]:
+        """
+        共有フレームを参照し、呼び出し側ごとに別のDataFrameとして返す
+        
+        参照は試合ごとに1つだけ保持し、shared_frames_max_attachedを超えた分は読み込みが古いものから解放する
+        返すDataFrameは列の追加などを他の呼び出し側と共有しないよう浅いコピーとする（数値列は読み取り専用）
+        """
+        released = []
+        with self._attached_lock:
+            current = self._attached_frames.get(cache_key)
+            if current == shared_key:
+                data = self._shared_frames.get_attached(shared_key)
+                if data is not None:
+                    self._attached_frames.move_to_end(cache_key)
+                    return data.copy(deep=False)
+            
+            data = self._shared_frames.attach(shared_key)
+            if data is None:
+                return None
+            
+            # 内容が変わった試合の古い参照と、上限を超えた分の参照を解放
+            if current is not None:
+                released.append(current)
+            self._attached_frames[cache_key] = shared_key
+            self._attached_frames.move_to_end(cache_key)
+            while len(self._attached_frames) > self.shared_frames_max_attached:
+                released.append(self._attached_frames.popitem(last=False)[1])
+        
+        for key in released:
+            self._shared_frames.release(key)
+        return data.copy(deep=False)
+    
+    def _release_shared_frames(self, cache_keys: List[str]) -> None:
+        """指定した試合の共有フレームの参照を解放"""
+        if self._shared_frames is None:
+            return
+        
+        with self._attached_lock:
+            released = [self._attached_frames.pop(key) for key in cache_keys if key in self._attached_frames]
+        for key in released:
+            self._shared_frames.release(key)
+    
+    def get_pitch_data_cached_at(self, pitcher_id: str, game_date: str) -> Optional[datetime]:
+        """
+        投球データがキャッシュされた日時を取得
+        
+        Parameters:
+        -----------
+        pitcher_id : str
+            投手ID
+        game_date : str
+            試合日（YYYY-MM-DD形式）
+            
+        Returns:
+        --------
+        Optional[datetime]
+            キャッシュ日時。キャッシュがない場合はNone
+        """
+        # 書き込み待ちのデータは最新とみなす
+        if self._write_queue is not None and \
+                self._write_queue.get_pending(self._cache_key(pitcher_id, game_date)) is not None:
+            return datetime.now()
+        
+        _, meta_path = self._pitch_data_paths(pitcher_id, game_date)
+        
+        try:
+            if os.path.exists(meta_path):
+                with open(meta_path, 'r', encoding='utf-8') as f:
+                    return datetime.fromisoformat(json.load(f)['cached_at'])
+            
+            _, partition_meta_path = self._partition_paths(pitcher_id, game_date[:4])
+            if os.path.exists(partition_meta_path):
+                with open(partition_meta_path, 'r', encoding='utf-8') as f:
+                    game_meta = json.load(f)['games'].get(game_date)
+                if game_meta is not None:
+                    return datetime.fromisoformat(game_meta['cached_at'])
+                    
+        except (OSError, ValueError, KeyError) as e:
+            self.logger.warning(f"キャッシュ日時の取得中にエラーが発生しました: {e}")
+        
+        return None
+    
+    def _load_partition(self, pitcher_id: str, season: str) -> Optional[Tuple[Dict[str, Any], Dict[str, bytes]]]:
+        """シーズン単位パーティションのメタデータと試合日ごとのpickle形式のデータを読み込む"""
+        file_path, meta_path = self._partition_paths(pitcher_id, season)
+        if not os.path.exists(file_path) or not os.path.exists(meta_path):
+            return None
+        
+        read_result = self._read_consistent(file_path, meta_path)
+        if read_result is None:
+            return None
+        
+        meta_data, payload = read_result
+        if meta_data.get('format') != self.PARTITION_FORMAT:
+            # 旧形式（試合日ごとのデータフレームの辞書をまとめてpickle）
+            return meta_data, {
+                game_date: pickle.dumps(frame, protocol=pickle.HIGHEST_PROTOCOL)
+                for game_date, frame in pickle.loads(payload).items()
+            }
+        
+        return meta_data, {
+            game_date: payload[game_meta['offset']:game_meta['offset'] + game_meta['length']]
+            for game_date, game_meta in meta_data['games'].items()
+        }
+    
+    def _write_partition(self, pitcher_id: str, season: str,
+                         meta_data: Dict[str, Any], payloads: Dict[str, bytes]) -> None:
+        """
+        試合日ごとのpickle形式のデータを連結してパーティションに書き込む
+        
+        1試合だけを読めるよう、試合ごとの位置・長さ・チェックサムをメタデータに記録する
+        呼び出し側で書き込みロックを取得していること
+        """
+        chunks = []
+        offset = 0
+        for game_date in sorted(payloads):
+            chunk = payloads[game_date]
+            meta_data['games'][game_date].update(
+                offset=offset, length=len(chunk), size_bytes=len(chunk), checksum=sha256_bytes(chunk)
+            )
+            chunks.append(chunk)
+            offset += len(chunk)
+        
+        meta_data['format'] = self.PARTITION_FORMAT
+        file_path, meta_path = self._partition_paths(pitcher_id, season)
+        self._write_consistent(file_path, meta_path, b''.join(chunks), meta_data)
+    
+    def _read_partition_entry(self, pitcher_id: str, game_date: str) -> Optional[Tuple[str, bytes]]:
+        """
+        パーティションから1試合分のキャッシュ日時とpickle形式のデータを取得
+        
+        メタデータに記録した位置からその試合の部分だけを読み込み、試合ごとのチェックサムで整合性を確認する
+        """
+        file_path, meta_path = self._partition_paths(pitcher_id, game_date[:4])
+        if not os.path.exists(file_path) or not os.path.exists(meta_path):
+            return None
+        
+        for attempt in range(self.READ_RETRIES):
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta_data = json.load(f)
+            
+            game_meta = meta_data['games'].get(game_date)
+            if game_meta is None:
+                return None
+            
+            if meta_data.get('format') != self.PARTITION_FORMAT:
+                partition = self._load_partition(pitcher_id, game_date[:4])
+                if partition is None or game_date not in partition[1]:
+                    return None
+                return game_meta['cached_at'], partition[1][game_date]
+            
+            with open(file_path, 'rb') as f:
+                f.seek(game_meta['offset'])
+                payload = f.read(game_meta['length'])
+            
+            if sha256_bytes(payload) == game_meta['checksum']:
+                return game_meta['cached_at'], payload
+            
+            self.logger.debug(f"チェックサム不一致のため再読み込みします（{attempt + 1}回目）: {file_path}")
+            time.sleep(self.READ_RETRY_INTERVAL)
+        
+        self.logger.warning(f"キャッシュの整合性を確認できませんでした: {file_path} {game_date}")
+        return None
     
     def save_pitcher_info(self, pitcher: Pitcher) -> None:
         """
@@ -270,11 +730,20 @@ class DataRepository:
             # ゲームIDの生成 (pitcher_id + date)
             game_id = f"{game.pitcher_id}_{game.date}"
             
-            # 試合情報を挿入または更新
+            # 試合情報を挿入または更新（既知のgame_pkは未設定の値で上書きしない）
             cursor.execute('''
-            INSERT OR REPLACE INTO games (id, date, pitcher_id, opponent, stadium, home_away)
-            VALUES (?, ?, ?, ?, ?, ?)
-            ''', (game_id, game.date, game.pitcher_id, game.opponent, game.stadium, game.home_away))
+            INSERT INTO games (id, date, pitcher_id, game_pk, season, opponent, stadium, home_away)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(id) DO UPDATE SET
+                date = excluded.date,
+                pitcher_id = excluded.pitcher_id,
+                game_pk = COALESCE(excluded.game_pk, games.game_pk),
+                season = excluded.season,
+                opponent = excluded.opponent,
+                stadium = excluded.stadium,
+                home_away = excluded.home_away
+            ''', (game_id, game.date, game.pitcher_id, game.game_pk, int(game.date[:4]),
+                  game.opponent, game.stadium, game.home_away))
             
             conn.commit()
             conn.close()
@@ -285,7 +754,7 @@ class DataRepository:
             self.logger.error(f"試合情報の保存中にエラーが発生しました: {e}")
             raise
     
-    def get_games_by_pitcher(self, pitcher_id: str) -> List[Game]:
+    def get_games_by_pitcher(self, pitcher_id: str, season: Optional[int] = None) -> List[Game]:
         """
         投手IDに基づいて試合情報を取得
         
@@ -293,6 +762,8 @@ class DataRepository:
         -----------
         pitcher_id : str
             投手ID
+        season : Optional[int]
+            シーズン年。Noneの場合は全シーズン
             
         Returns:
         --------
@@ -304,12 +775,20 @@ class DataRepository:
             cursor = conn.cursor()
             
             # 試合情報を検索
-            cursor.execute('''
-            SELECT id, date, pitcher_id, opponent, stadium, home_away
-            FROM games
-            WHERE pitcher_id = ?
-            ORDER BY date DESC
-            ''', (pitcher_id,))
+            if season is None:
+                cursor.execute('''
+                SELECT id, date, pitcher_id, game_pk, opponent, stadium, home_away
+                FROM games
+                WHERE pitcher_id = ?
+                ORDER BY date DESC
+                ''', (pitcher_id,))
+            else:
+                cursor.execute('''
+                SELECT id, date, pitcher_id, game_pk, opponent, stadium, home_away
+                FROM games
+                WHERE pitcher_id = ? AND season = ?
+                ORDER BY date DESC
+                ''', (pitcher_id, int(season)))
             
             rows = cursor.fetchall()
             conn.close()
@@ -319,9 +798,10 @@ class DataRepository:
                 game = Game(
                     date=row[1],
                     pitcher_id=row[2],
-                    opponent=row[3],
-                    stadium=row[4],
-                    home_away=row[5]
+                    game_pk=row[3],
+                    opponent=row[4],
+                    stadium=row[5],
+                    home_away=row[6]
                 )
                 games.append(game)
             
@@ -330,4 +810,585 @@ class DataRepository:
             
         except sqlite3.Error as e:
             self.logger.error(f"試合情報の取得中にエラーが発生しました: {e}")
-            return []
\ No newline at end of file
+            return []
+    
+    def get_game_pk(self, pitcher_id: str, game_date: str) -> Optional[int]:
+        """
+        投手IDと試合日からgame_pkを取得
+        
+        Parameters:
+        -----------
+        pitcher_id : str
+            投手ID
+        game_date : str
+            試合日（YYYY-MM-DD形式）
+            
+        Returns:
+        --------
+        Optional[int]
+            game_pk。不明な場合はNone
+        """
+        try:
+            conn = sqlite3.connect(self.db_path)
+            cursor = conn.cursor()
+            
+            cursor.execute('''
+            SELECT game_pk FROM games
+            WHERE pitcher_id = ? AND date = ?
+            ''', (pitcher_id, game_date))
+            
+            row = cursor.fetchone()
+            conn.close()
+            
+            return row[0] if row else None
+            
+        except sqlite3.Error as e:
+            self.logger.error(f"game_pkの取得中にエラーが発生しました: {e}")
+            return None
+    
+    def record_game_list_fetch(self, pitcher_id: str, season: int) -> None:
+        """
+        投手・シーズンの試合一覧をAPIから取得した日時を記録
+        
+        Parameters:
+        -----------
+        pitcher_id : str
+            投手ID
+        season : int
+            シーズン年
+        """
+        try:
+            conn = sqlite3.connect(self.db_path)
+            cursor = conn.cursor()
+            
+            cursor.execute('''
+            INSERT OR REPLACE INTO game_list_fetches (pitcher_id, season, fetched_at)
+            VALUES (?, ?, ?)
+            ''', (pitcher_id, int(season), datetime.now().isoformat()))
+            
+            conn.commit()
+            conn.close()
+            
+        except sqlite3.Error as e:
+            self.logger.error(f"試合一覧の取得日時の保存中にエラーが発生しました: {e}")
+    
+    def get_game_list_fetched_at(self, pitcher_id: str, season: int) -> Optional[datetime]:
+        """
+        投手・シーズンの試合一覧をAPIから取得した日時を取得
+        
+        Parameters:
+        -----------
+        pitcher_id : str
+            投手ID
+        season : int
+            シーズン年
+            
+        Returns:
+        --------
+        Optional[datetime]
+            取得日時。記録がない場合はNone
+        """
+        try:
+            conn = sqlite3.connect(self.db_path)
+            cursor = conn.cursor()
+            
+            cursor.execute('''
+            SELECT fetched_at FROM game_list_fetches
+            WHERE pitcher_id = ? AND season = ?
+            ''', (pitcher_id, int(season)))
+            
+            row = cursor.fetchone()
+            conn.close()
+            
+            return datetime.fromisoformat(row[0]) if row else None
+            
+        except sqlite3.Error as e:
+            self.logger.error(f"試合一覧の取得日時の取得中にエラーが発生しました: {e}")
+            return None
+    
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        バックグラウンドで書き込み待ちの投球データがなくなるまで待機
+        
+        Parameters:
+        -----------
+        timeout : Optional[float]
+            最大待機時間（秒）。Noneの場合は完了するまで待つ
+            
+        Returns:
+        --------
+        bool
+            すべての書き込みが完了した場合はTrue
+        """
+        if self._write_queue is None:
+            return True
+        return self._write_queue.flush(timeout)
+    
+    def close(self, timeout: Optional[float] = 10.0) -> None:
+        """
+        書き込み待ちをできるだけ保存してからバックグラウンド書き込みを停止し、
+        記録したキャッシュヒットをアクセスログに書き込んで共有フレームの参照を解放
+        """
+        if self._write_queue is not None:
+            self._write_queue.close(timeout)
+        self.flush_cache_access()
+        if self._shared_frames is not None:
+            with self._attached_lock:
+                self._attached_frames.clear()
+            self._shared_frames.release_all()
+    
+    @staticmethod
+    def _cache_key(pitcher_id: str, game_date: str) -> str:
+        """アクセスログで使用するキャッシュキー"""
+        return f"{pitcher_id}_{game_date}"
+    
+    def _record_cache_access(self, pitcher_id: str, game_date: str, size_bytes: Optional[int] = None) -> None:
+        """
+        保存したキャッシュのアクセスログを更新
+        
+        ログの更新に失敗してもキャッシュの読み書き自体は成功扱いとする
+        """
+        now = datetime.now().isoformat()
+        try:
+            conn = sqlite3.connect(self.db_path)
+            cursor = conn.cursor()
+            
+            cursor.execute('''
+            INSERT INTO cache_access (cache_key, pitcher_id, game_date, size_bytes, hits, last_access)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT(cache_key) DO UPDATE SET
+                size_bytes = COALESCE(?, size_bytes),
+                hits = hits + excluded.hits,
+                last_access = excluded.last_access
+            ''', (self._cache_key(pitcher_id, game_date), pitcher_id, game_date,
+                  size_bytes or 0, 0, now, size_bytes))
+            
+            conn.commit()
+            conn.close()
+            
+        except sqlite3.Error as e:
+            self.logger.warning(f"キャッシュアクセスログの更新に失敗しました: {e}")
+    
+    def _record_cache_hit(self, pitcher_id: str, game_date: str) -> None:
+        """キャッシュヒットをメモリ上に記録し、一定の件数か時間ごとにまとめてアクセスログに書き込む"""
+        with self._hits_lock:
+            key = self._cache_key(pitcher_id, game_date)
+            hit = self._pending_hits.setdefault(key, [pitcher_id, game_date, 0, None])
+            hit[2] += 1
+            hit[3] = datetime.now().isoformat()
+            self._pending_hit_count += 1
+            due = self._pending_hit_count >= self.ACCESS_LOG_FLUSH_HITS or \
+                time.monotonic() - self._hits_flushed_at >= self.ACCESS_LOG_FLUSH_SECONDS
+        
+        if due:
+            self.flush_cache_access()
+    
+    def flush_cache_access(self) -> int:
+        """
+        メモリ上に記録したキャッシュヒットをアクセスログに書き込む
+        
+        アクセスログにない試合（同期前のエントリなど）のヒットは記録しない
+        
+        Returns:
+        --------
+        int
+            書き込んだ試合数
+        """
+        with self._hits_lock:
+            hits = self._pending_hits
+            self._pending_hits = {}
+            self._pending_hit_count = 0
+            self._hits_flushed_at = time.monotonic()
+        
+        if not hits:
+            return 0
+        
+        try:
+            conn = sqlite3.connect(self.db_path)
+            cursor = conn.cursor()
+            cursor.executemany('''
+            UPDATE cache_access
+            SET hits = hits + ?, last_access = MAX(last_access, ?)
+            WHERE cache_key = ?
+            ''', [(count, last_access, key) for key, (_, _, count, last_access) in hits.items()])
+            conn.commit()
+            conn.close()
+        except sqlite3.Error as e:
+            self.logger.warning(f"キャッシュアクセスログの更新に失敗しました: {e}")
+            return 0
+        
+        return len(hits)
+    
+    def _scan_cache_entries(self) -> List[Dict[str, Any]]:
+        """キャッシュディレクトリを走査して投球データのエントリ一覧を作成"""
+        entries = []
+        
+        for file_name in sorted(os.listdir(self.cache_dir)):
+            if not file_name.endswith('.meta.json'):
+                continue
+            
+            meta_path = os.path.join(self.cache_dir, file_name)
+            try:
+                with open(meta_path, 'r', encoding='utf-8') as f:
+                    meta_data = json.load(f)
+            except (OSError, ValueError) as e:
+                self.logger.warning(f"メタデータを読み込めませんでした: {meta_path} ({e})")
+                continue
+            
+            if file_name.startswith('pitch_data_'):
+                file_path = meta_path[:-len('.meta.json')] + '.pkl'
+                size_bytes = meta_data.get('size_bytes')
+                if size_bytes is None and os.path.exists(file_path):
+                    size_bytes = os.path.getsize(file_path)
+                entries.append({
+                    'pitcher_id': meta_data['pitcher_id'],
+                    'game_date': meta_data['game_date'],
+                    'cached_at': meta_data['cached_at'],
+                    'size_bytes': size_bytes or 0,
+                    'location': 'game'
+                })
+            elif file_name.startswith('pitch_partition_'):
+                for game_date, game_meta in meta_data.get('games', {}).items():
+                    entries.append({
+                        'pitcher_id': meta_data['pitcher_id'],
+                        'game_date': game_date,
+                        'cached_at': game_meta['cached_at'],
+                        'size_bytes': game_meta.get('size_bytes', 0),
+                        'location': 'partition'
+                    })
+        
+        return entries
+    
+    def list_cached_pitch_data(
+        self,
+        pitcher_ids: Optional[List[str]] = None,
+        seasons: Optional[List[int]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        キャッシュされている投球データの一覧を取得
+        
+        Parameters:
+        -----------
+        pitcher_ids : Optional[List[str]]
+            対象の投手ID。Noneの場合は全投手
+        seasons : Optional[List[int]]
+            対象のシーズン年。Noneの場合は全シーズン
+            
+        Returns:
+        --------
+        List[Dict[str, Any]]
+            {'pitcher_id', 'game_date', 'cached_at', 'size_bytes', 'location'} のリスト（試合日順）
+        """
+        season_filter = {str(season) for season in seasons} if seasons else None
+        
+        entries: Dict[str, Dict[str, Any]] = {}
+        for entry in self._scan_cache_entries():
+            if pitcher_ids and entry['pitcher_id'] not in pitcher_ids:
+                continue
+            if season_filter and entry['game_date'][:4] not in season_filter:
+                continue
+            
+            key = self._cache_key(entry['pitcher_id'], entry['game_date'])
+            # 試合単位のファイルがパーティションより優先される
+            if key not in entries or entry['location'] == 'game':
+                entries[key] = entry
+        
+        return sorted(entries.values(), key=lambda e: (e['pitcher_id'], e['game_date']))
+    
+    def read_pitch_data_payload(self, pitcher_id: str, game_date: str) -> Optional[Tuple[str, bytes]]:
+        """
+        有効期限やアクセスログに関係なく、キャッシュされた投球データをシリアライズ済みの形で取得
+        
+        Parameters:
+        -----------
+        pitcher_id : str
+            投手ID
+        game_date : str
+            試合日（YYYY-MM-DD形式）
+            
+        Returns:
+        --------
+        Optional[Tuple[str, bytes]]
+            キャッシュ日時（ISO形式）とpickle形式のデータ。キャッシュがない場合はNone
+        """
+        file_path, meta_path = self._pitch_data_paths(pitcher_id, game_date)
+        
+        if os.path.exists(file_path) and os.path.exists(meta_path):
+            read_result = self._read_consistent(file_path, meta_path)
+            if read_result is None:
+                return None
+            meta_data, payload = read_result
+            return meta_data['cached_at'], payload
+        
+        return self._read_partition_entry(pitcher_id, game_date)
+    
+    def sync_cache_access_log(self) -> None:
+        """
+        アクセスログをキャッシュディレクトリの実体に合わせる
+        
+        ログにないエントリ（旧バージョンで保存されたものなど）はキャッシュ日時を
+        最終アクセスとして登録し、実体のないログは削除する
+        """
+        self.flush_cache_access()
+        entries = {
+            self._cache_key(entry['pitcher_id'], entry['game_date']): entry
+            for entry in self.list_cached_pitch_data()
+        }
+        
+        try:
+            conn = sqlite3.connect(self.db_path)
+            cursor = conn.cursor()
+            
+            cursor.executemany('''
+            INSERT OR IGNORE INTO cache_access (cache_key, pitcher_id, game_date, size_bytes, hits, last_access)
+            VALUES (?, ?, ?, ?, 0, ?)
+            ''', [(key, e['pitcher_id'], e['game_date'], e['size_bytes'], e['cached_at'])
+                  for key, e in entries.items()])
+            
+            cursor.execute('SELECT cache_key FROM cache_access')
+            stale_keys = [(row[0],) for row in cursor.fetchall() if row[0] not in entries]
+            cursor.executemany('DELETE FROM cache_access WHERE cache_key = ?', stale_keys)
+            
+            conn.commit()
+            conn.close()
+            
+            self.logger.info(f"キャッシュアクセスログを同期しました（{len(entries)}件, 削除 {len(stale_keys)}件）")
+            
+        except sqlite3.Error as e:
+            self.logger.error(f"キャッシュアクセスログの同期中にエラーが発生しました: {e}")
+            raise
+    
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """
+        投球データキャッシュの使用状況を取得
+        
+        Returns:
+        --------
+        Dict[str, Any]
+            {'entries': 試合数, 'total_bytes': 合計サイズ, 'files': キャッシュファイル数}
+        """
+        self.flush_cache_access()
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute('SELECT COUNT(*), COALESCE(SUM(size_bytes), 0) FROM cache_access')
+        entries, total_bytes = cursor.fetchone()
+        conn.close()
+        
+        files = sum(1 for name in os.listdir(self.cache_dir)
+                    if name.startswith(('pitch_data_', 'pitch_partition_')))
+        
+        return {'entries': entries, 'total_bytes': total_bytes, 'files': files}
+    
+    def evict_pitch_data(self, entries: List[Tuple[str, str]]) -> int:
+        """
+        指定した試合の投球データをキャッシュから削除
+        
+        Parameters:
+        -----------
+        entries : List[Tuple[str, str]]
+            (投手ID, 試合日) のリスト
+            
+        Returns:
+        --------
+        int
+            削除した試合数
+        """
+        evicted = 0
+        by_partition: Dict[Tuple[str, str], List[str]] = {}
+        
+        if self._write_queue is not None:
+            for pitcher_id, game_date in entries:
+                self._write_queue.discard(self._cache_key(pitcher_id, game_date))
+        self._release_shared_frames([self._cache_key(p, d) for p, d in entries])
+        with self._hits_lock:
+            for pitcher_id, game_date in entries:
+                self._pending_hits.pop(self._cache_key(pitcher_id, game_date), None)
+        
+        with self._write_lock():
+            for pitcher_id, game_date in entries:
+                removed = False
+                for path in self._pitch_data_paths(pitcher_id, game_date):
+                    if os.path.exists(path):
+                        os.remove(path)
+                        removed = True
+                evicted += int(removed)
+                by_partition.setdefault((pitcher_id, game_date[:4]), []).append(game_date)
+            
+            # パーティションに含まれる試合はパーティションを書き直して削除
+            for (pitcher_id, season), game_dates in by_partition.items():
+                partition = self._load_partition(pitcher_id, season)
+                if partition is None:
+                    continue
+                
+                meta_data, payloads = partition
+                targets = [d for d in game_dates if d in payloads]
+                if not targets:
+                    continue
+                
+                for game_date in targets:
+                    payloads.pop(game_date)
+                    meta_data['games'].pop(game_date, None)
+                evicted += len(targets)
+                
+                file_path, meta_path = self._partition_paths(pitcher_id, season)
+                if payloads:
+                    self._write_partition(pitcher_id, season, meta_data, payloads)
+                else:
+                    # メタデータ（コミットレコード）から先に削除する
+                    os.remove(meta_path)
+                    os.remove(file_path)
+        
+        try:
+            conn = sqlite3.connect(self.db_path)
+            cursor = conn.cursor()
+            cursor.executemany('DELETE FROM cache_access WHERE cache_key = ?',
+                               [(self._cache_key(p, d),) for p, d in entries])
+            conn.commit()
+            conn.close()
+        except sqlite3.Error as e:
+            self.logger.warning(f"キャッシュアクセスログの更新に失敗しました: {e}")
+        
+        self.logger.info(f"{evicted}試合分の投球データをキャッシュから削除しました")
+        return evicted
+    
+    def enforce_cache_quota(
+        self,
+        max_bytes: Optional[int] = None,
+        max_entries: Optional[int] = None,
+        policy: Optional[str] = None,
+        protect: Optional[str] = None
+    ) -> List[Tuple[str, str]]:
+        """
+        容量制限を超えている場合、アクセスログに基づいて投球データを削除
+        
+        Parameters:
+        -----------
+        max_bytes : Optional[int]
+            最大合計サイズ（バイト）。Noneの場合はインスタンスの設定値
+        max_entries : Optional[int]
+            最大試合数。Noneの場合はインスタンスの設定値
+        policy : Optional[str]
+            'lru' または 'lfu'。Noneの場合はインスタンスの設定値
+        protect : Optional[str]
+            削除対象から除外するキャッシュキー
+            
+        Returns:
+        --------
+        List[Tuple[str, str]]
+            削除した (投手ID, 試合日) のリスト
+        """
+        max_bytes = self.max_cache_bytes if max_bytes is None else max_bytes
+        max_entries = self.max_cache_entries if max_entries is None else max_entries
+        policy = policy or self.eviction_policy
+        
+        if policy not in self.EVICTION_POLICIES:
+            raise ValueError(f"未対応のエビクションポリシーです: {policy}")
+        
+        if max_bytes is None and max_entries is None:
+            return []
+        
+        order_by = 'last_access ASC' if policy == 'lru' else 'hits ASC, last_access ASC'
+        self.flush_cache_access()
+        
+        try:
+            conn = sqlite3.connect(self.db_path)
+            cursor = conn.cursor()
+            cursor.execute(f'''
+            SELECT cache_key, pitcher_id, game_date, size_bytes
+            FROM cache_access
+            ORDER BY {order_by}
+            ''')
+            rows = cursor.fetchall()
+            conn.close()
+        except sqlite3.Error as e:
+            self.logger.error(f"キャッシュアクセスログの取得中にエラーが発生しました: {e}")
+            return []
+        
+        total_bytes = sum(row[3] for row in rows)
+        total_entries = len(rows)
+        
+        victims = []
+        for cache_key, pitcher_id, game_date, size_bytes in rows:
+            over_bytes = max_bytes is not None and total_bytes > max_bytes
+            over_entries = max_entries is not None and total_entries > max_entries
+            if not over_bytes and not over_entries:
+                break
+            if cache_key == protect:
+                continue
+            
+            victims.append((pitcher_id, game_date))
+            total_bytes -= size_bytes
+            total_entries -= 1
+        
+        if victims:
+            self.logger.info(f"キャッシュ容量制限により{len(victims)}試合分を削除します（ポリシー: {policy}）")
+            self.evict_pitch_data(victims)
+        
+        return victims
+    
+    def compact_cache(self, min_games: int = 2) -> int:
+        """
+        試合単位のキャッシュファイルを投手・シーズン単位のパーティションにまとめる
+        
+        Parameters:
+        -----------
+        min_games : int
+            パーティションにまとめる最小試合数（既存パーティション内の試合を含む）
+            
+        Returns:
+        --------
+        int
+            パーティションに移動した試合数
+        """
+        # (投手ID, シーズン) ごとに試合単位のファイルを集める
+        groups: Dict[Tuple[str, str], List[str]] = {}
+        for entry in self._scan_cache_entries():
+            if entry['location'] == 'game':
+                key = (entry['pitcher_id'], entry['game_date'][:4])
+                groups.setdefault(key, []).append(entry['game_date'])
+        
+        moved = 0
+        
+        with self._write_lock():
+            for (pitcher_id, season), game_dates in groups.items():
+                partition = self._load_partition(pitcher_id, season)
+                if partition is None:
+                    meta_data = {'pitcher_id': pitcher_id, 'season': season, 'games': {}}
+                    payloads = {}
+                else:
+                    meta_data, payloads = partition
+                
+                if len(set(payloads) | set(game_dates)) < min_games:
+                    continue
+                
+                merged_dates = []
+                for game_date in game_dates:
+                    file_path, meta_path = self._pitch_data_paths(pitcher_id, game_date)
+                    read_result = self._read_consistent(file_path, meta_path)
+                    if read_result is None:
+                        continue
+                    
+                    game_meta, payload = read_result
+                    payloads[game_date] = payload
+                    meta_data['games'][game_date] = {
+                        'cached_at': game_meta['cached_at'],
+                        'rows': game_meta.get('rows')
+                    }
+                    merged_dates.append(game_date)
+                
+                if not merged_dates:
+                    continue
+                
+                meta_data['compacted_at'] = datetime.now().isoformat()
+                self._write_partition(pitcher_id, season, meta_data, payloads)
+                
+                # パーティションのコミット後に試合単位のファイルを削除（メタデータから先に）
+                for game_date in merged_dates:
+                    file_path, meta_path = self._pitch_data_paths(pitcher_id, game_date)
+                    os.remove(meta_path)
+                    os.remove(file_path)
+                
+                moved += len(merged_dates)
+                self.logger.info(f"{len(merged_dates)}試合分をパーティションにまとめました: {pitcher_id} {season}")
+        
+        return moved
@@ -0,0 +1,185 @@
+"""
+Redis互換のキーバリューストアに接続する最小限のクライアント
+
+RESP2プロトコルで必要なコマンド（GET/SET/MGET/DEL/SADD/SMEMBERS/PING）だけを実装する
+メソッド名と戻り値はredis-pyに合わせているため、redis.Redisのインスタンスと置き換えて使用できる
+"""
+import socket
+import threading
+from typing import Any, List, Optional, Set, Union
+from urllib.parse import urlparse
+
+
+class RespError(Exception):
+    """サーバーがエラー応答を返した場合の例外"""
+
+
+class RespClient:
+    """
+    RESP2プロトコルのクライアント
+
+    1本の接続をロックで保護して共有する。接続が切れた場合は次のコマンドで再接続する
+    """
+
+    def __init__(self, host: str = 'localhost', port: int = 6379, db: int = 0,
+                 password: Optional[str] = None, timeout: float = 5.0):
+        """
+        Parameters:
+        -----------
+        host : str
+            サーバーのホスト名
+        port : int
+            サーバーのポート番号
+        db : int
+            使用するデータベース番号
+        password : Optional[str]
+            認証パスワード。Noneの場合は認証しない
+        timeout : float
+            接続と応答のタイムアウト（秒）
+        """
+        self.host = host
+        self.port = port
+        self.db = db
+        self.password = password
+        self.timeout = timeout
+
+        self._sock: Optional[socket.socket] = None
+        self._reader = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_url(cls, url: str, timeout: float = 5.0) -> "RespClient":
+        """
+        redis://[:password@]host[:port][/db] 形式のURLからクライアントを作成
+
+        Parameters:
+        -----------
+        url : str
+            接続先URL
+        timeout : float
+            接続と応答のタイムアウト（秒）
+        """
+        parsed = urlparse(url)
+        if parsed.scheme != 'redis':
+            raise ValueError(f"未対応のURLスキームです: {parsed.scheme}")
+
+        db = int(parsed.path.lstrip('/')) if parsed.path.lstrip('/') else 0
+        return cls(
+            host=parsed.hostname or 'localhost',
+            port=parsed.port or 6379,
+            db=db,
+            password=parsed.password,
+            timeout=timeout
+        )
+
+    def _connect(self) -> None:
+        """接続を確立し、必要に応じて認証とデータベースの選択を行う"""
+        self._sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        self._reader = self._sock.makefile('rb')
+
+        if self.password is not None:
+            self._send_and_read(['AUTH', self.password])
+        if self.db:
+            self._send_and_read(['SELECT', str(self.db)])
+
+    def _disconnect(self) -> None:
+        """接続を閉じる"""
+        if self._sock is not None:
+            try:
+                self._reader.close()
+                self._sock.close()
+            except OSError:
+                pass
+        self._sock = None
+        self._reader = None
+
+    @staticmethod
+    def _encode(args: List[Union[str, bytes, int]]) -> bytes:
+        """コマンドをRESPの配列としてエンコード"""
+        parts = [f"*{len(args)}\r\n".encode()]
+        for arg in args:
+            if isinstance(arg, str):
+                arg = arg.encode('utf-8')
+            elif isinstance(arg, int):
+                arg = str(arg).encode()
+            parts.append(f"${len(arg)}\r\n".encode())
+            parts.append(arg)
+            parts.append(b"\r\n")
+        return b''.join(parts)
+
+    def _read_reply(self) -> Any:
+        """応答を1つ読み込む"""
+        line = self._reader.readline()
+        if not line:
+            raise ConnectionError("サーバーとの接続が切断されました")
+
+        prefix, body = line[:1], line[1:-2]
+        if prefix == b'+':
+            return body.decode('utf-8')
+        if prefix == b'-':
+            raise RespError(body.decode('utf-8'))
+        if prefix == b':':
+            return int(body)
+        if prefix == b'$':
+            length = int(body)
+            if length < 0:
+                return None
+            data = self._reader.read(length + 2)
+            return data[:-2]
+        if prefix == b'*':
+            length = int(body)
+            if length < 0:
+                return None
+            return [self._read_reply() for _ in range(length)]
+
+        raise RespError(f"不正な応答です: {line!r}")
+
+    def _send_and_read(self, args: List[Union[str, bytes, int]]) -> Any:
+        self._sock.sendall(self._encode(args))
+        return self._read_reply()
+
+    def execute_command(self, *args: Union[str, bytes, int]) -> Any:
+        """
+        コマンドを実行して応答を返す
+
+        接続エラーの場合は1度だけ再接続して再試行する
+        """
+        with self._lock:
+            for attempt in range(2):
+                try:
+                    if self._sock is None:
+                        self._connect()
+                    return self._send_and_read(list(args))
+                except (ConnectionError, OSError):
+                    self._disconnect()
+                    if attempt == 1:
+                        raise
+
+    def ping(self) -> bool:
+        return self.execute_command('PING') == 'PONG'
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self.execute_command('GET', key)
+
+    def mget(self, *keys: str) -> List[Optional[bytes]]:
+        return self.execute_command('MGET', *keys)
+
+    def set(self, key: str, value: Union[str, bytes], ex: Optional[int] = None) -> bool:
+        args: List[Union[str, bytes, int]] = ['SET', key, value]
+        if ex is not None:
+            args += ['EX', int(ex)]
+        return self.execute_command(*args) == 'OK'
+
+    def delete(self, *keys: str) -> int:
+        return self.execute_command('DEL', *keys)
+
+    def sadd(self, key: str, *members: Union[str, bytes]) -> int:
+        return self.execute_command('SADD', key, *members)
+
+    def smembers(self, key: str) -> Set[bytes]:
+        return set(self.execute_command('SMEMBERS', key) or [])
+
+    def close(self) -> None:
+        """接続を閉じる"""
+        with self._lock:
+            self._disconnect()
@@ -0,0 +1,276 @@
+"""
+複数プロセスでDataFrameを共有するためのメモリマップドArrowストア
+
+Streamlitのワーカープロセスごとに同じ投球データをデシリアライズして保持しないよう、
+Arrow IPCファイルをキャッシュディレクトリに書き出し、各プロセスはメモリマップで参照する
+ページはOSのページキャッシュで共有されるため、プロセス数が増えてもメモリ使用量はほぼ一定になる
+
+pyarrowがインストールされていない環境では利用できない（is_available()がFalseを返す）
+"""
+import os
+import re
+import time
+import logging
+import threading
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc as pa_ipc
+except ImportError:
+    pa = None
+    pa_ipc = None
+
+from src.infrastructure.atomic_io import atomic_write_bytes
+
+
+def is_available() -> bool:
+    """共有フレームストアが利用可能か（pyarrowがインストールされているか）"""
+    return pa is not None
+
+
+def _process_alive(pid: int) -> bool:
+    """指定したPIDのプロセスが生存しているか"""
+    if pid == os.getpid():
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class SharedFrameStore:
+    """
+    DataFrameをメモリマップドArrowファイルとして公開・参照するストア
+
+    参照カウントはプロセス単位で「refs/<キー>.<PID>」ファイルとして記録し、
+    どのプロセスからも参照されず一定時間経過したファイルをcleanupで削除する
+    """
+
+    def __init__(self, root_dir: str, max_idle_seconds: float = 3600.0):
+        """
+        Parameters:
+        -----------
+        root_dir : str
+            Arrowファイルを置くディレクトリ
+        max_idle_seconds : float
+            最後に利用されてから、参照がない状態で削除するまでの猶予時間（秒）
+        """
+        if not is_available():
+            raise RuntimeError("共有フレームストアを使用するにはpyarrowが必要です")
+
+        self.root_dir = root_dir
+        self.refs_dir = os.path.join(root_dir, 'refs')
+        self.max_idle_seconds = max_idle_seconds
+        self.logger = logging.getLogger(__name__)
+
+        os.makedirs(self.refs_dir, exist_ok=True)
+
+        # このプロセスで参照中のフレームと参照数
+        self._attached: Dict[str, pd.DataFrame] = {}
+        self._ref_counts: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _safe_key(key: str) -> str:
+        """ファイル名に使えない文字を置き換える"""
+        return re.sub(r'[^A-Za-z0-9_.-]', '_', key)
+
+    def _frame_path(self, key: str) -> str:
+        return os.path.join(self.root_dir, f"{self._safe_key(key)}.arrow")
+
+    def _ref_path(self, key: str) -> str:
+        return os.path.join(self.refs_dir, f"{self._safe_key(key)}.{os.getpid()}")
+
+    @staticmethod
+    def _to_table(data: pd.DataFrame) -> "pa.Table":
+        """
+        DataFrameをArrowテーブルに変換
+
+        浮動小数点列のNaNはnullに変換せずそのまま保持する
+        （nullがあると読み込み時にNaNで埋めるためのコピーが発生するため）
+        """
+        table = pa.Table.from_pandas(data, preserve_index=False)
+
+        for i, column in enumerate(data.columns):
+            values = data[column].to_numpy()
+            if isinstance(values, np.ndarray) and values.dtype.kind == 'f':
+                table = table.set_column(i, table.schema.field(i), pa.array(values, from_pandas=False))
+
+        return table
+
+    def publish(self, key: str, data: pd.DataFrame) -> None:
+        """
+        DataFrameを公開（同じキーが既にあれば置き換える）
+
+        既に参照中のプロセスは置き換え前のファイルを引き続き参照できる
+
+        Parameters:
+        -----------
+        key : str
+            フレームを識別するキー（内容が変わる場合はキーも変えること）
+        data : pd.DataFrame
+            公開するデータ
+        """
+        table = self._to_table(data)
+
+        sink = pa.BufferOutputStream()
+        with pa_ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+
+        atomic_write_bytes(self._frame_path(key), sink.getvalue().to_pybytes(), fsync=False)
+        self.logger.debug(f"共有フレームを公開しました: {key}")
+
+    def unpublish(self, key: str) -> None:
+        """
+        公開したフレームのファイルを削除
+
+        既に参照中のプロセスはメモリマップを通じて引き続き参照できる
+
+        Parameters:
+        -----------
+        key : str
+            フレームを識別するキー
+        """
+        try:
+            os.remove(self._frame_path(key))
+        except FileNotFoundError:
+            pass
+
+    def attach(self, key: str) -> Optional[pd.DataFrame]:
+        """
+        公開済みのフレームをメモリマップで参照
+
+        数値列はメモリマップ上のバッファをそのまま参照するため読み取り専用となる
+
+        Parameters:
+        -----------
+        key : str
+            フレームを識別するキー
+
+        Returns:
+        --------
+        Optional[pd.DataFrame]
+            参照したデータ。公開されていない場合はNone
+        """
+        with self._lock:
+            if key in self._attached:
+                self._ref_counts[key] += 1
+                return self._attached[key]
+
+            frame_path = self._frame_path(key)
+            if not os.path.exists(frame_path):
+                return None
+
+            try:
+                source = pa.memory_map(frame_path, 'r')
+                table = pa_ipc.open_file(source).read_all()
+                data = table.to_pandas(split_blocks=True)
+            except (OSError, pa.ArrowException) as e:
+                self.logger.warning(f"共有フレームを参照できませんでした: {key} ({e})")
+                return None
+
+            # 参照をファイルに記録（他プロセスのcleanupから保護する）
+            with open(self._ref_path(key), 'w') as f:
+                f.write(str(time.time()))
+            # 最終利用日時として更新日時を記録
+            os.utime(frame_path)
+
+            self._attached[key] = data
+            self._ref_counts[key] = 1
+
+        self.logger.debug(f"共有フレームを参照しました: {key}")
+        return data
+
+    def get_attached(self, key: str) -> Optional[pd.DataFrame]:
+        """このプロセスで参照中のフレーム（参照数は変えない）。参照していない場合はNone"""
+        with self._lock:
+            return self._attached.get(key)
+
+    def release(self, key: str) -> None:
+        """
+        フレームの参照を1つ解放し、参照がなくなればプロセスの参照記録を削除
+
+        Parameters:
+        -----------
+        key : str
+            フレームを識別するキー
+        """
+        with self._lock:
+            if key not in self._ref_counts:
+                return
+
+            self._ref_counts[key] -= 1
+            if self._ref_counts[key] > 0:
+                return
+
+            del self._ref_counts[key]
+            del self._attached[key]
+
+            try:
+                os.remove(self._ref_path(key))
+            except FileNotFoundError:
+                pass
+
+    def release_all(self) -> None:
+        """このプロセスのすべての参照を解放"""
+        with self._lock:
+            keys = list(self._ref_counts)
+            self._ref_counts.clear()
+            self._attached.clear()
+
+        for key in keys:
+            try:
+                os.remove(self._ref_path(key))
+            except FileNotFoundError:
+                pass
+
+    def cleanup(self) -> int:
+        """
+        参照されていないフレームを削除
+
+        終了したプロセスの参照記録も削除する
+
+        Returns:
+        --------
+        int
+            削除したフレーム数
+        """
+        live_refs = set()
+        for ref_name in os.listdir(self.refs_dir):
+            base_name, _, pid = ref_name.rpartition('.')
+            if pid.isdigit() and _process_alive(int(pid)):
+                live_refs.add(base_name)
+            else:
+                try:
+                    os.remove(os.path.join(self.refs_dir, ref_name))
+                except FileNotFoundError:
+                    pass
+
+        removed = 0
+        now = time.time()
+        for file_name in os.listdir(self.root_dir):
+            if not file_name.endswith('.arrow'):
+                continue
+
+            base_name = file_name[:-len('.arrow')]
+            if base_name in live_refs:
+                continue
+
+            frame_path = os.path.join(self.root_dir, file_name)
+            try:
+                if now - os.path.getmtime(frame_path) >= self.max_idle_seconds:
+                    os.remove(frame_path)
+                    removed += 1
+            except FileNotFoundError:
+                continue
+
+        if removed:
+            self.logger.info(f"参照されていない共有フレームを{removed}件削除しました")
+        return removed
@@ -0,0 +1,502 @@
+"""
+投手・試合情報と投球データキャッシュの保存先（ストレージバックエンド）
+
+ユースケースが必要とする操作をStorageBackendプロトコルとして定義し、次の実装を提供する
+- 'local': ローカルディスク（ファイル）+ SQLite（DataRepository）
+- 'sqlite': 投球データも含めてすべてを1つのSQLiteファイルに保存（SQLiteStorageBackend）
+- 'redis': Redis互換のキーバリューストア（KeyValueStorageBackend）。複数のダッシュボードノードで
+  同じキャッシュを共有できる
+"""
+import os
+import json
+import pickle
+import sqlite3
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Protocol, runtime_checkable
+
+import pandas as pd
+
+from src.domain.entities import Pitcher, Game
+from src.infrastructure.atomic_io import sha256_bytes
+from src.infrastructure.data_repository import DataRepository
+from src.infrastructure.resp_client import RespClient
+
+
+STORAGE_BACKENDS = ('local', 'sqlite', 'redis')
+
+
+@runtime_checkable
+class StorageBackend(Protocol):
+    """ユースケースから利用するストレージの操作"""
+
+    def save_pitcher_info(self, pitcher: Pitcher) -> None: ...
+
+    def get_pitcher_info(self, pitcher_id: str) -> Optional[Pitcher]: ...
+
+    def save_game_info(self, game: Game) -> None: ...
+
+    def get_games_by_pitcher(self, pitcher_id: str, season: Optional[int] = None) -> List[Game]: ...
+
+    def get_game_pk(self, pitcher_id: str, game_date: str) -> Optional[int]: ...
+
+    def record_game_list_fetch(self, pitcher_id: str, season: int) -> None: ...
+
+    def get_game_list_fetched_at(self, pitcher_id: str, season: int) -> Optional[datetime]: ...
+
+    def save_pitch_data(self, pitcher_id: str, game_date: str, data: pd.DataFrame,
+                        cached_at: Optional[str] = None) -> None: ...
+
+    def get_cached_pitch_data(self, pitcher_id: str, game_date: str,
+                              max_age_days: int = 7) -> Optional[pd.DataFrame]: ...
+
+    def get_pitch_data_cached_at(self, pitcher_id: str, game_date: str) -> Optional[datetime]: ...
+
+    def flush(self, timeout: Optional[float] = None) -> bool: ...
+
+    def close(self, timeout: Optional[float] = 10.0) -> None: ...
+
+
+def _is_expired(cached_at: datetime, max_age_days: int) -> bool:
+    """キャッシュ日時が有効期間を過ぎているか"""
+    return datetime.now() - cached_at > timedelta(days=max_age_days)
+
+
+class SQLiteStorageBackend:
+    """
+    投球データもBLOBとして同じSQLiteファイルに保存するバックエンド
+
+    キャッシュディレクトリを持たないため、ファイル1つをコピーするだけで移行できる
+    複数プロセスから読み書きできるようWALモードを使用する
+    """
+
+    def __init__(self, db_path: str = './data/db.sqlite'):
+        """
+        Parameters:
+        -----------
+        db_path : str
+            SQLiteデータベースファイルのパス
+        """
+        self.db_path = db_path
+        self.logger = logging.getLogger(__name__)
+
+        db_dir = os.path.dirname(db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+        self._init_db()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def _init_db(self) -> None:
+        """
+        データベーススキーマの初期化
+
+        DataRepositoryと同じファイルを使えるよう、既存のテーブルにはDataRepositoryのマイグレーションを適用する
+        """
+        conn = self._connect()
+        try:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.executescript('''
+            CREATE TABLE IF NOT EXISTS pitchers (
+                id TEXT PRIMARY KEY,
+                name TEXT NOT NULL,
+                team TEXT,
+                throws TEXT,
+                updated_at TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS games (
+                id TEXT PRIMARY KEY,
+                date TEXT NOT NULL,
+                pitcher_id TEXT NOT NULL,
+                game_pk INTEGER,
+                season INTEGER,
+                opponent TEXT,
+                stadium TEXT,
+                home_away TEXT
+            );
+            CREATE TABLE IF NOT EXISTS game_list_fetches (
+                pitcher_id TEXT NOT NULL,
+                season INTEGER NOT NULL,
+                fetched_at TEXT NOT NULL,
+                PRIMARY KEY (pitcher_id, season)
+            );
+            CREATE TABLE IF NOT EXISTS pitch_data (
+                pitcher_id TEXT NOT NULL,
+                game_date TEXT NOT NULL,
+                cached_at TEXT NOT NULL,
+                checksum TEXT NOT NULL,
+                payload BLOB NOT NULL,
+                PRIMARY KEY (pitcher_id, game_date)
+            );
+            ''')
+            conn.commit()
+            DataRepository.migrate_schema(conn.cursor())
+        finally:
+            conn.close()
+
+    def save_pitcher_info(self, pitcher: Pitcher) -> None:
+        """投手情報を保存"""
+        conn = self._connect()
+        try:
+            conn.execute('''
+            INSERT OR REPLACE INTO pitchers (id, name, team, throws, updated_at)
+            VALUES (?, ?, ?, ?, ?)
+            ''', (pitcher.id, pitcher.name, pitcher.team, pitcher.throws, datetime.now().isoformat()))
+            conn.commit()
+        finally:
+            conn.close()
+
+    def get_pitcher_info(self, pitcher_id: str) -> Optional[Pitcher]:
+        """投手情報を取得。見つからない場合はNone"""
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                'SELECT id, name, team, throws FROM pitchers WHERE id = ?', (pitcher_id,)
+            ).fetchone()
+        finally:
+            conn.close()
+
+        if row is None:
+            return None
+        return Pitcher(id=row[0], name=row[1], team=row[2], throws=row[3])
+
+    def save_game_info(self, game: Game) -> None:
+        """試合情報を保存（既知のgame_pkは未設定の値で上書きしない）"""
+        conn = self._connect()
+        try:
+            conn.execute('''
+            INSERT INTO games (id, date, pitcher_id, game_pk, season, opponent, stadium, home_away)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(id) DO UPDATE SET
+                game_pk = COALESCE(excluded.game_pk, games.game_pk),
+                opponent = excluded.opponent,
+                stadium = excluded.stadium,
+                home_away = excluded.home_away
+            ''', (f"{game.pitcher_id}_{game.date}", game.date, game.pitcher_id, game.game_pk,
+                  int(game.date[:4]), game.opponent, game.stadium, game.home_away))
+            conn.commit()
+        finally:
+            conn.close()
+
+    def get_games_by_pitcher(self, pitcher_id: str, season: Optional[int] = None) -> List[Game]:
+        """投手の試合情報を新しい順に取得"""
+        query = 'SELECT date, pitcher_id, game_pk, opponent, stadium, home_away FROM games WHERE pitcher_id = ?'
+        params: List[Any] = [pitcher_id]
+        if season is not None:
+            query += ' AND season = ?'
+            params.append(int(season))
+        query += ' ORDER BY date DESC'
+
+        conn = self._connect()
+        try:
+            rows = conn.execute(query, params).fetchall()
+        finally:
+            conn.close()
+
+        return [
+            Game(date=row[0], pitcher_id=row[1], game_pk=row[2],
+                 opponent=row[3], stadium=row[4], home_away=row[5])
+            for row in rows
+        ]
+
+    def get_game_pk(self, pitcher_id: str, game_date: str) -> Optional[int]:
+        """投手IDと試合日からgame_pkを取得"""
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                'SELECT game_pk FROM games WHERE pitcher_id = ? AND date = ?', (pitcher_id, game_date)
+            ).fetchone()
+        finally:
+            conn.close()
+        return row[0] if row else None
+
+    def record_game_list_fetch(self, pitcher_id: str, season: int) -> None:
+        """試合一覧をAPIから取得した日時を記録"""
+        conn = self._connect()
+        try:
+            conn.execute('''
+            INSERT OR REPLACE INTO game_list_fetches (pitcher_id, season, fetched_at)
+            VALUES (?, ?, ?)
+            ''', (pitcher_id, int(season), datetime.now().isoformat()))
+            conn.commit()
+        finally:
+            conn.close()
+
+    def get_game_list_fetched_at(self, pitcher_id: str, season: int) -> Optional[datetime]:
+        """試合一覧をAPIから取得した日時を取得"""
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                'SELECT fetched_at FROM game_list_fetches WHERE pitcher_id = ? AND season = ?',
+                (pitcher_id, int(season))
+            ).fetchone()
+        finally:
+            conn.close()
+        return datetime.fromisoformat(row[0]) if row else None
+
+    def save_pitch_data(self, pitcher_id: str, game_date: str, data: pd.DataFrame,
+                        cached_at: Optional[str] = None) -> None:
+        """投球データを保存"""
+        if data.empty:
+            self.logger.warning("空のデータフレームは保存しません")
+            return
+
+        payload = pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL)
+        conn = self._connect()
+        try:
+            conn.execute('''
+            INSERT OR REPLACE INTO pitch_data (pitcher_id, game_date, cached_at, checksum, payload)
+            VALUES (?, ?, ?, ?, ?)
+            ''', (pitcher_id, game_date, cached_at or datetime.now().isoformat(),
+                  sha256_bytes(payload), sqlite3.Binary(payload)))
+            conn.commit()
+        finally:
+            conn.close()
+
+        self.logger.info(f"投球データを保存しました: {pitcher_id} {game_date}")
+
+    def get_cached_pitch_data(self, pitcher_id: str, game_date: str,
+                              max_age_days: int = 7) -> Optional[pd.DataFrame]:
+        """有効期間内の投球データを取得。ない場合はNone"""
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                'SELECT cached_at, checksum, payload FROM pitch_data WHERE pitcher_id = ? AND game_date = ?',
+                (pitcher_id, game_date)
+            ).fetchone()
+        finally:
+            conn.close()
+
+        if row is None:
+            return None
+
+        cached_at, checksum, payload = row
+        if _is_expired(datetime.fromisoformat(cached_at), max_age_days):
+            self.logger.info(f"キャッシュの有効期限が切れています: {pitcher_id} {game_date}")
+            return None
+
+        if sha256_bytes(bytes(payload)) != checksum:
+            self.logger.warning(f"チェックサムが一致しないためキャッシュを無視します: {pitcher_id} {game_date}")
+            return None
+
+        return pickle.loads(payload)
+
+    def get_pitch_data_cached_at(self, pitcher_id: str, game_date: str) -> Optional[datetime]:
+        """投球データがキャッシュされた日時を取得"""
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                'SELECT cached_at FROM pitch_data WHERE pitcher_id = ? AND game_date = ?',
+                (pitcher_id, game_date)
+            ).fetchone()
+        finally:
+            conn.close()
+        return datetime.fromisoformat(row[0]) if row else None
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """書き込みは同期的に行うため常にTrue"""
+        return True
+
+    def close(self, timeout: Optional[float] = 10.0) -> None:
+        """接続は操作ごとに閉じているため何もしない"""
+
+
+class KeyValueStorageBackend:
+    """
+    Redis互換のキーバリューストアに保存するバックエンド
+
+    キーの構成（prefixは既定で'mlb_pitch:'）:
+    - pitcher:<投手ID>                 投手情報（JSON）
+    - games:<投手ID>                   試合日の集合
+    - game:<投手ID>:<試合日>            試合情報（JSON）
+    - game_list_fetch:<投手ID>:<年>     試合一覧の取得日時
+    - pitch:<投手ID>:<試合日>           投球データ（pickle）
+    - pitch_meta:<投手ID>:<試合日>      投球データのキャッシュ日時とチェックサム（JSON）
+
+    投球データは本体を先に書き込み、メタデータを最後に書き込む。読み込みはMGETで両方を
+    同時に取得し、チェックサムが一致しない組み合わせは無視する
+    """
+
+    def __init__(self, client: Any, prefix: str = 'mlb_pitch:', pitch_data_ttl_seconds: Optional[int] = None):
+        """
+        Parameters:
+        -----------
+        client : Any
+            RespClientまたはredis.Redisなど、get/mget/set/delete/sadd/smembersを持つクライアント
+        prefix : str
+            すべてのキーに付ける接頭辞
+        pitch_data_ttl_seconds : Optional[int]
+            投球データをストアから削除するまでの秒数。Noneの場合は削除しない
+        """
+        self.client = client
+        self.prefix = prefix
+        self.pitch_data_ttl_seconds = pitch_data_ttl_seconds
+        self.logger = logging.getLogger(__name__)
+
+    def _key(self, *parts: Any) -> str:
+        return self.prefix + ':'.join(str(part) for part in parts)
+
+    @staticmethod
+    def _decode(value: Optional[bytes]) -> Optional[str]:
+        if value is None:
+            return None
+        return value.decode('utf-8') if isinstance(value, bytes) else value
+
+    def save_pitcher_info(self, pitcher: Pitcher) -> None:
+        """投手情報を保存"""
+        self.client.set(self._key('pitcher', pitcher.id), json.dumps({
+            'id': pitcher.id, 'name': pitcher.name, 'team': pitcher.team, 'throws': pitcher.throws
+        }, ensure_ascii=False))
+
+    def get_pitcher_info(self, pitcher_id: str) -> Optional[Pitcher]:
+        """投手情報を取得。見つからない場合はNone"""
+        value = self._decode(self.client.get(self._key('pitcher', pitcher_id)))
+        return Pitcher(**json.loads(value)) if value is not None else None
+
+    def save_game_info(self, game: Game) -> None:
+        """試合情報を保存（既知のgame_pkは未設定の値で上書きしない）"""
+        game_key = self._key('game', game.pitcher_id, game.date)
+        game_pk = game.game_pk
+        if game_pk is None:
+            existing = self._decode(self.client.get(game_key))
+            if existing is not None:
+                game_pk = json.loads(existing).get('game_pk')
+
+        self.client.set(game_key, json.dumps({
+            'date': game.date, 'pitcher_id': game.pitcher_id, 'game_pk': game_pk,
+            'opponent': game.opponent, 'stadium': game.stadium, 'home_away': game.home_away
+        }, ensure_ascii=False))
+        self.client.sadd(self._key('games', game.pitcher_id), game.date)
+
+    def get_games_by_pitcher(self, pitcher_id: str, season: Optional[int] = None) -> List[Game]:
+        """投手の試合情報を新しい順に取得"""
+        dates = sorted((self._decode(d) for d in self.client.smembers(self._key('games', pitcher_id))), reverse=True)
+        if season is not None:
+            dates = [d for d in dates if d[:4] == str(season)]
+        if not dates:
+            return []
+
+        values = self.client.mget(*[self._key('game', pitcher_id, d) for d in dates])
+        return [Game(**json.loads(self._decode(v))) for v in values if v is not None]
+
+    def get_game_pk(self, pitcher_id: str, game_date: str) -> Optional[int]:
+        """投手IDと試合日からgame_pkを取得"""
+        value = self._decode(self.client.get(self._key('game', pitcher_id, game_date)))
+        return json.loads(value).get('game_pk') if value is not None else None
+
+    def record_game_list_fetch(self, pitcher_id: str, season: int) -> None:
+        """試合一覧をAPIから取得した日時を記録"""
+        self.client.set(self._key('game_list_fetch', pitcher_id, int(season)), datetime.now().isoformat())
+
+    def get_game_list_fetched_at(self, pitcher_id: str, season: int) -> Optional[datetime]:
+        """試合一覧をAPIから取得した日時を取得"""
+        value = self._decode(self.client.get(self._key('game_list_fetch', pitcher_id, int(season))))
+        return datetime.fromisoformat(value) if value is not None else None
+
+    def save_pitch_data(self, pitcher_id: str, game_date: str, data: pd.DataFrame,
+                        cached_at: Optional[str] = None) -> None:
+        """投球データを保存"""
+        if data.empty:
+            self.logger.warning("空のデータフレームは保存しません")
+            return
+
+        payload = pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL)
+        meta = json.dumps({
+            'cached_at': cached_at or datetime.now().isoformat(),
+            'checksum': sha256_bytes(payload),
+            'rows': len(data)
+        })
+
+        ttl = self.pitch_data_ttl_seconds
+        self.client.set(self._key('pitch', pitcher_id, game_date), payload, ex=ttl)
+        self.client.set(self._key('pitch_meta', pitcher_id, game_date), meta, ex=ttl)
+        self.logger.info(f"投球データを保存しました: {pitcher_id} {game_date}")
+
+    def _read_pitch_data(self, pitcher_id: str, game_date: str) -> Optional[tuple]:
+        """メタデータと本体を同時に取得し、整合している場合のみ返す"""
+        meta_value, payload = self.client.mget(
+            self._key('pitch_meta', pitcher_id, game_date),
+            self._key('pitch', pitcher_id, game_date)
+        )
+        if meta_value is None or payload is None:
+            return None
+
+        meta = json.loads(self._decode(meta_value))
+        if sha256_bytes(payload) != meta['checksum']:
+            self.logger.warning(f"チェックサムが一致しないためキャッシュを無視します: {pitcher_id} {game_date}")
+            return None
+
+        return meta, payload
+
+    def get_cached_pitch_data(self, pitcher_id: str, game_date: str,
+                              max_age_days: int = 7) -> Optional[pd.DataFrame]:
+        """有効期間内の投球データを取得。ない場合はNone"""
+        read_result = self._read_pitch_data(pitcher_id, game_date)
+        if read_result is None:
+            return None
+
+        meta, payload = read_result
+        if _is_expired(datetime.fromisoformat(meta['cached_at']), max_age_days):
+            self.logger.info(f"キャッシュの有効期限が切れています: {pitcher_id} {game_date}")
+            return None
+
+        return pickle.loads(payload)
+
+    def get_pitch_data_cached_at(self, pitcher_id: str, game_date: str) -> Optional[datetime]:
+        """投球データがキャッシュされた日時を取得"""
+        value = self._decode(self.client.get(self._key('pitch_meta', pitcher_id, game_date)))
+        return datetime.fromisoformat(json.loads(value)['cached_at']) if value is not None else None
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """書き込みは同期的に行うため常にTrue"""
+        return True
+
+    def close(self, timeout: Optional[float] = 10.0) -> None:
+        """クライアントの接続を閉じる"""
+        close = getattr(self.client, 'close', None)
+        if close is not None:
+            close()
+
+
+def create_storage_backend(config: Dict[str, Any]) -> StorageBackend:
+    """
+    設定からストレージバックエンドを作成
+
+    Parameters:
+    -----------
+    config : Dict[str, Any]
+        アプリケーション設定。'storage_backend'（'local', 'sqlite', 'redis'）で種類を選択する
+
+    Returns:
+    --------
+    StorageBackend
+        作成したバックエンド
+    """
+    backend = config.get('storage_backend', 'local')
+    db_path = config.get('db_path', './data/db.sqlite')
+
+    if backend == 'local':
+        return DataRepository(
+            cache_dir=config.get('cache_dir', './data'),
+            db_path=db_path,
+            max_cache_bytes=config.get('cache_max_bytes'),
+            max_cache_entries=config.get('cache_max_entries'),
+            eviction_policy=config.get('cache_eviction_policy', 'lru'),
+            write_behind=config.get('cache_write_behind', True),
+            shared_frames=config.get('cache_shared_frames', False),
+            shared_frames_max_attached=config.get('cache_shared_frames_max_attached', 32)
+        )
+
+    if backend == 'sqlite':
+        return SQLiteStorageBackend(db_path=db_path)
+
+    if backend == 'redis':
+        client = RespClient.from_url(config.get('redis_url', 'redis://localhost:6379/0'))
+        return KeyValueStorageBackend(
+            client,
+            prefix=config.get('redis_prefix', 'mlb_pitch:'),
+            pitch_data_ttl_seconds=config.get('redis_pitch_data_ttl_seconds')
+        )
+
+    raise ValueError(f"未対応のストレージバックエンドです: {backend}")
@@ -0,0 +1,175 @@
+"""
+キャッシュへの書き込みをバックグラウンドで行うライトビハインドキュー
+"""
+import queue
+import logging
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+
+class WriteBehindQueue:
+    """
+    書き込み処理をバックグラウンドスレッドで実行するキュー
+
+    同じキーへの書き込みが未処理のまま複数届いた場合は最新のものだけを書き込む
+    書き込み待ちの値は get_pending で参照できるため、読み手は書き込み完了を待つ必要がない
+    プロセス終了時には自動で停止しないため、所有者が close を呼んで書き込み待ちを保存すること
+    """
+
+    def __init__(self, writer: Callable[..., None], max_pending: int = 32, name: str = 'write-behind'):
+        """
+        Parameters:
+        -----------
+        writer : Callable[..., None]
+            実際の書き込みを行う関数。submitに渡した引数で呼び出される
+        max_pending : int
+            書き込み待ちにできる最大件数。超えた場合、submitは空きができるまで待機する
+        name : str
+            バックグラウンドスレッドの名前
+        """
+        self.writer = writer
+        self.name = name
+        self.logger = logging.getLogger(__name__)
+
+        self._queue: "queue.Queue[Optional[Hashable]]" = queue.Queue(maxsize=max_pending)
+        self._pending: Dict[Hashable, Tuple[Any, ...]] = {}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+
+    def _ensure_thread(self) -> None:
+        """バックグラウンドスレッドを必要になった時点で起動"""
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+
+    def submit(self, key: Hashable, *args: Any) -> None:
+        """
+        書き込みをキューに追加
+
+        Parameters:
+        -----------
+        key : Hashable
+            書き込み対象を識別するキー
+        *args : Any
+            writerに渡す引数
+        """
+        if self._closed:
+            raise RuntimeError("ライトビハインドキューは既に停止しています")
+
+        with self._lock:
+            already_queued = key in self._pending
+            self._pending[key] = args
+            self._ensure_thread()
+
+        # 同じキーが既にキューにある場合は値の差し替えだけで済む
+        if not already_queued:
+            self._queue.put(key)
+
+    def get_pending(self, key: Hashable) -> Optional[Tuple[Any, ...]]:
+        """
+        書き込み待ちの値を取得
+
+        Returns:
+        --------
+        Optional[Tuple[Any, ...]]
+            submitに渡した引数。書き込み待ちでない場合はNone
+        """
+        with self._lock:
+            return self._pending.get(key)
+
+    def discard(self, key: Hashable) -> None:
+        """書き込み待ちの値を破棄（キャッシュ削除時など）"""
+        with self._lock:
+            self._pending.pop(key, None)
+
+    @property
+    def pending_count(self) -> int:
+        """書き込み待ちの件数"""
+        with self._lock:
+            return len(self._pending)
+
+    def _run(self) -> None:
+        """バックグラウンドスレッドの処理"""
+        while True:
+            key = self._queue.get()
+            try:
+                if key is None:
+                    return
+
+                # 書き込み中に新しい値が届いた場合は続けて書き込む
+                while True:
+                    with self._lock:
+                        args = self._pending.get(key)
+
+                    if args is None:
+                        break
+
+                    try:
+                        self.writer(*args)
+                    except Exception as e:
+                        self.logger.error(f"バックグラウンド書き込み中にエラーが発生しました ({key}): {e}")
+
+                    with self._lock:
+                        if self._pending.get(key) is args:
+                            del self._pending[key]
+                            break
+            finally:
+                self._queue.task_done()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        書き込み待ちがなくなるまで待機
+
+        Parameters:
+        -----------
+        timeout : Optional[float]
+            最大待機時間（秒）。Noneの場合は完了するまで待つ
+
+        Returns:
+        --------
+        bool
+            すべての書き込みが完了した場合はTrue
+        """
+        if self._thread is None:
+            return True
+
+        done = threading.Event()
+
+        def wait_queue():
+            self._queue.join()
+            done.set()
+
+        threading.Thread(target=wait_queue, daemon=True).start()
+        return done.wait(timeout)
+
+    def close(self, timeout: Optional[float] = 10.0) -> bool:
+        """
+        書き込み待ちをできるだけ処理してからスレッドを停止
+
+        Parameters:
+        -----------
+        timeout : Optional[float]
+            書き込み完了を待つ最大時間（秒）
+
+        Returns:
+        --------
+        bool
+            すべての書き込みが完了した場合はTrue
+        """
+        if self._closed:
+            return self.pending_count == 0
+
+        self._closed = True
+
+        flushed = self.flush(timeout)
+        if not flushed:
+            self.logger.warning(f"{self.pending_count}件の書き込みが完了しないまま停止します")
+
+        if self._thread is not None and self._thread.is_alive():
+            try:
+                self._queue.put_nowait(None)
+            except queue.Full:
+                pass
+
+        return flushed
@@ -27,6 +27,15 @@ def parse_args() -> Dict[str, Any]:
     parser.add_argument('--api-rate-limit', type=float, default=2.0,
                         help='API呼び出しの最小間隔（秒）')
     
+    parser.add_argument('--cache-max-bytes', type=int, default=None,
+                        help='投球データキャッシュの最大合計サイズ（バイト）')
+    
+    parser.add_argument('--cache-max-entries', type=int, default=None,
+                        help='投球データキャッシュの最大試合数')
+    
+    parser.add_argument('--cache-eviction-policy', default='lru', choices=['lru', 'lfu'],
+                        help='キャッシュ容量超過時のエビクションポリシー')
+    
     args = parser.parse_args()
     
     # 設定辞書を作成
@@ -35,6 +44,9 @@ def parse_args() -> Dict[str, Any]:
         'cache_dir': args.cache_dir,
         'db_path': args.db_path,
         'api_rate_limit': args.api_rate_limit,
+        'cache_max_bytes': args.cache_max_bytes,
+        'cache_max_entries': args.cache_max_entries,
+        'cache_eviction_policy': args.cache_eviction_policy,
         'log_dir': 'logs'
     }
     
@@ -46,8 +58,8 @@ def main() -> None:
     config = parse_args()
     
     try:
-        # サービスファクトリの初期化
-        factory = ServiceFactory(config)
+        # サービスファクトリの取得（Streamlitの再実行間で共有）
+        factory = ServiceFactory.shared(config)
         logger = logging.getLogger(__name__)
         logger.info("アプリケーションを起動します")
         
@@ -0,0 +1,17 @@
+"""
+グラフ間で共通の配色
+"""
+import numpy as np
+
+from src.domain.pitch_outcomes import EVENT_CODES
+
+
+# 被打球の結果コード（EVENT_CODES）ごとの色（安打の種類とアウト以外はグレー）
+# 結果コードの配列で添字参照すれば、打球ごとの色の配列をまとめて得られる
+BATTED_BALL_RESULT_COLORS = np.full(max(EVENT_CODES.values()) + 1, 'gray', dtype=object)
+BATTED_BALL_RESULT_COLORS[EVENT_CODES['single']] = 'green'
+BATTED_BALL_RESULT_COLORS[EVENT_CODES['double']] = 'blue'
+BATTED_BALL_RESULT_COLORS[EVENT_CODES['triple']] = 'purple'
+BATTED_BALL_RESULT_COLORS[EVENT_CODES['home_run']] = 'red'
+BATTED_BALL_RESULT_COLORS[EVENT_CODES['out']] = 'black'
+BATTED_BALL_RESULT_COLORS[EVENT_CODES['strikeout']] = 'black'
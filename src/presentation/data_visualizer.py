@@ -17,6 +17,8 @@ from matplotlib.figure import Figure
 
 # 球種の日本語名マッピング - すでに変換済みのデータを使用するため冗長だが保険として残す
 from src.domain.pitch_utils import PITCH_TYPE_MAPPING, get_pitch_name_ja
+from src.domain.batted_balls import batted_ball_points
+from src.presentation.chart_colors import BATTED_BALL_RESULT_COLORS
 
 
 class DataVisualizer:
@@ -383,39 +385,20 @@ class DataVisualizer:
         has_coordinates = 'hc_x' in batted_ball_data.columns and 'hc_y' in batted_ball_data.columns
         
         if has_coordinates:
-            # 座標のスケール調整（StatcastのX,Y座標を描画用に変換）
-            x_coords = batted_ball_data['hc_x'].values
-            y_coords = batted_ball_data['hc_y'].values
-            
-            # 結果でカラー分け
-            colors = []
-            for result in batted_ball_data['hit_result']:
-                if pd.isna(result):
-                    colors.append('gray')
-                elif 'single' in str(result).lower():
-                    colors.append('green')
-                elif 'double' in str(result).lower():
-                    colors.append('blue')
-                elif 'triple' in str(result).lower():
-                    colors.append('purple')
-                elif 'home' in str(result).lower():
-                    colors.append('red')
-                elif 'out' in str(result).lower():
-                    colors.append('black')
-                else:
-                    colors.append('gray')
+            # 座標のスケール調整（Statcastの打球座標を本塁を原点とするフィート単位の座標に変換）
+            points = batted_ball_points(batted_ball_data)
+            x_coords = points['field_x']
+            y_coords = points['field_y']
+            
+            # 結果でカラー分け（結果コードから色を引く）
+            colors = BATTED_BALL_RESULT_COLORS[points['result_code']].tolist()
             
-            # サイズを打球速度から決定
-            sizes = []
+            # サイズを打球速度から決定（50-200の範囲）
             if 'launch_speed' in batted_ball_data.columns:
-                for speed in batted_ball_data['launch_speed']:
-                    if pd.isna(speed):
-                        sizes.append(50)
-                    else:
-                        # 50-200の範囲でサイズを設定
-                        sizes.append(50 + min(150, speed))
+                speeds = pd.to_numeric(batted_ball_data['launch_speed'], errors='coerce').to_numpy(dtype=float)
+                sizes = np.where(np.isnan(speeds), 50, 50 + np.minimum(150, speeds))
             else:
-                sizes = [100] * len(x_coords)
+                sizes = np.full(len(x_coords), 100)
             
             # 散布図描画
             scatter = ax.scatter(x_coords, y_coords, c=colors, s=sizes, alpha=0.6)
@@ -12,6 +12,8 @@ from typing import Dict, List, Any, Optional, Tuple
 
 # 球種の日本語名マッピング - すでに変換済みのデータを使用するため冗長だが保険として残す
 from src.domain.pitch_utils import PITCH_TYPE_MAPPING, get_pitch_name_ja
+from src.domain.batted_balls import batted_ball_points
+from src.presentation.chart_colors import BATTED_BALL_RESULT_COLORS
 
 
 class PlotlyVisualizer:
@@ -564,56 +566,38 @@ class PlotlyVisualizer:
         has_coordinates = 'hc_x' in batted_ball_data.columns and 'hc_y' in batted_ball_data.columns
         
         if has_coordinates:
-            # 座標のスケール調整
-            x_coords = batted_ball_data['hc_x'].values
-            y_coords = batted_ball_data['hc_y'].values
+            # 打球座標を本塁を原点とするフィート単位の座標に変換し、結果をコードに変換
+            points = batted_ball_points(batted_ball_data)
+            x_coords = points['field_x']
+            y_coords = points['field_y']
             
-            # 結果でカラー分け
-            colors = []
-            for result in batted_ball_data['hit_result']:
-                if pd.isna(result):
-                    colors.append('gray')
-                elif 'single' in str(result).lower():
-                    colors.append('green')
-                elif 'double' in str(result).lower():
-                    colors.append('blue')
-                elif 'triple' in str(result).lower():
-                    colors.append('purple')
-                elif 'home' in str(result).lower():
-                    colors.append('red')
-                elif 'out' in str(result).lower():
-                    colors.append('black')
-                else:
-                    colors.append('gray')
+            # 結果でカラー分け（結果コードから色を引く）
+            colors = BATTED_BALL_RESULT_COLORS[points['result_code']]
             
-            # サイズを打球速度から決定
-            sizes = []
+            # サイズを打球速度から決定（8-30の範囲）
             if 'launch_speed' in batted_ball_data.columns:
-                for speed in batted_ball_data['launch_speed']:
-                    if pd.isna(speed):
-                        sizes.append(12)
-                    else:
-                        # 8-30の範囲でサイズを設定
-                        sizes.append(8 + min(22, speed / 5))
+                speeds = pd.to_numeric(batted_ball_data['launch_speed'], errors='coerce').to_numpy(dtype=float)
+                sizes = np.where(np.isnan(speeds), 12, 8 + np.minimum(22, speeds / 5))
             else:
-                sizes = [15] * len(x_coords)
+                sizes = np.full(len(x_coords), 15)
             
-            # ホバー情報の準備
-            hover_data = []
-            for i in range(len(x_coords)):
-                info = {}
-                if 'pitch_type' in batted_ball_data.columns:
-                    info['球種'] = batted_ball_data['pitch_type'].iloc[i] if not pd.isna(batted_ball_data['pitch_type'].iloc[i]) else '不明'
-                if 'launch_speed' in batted_ball_data.columns:
-                    info['打球速度'] = f"{batted_ball_data['launch_speed'].iloc[i]:.1f} mph" if not pd.isna(batted_ball_data['launch_speed'].iloc[i]) else '不明'
-                if 'launch_angle' in batted_ball_data.columns:
-                    info['打角'] = f"{batted_ball_data['launch_angle'].iloc[i]:.1f}°" if not pd.isna(batted_ball_data['launch_angle'].iloc[i]) else '不明'
-                if 'hit_distance_sc' in batted_ball_data.columns:
-                    info['飛距離'] = f"{batted_ball_data['hit_distance_sc'].iloc[i]:.1f} ft" if not pd.isna(batted_ball_data['hit_distance_sc'].iloc[i]) else '不明'
-                
-                # ホバーテキストの作成
-                hover_text = '<br>'.join([f"{k}: {v}" for k, v in info.items()])
-                hover_data.append(hover_text)
+            # ホバー情報の準備（列ごとにまとめて文字列化する）
+            hover_parts = []
+            if 'pitch_type' in batted_ball_data.columns:
+                hover_parts.append('球種: ' + batted_ball_data['pitch_type'].astype(object).fillna('不明').astype(str))
+            for column, label, unit in [('launch_speed', '打球速度', ' mph'), ('launch_angle', '打角', '°'),
+                                        ('hit_distance_sc', '飛距離', ' ft')]:
+                if column in batted_ball_data.columns:
+                    values = pd.to_numeric(batted_ball_data[column], errors='coerce')
+                    text = values.map('{:.1f}'.format).where(values.notna(), None) + unit
+                    hover_parts.append(f'{label}: ' + text.fillna('不明'))
+            if hover_parts:
+                hover_data = hover_parts[0]
+                for part in hover_parts[1:]:
+                    hover_data = hover_data + '<br>' + part
+                hover_data = hover_data.tolist()
+            else:
+                hover_data = [''] * len(x_coords)
             
             # 散布図の追加
             fig.add_trace(go.Scatter(
@@ -621,7 +605,7 @@ class PlotlyVisualizer:
                 y=y_coords,
                 mode='markers',
                 marker=dict(
-                    color=colors,
+                    color=colors.tolist(),
                     size=sizes,
                     opacity=0.7,
                     line=dict(width=1, color='gray')
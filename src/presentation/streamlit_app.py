@@ -81,6 +81,8 @@ class StreamlitApp:
                                 st.session_state['selected_pitcher'] = selected_pitcher
                                 st.session_state['games'] = games
                                 st.success(f"{len(games)}試合のデータを取得しました")
+                                if self.use_case.is_refreshing_games(selected_pitcher.id, season):
+                                    st.caption("試合一覧をバックグラウンドで更新中です")
                             else:
                                 st.warning(f"{season}シーズンの試合データが見つかりませんでした")
                         except Exception as e:
@@ -111,13 +113,15 @@ class StreamlitApp:
                 with st.spinner(f"{pitcher.name}の{game.date}の試合を分析中..."):
                     try:
                         # 分析実行
-                        result = self.use_case.analyze_game(pitcher.id, game.date)
+                        result = self.use_case.analyze_game(pitcher.id, game.date, game_pk=game.game_pk)
                         
                         if result.error:
                             st.error(f"分析エラー: {result.error}")
                         else:
                             # 分析結果表示
                             st.header(f"{result.pitcher_name} - {result.game_date}の投球分析")
+                            if result.is_refreshing:
+                                st.caption("キャッシュされたデータを表示しています（バックグラウンドで最新データに更新中）")
                             
                             # タブで結果表示
                             tab1, tab2, tab3, tab4 = st.tabs(["概要", "イニング分析", "球種分析", "被打球分析"])
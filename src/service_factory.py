@@ -3,15 +3,24 @@
 アプリケーション全体の依存性を管理し、必要なオブジェクトを提供する
 """
 import os
+import json
+import atexit
 import logging
-from typing import Dict, Any
+import threading
+from datetime import timedelta
+from typing import Dict, Any, Optional
 
 from src.infrastructure.baseball_savant_client import BaseballSavantClient
-from src.infrastructure.data_repository import DataRepository
+from src.infrastructure.storage_backend import StorageBackend, create_storage_backend
+from src.infrastructure.analysis_memo import AnalysisMemo
+from src.infrastructure.artifact_store import GameArtifactStore
 from src.domain.pitch_analyzer import PitchAnalyzer
+from src.domain.expected_outcomes import ExpectedOutcomeTable
 from src.presentation.data_visualizer import DataVisualizer
 from src.presentation.plotly_visualizer import PlotlyVisualizer
 from src.application.usecases import PitcherGameAnalysisUseCase
+from src.application.background_refresher import BackgroundRefresher
+from src.application.batch_runner import BatchAnalysisRunner
 from src.presentation.streamlit_app import StreamlitApp
 from src.presentation.plotly_streamlit_app import PlotlyStreamlitApp
 from src.config import get_config
@@ -23,6 +32,10 @@ class ServiceFactory:
     アプリケーション全体の依存性を管理し、必要なオブジェクトを提供する
     """
     
+    # プロセス内で共有するファクトリ（設定ごと）
+    _shared: Dict[str, "ServiceFactory"] = {}
+    _shared_lock = threading.Lock()
+    
     def __init__(self, config: Dict[str, Any] = None):
         """
         Parameters:
@@ -41,6 +54,51 @@ class ServiceFactory:
         # 設定からビジュアライザーの種類を判断
         self.use_plotly = self.config.get('use_plotly', True)  # デフォルトでPlotlyを使用
     
+    @classmethod
+    def shared(cls, config: Dict[str, Any] = None) -> "ServiceFactory":
+        """
+        設定ごとにプロセス内で1つのファクトリを作成/取得
+        
+        Streamlitのように操作のたびにスクリプトが再実行される場合でも、リポジトリの
+        バックグラウンド書き込みスレッド、バックグラウンド更新（実行中の更新の重複排除）、
+        APIクライアント（レート制限）、ライブ試合の分析器を再実行間で共有する
+        作成したファクトリはプロセス終了時にまとめて閉じる
+        
+        Parameters:
+        -----------
+        config : Dict[str, Any], optional
+            アプリケーション設定
+        """
+        key = json.dumps(config or {}, sort_keys=True, default=str)
+        with cls._shared_lock:
+            if key not in cls._shared:
+                if not cls._shared:
+                    atexit.register(cls.close_shared)
+                cls._shared[key] = cls(config)
+            return cls._shared[key]
+    
+    @classmethod
+    def close_shared(cls) -> None:
+        """sharedで作成したすべてのファクトリを閉じる"""
+        with cls._shared_lock:
+            factories = list(cls._shared.values())
+            cls._shared.clear()
+            atexit.unregister(cls.close_shared)
+        
+        for factory in factories:
+            factory.close()
+    
+    def close(self) -> None:
+        """バックグラウンド更新を停止し、作成したデータリポジトリの書き込み待ちを保存してから停止"""
+        refresher = self._instances.pop('background_refresher', None)
+        if refresher is not None:
+            refresher.shutdown(wait=False)
+        
+        repository = self._instances.pop('data_repository', None)
+        if repository is not None:
+            repository.close()
+            self.logger.info("データリポジトリを閉じました")
+    
     def _setup_logging(self) -> None:
         """ロギングの設定"""
         log_level = self.config.get('log_level', 'INFO')
@@ -69,28 +127,53 @@ class ServiceFactory:
         
         return self._instances['baseball_savant_client']
     
-    def create_data_repository(self) -> DataRepository:
-        """DataRepositoryのインスタンスを作成/取得"""
+    def create_data_repository(self) -> StorageBackend:
+        """
+        データリポジトリ（ストレージバックエンド）のインスタンスを作成/取得
+        
+        設定の'storage_backend'で保存先を選択する（'local', 'sqlite', 'redis'）
+        """
         if 'data_repository' not in self._instances:
             cache_dir = self.config.get('cache_dir', './data')
             db_path = self.config.get('db_path', './data/db.sqlite')
+            backend = self.config.get('storage_backend', 'local')
             
             # キャッシュディレクトリの作成
             os.makedirs(cache_dir, exist_ok=True)
             
-            self._instances['data_repository'] = DataRepository(cache_dir=cache_dir, db_path=db_path)
-            self.logger.info(f"DataRepositoryを作成しました (cache_dir: {cache_dir}, db_path: {db_path})")
+            self._instances['data_repository'] = create_storage_backend(self.config)
+            self.logger.info(
+                f"データリポジトリを作成しました (backend: {backend}, cache_dir: {cache_dir}, db_path: {db_path})"
+            )
         
         return self._instances['data_repository']
     
     def create_pitch_analyzer(self) -> PitchAnalyzer:
         """PitchAnalyzerのインスタンスを作成/取得"""
         if 'pitch_analyzer' not in self._instances:
-            self._instances['pitch_analyzer'] = PitchAnalyzer()
+            self._instances['pitch_analyzer'] = PitchAnalyzer(expected_outcomes=self._load_expected_outcomes())
             self.logger.info("PitchAnalyzerを作成しました")
         
         return self._instances['pitch_analyzer']
     
+    def _load_expected_outcomes(self) -> Optional[ExpectedOutcomeTable]:
+        """
+        保存済みの期待打率・期待wOBAの表のうち最新のシーズンのもの（ない場合はNone）
+        
+        ユースケースは試合のシーズンの表を使い、この表はシーズンを指定しない分析と表がないシーズンの分析で使う
+        """
+        store = self.create_artifact_store()
+        seasons = store.list_seasons(ExpectedOutcomeTable.KIND, ExpectedOutcomeTable.VERSION)
+        if not seasons:
+            return None
+        
+        arrays = store.load_season(ExpectedOutcomeTable.KIND, ExpectedOutcomeTable.VERSION, seasons[-1])
+        try:
+            return ExpectedOutcomeTable.from_arrays(arrays) if arrays is not None else None
+        except (KeyError, ValueError) as e:
+            self.logger.warning(f"期待打率・期待wOBAの表を読み込めませんでした: {str(e)}")
+            return None
+    
     def create_data_visualizer(self) -> DataVisualizer:
         """DataVisualizerのインスタンスを作成/取得"""
         if 'data_visualizer' not in self._instances:
@@ -107,22 +190,82 @@ class ServiceFactory:
         
         return self._instances['plotly_visualizer']
     
+    def create_background_refresher(self) -> BackgroundRefresher:
+        """BackgroundRefresherのインスタンスを作成/取得"""
+        if 'background_refresher' not in self._instances:
+            self._instances['background_refresher'] = BackgroundRefresher()
+            self.logger.info("BackgroundRefresherを作成しました")
+        
+        return self._instances['background_refresher']
+    
+    def create_analysis_memo(self) -> Optional[AnalysisMemo]:
+        """
+        分析結果のメモ化に使うAnalysisMemoのインスタンスを作成/取得
+        
+        設定の'analysis_memo'がFalseの場合はNoneを返す
+        """
+        if not self.config.get('analysis_memo', True):
+            return None
+        
+        if 'analysis_memo' not in self._instances:
+            cache_dir = self.config.get('cache_dir', './data')
+            self._instances['analysis_memo'] = AnalysisMemo(
+                db_path=os.path.join(cache_dir, 'analysis_memo.sqlite'),
+                max_entries=self.config.get('analysis_memo_max_entries', 5000),
+                max_bytes=self.config.get('analysis_memo_max_bytes')
+            )
+            self.logger.info("AnalysisMemoを作成しました")
+        
+        return self._instances['analysis_memo']
+    
+    def create_artifact_store(self) -> GameArtifactStore:
+        """試合ごとの集計とリーグ全体の分布を保存するGameArtifactStoreのインスタンスを作成/取得"""
+        if 'artifact_store' not in self._instances:
+            cache_dir = self.config.get('cache_dir', './data')
+            self._instances['artifact_store'] = GameArtifactStore(os.path.join(cache_dir, 'artifacts'))
+            self.logger.info("GameArtifactStoreを作成しました")
+        
+        return self._instances['artifact_store']
+    
     def create_pitcher_game_analysis_use_case(self) -> PitcherGameAnalysisUseCase:
         """PitcherGameAnalysisUseCaseのインスタンスを作成/取得"""
         if 'pitcher_game_analysis_use_case' not in self._instances:
             client = self.create_baseball_savant_client()
             repository = self.create_data_repository()
             analyzer = self.create_pitch_analyzer()
+            refresher = self.create_background_refresher()
+            soft_ttl_hours = self.config.get('cache_soft_ttl_hours', 24.0)
+            memo = self.create_analysis_memo()
+            artifact_store = self.create_artifact_store()
             
             self._instances['pitcher_game_analysis_use_case'] = PitcherGameAnalysisUseCase(
                 client=client,
                 repository=repository,
-                analyzer=analyzer
+                analyzer=analyzer,
+                refresher=refresher,
+                soft_ttl=timedelta(hours=soft_ttl_hours),
+                memo=memo,
+                artifact_store=artifact_store
             )
             self.logger.info("PitcherGameAnalysisUseCaseを作成しました")
         
         return self._instances['pitcher_game_analysis_use_case']
     
+    def create_batch_runner(self) -> BatchAnalysisRunner:
+        """
+        BatchAnalysisRunnerのインスタンスを作成
+        
+        設定の'batch_max_workers'でプロセス数（NoneはCPUコア数）、
+        'batch_max_in_flight'で同時に処理中にする試合数を指定する
+        """
+        runner = BatchAnalysisRunner(
+            use_case=self.create_pitcher_game_analysis_use_case(),
+            max_workers=self.config.get('batch_max_workers'),
+            max_in_flight=self.config.get('batch_max_in_flight')
+        )
+        self.logger.info(f"BatchAnalysisRunnerを作成しました (workers: {runner.max_workers})")
+        return runner
+    
     def create_streamlit_app(self) -> StreamlitApp:
         """
         Streamlitアプリケーションのインスタンスを作成
@@ -0,0 +1,50 @@
+import threading
+
+from src.application.background_refresher import BackgroundRefresher
+
+
+class TestBackgroundRefresher:
+    """BackgroundRefresherクラスのテスト"""
+    
+    def test_schedule_runs_job(self):
+        """登録したジョブが実行されることのテスト"""
+        refresher = BackgroundRefresher()
+        done = threading.Event()
+        
+        assert refresher.schedule('key', done.set)
+        assert done.wait(5)
+        refresher.shutdown()
+        
+        assert not refresher.is_refreshing('key')
+    
+    def test_schedule_deduplicates_in_flight_keys(self):
+        """実行中のキーは重複して登録されないことのテスト"""
+        refresher = BackgroundRefresher()
+        release = threading.Event()
+        calls = []
+        
+        def job():
+            calls.append(1)
+            release.wait(5)
+        
+        assert refresher.schedule('key', job)
+        assert not refresher.schedule('key', job)
+        assert refresher.is_refreshing('key')
+        
+        release.set()
+        refresher.shutdown()
+        
+        assert calls == [1]
+        assert not refresher.is_refreshing('key')
+    
+    def test_job_error_releases_key(self):
+        """ジョブが失敗してもキーが解放されることのテスト"""
+        refresher = BackgroundRefresher()
+        
+        def failing_job():
+            raise RuntimeError('api error')
+        
+        refresher.schedule('key', failing_job)
+        refresher.shutdown()
+        
+        assert not refresher.is_refreshing('key')
@@ -0,0 +1,102 @@
+from unittest.mock import MagicMock
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.domain.entities import Pitcher, Game
+from src.domain.league_baseline import LeagueBaseline
+from src.domain.pitch_analyzer import PitchAnalyzer
+from src.infrastructure.analysis_memo import AnalysisMemo
+from src.infrastructure.artifact_store import GameArtifactStore
+from src.infrastructure.baseball_savant_client import BaseballSavantClient
+from src.infrastructure.data_repository import DataRepository
+from src.application.usecases import PitcherGameAnalysisUseCase
+from src.application.batch_runner import BatchAnalysisRunner
+
+
+class TestBatchAnalysisRunner:
+    """BatchAnalysisRunnerクラスのテスト"""
+    
+    @pytest.fixture
+    def use_case(self):
+        repository = MagicMock(spec=DataRepository)
+        repository.get_pitcher_info.return_value = Pitcher(id="123", name="Test Pitcher")
+        
+        def cached_pitch_data(pitcher_id, game_date):
+            if game_date == '2023-04-30':
+                return None
+            day = int(game_date[-2:])
+            return pd.DataFrame({
+                'pitch_type': ['FF', 'SL', 'FF'][:1 + day % 3],
+                'release_speed': [95.0, 86.0, 94.0][:1 + day % 3],
+                'inning': [1, 1, 2][:1 + day % 3],
+                'description': ['ball', 'called_strike', 'foul'][:1 + day % 3],
+                'delta_run_exp': [0.04, -0.05, -0.03][:1 + day % 3]
+            })
+        repository.get_cached_pitch_data.side_effect = cached_pitch_data
+        
+        client = MagicMock(spec=BaseballSavantClient)
+        client.get_pitch_data.return_value = pd.DataFrame()
+        
+        return PitcherGameAnalysisUseCase(client=client, repository=repository, analyzer=PitchAnalyzer())
+    
+    def test_run_matches_analyze_all(self, use_case, tmp_path):
+        """各試合の結果が1試合ずつ分析した結果と一致し、進捗が通知されることのテスト"""
+        games = [Game(date=f"2023-04-{day:02d}", pitcher_id="123") for day in range(1, 7)]
+        progress = []
+        runner = BatchAnalysisRunner(use_case, max_workers=2, max_in_flight=2, shared_dir=str(tmp_path))
+        
+        results = runner.run(games, progress_callback=lambda done, total, result: progress.append((done, total)))
+        
+        assert progress == [(i, 6) for i in range(1, 7)]
+        assert sorted(r.game_date for r in results) == [g.date for g in games]
+        for result in results:
+            expected = PitchAnalyzer().analyze_all(use_case.repository.get_cached_pitch_data("123", result.game_date))
+            assert result.error is None
+            assert result.pitcher_name == "Test Pitcher"
+            assert result.performance_summary['total_pitches'] == expected['performance_summary']['total_pitches']
+            assert result.inning_analysis['pitch_count'] == expected['inning_analysis']['pitch_count']
+        
+        # 公開した投球データは結果の回収後に削除される
+        assert not list(tmp_path.glob('*.arrow'))
+    
+    def test_missing_data_is_reported_as_error(self, use_case):
+        """データが取得できない試合はエラーの結果になることのテスト"""
+        games = [Game(date="2023-04-30", pitcher_id="123"), Game(date="2023-04-01", pitcher_id="123")]
+        
+        results = {r.game_date: r for r in BatchAnalysisRunner(use_case, max_workers=1).run(games)}
+        
+        assert results['2023-04-30'].error is not None
+        assert results['2023-04-01'].error is None
+
+    def test_results_match_analyze_game(self, use_case, tmp_path):
+        """メモ化の有無によらず、バッチ処理の結果にもanalyze_gameと同じパーセンタイルと得点価値が付くことのテスト"""
+        use_case = PitcherGameAnalysisUseCase(
+            client=use_case.client,
+            repository=use_case.repository,
+            analyzer=PitchAnalyzer(),
+            artifact_store=GameArtifactStore(str(tmp_path / 'artifacts')),
+            memo=AnalysisMemo(str(tmp_path / 'memo.sqlite'))
+        )
+        league = pd.DataFrame({
+            'game_date': '2023-05-01',
+            'pitch_type': 'FF',
+            'release_speed': np.linspace(90.0, 100.0, 101)
+        })
+        use_case.save_league_baseline(LeagueBaseline.build(league, 2023))
+        games = [Game(date=f"2023-04-{day:02d}", pitcher_id="123") for day in range(1, 4)]
+        runner = BatchAnalysisRunner(use_case, max_workers=1, shared_dir=str(tmp_path / 'shared'))
+        
+        # 1回目はワーカーで分析し、2回目はメモ化した結果を使う
+        for _ in range(2):
+            results = {r.game_date: r for r in runner.run(games)}
+            for game in games:
+                expected = use_case.analyze_game("123", game.date)
+                result = results[game.date]
+                assert result.error is None
+                assert result.metadata['data_source'] == 'batch'
+                assert result.pitch_type_analysis['percentile_season'] == 2023
+                assert result.pitch_type_analysis['percentiles'] == expected.pitch_type_analysis['percentiles']
+                assert result.run_value_analysis == expected.run_value_analysis
+                assert result.run_value_analysis
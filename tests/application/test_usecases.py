@@ -1,3 +1,24 @@
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.application.analysis_result import AnalysisResult
+from src.application.background_refresher import BackgroundRefresher
+from src.application.usecases import PitcherGameAnalysisUseCase
+from src.domain.entities import Pitcher, Game
+from src.domain.expected_outcomes import ExpectedOutcomeTable
+from src.domain.league_baseline import LeagueBaseline
+from src.domain.pitch_analyzer import PitchAnalyzer
+from src.domain.zone_grid import ZoneGridCube
+from src.infrastructure.analysis_memo import AnalysisMemo
+from src.infrastructure.artifact_store import GameArtifactStore
+from src.infrastructure.baseball_savant_client import BaseballSavantClient
+from src.infrastructure.data_repository import DataRepository
+
+
 class TestPitcherGameAnalysisUseCase:
     """PitcherGameAnalysisUseCaseクラスのテスト"""
     
@@ -43,19 +64,20 @@ class TestPitcherGameAnalysisUseCase:
         assert result == test_pitchers
     
     def test_get_pitcher_games_from_cache(self, use_case, mock_client, mock_repository):
-        """キャッシュからの試合取得テスト"""
+        """キャッシュからの試合取得テスト（取得済みの試合一覧は試合数が少なくてもAPIを呼ばない）"""
         # モックの設定
         test_games = [
             Game(date="2023-04-01", pitcher_id="123"),
             Game(date="2023-04-06", pitcher_id="123")
         ]
         mock_repository.get_games_by_pitcher.return_value = test_games
+        mock_repository.get_game_list_fetched_at.return_value = datetime.now()
         
         # 試合リストを取得
         result = use_case.get_pitcher_games("123", 2023)
         
         # 検証
-        mock_repository.get_games_by_pitcher.assert_called_once_with("123")
+        mock_repository.get_games_by_pitcher.assert_called_once_with("123", season=2023)
         mock_client.get_pitcher_games.assert_not_called()  # キャッシュから取得できるのでAPIは呼ばない
         assert result == test_games
     
@@ -63,6 +85,7 @@ class TestPitcherGameAnalysisUseCase:
         """APIからの試合取得テスト"""
         # モックの設定
         mock_repository.get_games_by_pitcher.return_value = []  # キャッシュは空
+        mock_repository.get_game_list_fetched_at.return_value = None  # 一度も取得していない
         
         test_games = [
             Game(date="2023-04-01", pitcher_id="123"),
@@ -74,9 +97,10 @@ class TestPitcherGameAnalysisUseCase:
         result = use_case.get_pitcher_games("123", 2023)
         
         # 検証
-        mock_repository.get_games_by_pitcher.assert_called_once_with("123")
+        mock_repository.get_games_by_pitcher.assert_called_once_with("123", season=2023)
         mock_client.get_pitcher_games.assert_called_once_with("123", 2023)
         assert mock_repository.save_game_info.call_count == 2
+        mock_repository.record_game_list_fetch.assert_called_once_with("123", 2023)
         assert result == test_games
     
     def test_analyze_game_cached_data(self, use_case, mock_client, mock_repository, mock_analyzer):
@@ -92,10 +116,12 @@ class TestPitcherGameAnalysisUseCase:
         mock_repository.get_cached_pitch_data.return_value = test_data
         
         # モック分析結果
-        mock_analyzer.analyze_by_inning.return_value = {'innings': [1, 2]}
-        mock_analyzer.analyze_by_pitch_type.return_value = {'pitch_types': ['FF', 'SL']}
-        mock_analyzer.analyze_batted_balls.return_value = pd.DataFrame()
-        mock_analyzer.get_performance_summary.return_value = {'total_pitches': 2}
+        mock_analyzer.analyze_all.return_value = {
+            'inning_analysis': {'innings': [1, 2]},
+            'pitch_type_analysis': {'pitch_types': ['FF', 'SL']},
+            'batted_ball_analysis': pd.DataFrame(),
+            'performance_summary': {'total_pitches': 2}
+        }
         
         # 試合分析を実行
         result = use_case.analyze_game("123", "2023-04-01")
@@ -104,6 +130,7 @@ class TestPitcherGameAnalysisUseCase:
         mock_repository.get_pitcher_info.assert_called_once_with("123")
         mock_repository.get_cached_pitch_data.assert_called_once_with("123", "2023-04-01")
         mock_client.get_pitch_data.assert_not_called()  # キャッシュがあるのでAPI呼び出しなし
+        mock_analyzer.analyze_all.assert_called_once_with(test_data)
         
         assert isinstance(result, AnalysisResult)
         assert result.pitcher_id == "123"
@@ -119,6 +146,7 @@ class TestPitcherGameAnalysisUseCase:
         pitcher = Pitcher(id="123", name="Test Pitcher")
         mock_repository.get_pitcher_info.return_value = pitcher
         mock_repository.get_cached_pitch_data.return_value = None  # キャッシュなし
+        mock_repository.get_game_pk.return_value = None  # game_pk不明
         
         test_data = pd.DataFrame({
             'pitch_type': ['FF', 'SL'],
@@ -127,10 +155,12 @@ class TestPitcherGameAnalysisUseCase:
         mock_client.get_pitch_data.return_value = test_data
         
         # モック分析結果
-        mock_analyzer.analyze_by_inning.return_value = {'innings': [1, 2]}
-        mock_analyzer.analyze_by_pitch_type.return_value = {'pitch_types': ['FF', 'SL']}
-        mock_analyzer.analyze_batted_balls.return_value = pd.DataFrame()
-        mock_analyzer.get_performance_summary.return_value = {'total_pitches': 2}
+        mock_analyzer.analyze_all.return_value = {
+            'inning_analysis': {'innings': [1, 2]},
+            'pitch_type_analysis': {'pitch_types': ['FF', 'SL']},
+            'batted_ball_analysis': pd.DataFrame(),
+            'performance_summary': {'total_pitches': 2}
+        }
         
         # 試合分析を実行
         result = use_case.analyze_game("123", "2023-04-01")
@@ -147,4 +177,290 @@ class TestPitcherGameAnalysisUseCase:
         assert result.game_date == "2023-04-01"
         assert result.inning_analysis == {'innings': [1, 2]}
         assert result.pitch_type_analysis == {'pitch_types': ['FF', 'SL']}
-        assert result.performance_summary == {'total_pitches': 2}
\ No newline at end of file
+        assert result.performance_summary == {'total_pitches': 2}    
+    def test_analyze_game_stale_cache_schedules_refresh(self, mock_client, mock_repository, mock_analyzer):
+        """ソフトTTLを過ぎたキャッシュはそのまま使われ、バックグラウンド更新が登録されることのテスト"""
+        refresher = MagicMock(spec=BackgroundRefresher)
+        refresher.is_refreshing.return_value = True
+        use_case = PitcherGameAnalysisUseCase(
+            client=mock_client,
+            repository=mock_repository,
+            analyzer=mock_analyzer,
+            refresher=refresher,
+            soft_ttl=timedelta(hours=1)
+        )
+        
+        mock_repository.get_pitcher_info.return_value = Pitcher(id="123", name="Test Pitcher")
+        mock_repository.get_cached_pitch_data.return_value = pd.DataFrame({'pitch_type': ['FF']})
+        mock_repository.get_pitch_data_cached_at.return_value = datetime.now() - timedelta(hours=5)
+        mock_analyzer.analyze_all.return_value = {
+            'inning_analysis': {'innings': [1]},
+            'pitch_type_analysis': {'pitch_types': ['FF']},
+            'batted_ball_analysis': pd.DataFrame(),
+            'performance_summary': {'total_pitches': 1}
+        }
+        
+        result = use_case.analyze_game("123", "2023-04-01")
+        
+        mock_client.get_pitch_data.assert_not_called()  # 更新を待たずにキャッシュを返す
+        refresher.schedule.assert_called_once()
+        assert result.metadata['stale'] is True
+        assert result.is_refreshing
+    
+    def test_analyze_game_fresh_cache_does_not_refresh(self, mock_client, mock_repository, mock_analyzer):
+        """ソフトTTL内のキャッシュでは更新が登録されないことのテスト"""
+        refresher = MagicMock(spec=BackgroundRefresher)
+        use_case = PitcherGameAnalysisUseCase(
+            client=mock_client,
+            repository=mock_repository,
+            analyzer=mock_analyzer,
+            refresher=refresher,
+            soft_ttl=timedelta(hours=1)
+        )
+        
+        mock_repository.get_pitcher_info.return_value = Pitcher(id="123", name="Test Pitcher")
+        mock_repository.get_cached_pitch_data.return_value = pd.DataFrame({'pitch_type': ['FF']})
+        mock_repository.get_pitch_data_cached_at.return_value = datetime.now()
+        mock_analyzer.analyze_all.return_value = {
+            'inning_analysis': {'innings': [1]},
+            'pitch_type_analysis': {'pitch_types': ['FF']},
+            'batted_ball_analysis': pd.DataFrame(),
+            'performance_summary': {'total_pitches': 1}
+        }
+        
+        result = use_case.analyze_game("123", "2023-04-01")
+        
+        refresher.schedule.assert_not_called()
+        assert result.metadata['stale'] is False
+        assert not result.is_refreshing
+    
+    def test_get_pitcher_games_stale_list_refreshes_in_background(self, mock_client, mock_repository, mock_analyzer):
+        """古い試合一覧はキャッシュから返され、バックグラウンドで更新されることのテスト"""
+        refresher = BackgroundRefresher()
+        use_case = PitcherGameAnalysisUseCase(
+            client=mock_client,
+            repository=mock_repository,
+            analyzer=mock_analyzer,
+            refresher=refresher,
+            soft_ttl=timedelta(hours=1)
+        )
+        
+        cached_games = [Game(date=f"2023-04-0{i}", pitcher_id="123") for i in range(1, 6)]
+        mock_repository.get_games_by_pitcher.return_value = cached_games
+        mock_repository.get_game_list_fetched_at.return_value = datetime.now() - timedelta(days=2)
+        mock_client.get_pitcher_games.return_value = [Game(date="2023-04-10", pitcher_id="123")]
+        
+        result = use_case.get_pitcher_games("123", 2023)
+        refresher.shutdown(wait=True)
+        
+        assert result == cached_games
+        mock_client.get_pitcher_games.assert_called_once_with("123", 2023)
+        mock_repository.record_game_list_fetch.assert_called_once_with("123", 2023)
+    
+    def test_analyze_game_fetches_by_game_pk(self, use_case, mock_client, mock_repository, mock_analyzer):
+        """game_pkが分かっている場合はgame_pkでAPIから取得することのテスト"""
+        mock_repository.get_pitcher_info.return_value = Pitcher(id="123", name="Test Pitcher")
+        mock_repository.get_cached_pitch_data.return_value = None
+        mock_repository.get_game_pk.return_value = 717465
+        
+        test_data = pd.DataFrame({'pitch_type': ['FF'], 'release_speed': [95.0]})
+        mock_client.get_pitch_data.return_value = test_data
+        mock_analyzer.analyze_all.return_value = {
+            'inning_analysis': {'innings': [1]},
+            'pitch_type_analysis': {'pitch_types': ['FF']},
+            'batted_ball_analysis': pd.DataFrame(),
+            'performance_summary': {'total_pitches': 1}
+        }
+        
+        use_case.analyze_game("123", "2023-04-01")
+        
+        mock_repository.get_game_pk.assert_called_once_with("123", "2023-04-01")
+        mock_client.get_pitch_data.assert_called_once_with("123", "2023-04-01", game_pk=717465)
+    
+    def test_aggregate_season(self, use_case, mock_client, mock_repository, mock_analyzer):
+        """シーズン集計で全試合のデータを結合して1回だけ集計することのテスト"""
+        mock_repository.get_games_by_pitcher.return_value = [
+            Game(date="2023-04-08", pitcher_id="123", game_pk=2),
+            Game(date="2023-04-01", pitcher_id="123", game_pk=1)
+        ]
+        cached = pd.DataFrame({'pitch_type': ['FF'], 'inning': [1]})
+        fetched = pd.DataFrame({'pitch_type': ['SL'], 'inning': [1]})
+        mock_repository.get_cached_pitch_data.side_effect = [cached, None]
+        mock_client.get_pitch_data.return_value = fetched
+        mock_analyzer.aggregate_games.return_value = pd.DataFrame({'scope': ['season']})
+        
+        result = use_case.aggregate_season("123", 2023)
+        
+        mock_repository.get_games_by_pitcher.assert_called_once_with("123", season=2023)
+        mock_client.get_pitch_data.assert_called_once_with("123", "2023-04-01", game_pk=1)
+        mock_repository.save_pitch_data.assert_called_once_with("123", "2023-04-01", fetched)
+        combined = mock_analyzer.aggregate_games.call_args[0][0]
+        assert list(combined['game_date']) == ["2023-04-08", "2023-04-01"]
+        assert list(result['scope']) == ['season']
+    
+    def test_analyze_live_game_adds_new_pitches_only(self, mock_client, mock_repository):
+        """試合中の再取得では新しく届いた投球だけを追加集計することのテスト"""
+        use_case = PitcherGameAnalysisUseCase(
+            client=mock_client,
+            repository=mock_repository,
+            analyzer=PitchAnalyzer()
+        )
+        mock_repository.get_pitcher_info.return_value = Pitcher(id="123", name="Test Pitcher")
+        full_game = pd.DataFrame({
+            'at_bat_number': [1, 1, 2, 2, 3],
+            'pitch_number': [1, 2, 1, 2, 1],
+            'inning': [1, 1, 1, 1, 2],
+            'pitch_type': ['FF', 'SL', 'FF', 'CH', 'FF'],
+            'release_speed': [95.0, 86.0, 96.0, 85.0, 94.0],
+            'description': ['ball', 'called_strike', 'foul', 'swinging_strike', 'hit_into_play']
+        })
+        
+        mock_client.get_pitch_data.return_value = full_game.iloc[:3]
+        first = use_case.analyze_live_game("123", "2023-04-01", game_pk=7001)
+        mock_client.get_pitch_data.return_value = full_game
+        second = use_case.analyze_live_game("123", "2023-04-01", game_pk=7001)
+        
+        assert first.metadata['new_pitches'] == 3
+        assert second.metadata == {'data_source': 'live', 'new_pitches': 2, 'total_pitches': 5}
+        assert second.performance_summary['total_pitches'] == 5
+        assert second.inning_analysis['pitch_count'] == {'1': 4, '2': 1}
+        
+        use_case.end_live_game("123", "2023-04-01")
+        mock_client.get_pitch_data.return_value = full_game
+        
+        assert use_case.analyze_live_game("123", "2023-04-01", game_pk=7001).metadata['new_pitches'] == 5
+    
+    def test_analyze_pitch_data_uses_memo(self, mock_client, mock_repository, mock_analyzer, tmp_path):
+        """メモ化が有効な場合、同じ内容のデータは1度だけ分析することのテスト"""
+        
+        mock_analyzer.cache_version = '1'
+        mock_analyzer.analyze_all.return_value = {'inning_analysis': {'innings': [1]}}
+        use_case = PitcherGameAnalysisUseCase(
+            client=mock_client,
+            repository=mock_repository,
+            analyzer=mock_analyzer,
+            memo=AnalysisMemo(str(tmp_path / 'memo.sqlite'))
+        )
+        pitch_data = pd.DataFrame({'pitch_type': ['FF'], 'inning': [1]})
+        
+        first = use_case.analyze_pitch_data(pitch_data)
+        second = use_case.analyze_pitch_data(pitch_data.copy())
+        
+        assert first == second == {'inning_analysis': {'innings': [1]}}
+        mock_analyzer.analyze_all.assert_called_once()
+    
+    def test_aggregate_cube_reuses_stored_cubes(self, mock_client, mock_repository, mock_analyzer, tmp_path):
+        """試合ごとの集計を保存し、キャッシュ日時が変わらなければ投球データを読み直さないことのテスト"""
+        
+        use_case = PitcherGameAnalysisUseCase(
+            client=mock_client,
+            repository=mock_repository,
+            analyzer=mock_analyzer,
+            artifact_store=GameArtifactStore(str(tmp_path))
+        )
+        games = [
+            Game(date="2023-04-01", pitcher_id="123", game_pk=1),
+            Game(date="2023-04-08", pitcher_id="123", game_pk=2)
+        ]
+        mock_repository.get_games_by_pitcher.return_value = games
+        mock_repository.get_pitch_data_cached_at.return_value = datetime(2023, 4, 9)
+        mock_repository.get_cached_pitch_data.return_value = pd.DataFrame({
+            'pitch_type': ['FF', 'SL'],
+            'stand': ['R', 'L'],
+            'plate_x': [0.0, 0.5],
+            'plate_z': [2.5, 2.0],
+            'description': ['called_strike', 'ball']
+        })
+        
+        first = use_case.aggregate_cube(ZoneGridCube, "123", season=2023)
+        second = use_case.aggregate_cube(ZoneGridCube, "123", season=2023, start_date="2023-04-05")
+        
+        assert first.counts.sum() == 4
+        assert second.counts.sum() == 2
+        assert mock_repository.get_cached_pitch_data.call_count == 2
+        
+        # 投球データが更新された試合だけ集計し直す
+        mock_repository.get_pitch_data_cached_at.return_value = datetime(2023, 4, 10)
+        use_case.aggregate_cube(ZoneGridCube, "123", season=2023)
+        assert mock_repository.get_cached_pitch_data.call_count == 4
+        
+        # 投球データのキャッシュが削除されても、保存済みの集計をそのまま使う（APIから取り直さない）
+        mock_repository.get_pitch_data_cached_at.return_value = None
+        evicted = use_case.aggregate_cube(ZoneGridCube, "123", season=2023)
+        assert evicted.counts.sum() == 4
+        assert mock_repository.get_cached_pitch_data.call_count == 4
+        mock_client.get_pitch_data.assert_not_called()
+    
+    def test_analyze_game_adds_league_percentiles(self, mock_client, mock_repository, tmp_path):
+        """保存したリーグ全体の分布で、試合のシーズンの球種別分析にパーセンタイルが付くことのテスト"""
+        
+        use_case = PitcherGameAnalysisUseCase(
+            client=mock_client,
+            repository=mock_repository,
+            analyzer=PitchAnalyzer(),
+            artifact_store=GameArtifactStore(str(tmp_path))
+        )
+        league = pd.DataFrame({
+            'game_date': '2023-05-01',
+            'pitch_type': 'FF',
+            'release_speed': np.linspace(90.0, 100.0, 101)
+        })
+        use_case.save_league_baseline(LeagueBaseline.build(league, 2023))
+        
+        mock_repository.get_pitcher_info.return_value = Pitcher(id="123", name="Test Pitcher")
+        mock_repository.get_cached_pitch_data.return_value = pd.DataFrame({
+            'pitch_type': ['FF', 'FF'],
+            'release_speed': [97.0, 97.0],
+            'inning': [1, 1],
+            'description': ['called_strike', 'ball']
+        })
+        
+        # メモリ上の分布を消しても保存先から読み込む
+        use_case._league_baselines.clear()
+        result = use_case.analyze_game("123", "2023-04-01")
+        assert result.pitch_type_analysis['percentile_season'] == 2023
+        assert result.pitch_type_analysis['percentiles']['FF']['release_speed'] == pytest.approx(70.0)
+        
+        # 分布がないシーズンにはパーセンタイルを付けない
+        result = use_case.analyze_game("123", "2024-04-01")
+        assert 'percentiles' not in result.pitch_type_analysis
+    
+    def test_analyze_game_uses_season_expected_outcomes(self, mock_client, mock_repository, tmp_path):
+        """試合のシーズンの期待値の表で分析し、表がないシーズンは最新の表を使うことのテスト"""
+        use_case = PitcherGameAnalysisUseCase(
+            client=mock_client,
+            repository=mock_repository,
+            analyzer=PitchAnalyzer(),
+            memo=AnalysisMemo(str(tmp_path / 'memo.sqlite')),
+            artifact_store=GameArtifactStore(str(tmp_path / 'artifacts'))
+        )
+        # 2023年は同じ打球がすべて安打、2022年はすべてアウト
+        for season, event in ((2023, 'single'), (2022, 'field_out')):
+            use_case.save_expected_outcomes(ExpectedOutcomeTable.build(pd.DataFrame({
+                'game_date': f'{season}-06-01',
+                'description': 'hit_into_play',
+                'events': event,
+                'launch_speed': np.full(1000, 100.0),
+                'launch_angle': np.full(1000, 20.0)
+            }), season))
+        
+        mock_repository.get_pitcher_info.return_value = Pitcher(id="123", name="Test Pitcher")
+        mock_repository.get_cached_pitch_data.return_value = pd.DataFrame({
+            'pitch_type': ['FF', 'SL'],
+            'inning': [1, 1],
+            'description': ['hit_into_play', 'ball'],
+            'events': ['single', None],
+            'launch_speed': [100.0, np.nan],
+            'launch_angle': [20.0, np.nan]
+        })
+        
+        # 同じ投球データでも、メモ化した別のシーズンの結果は使わない
+        xba = {}
+        for game_date in ['2023-04-01', '2022-04-01', '2024-04-01']:
+            result = use_case.analyze_game("123", game_date)
+            xba[game_date] = result.batted_ball_analysis['xba'].iloc[0]
+        
+        assert xba['2023-04-01'] > 0.9
+        assert xba['2022-04-01'] < 0.1
+        assert xba['2024-04-01'] == xba['2023-04-01']
+        assert use_case.analyzer.expected_outcomes.season == 2023
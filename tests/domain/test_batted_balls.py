@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.domain.batted_balls import (
+    HOME_PLATE_HC, add_batted_ball_features, batted_ball_points, direction_codes, launch_angle_codes,
+    spray_coordinates
+)
+from src.domain.pitch_outcomes import EVENT_CODES
+
+
+def test_launch_angle_codes():
+    """打球角度の区切りごとに打球の種類が判定されることのテスト"""
+    codes = launch_angle_codes(np.array([-5.0, 10.0, 24.9, 25.0, 49.9, 50.0, np.nan]))
+
+    assert codes.tolist() == [0, 1, 1, 2, 2, 3, -1]
+
+
+def test_spray_coordinates():
+    """本塁・センター・ライト線・レフト線の座標が正しく変換されることのテスト"""
+    hc_x = np.array([HOME_PLATE_HC[0], HOME_PLATE_HC[0], HOME_PLATE_HC[0] + 100, HOME_PLATE_HC[0] - 100, np.nan])
+    hc_y = np.array([HOME_PLATE_HC[1], HOME_PLATE_HC[1] - 160, HOME_PLATE_HC[1] - 100, HOME_PLATE_HC[1] - 100, 100.0])
+
+    result = spray_coordinates(hc_x, hc_y)
+
+    np.testing.assert_allclose(result['spray_distance'][:4], [0.0, 400.0, 250 * np.sqrt(2), 250 * np.sqrt(2)])
+    np.testing.assert_allclose(result['spray_angle'][1:4], [0.0, 45.0, -45.0])
+    np.testing.assert_allclose(result['field_y'][1], 400.0)
+    assert np.isnan(result['spray_angle'][4])
+
+
+def test_direction_codes_depend_on_stand():
+    """右打者はレフト方向、左打者はライト方向がプルになることのテスト"""
+    angles = np.array([-30.0, -30.0, 30.0, 30.0, 5.0, 30.0, np.nan])
+    stand = np.array(['R', 'L', 'R', 'L', 'R', None, 'R'], dtype=object)
+
+    assert direction_codes(angles, stand).tolist() == [0, 2, 2, 0, 1, -1, -1]
+
+
+class TestAddBattedBallFeatures:
+    """add_batted_ball_featuresのテスト"""
+
+    @pytest.fixture
+    def batted_balls(self):
+        return pd.DataFrame({
+            'launch_angle': [5.0, 30.0, 60.0],
+            'hc_x': [HOME_PLATE_HC[0] - 20, HOME_PLATE_HC[0] + 100, HOME_PLATE_HC[0]],
+            'hc_y': [HOME_PLATE_HC[1] - 30, HOME_PLATE_HC[1] - 100, HOME_PLATE_HC[1] - 20],
+            'hit_distance_sc': [np.nan, 380.0, 90.0],
+            'stand': ['R', 'L', 'R'],
+            'events': ['field_out', 'home_run', 'grounded_into_double_play']
+        })
+
+    def test_features(self, batted_balls):
+        """打球の種類・方向・内外野・結果コードが追加されることのテスト"""
+        result = add_batted_ball_features(batted_balls)
+
+        assert result['hit_type'].tolist() == ['ground_ball', 'fly_ball', 'popup']
+        assert result['direction'].tolist() == ['pull', 'pull', 'center']
+        assert result['depth'].tolist() == ['infield', 'outfield', 'infield']
+        assert result['result_code'].tolist() == [EVENT_CODES['out'], EVENT_CODES['home_run'], EVENT_CODES['out']]
+        assert 'spray_angle' not in batted_balls.columns
+
+    def test_bb_type_takes_precedence(self, batted_balls):
+        """bb_typeがある場合はその値を打球の種類とすることのテスト"""
+        result = add_batted_ball_features(batted_balls.assign(bb_type=['line_drive'] * 3))
+
+        assert result['hit_type'].tolist() == ['line_drive'] * 3
+
+    def test_points_reuse_features(self, batted_balls):
+        """描画用の座標と結果コードが追加済みの列と一致することのテスト"""
+        featured = add_batted_ball_features(batted_balls)
+        from_features = batted_ball_points(featured)
+        from_raw = batted_ball_points(batted_balls.assign(hit_result=batted_balls['events']).drop(columns='events'))
+
+        np.testing.assert_allclose(from_features['field_x'], from_raw['field_x'])
+        assert from_features['result_code'].tolist() == from_raw['result_code'].tolist()
@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.domain.count_states import COUNT_STATES, CountStateCube, count_state_codes
+from src.domain.pitch_analyzer import PitchAnalyzer
+
+
+@pytest.fixture
+def sample_data():
+    return pd.DataFrame({
+        'pitch_type': ['FF', 'SL', 'FF', 'FF', 'CH', 'FF', None],
+        'balls': [0, 0, 1, 3, 3, 4, 0],
+        'strikes': [0, 1, 1, 2, 2, 0, 0],
+        'release_speed': [95.0, 85.0, 96.0, 97.0, 87.0, 95.0, 90.0],
+        'description': ['ball', 'swinging_strike', 'foul', 'hit_into_play', 'called_strike', 'ball', 'ball']
+    })
+
+
+def test_count_state_codes(sample_data):
+    """12通りのカウントに変換され、範囲外の値は-1になることのテスト"""
+    assert len(COUNT_STATES) == 12
+    assert count_state_codes(sample_data).tolist() == [0, 1, 4, 11, 11, -1, 0]
+    assert COUNT_STATES[11] == '3-2'
+
+
+class TestCountStateCube:
+    """CountStateCubeクラスのテスト"""
+
+    def test_table(self, sample_data):
+        """カウントごとの割合・球速・結果の割合のテスト"""
+        table = CountStateCube.from_pitches(sample_data).table()
+
+        assert table['pitches'].sum() == 5
+        full_count = table.loc['3-2']
+        assert full_count.loc['FF', 'usage_percentage'] == 50.0
+        assert full_count.loc['FF', 'in_play_percentage'] == 100.0
+        assert full_count.loc['CH', 'strike_percentage'] == 100.0
+        assert table.loc[('0-1', 'SL'), 'whiff_percentage'] == 100.0
+        assert table.loc[('0-0', 'FF'), 'velocity_mean'] == 95.0
+
+    def test_merge_matches_single_pass(self, sample_data):
+        """試合ごとの集計を足し合わせた結果が、まとめて集計した結果と一致することのテスト"""
+        data = pd.concat([sample_data, sample_data.assign(release_speed=sample_data['release_speed'] + 1)],
+                         ignore_index=True)
+        merged = CountStateCube.merge_all([
+            CountStateCube.from_pitches(data.iloc[:4]), CountStateCube.from_pitches(data.iloc[4:])
+        ])
+
+        pd.testing.assert_frame_equal(merged.table(), CountStateCube.from_pitches(data).table())
+        assert merged.table().loc[('0-0', 'FF'), 'velocity_std'] == pytest.approx(np.std([95.0, 96.0], ddof=1))
+
+    def test_arrays_round_trip(self, sample_data):
+        """配列に変換して復元できることのテスト"""
+        cube = CountStateCube.from_pitches(sample_data)
+        restored = CountStateCube.from_arrays(cube.to_arrays())
+
+        pd.testing.assert_frame_equal(restored.table(), cube.table())
+
+
+def test_analyze_by_count(sample_data):
+    """PitchAnalyzerからカウント別の分析結果を取得できることのテスト"""
+    result = PitchAnalyzer().analyze_by_count(sample_data)
+
+    assert result['count_states'] == ['0-0', '0-1', '1-1', '3-2']
+    assert result['by_count']['3-2']['pitches'] == 2
+    assert result['by_count']['0-0']['pitch_types']['FF']['pitches'] == 1
+    assert 'error' in PitchAnalyzer().analyze_by_count(sample_data.drop(columns=['balls']))
@@ -0,0 +1,87 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.domain.expected_outcomes import (
+    ANGLE_EDGES, SPEED_EDGES, ExpectedOutcomeTable, add_expected_outcomes, bin_codes, contact_quality
+)
+
+
+def make_league(seed=0, balls=100000):
+    """強い打球（100mph以上・10〜30度）ほど安打になりやすいリーグ全体の打球データ"""
+    rng = np.random.default_rng(seed)
+    speed = rng.uniform(60, 115, balls)
+    angle = rng.uniform(-30, 60, balls)
+    sweet_spot = (speed >= 100) & (angle >= 10) & (angle < 30)
+    hit = rng.random(balls) < np.where(sweet_spot, 0.8, 0.2)
+    events = np.where(hit, np.where(sweet_spot, 'home_run', 'single'), 'field_out')
+    return pd.DataFrame({
+        'game_date': '2024-06-01',
+        'pitch_type': 'FF',
+        'description': 'hit_into_play',
+        'events': events,
+        'launch_speed': speed,
+        'launch_angle': angle
+    })
+
+
+def test_bin_codes():
+    """ビンの位置が求められ、範囲外の値は両端のビン、欠損値は-1になることのテスト"""
+    angle_bins = len(ANGLE_EDGES) - 1
+
+    codes = bin_codes([40.0, 41.9, 200.0, np.nan], [-90.0, 0.0, 100.0, 10.0])
+
+    assert codes[0] == 0
+    assert codes[1] == 45
+    assert codes[2] == (len(SPEED_EDGES) - 2) * angle_bins + angle_bins - 1
+    assert codes[3] == -1
+
+
+class TestExpectedOutcomeTable:
+    """ExpectedOutcomeTableクラスのテスト"""
+
+    def test_build_and_lookup(self):
+        """打球速度・打球角度に応じた期待値が引けることのテスト"""
+        table = ExpectedOutcomeTable.build(make_league(), 2024)
+
+        assert table.batted_balls.sum() == 100000
+        expected = table.lookup([105.0, 70.0, np.nan], [20.0, 0.0, 20.0])
+        assert expected['xba'][0] == pytest.approx(0.8, abs=0.1)
+        assert expected['xba'][1] == pytest.approx(0.2, abs=0.1)
+        assert expected['xwoba'][0] == pytest.approx(0.8 * 2.10, abs=0.25)
+        assert np.isnan(expected['xba'][2])
+
+    def test_sparse_bins_are_smoothed(self):
+        """打球がないビンも周囲やリーグ全体の値で埋まることのテスト"""
+        table = ExpectedOutcomeTable.build(make_league(), 2024)
+
+        assert np.isfinite(table.xba).all()
+        assert table.lookup([45.0], [-80.0])['xba'][0] == pytest.approx(table.xba.ravel()[0])
+
+    def test_round_trip_arrays(self):
+        """to_arraysとfrom_arraysで復元できることのテスト"""
+        table = ExpectedOutcomeTable.build(make_league(), 2024)
+
+        restored = ExpectedOutcomeTable.from_arrays(table.to_arrays())
+
+        assert restored.fingerprint == table.fingerprint
+        np.testing.assert_array_equal(restored.xwoba, table.xwoba)
+
+
+def test_add_expected_outcomes_and_contact_quality():
+    """被打球データに期待値の列が追加され、球種別・全体の打球の質が集計できることのテスト"""
+    table = ExpectedOutcomeTable.build(make_league(), 2024)
+    batted_balls = pd.DataFrame({
+        'pitch_type': ['FF', 'FF', 'SL'],
+        'launch_speed': [105.0, 70.0, 96.0],
+        'launch_angle': [20.0, 0.0, np.nan]
+    })
+
+    assert add_expected_outcomes(batted_balls, None)['xba'].isna().all()
+
+    quality = contact_quality(add_expected_outcomes(batted_balls, table))
+    assert quality.index.tolist() == ['FF', 'SL', 'all']
+    assert quality.loc['all', 'batted_balls'] == 3
+    assert quality.loc['FF', 'hard_hit_pct'] == 50.0
+    assert np.isnan(quality.loc['SL', 'xba'])
+    assert quality.loc['all', 'xba'] == pytest.approx(quality.loc['FF', 'xba'])
@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.domain.fatigue import add_outing_position, analyze_fatigue, detect_velocity_drop, rolling_trends
+
+
+def make_game(game_pk, batters=27, drop_after=None, seed=0):
+    """1打席4球の試合データ（drop_after球目以降は速球の球速が3mph落ちる）"""
+    rng = np.random.default_rng(seed)
+    rows = []
+    outing_pitch = 0
+    for at_bat in range(1, batters + 1):
+        for pitch_number in range(1, 5):
+            outing_pitch += 1
+            speed = 95.0 + rng.normal(0, 0.3)
+            if drop_after is not None and outing_pitch > drop_after:
+                speed -= 3.0
+            rows.append({
+                'game_pk': game_pk,
+                'at_bat_number': at_bat,
+                'pitch_number': pitch_number,
+                'batter': 100 + (at_bat - 1) % 9,
+                'pitch_type': 'FF' if pitch_number % 2 == 1 else 'SL',
+                'release_speed': speed if pitch_number % 2 == 1 else 85.0,
+                'description': ['ball', 'swinging_strike', 'foul', 'hit_into_play'][pitch_number - 1]
+            })
+    return pd.DataFrame(rows)
+
+
+def test_add_outing_position():
+    """並べ替えたうえで試合ごとに通算球数・巡目・球数帯が求められることのテスト"""
+    data = pd.concat([make_game(1, batters=10), make_game(2, batters=2)]).sample(frac=1, random_state=0)
+
+    positioned = add_outing_position(data)
+
+    first_game = positioned[positioned['game_pk'] == 1]
+    assert first_game['outing_pitch'].tolist() == list(range(1, 41))
+    assert first_game['times_through_order'].tolist()[35:] == [1, 2, 2, 2, 2]
+    assert positioned['pitch_count_bucket'].iloc[15] == '16-30'
+    assert positioned[positioned['game_pk'] == 2]['outing_pitch'].max() == 8
+
+
+def test_rolling_trends_reset_per_game():
+    """移動平均が試合の先頭をまたがないことのテスト"""
+    data = pd.concat([make_game(1, batters=3), make_game(2, batters=3).assign(release_speed=90.0)])
+    trend = rolling_trends(add_outing_position(data), window=4, pitch_type='FF')
+
+    second_game = trend[trend['game_index'] == 1]
+    assert second_game['rolling_velocity'].iloc[0] == 90.0
+    assert second_game['rolling_whiff_pct'].iloc[0] != second_game['rolling_whiff_pct'].iloc[0]  # NaN
+    assert second_game['rolling_whiff_pct'].iloc[3] == pytest.approx(100 / 3)
+
+
+def test_detect_velocity_drop():
+    """球速が落ちた試合だけ検出され、開始位置が落ち始めた付近になることのテスト"""
+    data = pd.concat([make_game(1, drop_after=70), make_game(2, seed=1)])
+
+    drops = detect_velocity_drop(add_outing_position(data), 'FF')
+
+    assert 69 <= drops.loc[0, 'onset_pitch'] <= 75
+    assert drops.loc[0, 'alarm_pitch'] >= drops.loc[0, 'onset_pitch']
+    assert drops.loc[0, 'velocity_drop'] == pytest.approx(-3.0, abs=0.5)
+    assert pd.isna(drops.loc[1, 'onset_pitch'])
+
+
+def test_analyze_fatigue():
+    """巡目別・球数帯別の集計と試合ごとの検出結果のテスト"""
+    result = analyze_fatigue(pd.concat([make_game(1, drop_after=70), make_game(2, seed=1)]))
+
+    assert result['pitch_type'] == 'FF'
+    assert list(result['by_times_through_order']) == ['1', '2', '3']
+    assert result['by_times_through_order']['1']['pitches'] == 72
+    assert result['by_pitch_count']['1-15']['pitches'] == 30
+    assert result['velocity_drop'][1]['onset_pitch'] is not None
+    assert result['velocity_drop'][2]['onset_pitch'] is None
+    assert len(result['trend']) == 216
@@ -0,0 +1,111 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.domain.incremental_analyzer import IncrementalPitchAnalyzer
+from src.domain.pitch_analyzer import PitchAnalyzer
+
+
+def _assert_same(actual, expected):
+    """辞書・リスト・数値を再帰的に比較（数値は近似比較、NaN同士は一致とみなす）"""
+    if isinstance(expected, dict):
+        assert set(actual) == set(expected)
+        for key in expected:
+            _assert_same(actual[key], expected[key])
+    elif isinstance(expected, list):
+        assert list(actual) == expected
+    elif isinstance(expected, (float, np.floating)) and np.isnan(expected):
+        assert np.isnan(actual)
+    elif isinstance(expected, (int, float, np.number)):
+        assert actual == pytest.approx(expected)
+    else:
+        assert actual == expected
+
+
+class TestIncrementalPitchAnalyzer:
+    """IncrementalPitchAnalyzerクラスのテスト"""
+    
+    @pytest.fixture
+    def game_data(self):
+        rng = np.random.default_rng(7)
+        n = 300
+        speeds = rng.normal(93.0, 3.0, n)
+        speeds[::29] = np.nan
+        return pd.DataFrame({
+            'game_pk': 7001,
+            'at_bat_number': np.arange(n) // 4 + 1,
+            'pitch_number': np.arange(n) % 4 + 1,
+            'inning': np.arange(n) // 35 + 1,
+            'pitch_type': rng.choice(['FF', 'SL', 'CH', ''], n),
+            'release_speed': speeds,
+            'plate_x': rng.normal(0.0, 0.8, n),
+            'plate_z': rng.normal(2.5, 0.7, n),
+            'pfx_x': rng.normal(0.0, 6.0, n),
+            'pfx_z': rng.normal(8.0, 4.0, n),
+            'description': rng.choice(['ball', 'called_strike', 'swinging_strike', 'foul', 'hit_into_play'], n),
+            'type': rng.choice(['S', 'B', 'X'], n),
+            'events': None,
+            'launch_angle': rng.normal(12.0, 20.0, n)
+        })
+    
+    def test_chunks_match_batch(self, game_data):
+        """分割して追加した結果がまとめて分析した結果と一致することのテスト"""
+        incremental = IncrementalPitchAnalyzer()
+        for start in range(0, len(game_data), 70):
+            incremental.update(game_data.iloc[start:start + 70])
+        
+        actual = incremental.results()
+        expected = PitchAnalyzer().analyze_all(game_data)
+        
+        for key in ['inning_analysis', 'pitch_type_analysis', 'performance_summary']:
+            _assert_same(actual[key], expected[key])
+        pd.testing.assert_frame_equal(actual['batted_ball_analysis'], expected['batted_ball_analysis'])
+        assert incremental.pitch_count == len(game_data)
+    
+    def test_repulled_game_counts_new_pitches_only(self, game_data):
+        """試合全体を取得し直して渡しても、新しい投球だけが追加されることのテスト"""
+        incremental = IncrementalPitchAnalyzer()
+        
+        assert incremental.update(game_data.iloc[:100]) == 100
+        assert incremental.update(game_data.iloc[:180]) == 80
+        assert incremental.update(game_data.iloc[:180]) == 0
+        
+        expected = PitchAnalyzer().analyze_all(game_data.iloc[:180])
+        _assert_same(incremental.results()['performance_summary'], expected['performance_summary'])
+    
+    def test_empty_and_reset(self, game_data):
+        """集計前とリセット後は空のデータと同じ結果を返すことのテスト"""
+        incremental = IncrementalPitchAnalyzer()
+        expected = PitchAnalyzer().analyze_all(pd.DataFrame())
+        
+        assert incremental.results()['inning_analysis'] == expected['inning_analysis']
+        
+        incremental.update(game_data)
+        incremental.reset()
+        
+        assert incremental.pitch_count == 0
+        assert incremental.results()['performance_summary'] == expected['performance_summary']
+    
+    def test_same_frame_twice_does_not_double_count(self, game_data):
+        """同じデータを2回渡しても集計が変わらないことのテスト"""
+        incremental = IncrementalPitchAnalyzer()
+        incremental.update(game_data)
+        before = incremental.results()
+        
+        assert incremental.update(game_data) == 0
+        assert incremental.pitch_count == len(game_data)
+        _assert_same(incremental.results()['inning_analysis'], before['inning_analysis'])
+        _assert_same(incremental.results()['performance_summary'], before['performance_summary'])
+    
+    def test_requires_inning_and_pitch_type(self):
+        """inningまたはpitch_typeがないデータは受け付けないことのテスト"""
+        with pytest.raises(ValueError):
+            IncrementalPitchAnalyzer().update(pd.DataFrame({'release_speed': [95.0]}))
+    
+    def test_requires_pitch_keys(self, game_data):
+        """at_bat_numberまたはpitch_numberがなく投球を識別できないデータは受け付けないことのテスト"""
+        incremental = IncrementalPitchAnalyzer()
+        for column in ['at_bat_number', 'pitch_number']:
+            with pytest.raises(ValueError):
+                incremental.update(game_data.drop(columns=column))
+        assert incremental.pitch_count == 0
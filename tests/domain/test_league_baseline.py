@@ -0,0 +1,86 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.domain.league_baseline import QUANTILE_POINTS, LeagueBaseline, percentile_table
+
+
+def make_league(season=2024, pitchers=4, pitches=100, seed=0):
+    """投手ごとに速球の球速と空振り率が異なるリーグ全体の投球データ"""
+    rng = np.random.default_rng(seed)
+    frames = []
+    for pitcher in range(pitchers):
+        whiffs = rng.random(pitches) < 0.05 * (pitcher + 1)
+        frames.append(pd.DataFrame({
+            'game_date': f'{season}-05-01',
+            'pitcher': pitcher,
+            'pitch_type': 'FF',
+            'release_speed': 92.0 + pitcher + rng.normal(0, 0.5, pitches),
+            'release_spin_rate': 2300.0 + rng.normal(0, 50, pitches),
+            'pfx_x': -0.5 + rng.normal(0, 0.05, pitches),
+            'pfx_z': 1.3 + rng.normal(0, 0.05, pitches),
+            'description': np.where(whiffs, 'swinging_strike', 'ball')
+        }))
+    return pd.concat(frames, ignore_index=True)
+
+
+class TestLeagueBaseline:
+    """LeagueBaselineクラスのテスト"""
+
+    def test_build(self):
+        """球種 × 指標ごとに分位数が作られ、他のシーズンの投球は使われないことのテスト"""
+        data = pd.concat([make_league(2024), make_league(2023, pitchers=1)])
+
+        baseline = LeagueBaseline.build(data, 2024)
+
+        assert baseline.pitch_types() == ['FF']
+        assert baseline.sample_sizes[('FF', 'release_speed')] == 400
+        # 空振り率の分布は投手ごとの値
+        assert baseline.sample_sizes[('FF', 'swinging_strike_pct')] == 4
+        quantiles = baseline.quantiles[('FF', 'horizontal_movement')]
+        assert len(quantiles) == QUANTILE_POINTS
+        assert np.all(np.diff(quantiles) >= 0)
+        assert quantiles[0] > 0
+
+    def test_percentile_matches_empirical_rank(self):
+        """パーセンタイルが元のデータに対する順位とほぼ一致することのテスト"""
+        data = make_league(pitchers=10, pitches=500)
+        baseline = LeagueBaseline.build(data, 2024)
+
+        values = np.array([92.0, 95.0, 97.5, 200.0, 0.0])
+        expected = [(data['release_speed'] < v).mean() * 100 for v in values]
+        np.testing.assert_allclose(baseline.percentile('FF', 'release_speed', values), expected, atol=1.0)
+        assert baseline.percentile('FF', 'release_speed', 200.0) == 100.0
+
+    def test_percentile_ties_and_missing(self):
+        """同じ値が続く分布では中央の値、分布がない場合や欠損値はNaNになることのテスト"""
+        baseline = LeagueBaseline(2024, {('FF', 'x'): np.array([1.0, 2.0, 2.0, 2.0, 3.0])}, {('FF', 'x'): 5})
+
+        assert baseline.percentile('FF', 'x', 2.0) == pytest.approx(50.0)
+        assert baseline.percentile('FF', 'x', 1.5) == pytest.approx(12.5)
+        assert np.isnan(baseline.percentile('FF', 'x', np.nan))
+        assert np.isnan(baseline.percentile('SL', 'x', 2.0))
+
+    def test_round_trip_arrays(self):
+        """to_arraysとfrom_arraysで復元できることのテスト"""
+        baseline = LeagueBaseline.build(make_league(), 2024)
+
+        restored = LeagueBaseline.from_arrays(baseline.to_arrays())
+
+        assert restored.season == 2024
+        assert restored.sample_sizes == baseline.sample_sizes
+        for key, quantiles in baseline.quantiles.items():
+            np.testing.assert_array_equal(restored.quantiles[key], quantiles)
+
+
+def test_percentile_table():
+    """1試合の球種ごとの平均値がリーグ内のパーセンタイルに変換されることのテスト"""
+    league = make_league(pitchers=10, pitches=200)
+    baseline = LeagueBaseline.build(league, 2024)
+    game = league[league['pitcher'] == 9].assign(pitch_type=['FF'] * 199 + ['KN'])
+
+    table = percentile_table(game, baseline)
+
+    assert table['FF']['release_speed'] > 90
+    assert table['FF']['swinging_strike_pct'] > 50
+    assert table['KN']['release_speed'] is None
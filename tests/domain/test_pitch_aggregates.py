@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.domain.pitch_aggregates import build_cells, rollup, moment_stats, merge_cells
+
+
+class TestPitchAggregates:
+    """セル集計とロールアップのテスト"""
+    
+    @pytest.fixture
+    def sample_data(self):
+        rng = np.random.default_rng(1)
+        n = 500
+        speeds = rng.normal(93.0, 3.0, n)
+        speeds[::17] = np.nan
+        return pd.DataFrame({
+            'inning': rng.integers(1, 8, n).astype(float),
+            'pitch_type': rng.choice(['FF', 'SL', 'CH', None], n),
+            'release_speed': speeds,
+            'description': rng.choice(['ball', 'called_strike', 'swinging_strike', 'foul', 'hit_into_play'], n),
+            'type': rng.choice(['S', 'B', 'X'], n)
+        })
+    
+    def test_rollup_matches_direct_groupby(self, sample_data):
+        """セルを集約した結果が元データを直接集計した結果と一致することのテスト"""
+        cells = build_cells(sample_data, ['inning', 'pitch_type'])
+        
+        by_type = rollup(cells, 'pitch_type')
+        expected = sample_data.groupby('pitch_type')['release_speed'].agg(['mean', 'max', 'min', 'std'])
+        stats = moment_stats(by_type, 'release_speed')
+        
+        assert list(by_type.index) == list(expected.index)
+        np.testing.assert_allclose(stats[['mean', 'max', 'min', 'std']].to_numpy(), expected.to_numpy())
+        assert list(by_type['pitches']) == list(sample_data.groupby('pitch_type').size())
+    
+    def test_rollup_total_includes_missing_keys(self, sample_data):
+        """全体の集約には欠損値のキーの投球も含まれることのテスト"""
+        cells = build_cells(sample_data, ['inning', 'pitch_type'])
+        
+        totals = rollup(cells).iloc[0]
+        
+        assert totals['pitches'] == len(sample_data)
+        assert totals['is_strike_type'] == sample_data['type'].isin(['S', 'X']).sum()
+        assert totals['release_speed_mean'] == pytest.approx(sample_data['release_speed'].mean())
+        assert np.sqrt(totals['release_speed_m2'] / (totals['release_speed_n'] - 1)) == \
+            pytest.approx(sample_data['release_speed'].std())
+    
+    def test_merge_cells_matches_single_pass(self, sample_data):
+        """分割して集計したセルを合成した結果が一括の集計と一致することのテスト"""
+        keys = ['inning', 'pitch_type']
+        expected = rollup(build_cells(sample_data, keys), 'pitch_type')
+        
+        merged = merge_cells(build_cells(sample_data.iloc[:123], keys), build_cells(sample_data.iloc[123:], keys))
+        actual = rollup(merged, 'pitch_type')
+        
+        assert merged['pitches'].sum() == len(sample_data)
+        pd.testing.assert_index_equal(actual.index, expected.index)
+        np.testing.assert_allclose(actual.to_numpy(dtype=float), expected.to_numpy(dtype=float))
@@ -1,3 +1,9 @@
+import pandas as pd
+import pytest
+
+from src.domain.pitch_analyzer import PitchAnalyzer
+
+
 class TestPitchAnalyzer:
     """PitchAnalyzerクラスのテスト"""
     
@@ -122,4 +128,71 @@ class TestPitchAnalyzer:
         
         # 結果の検証
         assert result['outcomes']['called_strikes'] == 2
-        assert result['outcomes']['swinging_strikes'] == 3
\ No newline at end of file
+        assert result['outcomes']['swinging_strikes'] == 3
+    
+    def test_analyze_all_matches_individual_analyses(self, sample_pitch_data):
+        """まとめて実行した結果が個別の分析と一致することのテスト"""
+        analyzer = PitchAnalyzer()
+        data = sample_pitch_data.copy()
+        data.loc[0, 'pitch_type'] = None
+        
+        result = analyzer.analyze_all(data)
+        
+        def assert_same(expected, actual):
+            if isinstance(expected, dict):
+                assert set(expected) == set(actual)
+                for key in expected:
+                    assert_same(expected[key], actual[key])
+            elif isinstance(expected, list):
+                assert expected == actual
+            elif pd.isna(expected):
+                assert pd.isna(actual)
+            else:
+                assert actual == pytest.approx(expected)
+        
+        assert_same(analyzer.analyze_by_inning(data), result['inning_analysis'])
+        assert_same(analyzer.analyze_by_pitch_type(data), result['pitch_type_analysis'])
+        assert_same(analyzer.get_performance_summary(data), result['performance_summary'])
+        pd.testing.assert_frame_equal(analyzer.analyze_batted_balls(data), result['batted_ball_analysis'])
+    
+    def test_analyze_all_empty(self):
+        """空のデータの場合は各分析のエラー結果を返すことのテスト"""
+        result = PitchAnalyzer().analyze_all(pd.DataFrame())
+        
+        assert 'error' in result['inning_analysis']
+        assert 'error' in result['pitch_type_analysis']
+        assert result['batted_ball_analysis'].empty
+        assert 'error' in result['performance_summary']
+    
+    def test_aggregate_games(self, sample_pitch_data):
+        """複数試合の集計が試合ごとの分析と一致することのテスト"""
+        analyzer = PitchAnalyzer()
+        game1 = sample_pitch_data.assign(game_pk=1, game_date='2023-04-01')
+        game2 = sample_pitch_data.iloc[:5].assign(game_pk=2, game_date='2023-04-08')
+        season = pd.concat([game1, game2], ignore_index=True)
+        
+        result = analyzer.aggregate_games(season)
+        
+        assert set(result['scope']) == {'game_pitch_type', 'game_inning', 'game', 'season_pitch_type', 'season'}
+        
+        # 試合×球種の集計は1試合分の球種別分析と一致する
+        expected = analyzer.analyze_by_pitch_type(game2)
+        rows = result[(result['scope'] == 'game_pitch_type') & (result['game_pk'] == 2)].set_index('pitch_type')
+        for pitch_type, usage in expected['usage'].items():
+            assert rows.loc[pitch_type, 'pitches'] == usage['count']
+            assert rows.loc[pitch_type, 'usage_pct'] == pytest.approx(usage['percentage'])
+            assert rows.loc[pitch_type, 'release_speed_mean'] == pytest.approx(expected['velocity'][pitch_type]['mean'])
+        
+        # 試合×イニング
+        innings = result[(result['scope'] == 'game_inning') & (result['game_pk'] == 1)].set_index('inning')
+        assert innings.loc[3, 'pitches'] == 3
+        
+        # シーズン合計
+        season_row = result[result['scope'] == 'season'].iloc[0]
+        assert season_row['season'] == 2023
+        assert season_row['pitches'] == 13
+        assert season_row['release_speed_max'] == pytest.approx(96.1)
+    
+    def test_aggregate_games_requires_game_key(self, sample_pitch_data):
+        """試合を識別するカラムがない場合は空の表を返すことのテスト"""
+        assert PitchAnalyzer().aggregate_games(sample_pitch_data).empty
@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+import pandas as pd
+
+from src.domain.pitch_analyzer import PitchAnalyzer
+from src.domain.pitch_outcomes import (
+    OUTCOME_CODES, EVENT_CODES, OUTCOME_COLUMNS, classify_outcomes, with_outcome_flags
+)
+
+
+class TestPitchOutcomes:
+    """投球結果の分類のテスト"""
+    
+    def test_classify_outcomes(self):
+        """descriptionとeventsからフラグとコードを計算するテスト"""
+        data = pd.DataFrame({
+            'description': ['called_strike', 'swinging_strike_blocked', 'foul_tip', 'blocked_ball',
+                            'hit_into_play', 'hit_by_pitch', 'Called_Strike', None],
+            'events': [None, 'strikeout', None, 'walk', 'grounded_into_double_play', 'hit_by_pitch', None, None]
+        })
+        
+        result = classify_outcomes(data)
+        
+        assert list(result['is_called_strike']) == [True, False, False, False, False, False, True, False]
+        assert list(result['is_swinging_strike']) == [False, True, False, False, False, False, False, False]
+        assert list(result['is_foul']) == [False, False, True, False, False, False, False, False]
+        assert list(result['is_ball']) == [False, False, False, True, False, False, False, False]
+        assert list(result['is_in_play']) == [False, False, False, False, True, False, False, False]
+        assert list(result['is_swing']) == [False, True, True, False, True, False, False, False]
+        assert list(result['outcome_code']) == [
+            OUTCOME_CODES['called_strike'], OUTCOME_CODES['swinging_strike'], OUTCOME_CODES['foul'],
+            OUTCOME_CODES['ball'], OUTCOME_CODES['in_play'], OUTCOME_CODES['hit_by_pitch'],
+            OUTCOME_CODES['called_strike'], OUTCOME_CODES['other']
+        ]
+        assert list(result['event_code']) == [
+            EVENT_CODES['none'], EVENT_CODES['strikeout'], EVENT_CODES['none'], EVENT_CODES['walk'],
+            EVENT_CODES['out'], EVENT_CODES['hit_by_pitch'], EVENT_CODES['none'], EVENT_CODES['none']
+        ]
+        assert result['outcome_code'].dtype == np.int8
+    
+    def test_with_outcome_flags_is_idempotent(self):
+        """フラグ追加済みのフレームは再計算せずにそのまま返すことのテスト"""
+        data = pd.DataFrame({'description': ['ball', 'foul']})
+        
+        flagged = with_outcome_flags(data)
+        
+        assert all(column in flagged.columns for column in OUTCOME_COLUMNS)
+        assert 'is_ball' not in data.columns
+        assert with_outcome_flags(flagged) is flagged
+    
+    def test_missing_columns(self):
+        """descriptionとeventsがない場合のテスト"""
+        result = classify_outcomes(pd.DataFrame({'inning': [1, 2]}))
+        
+        assert not result['is_swing'].any()
+        assert list(result['event_code']) == [EVENT_CODES['none']] * 2
+    
+    def test_whiff_percentage_uses_all_swings(self):
+        """空振り率の分母がファウルと打球を含むスイング数であることのテスト"""
+        data = pd.DataFrame({
+            'inning': [1, 1, 1, 1],
+            'description': ['swinging_strike', 'foul', 'hit_into_play', 'ball']
+        })
+        
+        result = PitchAnalyzer().analyze_by_inning(data)
+        
+        assert result['whiff_percentage']['1'] == pytest.approx(100 / 3)
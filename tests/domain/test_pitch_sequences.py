@@ -0,0 +1,61 @@
+import pandas as pd
+import pytest
+
+from src.domain.pitch_analyzer import PitchAnalyzer
+from src.domain.pitch_sequences import PitchSequences
+
+
+@pytest.fixture
+def sample_data():
+    # 2試合分（並び順はばらばら）。打席をまたぐ並びは数えない
+    return pd.DataFrame({
+        'game_pk': [1, 1, 1, 1, 1, 2, 2, 2],
+        'at_bat_number': [1, 1, 1, 2, 2, 1, 1, 1],
+        'pitch_number': [2, 1, 3, 1, 2, 3, 2, 1],
+        'pitch_type': ['SL', 'FF', 'FF', 'SL', 'FF', 'CH', 'SL', 'FF'],
+        'description': ['swinging_strike', 'ball', 'hit_into_play', 'ball', 'foul',
+                        'swinging_strike', 'called_strike', 'ball']
+    })
+
+
+class TestPitchSequences:
+    """PitchSequencesクラスのテスト"""
+
+    def test_transition_matrix(self, sample_data):
+        """同じ打席内の連続する投球だけが遷移として数えられることのテスト"""
+        matrix = PitchSequences(sample_data).transition_matrix()
+
+        assert matrix.loc['FF', 'SL'] == 2
+        assert matrix.loc['SL', 'FF'] == 2
+        assert matrix.loc['SL', 'CH'] == 1
+        assert matrix.values.sum() == 5
+
+    def test_ngram_table(self, sample_data):
+        """3球の組み合わせと最後の投球の結果のテスト"""
+        table = PitchSequences(sample_data).ngram_table(3).set_index('sequence')
+
+        assert table.index.tolist() == ['FF-SL-CH', 'FF-SL-FF']
+        assert table.loc['FF-SL-FF', 'in_play'] == 1
+        assert table.loc['FF-SL-CH', 'swinging_strike'] == 1
+        assert table.loc['FF-SL-CH', 'whiff_percentage'] == 100.0
+        assert table['percentage'].sum() == pytest.approx(100.0)
+
+    def test_missing_pitch_type_breaks_sequence(self, sample_data):
+        """球種が欠損した投球を含む組み合わせは数えないことのテスト"""
+        sample_data.loc[0, 'pitch_type'] = None
+
+        table = PitchSequences(sample_data).ngram_table(2).set_index('sequence')
+
+        assert table.loc['FF-SL', 'count'] == 1
+        assert table['count'].sum() == 3
+
+
+def test_analyze_sequences(sample_data):
+    """PitchAnalyzerから遷移と組み合わせを取得できることのテスト"""
+    result = PitchAnalyzer().analyze_sequences(sample_data, top_n=1)
+
+    assert result['pitch_types'] == ['CH', 'FF', 'SL']
+    assert result['transitions']['SL'] == {'CH': 1, 'FF': 2}
+    assert len(result['sequences'][2]) == 1
+    assert result['sequences'][2][0]['count'] == 2
+    assert 'error' in PitchAnalyzer().analyze_sequences(sample_data.drop(columns=['pitch_number']))
@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.domain.run_values import UNKNOWN, RunValueCube, zone_codes
+
+
+def make_game():
+    return pd.DataFrame({
+        'pitch_type': ['FF', 'FF', 'SL', 'SL', 'FF', None],
+        'zone': [5, 5, 14, np.nan, 11, 5],
+        'balls': [0, 1, 0, 0, 0, 0],
+        'strikes': [0, 0, 1, 1, 0, 0],
+        'delta_run_exp': [-0.04, 0.1, -0.06, np.nan, 0.5, 0.2]
+    })
+
+
+def test_zone_codes():
+    """ゾーンが軸の位置に変換され、不明な値は末尾になることのテスト"""
+    codes = zone_codes(pd.DataFrame({'zone': [1, 9, 11.0, 14, np.nan, 10]}))
+
+    assert codes.tolist() == [0, 8, 9, 12, 13, 13]
+
+
+class TestRunValueCube:
+    """RunValueCubeクラスのテスト"""
+
+    def test_from_pitches(self):
+        """球種 × ゾーン × カウントごとに集計され、得点価値は投手側から見た値になることのテスト"""
+        cube = RunValueCube.from_pitches(make_game())
+
+        assert cube.pitch_types == ['FF', 'SL']
+        assert cube.pitches.sum() == 5
+
+        by_zone = cube.table(['pitch_type', 'zone'])
+        assert by_zone.loc[('FF', '5'), 'pitches'] == 2
+        assert by_zone.loc[('FF', '5'), 'run_value'] == pytest.approx(-0.06)
+        assert by_zone.loc[('SL', UNKNOWN), 'pitches'] == 1
+        assert np.isnan(by_zone.loc[('SL', UNKNOWN), 'run_value_per_100'])
+
+        by_count = cube.table(['count_state', 'pitch_type'])
+        assert by_count.index.names == ['count_state', 'pitch_type']
+        assert by_count.loc[('0-1', 'SL'), 'pitches'] == 2
+
+    def test_merge_and_to_dict(self):
+        """試合ごとの集計を足し合わせた得点価値がまとめて集計した結果と一致することのテスト"""
+        game1 = make_game()
+        game2 = make_game().assign(pitch_type=['CU', 'FF', 'FF', 'FF', 'FF', 'FF'])
+
+        merged = RunValueCube.merge_all([RunValueCube.from_pitches(game1), RunValueCube.from_pitches(game2)])
+        expected = RunValueCube.from_pitches(pd.concat([game1, game2])).to_dict()
+
+        result = merged.to_dict()
+        assert result == expected
+        assert result['pitch_types'] == ['CU', 'FF', 'SL']
+        assert result['run_values']['SL'] == {
+            'pitches': 2, 'run_value': pytest.approx(0.06), 'run_value_per_100': pytest.approx(6.0)
+        }
+        assert result['total']['pitches'] == 11
+
+    def test_round_trip_and_empty(self):
+        """保存用の配列から復元でき、投球がない場合も集計できることのテスト"""
+        cube = RunValueCube.from_pitches(make_game())
+
+        assert RunValueCube.from_arrays(cube.to_arrays()).to_dict() == cube.to_dict()
+        assert RunValueCube.merge_all([]).to_dict() == {
+            'pitch_types': [], 'run_values': {}, 'total': {'pitches': 0, 'run_value': 0.0, 'run_value_per_100': None}
+        }
@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.domain.pitch_analyzer import PitchAnalyzer
+from src.domain.situational_splits import SplitCube, split_keys
+
+
+@pytest.fixture
+def sample_data():
+    return pd.DataFrame({
+        'pitch_type': ['FF', 'SL', 'FF', 'CH', 'FF', 'SL'],
+        'stand': ['R', 'L', 'R', 'R', 'L', 'L'],
+        'on_1b': [np.nan, 1.0, 1.0, np.nan, np.nan, 1.0],
+        'on_2b': [np.nan, np.nan, 2.0, np.nan, np.nan, np.nan],
+        'on_3b': [np.nan, np.nan, np.nan, np.nan, 3.0, np.nan],
+        'outs_when_up': [0, 1, 2, 0, 1, 1],
+        'inning_topbot': ['Top', 'Top', 'Bot', 'Top', 'Bot', 'Top'],
+        'balls': [0, 1, 2, 0, 3, 1],
+        'strikes': [0, 0, 1, 1, 2, 1],
+        'release_speed': [95.0, 85.0, 96.0, 88.0, 94.0, 86.0],
+        'description': ['ball', 'swinging_strike', 'foul', 'called_strike', 'hit_into_play', 'foul']
+    })
+
+
+def test_split_keys(sample_data):
+    """走者の状況・アウト数・カウントがカテゴリ型のキーになることのテスト"""
+    keys = split_keys(sample_data)
+
+    assert keys['base_state'].tolist() == ['___', '1__', '12_', '___', '__3', '1__']
+    assert keys['outs'].tolist() == ['0', '1', '2', '0', '1', '1']
+    assert keys['count_state'].tolist()[:3] == ['0-0', '1-0', '2-1']
+    assert isinstance(keys['stand'].dtype, pd.CategoricalDtype)
+
+
+class TestSplitCube:
+    """SplitCubeクラスのテスト"""
+
+    def test_table(self, sample_data):
+        """状況の組み合わせごとの投球数・球種の割合・球速のテスト"""
+        table = SplitCube.from_pitches(sample_data).table(['stand', 'pitch_type'])
+
+        assert table.loc[('L', 'SL'), 'pitches'] == 2
+        assert table.loc[('L', 'SL'), 'usage_pct'] == pytest.approx(200 / 3)
+        assert table.loc[('R', 'FF'), 'release_speed_mean'] == 95.5
+
+    def test_derived_dimension(self, sample_data):
+        """走者の状況から導出した得点圏の集計のテスト"""
+        table = SplitCube.from_pitches(sample_data).table(['runners'])
+
+        assert table['pitches'].to_dict() == {'empty': 2, 'on_base': 2, 'risp': 2}
+        assert table.loc['risp', 'whiff_pct'] == 0.0
+
+    def test_merge_and_round_trip(self, sample_data):
+        """保存・復元した試合ごとの集計を合成した結果が、まとめて集計した結果と一致することのテスト"""
+        first = SplitCube.from_arrays(SplitCube.from_pitches(sample_data.iloc[:3]).to_arrays())
+        second = SplitCube.from_arrays(SplitCube.from_pitches(sample_data.iloc[3:]).to_arrays())
+
+        merged = SplitCube.merge_all([first, second]).table(['outs', 'inning_topbot'])
+        expected = SplitCube.from_pitches(sample_data).table(['outs', 'inning_topbot'])
+
+        pd.testing.assert_frame_equal(merged, expected, check_index_type=False)
+
+    def test_unknown_dimension(self, sample_data):
+        """未知の状況を指定した場合はエラーになることのテスト"""
+        with pytest.raises(ValueError):
+            SplitCube.from_pitches(sample_data).table(['weather'])
+
+
+def test_analyze_splits_without_columns(sample_data):
+    """必要なカラムがない状況は集計から除外されることのテスト"""
+    table = PitchAnalyzer().analyze_splits(sample_data.drop(columns=['on_1b']), ['pitch_type'])
+
+    assert table['pitches'].sum() == 6
+    assert PitchAnalyzer().analyze_splits(sample_data.drop(columns=['on_1b']), ['base_state']).empty
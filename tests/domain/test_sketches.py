@@ -0,0 +1,103 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.domain.sketches import HyperLogLog, SketchCube, TDigest
+
+
+class TestTDigest:
+    """TDigestクラスのテスト"""
+
+    def test_merged_quantiles(self):
+        """試合ごとのスケッチを合わせた分位数が全データの分位数に近く、重心の数が抑えられることのテスト"""
+        rng = np.random.default_rng(0)
+        games = [rng.normal(95.0, 1.5, 100) for _ in range(100)]
+
+        digest = TDigest()
+        for values in games:
+            digest = digest.merge(TDigest.from_values(values))
+
+        values = np.concatenate(games)
+        q = [0.01, 0.1, 0.5, 0.9, 0.99]
+        np.testing.assert_allclose(digest.quantile(q), np.quantile(values, q), atol=0.1)
+        assert digest.count == len(values)
+        assert len(digest.means) < 100
+        assert digest.quantile(0.0) == values.min()
+        assert digest.quantile(1.0) == values.max()
+
+    def test_small_and_empty(self):
+        """値が少ない場合は正確な値、空の場合はNaNになることのテスト"""
+        digest = TDigest.from_values([90.0, np.nan, 92.0, 94.0])
+
+        assert digest.quantile(0.5) == pytest.approx(92.0)
+        assert np.isnan(TDigest().quantile(0.5))
+
+
+class TestHyperLogLog:
+    """HyperLogLogクラスのテスト"""
+
+    def test_count(self):
+        """異なる値の数が近似でき、合わせると重複が除かれることのテスト"""
+        first = HyperLogLog.from_values(np.arange(0, 6000))
+        second = HyperLogLog.from_values(np.arange(4000, 10000))
+
+        assert first.count() == pytest.approx(6000, rel=0.05)
+        assert first.merge(second).count() == pytest.approx(10000, rel=0.05)
+        assert HyperLogLog.from_values([1, 2, 3, 3, None]).count() == 3
+        assert HyperLogLog().count() == 0
+
+    def test_mixed_dtypes(self):
+        """同じIDがint64とfloat64（欠損値を含むカラム）で保存されていても重複して数えないことのテスト"""
+        ids = np.arange(660000, 661500)
+        as_int = HyperLogLog.from_values(ids)
+        as_float = HyperLogLog.from_values(np.r_[ids.astype(float), np.nan])
+
+        np.testing.assert_array_equal(as_int.registers, as_float.registers)
+        assert as_int.merge(as_float).count() == as_int.count()
+        assert as_int.count() == pytest.approx(1500, rel=0.05)
+
+        cube = SketchCube.from_pitches(make_game(ids[:5], 95.0)).merge(
+            SketchCube.from_pitches(make_game(ids[:5].astype(float), 95.0))
+        )
+        assert cube.distinct_batters() == 5
+
+
+def make_game(batters, speed):
+    return pd.DataFrame({
+        'pitch_type': ['FF', 'SL'] * len(batters),
+        'release_speed': [speed, speed - 10] * len(batters),
+        'release_spin_rate': [2300.0, 2500.0] * len(batters),
+        'batter': np.repeat(batters, 2)
+    })
+
+
+class TestSketchCube:
+    """SketchCubeクラスのテスト"""
+
+    def test_merge_and_summary(self):
+        """試合ごとのスケッチを合わせて、球種別の分位数と対戦打者数が求められることのテスト"""
+        first = SketchCube.from_pitches(make_game(list(range(10)), 95.0))
+        second = SketchCube.from_pitches(make_game(list(range(5, 15)), 97.0).assign(pitch_type='FF', release_speed=97.0))
+
+        summary = first.merge(second).summary(quantiles=(0.0, 1.0))
+
+        assert summary['distinct_batters'] == 15
+        assert summary['pitch_types']['FF']['pitches'] == 30
+        assert summary['pitch_types']['FF']['release_speed'] == {'p0': 95.0, 'p100': 97.0}
+        assert summary['pitch_types']['SL']['release_speed']['p100'] == 85.0
+        assert summary['all']['pitches'] == 40
+
+    def test_round_trip_arrays(self):
+        """to_arraysとfrom_arraysで復元できることのテスト"""
+        cube = SketchCube.from_pitches(make_game(list(range(10)), 95.0))
+
+        restored = SketchCube.from_arrays(cube.to_arrays())
+
+        assert restored.summary() == cube.summary()
+
+    def test_empty(self):
+        """投球がない場合も集計・保存できることのテスト"""
+        cube = SketchCube.merge_all([])
+
+        assert cube.summary()['all']['release_speed']['p50'] is None
+        assert SketchCube.from_arrays(cube.to_arrays()).pitch_types == []
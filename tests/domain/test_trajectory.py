@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.domain.trajectory import PLATE_Y, Y0, Trajectories, trajectory_frame
+
+
+def make_pitches():
+    return pd.DataFrame({
+        'vx0': [5.0, -3.0], 'vy0': [-135.0, -120.0], 'vz0': [-6.0, -2.0],
+        'ax': [-12.0, 8.0], 'ay': [28.0, 24.0], 'az': [-15.0, -30.0],
+        'plate_x': [0.3, np.nan], 'plate_z': [2.4, np.nan],
+        'release_pos_x': [-1.8, -2.0], 'release_pos_z': [5.9, 6.0], 'release_extension': [6.3, 6.0]
+    })
+
+
+class TestTrajectories:
+    """Trajectoriesクラスのテスト"""
+
+    def test_anchor_positions(self):
+        """プレートの位置（ない場合はリリース位置）を通る軌道が再構成されることのテスト"""
+        trajectories = Trajectories.from_pitches(make_pitches())
+
+        at_plate = trajectories.positions_at_y(PLATE_Y)
+        assert at_plate[0] == pytest.approx([0.3, PLATE_Y, 2.4])
+        at_release = trajectories.positions_at_y(60.5 - 6.0)
+        assert at_release[1] == pytest.approx([-2.0, 54.5, 6.0])
+        assert trajectories.positions_at(np.zeros(2))[:, 1] == pytest.approx([Y0, Y0])
+
+    def test_positions_broadcast(self):
+        """共通の時刻と投球ごとの時刻の両方で位置が求められることのテスト"""
+        trajectories = Trajectories.from_pitches(make_pitches())
+
+        shared = trajectories.positions(np.array([0.0, 0.1, 0.2]))
+        per_pitch = trajectories.positions(np.array([[0.0, 0.1, 0.2], [0.0, 0.1, 0.2]]))
+
+        assert shared.shape == (2, 3, 3)
+        np.testing.assert_allclose(shared, per_pitch)
+        assert shared[0, 2, 2] == pytest.approx(trajectories.p0[0, 2] - 6.0 * 0.2 - 0.5 * 15.0 * 0.04)
+
+    def test_missing_kinematics(self):
+        """初期条件がない投球の位置はNaNになることのテスト"""
+        data = make_pitches()
+        data.loc[1, 'vy0'] = np.nan
+
+        assert np.isnan(Trajectories.from_pitches(data).positions_at_y(PLATE_Y)[1]).all()
+
+
+def test_trajectory_frame():
+    """リリースからプレートまでの軌道の点が投球ごとに並ぶことのテスト"""
+    frame = trajectory_frame(make_pitches(), points=5)
+
+    assert len(frame) == 10
+    first = frame[frame['pitch_index'] == 0]
+    assert first['y'].iloc[0] == pytest.approx(60.5 - 6.3)
+    assert first['y'].iloc[-1] == pytest.approx(PLATE_Y)
+    assert first['y'].is_monotonic_decreasing
@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.domain.tunneling import TunnelCube, tunnel_pairs
+
+
+def make_at_bats(game_pk=1, at_bats=3):
+    """速球とチェンジアップを交互に投げる打席（どちらもリリース位置は同じ）"""
+    rows = []
+    for at_bat in range(1, at_bats + 1):
+        for pitch_number, (pitch_type, plate_x, plate_z, vy0) in enumerate([
+            ('FF', 0.0, 3.0, -135.0), ('CH', 0.5, 1.5, -120.0), ('FF', 0.0, 3.0, -135.0)
+        ], start=1):
+            rows.append({
+                'game_pk': game_pk, 'at_bat_number': at_bat, 'pitch_number': pitch_number,
+                'pitch_type': pitch_type, 'vx0': 5.0 if pitch_type == 'FF' else 7.0, 'vy0': vy0,
+                'vz0': -5.0, 'ax': -10.0 if pitch_type == 'FF' else -15.0, 'ay': 28.0,
+                'az': -15.0 if pitch_type == 'FF' else -28.0, 'plate_x': plate_x, 'plate_z': plate_z,
+                'release_extension': 6.3
+            })
+    return pd.DataFrame(rows)
+
+
+def test_tunnel_pairs_blocks():
+    """打席内の連続する2球の距離が求められ、ブロックの大きさによらず同じ結果になることのテスト"""
+    data = make_at_bats().sample(frac=1, random_state=0)
+
+    pairs = tunnel_pairs(data)
+    blocked = tunnel_pairs(data, block_size=2)
+
+    # 1打席につき2組（打席をまたぐ組は含めない）
+    assert len(pairs) == 6
+    pd.testing.assert_frame_equal(pairs, blocked)
+    ff_to_ch = pairs[pairs['previous_pitch_type'] == 'FF'].iloc[0]
+    assert ff_to_ch['plate_distance'] == pytest.approx(np.hypot(0.5, 1.5) * 12)
+    assert ff_to_ch['tunnel_distance'] < ff_to_ch['plate_distance']
+
+
+class TestTunnelCube:
+    """TunnelCubeクラスのテスト"""
+
+    def test_merge_and_table(self):
+        """試合ごとの集計を足し合わせた平均距離がまとめて集計した結果と一致することのテスト"""
+        game1 = make_at_bats(1)
+        game2 = make_at_bats(2, at_bats=2).assign(pitch_type=lambda d: d['pitch_type'].replace('CH', 'SL'))
+
+        merged = TunnelCube.from_pitches(game1).merge(TunnelCube.from_pitches(game2))
+        expected = TunnelCube.from_pitches(pd.concat([game1, game2]))
+
+        pd.testing.assert_frame_equal(merged.table(), expected.table())
+        table = merged.table()
+        assert table.loc[('FF', 'CH'), 'pairs'] == 3
+        assert table.loc[('SL', 'FF'), 'pairs'] == 2
+        assert table.loc[('FF', 'CH'), 'plate_to_tunnel_ratio'] > 1
+
+    def test_round_trip_and_missing_columns(self):
+        """保存用の配列から復元でき、初期条件がない場合は組のない集計になることのテスト"""
+        cube = TunnelCube.from_pitches(make_at_bats())
+
+        assert TunnelCube.from_arrays(cube.to_arrays()).to_dict() == cube.to_dict()
+        assert TunnelCube.from_pitches(make_at_bats().drop(columns=['vx0'])).pairs.sum() == 0
+        assert TunnelCube.merge_all([]).to_dict() == {'pitch_types': [], 'pairs': []}
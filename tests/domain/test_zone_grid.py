@@ -0,0 +1,84 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.domain.zone_grid import OUTCOMES, STANDS, X_EDGES, Z_EDGES, ZoneGridCube, normalized_location
+
+
+@pytest.fixture
+def sample_data():
+    return pd.DataFrame({
+        'pitch_type': ['FF', 'FF', 'SL', 'SL', 'FF', None],
+        'stand': ['R', 'R', 'L', 'R', 'L', 'R'],
+        'plate_x': [0.0, 0.05, -0.5, 5.0, 0.0, 0.0],
+        'plate_z': [2.5, 2.55, 1.0, 2.5, np.nan, 2.5],
+        'sz_top': [3.5, 3.5, 3.0, np.nan, 3.5, 3.5],
+        'sz_bot': [1.5, 1.5, 1.0, np.nan, 1.5, 1.5],
+        'description': ['swinging_strike', 'called_strike', 'ball', 'foul', 'ball', 'ball']
+    })
+
+
+def test_normalized_location(sample_data):
+    """プレート幅とゾーンの上下端で正規化され、ゾーンがない投球は既定値を使うことのテスト"""
+    location = normalized_location(sample_data)
+
+    np.testing.assert_allclose(location['x'][:3], [0.0, 0.05 / (17 / 24), -0.5 / (17 / 24)])
+    np.testing.assert_allclose(location['z'][[0, 2, 3]], [0.5, 0.0, 0.5])
+
+
+class TestZoneGridCube:
+    """ZoneGridCubeクラスのテスト"""
+
+    def test_from_pitches(self, sample_data):
+        """球種・左右・結果・位置ごとに数え、欠損値を含む投球は除くことのテスト"""
+        cube = ZoneGridCube.from_pitches(sample_data)
+
+        assert cube.pitch_types == ['FF', 'SL']
+        assert cube.counts.shape == (2, len(STANDS), len(OUTCOMES), len(X_EDGES) - 1, len(Z_EDGES) - 1)
+        assert cube.counts.sum() == 4
+
+        # 中央付近の2球は同じマス、グリッド外の投球は端のマスに入る
+        center = cube.grid('FF', 'R')
+        assert center.max() == 2
+        assert cube.grid('SL', 'R')[-1].sum() == 1
+        assert cube.grid('SL', 'L', ['ball']).sum() == 1
+
+    def test_rates(self, sample_data):
+        """マスごとの空振り率・見逃しストライク率・球種の割合のテスト"""
+        cube = ZoneGridCube.from_pitches(sample_data)
+        cell = np.unravel_index(cube.grid('FF', 'R').argmax(), cube.grid().shape)
+
+        assert cube.whiff_rate('FF', 'R')[cell] == 100.0
+        assert cube.called_strike_rate('FF', 'R')[cell] == 100.0
+        assert cube.usage('FF', 'R')[cell] == 100.0
+        assert np.isnan(cube.whiff_rate('FF', 'R')[0, 0])
+
+    def test_merge_matches_single_pass(self, sample_data):
+        """試合ごとの集計を足し合わせた結果が、まとめて集計した結果と一致することのテスト"""
+        first = sample_data.iloc[:2]
+        second = sample_data.iloc[2:]
+
+        merged = ZoneGridCube.merge_all([ZoneGridCube.from_pitches(first), ZoneGridCube.from_pitches(second)])
+        expected = ZoneGridCube.from_pitches(sample_data)
+
+        assert merged.pitch_types == expected.pitch_types
+        np.testing.assert_array_equal(merged.counts, expected.counts)
+
+    def test_arrays_round_trip(self, sample_data):
+        """配列に変換して復元できること、区切りが異なる場合はエラーになることのテスト"""
+        cube = ZoneGridCube.from_pitches(sample_data)
+        arrays = cube.to_arrays()
+
+        restored = ZoneGridCube.from_arrays(arrays)
+        assert restored.pitch_types == cube.pitch_types
+        np.testing.assert_array_equal(restored.counts, cube.counts)
+
+        with pytest.raises(ValueError):
+            ZoneGridCube.from_arrays({**arrays, 'x_edges': np.linspace(-3, 3, 13)})
+
+    def test_empty(self):
+        """投球がない場合は空の集計になることのテスト"""
+        cube = ZoneGridCube.merge_all([])
+
+        assert cube.pitch_types == []
+        assert cube.grid().sum() == 0
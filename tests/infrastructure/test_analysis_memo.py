@@ -0,0 +1,91 @@
+import pandas as pd
+import pytest
+
+from src.domain.pitch_analyzer import PitchAnalyzer
+from src.infrastructure.analysis_memo import AnalysisMemo, frame_fingerprint
+
+
+@pytest.fixture
+def sample_data():
+    return pd.DataFrame({
+        'pitch_type': ['FF', 'SL', 'FF', None],
+        'release_speed': [95.2, 86.1, 94.8, 93.0],
+        'inning': [1, 1, 2, 2],
+        'description': ['ball', 'called_strike', 'hit_into_play', 'foul']
+    })
+
+
+def test_frame_fingerprint(sample_data):
+    """内容が同じなら一致し、値・型・カラムのいずれかが異なれば変わることのテスト"""
+    fingerprint = frame_fingerprint(sample_data)
+
+    assert frame_fingerprint(sample_data.copy()) == fingerprint
+    assert frame_fingerprint(sample_data.set_index(pd.Index([10, 11, 12, 13]))) == fingerprint
+
+    changed_value = sample_data.copy()
+    changed_value.loc[2, 'description'] = 'foul'
+    changed_type = sample_data.astype({'inning': float})
+    renamed = sample_data.rename(columns={'inning': 'period'})
+
+    assert len({fingerprint, frame_fingerprint(changed_value), frame_fingerprint(changed_type),
+                frame_fingerprint(renamed), frame_fingerprint(sample_data.iloc[::-1])}) == 5
+
+
+class TestAnalysisMemo:
+    """AnalysisMemoクラスのテスト"""
+
+    def test_get_or_compute_persists_across_instances(self, tmp_path, sample_data):
+        """2回目以降は計算せず、再起動後（別インスタンス）も保存済みの結果を使うことのテスト"""
+        calls = []
+
+        def compute(data):
+            calls.append(len(data))
+            return PitchAnalyzer().analyze_all(data)
+
+        memo = AnalysisMemo(str(tmp_path / 'memo.sqlite'))
+        first = memo.get_or_compute(sample_data, 'analyze_all', 1, compute)
+        second = memo.get_or_compute(sample_data.copy(), 'analyze_all', 1, compute)
+        memo.close()
+
+        restarted = AnalysisMemo(str(tmp_path / 'memo.sqlite'))
+        third = restarted.get_or_compute(sample_data, 'analyze_all', 1, compute)
+
+        assert calls == [4]
+        assert second['performance_summary'] == first['performance_summary']
+        pd.testing.assert_frame_equal(third['batted_ball_analysis'], first['batted_ball_analysis'])
+
+        # バージョンが変われば計算し直す
+        restarted.get_or_compute(sample_data, 'analyze_all', 2, compute)
+        assert calls == [4, 4]
+
+    def test_results_are_independent_copies(self, tmp_path):
+        """取得した結果を変更しても保存済みの結果は変わらないことのテスト"""
+        memo = AnalysisMemo(str(tmp_path / 'memo.sqlite'))
+        memo.put('k', {'innings': [1, 2]})
+
+        memo.get('k')['innings'].append(3)
+
+        assert memo.get('k') == {'innings': [1, 2]}
+
+    def test_eviction_keeps_recently_used(self, tmp_path):
+        """上限を超えると最後に参照されてから最も時間が経った結果から削除されることのテスト"""
+        memo = AnalysisMemo(str(tmp_path / 'memo.sqlite'), max_entries=2, memory_entries=1)
+        memo.put('a', 1)
+        memo.put('b', 2)
+        assert memo.get('a') == 1
+
+        memo.put('c', 3)
+
+        assert memo.get('b') is None
+        assert memo.get('a') == 1
+        assert memo.get('c') == 3
+        assert memo.get_stats()['entries'] == 2
+
+    def test_max_bytes(self, tmp_path):
+        """合計サイズの上限を超えた分が削除されることのテスト"""
+        memo = AnalysisMemo(str(tmp_path / 'memo.sqlite'), max_entries=None, max_bytes=1)
+
+        memo.put('a', 'x' * 100)
+
+        assert memo.get_stats()['entries'] == 0
+        assert memo.get('a') is None
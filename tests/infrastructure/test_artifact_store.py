@@ -0,0 +1,61 @@
+import numpy as np
+
+from src.infrastructure.artifact_store import GameArtifactStore
+
+
+class TestGameArtifactStore:
+    """GameArtifactStoreクラスのテスト"""
+
+    def test_save_and_load(self, tmp_path):
+        """配列とメタデータを保存して読み込めることのテスト"""
+        store = GameArtifactStore(str(tmp_path))
+        arrays = {'labels': np.array(['FF', 'SL']), 'counts': np.arange(6).reshape(2, 3)}
+
+        store.save('zone_grid', 1, '123', '2023-04-01', arrays, metadata={'source_cached_at': '2023-04-02T00:00:00'})
+
+        loaded = store.load('zone_grid', 1, '123', '2023-04-01')
+        assert loaded.keys() == arrays.keys()
+        np.testing.assert_array_equal(loaded['counts'], arrays['counts'])
+        assert loaded['labels'].tolist() == ['FF', 'SL']
+        assert store.load_metadata('zone_grid', 1, '123', '2023-04-01') == {'source_cached_at': '2023-04-02T00:00:00'}
+
+        loaded, metadata = store.load_with_metadata('zone_grid', 1, '123', '2023-04-01')
+        assert loaded.keys() == arrays.keys()
+        assert metadata == {'source_cached_at': '2023-04-02T00:00:00'}
+        assert store.load_with_metadata('zone_grid', 1, '123', '2023-04-08') is None
+
+    def test_versions_are_separate(self, tmp_path):
+        """別のバージョンで保存した集計は読み込まれないことのテスト"""
+        store = GameArtifactStore(str(tmp_path))
+        store.save('zone_grid', 1, '123', '2023-04-01', {'counts': np.zeros(3)})
+
+        assert store.load('zone_grid', 2, '123', '2023-04-01') is None
+        assert store.list_game_dates('zone_grid', 1, '123') == ['2023-04-01']
+        assert store.list_game_dates('zone_grid', 2, '123') == []
+
+    def test_delete_and_corrupt_file(self, tmp_path):
+        """削除と、壊れたファイルを読み込んだ場合にNoneを返すことのテスト"""
+        store = GameArtifactStore(str(tmp_path))
+        store.save('zone_grid', 1, '123', '2023-04-01', {'counts': np.zeros(3)})
+        store.save('zone_grid', 1, '123', '2023-04-08', {'counts': np.zeros(3)})
+
+        assert store.delete('zone_grid', 1, '123', '2023-04-01') is True
+        assert store.delete('zone_grid', 1, '123', '2023-04-01') is False
+        assert store.load('zone_grid', 1, '123', '2023-04-01') is None
+
+        path = tmp_path / 'zone_grid' / 'v1' / '123' / '2023-04-08.npz'
+        path.write_bytes(b'broken')
+        assert store.load('zone_grid', 1, '123', '2023-04-08') is None
+
+    def test_save_and_load_season(self, tmp_path):
+        """シーズン単位の集計を保存して読み込めることのテスト"""
+        store = GameArtifactStore(str(tmp_path))
+        store.save_season('league_baseline', 1, 2024, {'quantiles': np.linspace(0, 1, 5)})
+
+        loaded = store.load_season('league_baseline', 1, 2024)
+        np.testing.assert_array_equal(loaded['quantiles'], np.linspace(0, 1, 5))
+        assert (tmp_path / 'league_baseline' / 'v1' / '2024.npz').exists()
+        assert store.load_season('league_baseline', 1, 2023) is None
+        assert store.load_season('league_baseline', 2, 2024) is None
+        assert store.list_seasons('league_baseline', 1) == [2024]
+        assert store.list_seasons('league_baseline', 2) == []
@@ -0,0 +1,95 @@
+import io
+import tarfile
+
+import pandas as pd
+import pytest
+
+from src.domain.entities import Game, Pitcher
+from src.infrastructure.cache_bundle import export_cache_bundle, import_cache_bundle, read_bundle_manifest
+from src.infrastructure.data_repository import DataRepository
+
+
+class TestCacheBundle:
+    """キャッシュバンドルのエクスポート・インポートのテスト"""
+    
+    @pytest.fixture
+    def source_repo(self, tmp_path):
+        """エクスポート元のリポジトリ"""
+        repo = DataRepository(cache_dir=str(tmp_path / "src_cache"), db_path=str(tmp_path / "src.db"))
+        
+        repo.save_pitcher_info(Pitcher(id="123", name="Test Pitcher", team="Test Team", throws="R"))
+        repo.save_game_info(Game(date="2023-04-01", pitcher_id="123", game_pk=718001, opponent="NYY"))
+        repo.save_game_info(Game(date="2024-04-01", pitcher_id="123", game_pk=745001, opponent="BOS"))
+        repo.save_pitch_data("123", "2023-04-01", pd.DataFrame({'pitch_type': ['FF'], 'release_speed': [95.2]}))
+        repo.save_pitch_data("123", "2024-04-01", pd.DataFrame({'pitch_type': ['SL'], 'release_speed': [88.3]}))
+        repo.save_pitch_data("456", "2024-04-02", pd.DataFrame({'pitch_type': ['CH'], 'release_speed': [84.1]}))
+        
+        return repo
+    
+    @pytest.fixture
+    def target_repo(self, tmp_path):
+        """インポート先のリポジトリ"""
+        return DataRepository(cache_dir=str(tmp_path / "dst_cache"), db_path=str(tmp_path / "dst.db"))
+    
+    def test_export_and_import_roundtrip(self, source_repo, target_repo, tmp_path):
+        """エクスポートしたバンドルを別のリポジトリに取り込めることのテスト"""
+        bundle_path = str(tmp_path / "bundle.tar.gz")
+        
+        manifest = export_cache_bundle(source_repo, bundle_path, pitcher_ids=["123"])
+        
+        assert len(manifest['pitch_data']) == 2
+        assert read_bundle_manifest(bundle_path)['pitchers'][0]['name'] == "Test Pitcher"
+        
+        report = import_cache_bundle(target_repo, bundle_path)
+        
+        assert report['imported'] == 2
+        assert report['corrupted'] == 0
+        assert target_repo.get_pitcher_info("123").name == "Test Pitcher"
+        assert target_repo.get_game_pk("123", "2024-04-01") == 745001
+        assert target_repo.get_cached_pitch_data("123", "2024-04-01")['release_speed'][0] == 88.3
+        assert target_repo.get_cached_pitch_data("456", "2024-04-02") is None
+        
+        # キャッシュ日時は元のものを引き継ぐ
+        assert target_repo.get_pitch_data_cached_at("123", "2023-04-01") == \
+            source_repo.get_pitch_data_cached_at("123", "2023-04-01")
+    
+    def test_export_filters_by_season(self, source_repo, tmp_path):
+        """シーズンで絞り込んでエクスポートできることのテスト"""
+        bundle_path = str(tmp_path / "bundle.tar.gz")
+        
+        manifest = export_cache_bundle(source_repo, bundle_path, seasons=[2024])
+        
+        assert sorted(e['pitcher_id'] for e in manifest['pitch_data']) == ["123", "456"]
+        assert [g['date'] for g in manifest['games']] == ["2024-04-01"]
+    
+    def test_import_skips_newer_existing_data(self, source_repo, target_repo, tmp_path):
+        """取り込み先の方が新しい場合はスキップされることのテスト"""
+        bundle_path = str(tmp_path / "bundle.tar.gz")
+        export_cache_bundle(source_repo, bundle_path, pitcher_ids=["456"])
+        
+        target_repo.save_pitch_data("456", "2024-04-02", pd.DataFrame({'pitch_type': ['FF']}))
+        
+        report = import_cache_bundle(target_repo, bundle_path)
+        
+        assert report['skipped'] == 1
+        assert target_repo.get_cached_pitch_data("456", "2024-04-02")['pitch_type'][0] == 'FF'
+    
+    def test_import_detects_corrupted_entries(self, source_repo, target_repo, tmp_path):
+        """チェックサムが一致しないデータは取り込まれないことのテスト"""
+        bundle_path = str(tmp_path / "bundle.tar.gz")
+        manifest = export_cache_bundle(source_repo, bundle_path, pitcher_ids=["456"])
+        
+        # データ部分を差し替えたバンドルを作成
+        tampered_path = str(tmp_path / "tampered.tar.gz")
+        with tarfile.open(bundle_path, 'r:gz') as src, tarfile.open(tampered_path, 'w:gz') as dst:
+            for member in src.getmembers():
+                payload = src.extractfile(member).read()
+                if member.name == manifest['pitch_data'][0]['file']:
+                    payload = pd.DataFrame({'pitch_type': ['XX']}).to_json().encode('utf-8')
+                    member.size = len(payload)
+                dst.addfile(member, io.BytesIO(payload))
+        
+        report = import_cache_bundle(target_repo, tampered_path)
+        
+        assert report['corrupted'] == 1
+        assert target_repo.get_cached_pitch_data("456", "2024-04-02") is None
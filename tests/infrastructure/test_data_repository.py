@@ -1,3 +1,15 @@
+import json
+import pickle
+import sqlite3
+import threading
+
+import pandas as pd
+import pytest
+
+from src.domain.entities import Pitcher, Game
+from src.infrastructure.data_repository import DataRepository
+
+
 class TestDataRepository:
     """DataRepositoryクラスのテスト"""
     
@@ -93,4 +105,303 @@ class TestDataRepository:
         assert retrieved_data is not None
         assert len(retrieved_data) == 2
         assert retrieved_data['pitch_type'][0] == 'FF'
-        assert retrieved_data['release_speed'][1] == 88.3
\ No newline at end of file
+        assert retrieved_data['release_speed'][1] == 88.3    
+    def test_save_pitch_data_records_checksum(self, tmp_db_path, tmp_cache_dir):
+        """メタデータにチェックサムが記録され、一時ファイルが残らないことのテスト"""
+        repo = DataRepository(cache_dir=str(tmp_cache_dir), db_path=str(tmp_db_path))
+        
+        data = pd.DataFrame({'pitch_type': ['FF', 'SL'], 'release_speed': [95.2, 88.3]})
+        repo.save_pitch_data("123", "2023-04-01", data)
+        
+        meta_path = tmp_cache_dir / "pitch_data_123_2023-04-01.meta.json"
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            meta_data = json.load(f)
+        
+        assert len(meta_data['checksum']) == 64
+        assert meta_data['size_bytes'] == (tmp_cache_dir / "pitch_data_123_2023-04-01.pkl").stat().st_size
+        assert not list(tmp_cache_dir.glob("*.tmp"))
+    
+    def test_get_cached_pitch_data_rejects_torn_data(self, tmp_db_path, tmp_cache_dir):
+        """メタデータと本体が一致しない場合はNoneを返すことのテスト"""
+        repo = DataRepository(cache_dir=str(tmp_cache_dir), db_path=str(tmp_db_path))
+        repo.READ_RETRY_INTERVAL = 0
+        
+        data = pd.DataFrame({'pitch_type': ['FF'], 'release_speed': [95.2]})
+        repo.save_pitch_data("123", "2023-04-01", data)
+        
+        # 別の内容で本体だけを書き換える（メタデータ更新前の状態を再現）
+        pd.DataFrame({'pitch_type': ['CH']}).to_pickle(tmp_cache_dir / "pitch_data_123_2023-04-01.pkl")
+        
+        assert repo.get_cached_pitch_data("123", "2023-04-01") is None
+    
+    def test_concurrent_reads_during_writes(self, tmp_db_path, tmp_cache_dir):
+        """書き込み中の並行読み込みが不完全なデータを返さないことのテスト"""
+        
+        repo = DataRepository(cache_dir=str(tmp_cache_dir), db_path=str(tmp_db_path))
+        frames = [pd.DataFrame({'value': [i] * 500}) for i in range(20)]
+        repo.save_pitch_data("123", "2023-04-01", frames[0])
+        
+        errors = []
+        
+        def reader():
+            for _ in range(50):
+                result = repo.get_cached_pitch_data("123", "2023-04-01")
+                if result is None or result['value'].nunique() != 1 or len(result) != 500:
+                    errors.append(result)
+        
+        threads = [threading.Thread(target=reader) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for frame in frames[1:]:
+            repo.save_pitch_data("123", "2023-04-01", frame)
+        for t in threads:
+            t.join()
+        
+        assert errors == []
+    
+    def test_cache_quota_evicts_least_recently_used(self, tmp_db_path, tmp_cache_dir):
+        """試合数の上限を超えた場合に最終アクセスが古い試合から削除されることのテスト"""
+        repo = DataRepository(cache_dir=str(tmp_cache_dir), db_path=str(tmp_db_path), max_cache_entries=2)
+        
+        data = pd.DataFrame({'pitch_type': ['FF'], 'release_speed': [95.2]})
+        repo.save_pitch_data("123", "2023-04-01", data)
+        repo.save_pitch_data("123", "2023-04-07", data)
+        
+        # 4/1を参照して最近使った状態にする
+        assert repo.get_cached_pitch_data("123", "2023-04-01") is not None
+        
+        repo.save_pitch_data("123", "2023-04-13", data)
+        
+        assert repo.get_cached_pitch_data("123", "2023-04-07") is None
+        assert repo.get_cached_pitch_data("123", "2023-04-01") is not None
+        assert repo.get_cached_pitch_data("123", "2023-04-13") is not None
+        assert repo.get_cache_stats()['entries'] == 2
+    
+    def test_cache_quota_lfu_policy(self, tmp_db_path, tmp_cache_dir):
+        """LFUポリシーでアクセス回数が少ない試合から削除されることのテスト"""
+        repo = DataRepository(cache_dir=str(tmp_cache_dir), db_path=str(tmp_db_path))
+        
+        data = pd.DataFrame({'pitch_type': ['FF'], 'release_speed': [95.2]})
+        repo.save_pitch_data("123", "2023-04-01", data)
+        repo.save_pitch_data("123", "2023-04-07", data)
+        for _ in range(3):
+            repo.get_cached_pitch_data("123", "2023-04-01")
+        repo.get_cached_pitch_data("123", "2023-04-07")
+        
+        evicted = repo.enforce_cache_quota(max_entries=1, policy='lfu')
+        
+        assert evicted == [("123", "2023-04-07")]
+        assert not (tmp_cache_dir / "pitch_data_123_2023-04-07.pkl").exists()
+    
+    def test_compact_cache_into_season_partition(self, tmp_db_path, tmp_cache_dir):
+        """試合単位のファイルがシーズン単位にまとめられ、引き続き読み込めることのテスト"""
+        repo = DataRepository(cache_dir=str(tmp_cache_dir), db_path=str(tmp_db_path))
+        
+        repo.save_pitch_data("123", "2023-04-01", pd.DataFrame({'release_speed': [95.2]}))
+        repo.save_pitch_data("123", "2023-04-07", pd.DataFrame({'release_speed': [88.3, 90.1]}))
+        repo.save_pitch_data("123", "2024-04-01", pd.DataFrame({'release_speed': [93.0]}))
+        
+        moved = repo.compact_cache(min_games=2)
+        
+        assert moved == 2
+        assert (tmp_cache_dir / "pitch_partition_123_2023.pkl").exists()
+        assert not (tmp_cache_dir / "pitch_data_123_2023-04-01.pkl").exists()
+        # 1試合しかないシーズンはそのまま
+        assert (tmp_cache_dir / "pitch_data_123_2024-04-01.pkl").exists()
+        
+        retrieved = repo.get_cached_pitch_data("123", "2023-04-07")
+        assert list(retrieved['release_speed']) == [88.3, 90.1]
+        
+        # パーティション内の試合も削除できる
+        repo.evict_pitch_data([("123", "2023-04-07")])
+        assert repo.get_cached_pitch_data("123", "2023-04-07") is None
+        assert repo.get_cached_pitch_data("123", "2023-04-01") is not None
+    
+    def test_partition_reads_only_requested_game(self, tmp_db_path, tmp_cache_dir):
+        """パーティションから1試合を読む際にその試合の部分だけを読み込むことのテスト"""
+        repo = DataRepository(cache_dir=str(tmp_cache_dir), db_path=str(tmp_db_path))
+        repo.save_pitch_data("123", "2023-04-01", pd.DataFrame({'release_speed': [95.2]}))
+        repo.save_pitch_data("123", "2023-04-07", pd.DataFrame({'release_speed': [88.3, 90.1]}))
+        repo.compact_cache(min_games=2)
+        
+        # 別の試合の部分を壊しても、読み込む試合には影響しない
+        with open(tmp_cache_dir / "pitch_partition_123_2023.meta.json", encoding='utf-8') as f:
+            other = json.load(f)['games']['2023-04-01']
+        with open(tmp_cache_dir / "pitch_partition_123_2023.pkl", 'r+b') as f:
+            f.seek(other['offset'])
+            f.write(b'\x00' * other['length'])
+        
+        assert list(repo.get_cached_pitch_data("123", "2023-04-07")['release_speed']) == [88.3, 90.1]
+        assert repo.get_cached_pitch_data("123", "2023-04-01") is None
+    
+    def test_reads_legacy_partition_format(self, tmp_db_path, tmp_cache_dir):
+        """試合ごとの位置を持たない旧形式のパーティションも読み込めることのテスト"""
+        repo = DataRepository(cache_dir=str(tmp_cache_dir), db_path=str(tmp_db_path))
+        frames = {"2023-04-01": pd.DataFrame({'release_speed': [95.2]}),
+                  "2023-04-07": pd.DataFrame({'release_speed': [88.3]})}
+        meta_data = {'pitcher_id': "123", 'season': "2023",
+                     'games': {d: {'cached_at': pd.Timestamp.now().isoformat()} for d in frames}}
+        with repo._write_lock():
+            repo._write_consistent(str(tmp_cache_dir / "pitch_partition_123_2023.pkl"),
+                                   str(tmp_cache_dir / "pitch_partition_123_2023.meta.json"),
+                                   pickle.dumps(frames), meta_data)
+        
+        assert list(repo.get_cached_pitch_data("123", "2023-04-07")['release_speed']) == [88.3]
+        
+        # 削除時に新しい形式で書き直される
+        repo.evict_pitch_data([("123", "2023-04-07")])
+        assert list(repo.get_cached_pitch_data("123", "2023-04-01")['release_speed']) == [95.2]
+        with open(tmp_cache_dir / "pitch_partition_123_2023.meta.json", encoding='utf-8') as f:
+            assert json.load(f)['format'] == DataRepository.PARTITION_FORMAT
+    
+    def test_cache_hits_batched(self, tmp_db_path, tmp_cache_dir):
+        """キャッシュヒットがまとめてアクセスログに書き込まれることのテスト"""
+        repo = DataRepository(cache_dir=str(tmp_cache_dir), db_path=str(tmp_db_path))
+        repo.save_pitch_data("123", "2023-04-01", pd.DataFrame({'release_speed': [95.2]}))
+        
+        def logged_hits():
+            conn = sqlite3.connect(str(tmp_db_path))
+            hits = conn.execute("SELECT hits FROM cache_access WHERE cache_key = '123_2023-04-01'").fetchone()[0]
+            conn.close()
+            return hits
+        
+        for _ in range(3):
+            repo.get_cached_pitch_data("123", "2023-04-01")
+        assert logged_hits() == 0
+        
+        assert repo.flush_cache_access() == 1
+        assert logged_hits() == 3
+        
+        repo.ACCESS_LOG_FLUSH_HITS = 2
+        repo.get_cached_pitch_data("123", "2023-04-01")
+        repo.get_cached_pitch_data("123", "2023-04-01")
+        assert logged_hits() == 5
+    
+    def test_sync_cache_access_log_registers_existing_files(self, tmp_db_path, tmp_cache_dir):
+        """アクセスログにない既存ファイルが同期で登録されることのテスト"""
+        repo = DataRepository(cache_dir=str(tmp_cache_dir), db_path=str(tmp_db_path))
+        repo.save_pitch_data("123", "2023-04-01", pd.DataFrame({'release_speed': [95.2]}))
+        
+        # 別のDBから参照した場合はログが空
+        other = DataRepository(cache_dir=str(tmp_cache_dir), db_path=str(tmp_db_path.parent / "other.db"))
+        assert other.get_cache_stats()['entries'] == 0
+        
+        other.sync_cache_access_log()
+        
+        assert other.get_cache_stats()['entries'] == 1
+    
+    def test_write_behind_save_and_read_pending(self, tmp_db_path, tmp_cache_dir):
+        """ライトビハインド有効時に書き込み待ちのデータも読み込めることのテスト"""
+        repo = DataRepository(cache_dir=str(tmp_cache_dir), db_path=str(tmp_db_path), write_behind=True)
+        
+        data = pd.DataFrame({'pitch_type': ['FF'], 'release_speed': [95.2]})
+        repo.save_pitch_data("123", "2023-04-01", data)
+        
+        retrieved = repo.get_cached_pitch_data("123", "2023-04-01")
+        assert retrieved is not None
+        assert retrieved['release_speed'][0] == 95.2
+        
+        assert repo.flush(timeout=5)
+        assert (tmp_cache_dir / "pitch_data_123_2023-04-01.pkl").exists()
+        repo.close()
+    
+    def test_cache_timestamps(self, tmp_db_path, tmp_cache_dir):
+        """投球データのキャッシュ日時と試合一覧の取得日時のテスト"""
+        repo = DataRepository(cache_dir=str(tmp_cache_dir), db_path=str(tmp_db_path))
+        
+        assert repo.get_pitch_data_cached_at("123", "2023-04-01") is None
+        repo.save_pitch_data("123", "2023-04-01", pd.DataFrame({'release_speed': [95.2]}))
+        assert repo.get_pitch_data_cached_at("123", "2023-04-01") is not None
+        
+        assert repo.get_game_list_fetched_at("123", 2023) is None
+        repo.record_game_list_fetch("123", 2023)
+        assert repo.get_game_list_fetched_at("123", 2023) is not None
+    
+    def test_game_pk_and_season_are_persisted(self, tmp_db_path, tmp_cache_dir):
+        """game_pkとシーズンが保存され、シーズンで絞り込めることのテスト"""
+        repo = DataRepository(cache_dir=str(tmp_cache_dir), db_path=str(tmp_db_path))
+        
+        repo.save_game_info(Game(date="2023-04-01", pitcher_id="123", game_pk=718001))
+        repo.save_game_info(Game(date="2024-04-01", pitcher_id="123", game_pk=745001))
+        
+        # game_pkなしで再保存しても既知のgame_pkは消えない
+        repo.save_game_info(Game(date="2023-04-01", pitcher_id="123", opponent="NYY"))
+        
+        games_2023 = repo.get_games_by_pitcher("123", season=2023)
+        assert len(games_2023) == 1
+        assert games_2023[0].game_pk == 718001
+        assert games_2023[0].opponent == "NYY"
+        assert len(repo.get_games_by_pitcher("123")) == 2
+        assert repo.get_game_pk("123", "2024-04-01") == 745001
+        assert repo.get_game_pk("123", "2025-04-01") is None
+    
+    def test_migrates_legacy_games_table(self, tmp_db_path, tmp_cache_dir):
+        """旧スキーマのデータベースがマイグレーションされることのテスト"""
+        
+        conn = sqlite3.connect(str(tmp_db_path))
+        conn.execute('''
+        CREATE TABLE games (
+            id TEXT PRIMARY KEY, date TEXT NOT NULL, pitcher_id TEXT NOT NULL,
+            opponent TEXT, stadium TEXT, home_away TEXT
+        )
+        ''')
+        conn.execute("INSERT INTO games VALUES ('123_2023-04-01', '2023-04-01', '123', 'NYY', NULL, 'home')")
+        conn.commit()
+        conn.close()
+        
+        repo = DataRepository(cache_dir=str(tmp_cache_dir), db_path=str(tmp_db_path))
+        
+        conn = sqlite3.connect(str(tmp_db_path))
+        assert conn.execute('PRAGMA user_version').fetchone()[0] == len(DataRepository.SCHEMA_MIGRATIONS)
+        indexes = {row[1] for row in conn.execute("PRAGMA index_list('games')")}
+        conn.close()
+        
+        assert 'idx_games_pitcher_date' in indexes
+        assert repo.get_games_by_pitcher("123", season=2023)[0].opponent == "NYY"
+    
+    def test_shared_frames_mode(self, tmp_db_path, tmp_cache_dir):
+        """共有フレームモードで読み込んだデータが公開され、再利用されることのテスト"""
+        pytest.importorskip('pyarrow')
+        
+        repo = DataRepository(cache_dir=str(tmp_cache_dir), db_path=str(tmp_db_path), shared_frames=True)
+        repo.save_pitch_data("123", "2023-04-01", pd.DataFrame({'pitch_type': ['FF'], 'release_speed': [95.2]}))
+        
+        first = repo.get_cached_pitch_data("123", "2023-04-01")
+        assert list((tmp_cache_dir / "shared").glob("*.arrow"))
+        
+        # 別インスタンス（別プロセス相当）からも共有フレームを参照できる
+        other = DataRepository(cache_dir=str(tmp_cache_dir), db_path=str(tmp_db_path), shared_frames=True)
+        second = other.get_cached_pitch_data("123", "2023-04-01")
+        
+        assert first['release_speed'][0] == second['release_speed'][0] == 95.2
+        repo.close()
+        other.close()
+    
+    def test_shared_frames_refcount_bounded(self, tmp_db_path, tmp_cache_dir):
+        """同じ試合を繰り返し読んでも参照数が増えず、上限を超えた参照や削除した試合の参照が解放されることのテスト"""
+        pytest.importorskip('pyarrow')
+        
+        repo = DataRepository(cache_dir=str(tmp_cache_dir), db_path=str(tmp_db_path), shared_frames=True,
+                              shared_frames_max_attached=2)
+        for game_date in ["2023-04-01", "2023-04-02", "2023-04-03"]:
+            repo.save_pitch_data("123", game_date, pd.DataFrame({'pitch_type': ['FF'], 'release_speed': [95.2]}))
+        
+        frames = [repo.get_cached_pitch_data("123", "2023-04-01") for _ in range(5)]
+        store = repo._shared_frames
+        assert list(store._ref_counts.values()) == [1]
+        assert len(list((tmp_cache_dir / "shared" / "refs").iterdir())) == 1
+        
+        # 呼び出し側ごとに別のDataFrameを返す
+        frames[0]['extra'] = 1
+        assert 'extra' not in frames[1].columns
+        
+        repo.get_cached_pitch_data("123", "2023-04-02")
+        repo.get_cached_pitch_data("123", "2023-04-03")
+        assert len(store._ref_counts) == 2
+        assert all(count == 1 for count in store._ref_counts.values())
+        assert not any(key.startswith("123_2023-04-01") for key in store._ref_counts)
+        
+        repo.evict_pitch_data([("123", "2023-04-03")])
+        assert len(store._ref_counts) == 1
+        assert len(list((tmp_cache_dir / "shared" / "refs").iterdir())) == 1
+        repo.close()
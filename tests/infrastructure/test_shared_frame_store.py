@@ -0,0 +1,85 @@
+import os
+import multiprocessing
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip('pyarrow')
+
+from src.infrastructure.shared_frame_store import SharedFrameStore
+
+
+def _attach_in_child(root_dir, key, queue):
+    """子プロセスで共有フレームを参照して結果を返す"""
+    store = SharedFrameStore(root_dir)
+    data = store.attach(key)
+    queue.put(None if data is None else float(data['release_speed'].sum()))
+    store.release(key)
+
+
+class TestSharedFrameStore:
+    """SharedFrameStoreクラスのテスト"""
+    
+    @pytest.fixture
+    def sample_data(self):
+        """テスト用の投球データ"""
+        return pd.DataFrame({
+            'pitch_type': ['FF', 'SL', None],
+            'release_speed': [95.2, np.nan, 85.1],
+            'inning': [1, 1, 2]
+        })
+    
+    def test_publish_and_attach(self, tmp_path, sample_data):
+        """公開したフレームを同じ内容で参照できることのテスト"""
+        store = SharedFrameStore(str(tmp_path))
+        store.publish('123_2023-04-01', sample_data)
+        
+        data = store.attach('123_2023-04-01')
+        
+        assert list(data['inning']) == [1, 1, 2]
+        assert np.isnan(data['release_speed'][1])
+        assert data['pitch_type'][0] == 'FF'
+        assert pd.isna(data['pitch_type'][2])
+        assert store.attach('unknown') is None
+    
+    def test_attach_in_other_process(self, tmp_path, sample_data):
+        """別プロセスから公開済みのフレームを参照できることのテスト"""
+        store = SharedFrameStore(str(tmp_path))
+        store.publish('key', sample_data)
+        
+        queue = multiprocessing.Queue()
+        process = multiprocessing.Process(target=_attach_in_child, args=(str(tmp_path), 'key', queue))
+        process.start()
+        result = queue.get(timeout=30)
+        process.join(timeout=30)
+        
+        assert result == pytest.approx(95.2 + 85.1)
+    
+    def test_cleanup_keeps_referenced_frames(self, tmp_path, sample_data):
+        """参照中のフレームは削除されず、解放後に削除されることのテスト"""
+        store = SharedFrameStore(str(tmp_path), max_idle_seconds=0)
+        store.publish('key', sample_data)
+        store.attach('key')
+        store.attach('key')
+        
+        assert store.cleanup() == 0
+        
+        store.release('key')
+        assert store.cleanup() == 0  # まだ1つ参照が残っている
+        
+        store.release('key')
+        assert store.cleanup() == 1
+        assert not os.path.exists(os.path.join(str(tmp_path), 'key.arrow'))
+    
+    def test_cleanup_removes_dead_process_refs(self, tmp_path, sample_data):
+        """終了したプロセスの参照記録が削除されることのテスト"""
+        store = SharedFrameStore(str(tmp_path), max_idle_seconds=0)
+        store.publish('key', sample_data)
+        
+        # 存在しないPIDの参照記録を作成
+        with open(os.path.join(store.refs_dir, 'key.999999999'), 'w') as f:
+            f.write('0')
+        
+        assert store.cleanup() == 1
+        assert os.listdir(store.refs_dir) == []
@@ -0,0 +1,274 @@
+import socketserver
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+
+import pandas as pd
+import pytest
+
+from src.domain.entities import Pitcher, Game
+from src.infrastructure.data_repository import DataRepository
+from src.infrastructure.resp_client import RespClient, RespError
+from src.infrastructure.storage_backend import (
+    StorageBackend, SQLiteStorageBackend, KeyValueStorageBackend, create_storage_backend
+)
+
+
+class _FakeRedisHandler(socketserver.StreamRequestHandler):
+    """テスト用のRedis互換サーバーのハンドラ（必要なコマンドのみ対応）"""
+
+    def _read_command(self):
+        line = self.rfile.readline()
+        if not line:
+            return None
+        count = int(line[1:-2])
+        args = []
+        for _ in range(count):
+            length = int(self.rfile.readline()[1:-2])
+            args.append(self.rfile.read(length + 2)[:-2])
+        return args
+
+    def _write(self, value):
+        if value is None:
+            self.wfile.write(b"$-1\r\n")
+        elif isinstance(value, bool):
+            self.wfile.write(b"+OK\r\n" if value else b"$-1\r\n")
+        elif isinstance(value, int):
+            self.wfile.write(f":{value}\r\n".encode())
+        elif isinstance(value, bytes):
+            self.wfile.write(f"${len(value)}\r\n".encode() + value + b"\r\n")
+        elif isinstance(value, list):
+            self.wfile.write(f"*{len(value)}\r\n".encode())
+            for item in value:
+                self._write(item)
+
+    def handle(self):
+        store = self.server.store
+        while True:
+            args = self._read_command()
+            if args is None:
+                return
+            command, params = args[0].upper(), args[1:]
+            self.server.commands.append(command)
+
+            with self.server.lock:
+                if command == b'PING':
+                    self.wfile.write(b"+PONG\r\n")
+                elif command == b'SELECT':
+                    self._write(True)
+                elif command == b'GET':
+                    value = store.get(params[0])
+                    if isinstance(value, set):
+                        self.wfile.write(b"-WRONGTYPE Operation against a key holding the wrong kind of value\r\n")
+                    else:
+                        self._write(value)
+                elif command == b'MGET':
+                    self._write([store.get(key) for key in params])
+                elif command == b'SET':
+                    store[params[0]] = params[1]
+                    self._write(True)
+                elif command == b'DEL':
+                    self._write(sum(1 for key in params if store.pop(key, None) is not None))
+                elif command == b'SADD':
+                    members = store.setdefault(params[0], set())
+                    added = len(set(params[1:]) - members)
+                    members.update(params[1:])
+                    self._write(added)
+                elif command == b'SMEMBERS':
+                    self._write(sorted(store.get(params[0], set())))
+                else:
+                    self.wfile.write(b"-ERR unknown command\r\n")
+
+
+@pytest.fixture
+def fake_redis():
+    """ローカルで起動するRedis互換サーバー"""
+    server = socketserver.ThreadingTCPServer(('127.0.0.1', 0), _FakeRedisHandler)
+    server.daemon_threads = True
+    server.store = {}
+    server.commands = []
+    server.lock = threading.Lock()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def sample_data():
+    return pd.DataFrame({'pitch_type': ['FF', 'SL'], 'release_speed': [95.2, 86.1], 'inning': [1, 2]})
+
+
+class TestRespClient:
+    """RespClientクラスのテスト"""
+
+    def test_commands(self, fake_redis):
+        """基本的なコマンドの送受信のテスト"""
+        host, port = fake_redis.server_address
+        client = RespClient.from_url(f"redis://{host}:{port}/1")
+
+        assert client.ping()
+        assert client.set('a', b'\x00binary\r\n')
+        assert client.get('a') == b'\x00binary\r\n'
+        assert client.get('missing') is None
+        assert client.mget('a', 'missing') == [b'\x00binary\r\n', None]
+        assert client.sadd('s', 'x', 'y') == 2
+        assert client.smembers('s') == {b'x', b'y'}
+        assert client.delete('a') == 1
+        assert b'SELECT' in fake_redis.commands
+
+        with pytest.raises(RespError):
+            client.get('s')
+        client.close()
+
+    def test_from_url_rejects_other_schemes(self):
+        """redis以外のスキームを拒否することのテスト"""
+        with pytest.raises(ValueError):
+            RespClient.from_url('http://localhost:6379')
+
+
+class TestStorageBackends:
+    """各ストレージバックエンドが同じ振る舞いをすることのテスト"""
+
+    @pytest.fixture(params=['local', 'sqlite', 'redis'])
+    def backend(self, request, tmp_path):
+        if request.param == 'local':
+            backend = DataRepository(cache_dir=str(tmp_path / 'cache'), db_path=str(tmp_path / 'db.sqlite'))
+        elif request.param == 'sqlite':
+            backend = SQLiteStorageBackend(db_path=str(tmp_path / 'db.sqlite'))
+        else:
+            server = request.getfixturevalue('fake_redis')
+            host, port = server.server_address
+            backend = KeyValueStorageBackend(RespClient(host, port))
+        yield backend
+        backend.close()
+
+    def test_conforms_to_protocol(self, backend):
+        """プロトコルを満たしていることのテスト"""
+        assert isinstance(backend, StorageBackend)
+
+    def test_pitcher_roundtrip(self, backend):
+        """投手情報の保存と取得のテスト"""
+        backend.save_pitcher_info(Pitcher(id='123', name='大谷翔平', team='LAD', throws='R'))
+
+        pitcher = backend.get_pitcher_info('123')
+
+        assert pitcher == Pitcher(id='123', name='大谷翔平', team='LAD', throws='R')
+        assert backend.get_pitcher_info('999') is None
+
+    def test_games_roundtrip(self, backend):
+        """試合情報の保存と取得、game_pkが保持されることのテスト"""
+        backend.save_game_info(Game(date='2023-04-01', pitcher_id='123', game_pk=7001, opponent='SEA'))
+        backend.save_game_info(Game(date='2024-05-01', pitcher_id='123', opponent='SD'))
+        # game_pkなしで再保存しても既知のgame_pkは消えない
+        backend.save_game_info(Game(date='2023-04-01', pitcher_id='123', opponent='SEA'))
+
+        games = backend.get_games_by_pitcher('123')
+
+        assert [g.date for g in games] == ['2024-05-01', '2023-04-01']
+        assert [g.date for g in backend.get_games_by_pitcher('123', season=2023)] == ['2023-04-01']
+        assert backend.get_game_pk('123', '2023-04-01') == 7001
+        assert backend.get_game_pk('123', '2024-05-01') is None
+
+    def test_game_list_fetch(self, backend):
+        """試合一覧の取得日時の記録のテスト"""
+        assert backend.get_game_list_fetched_at('123', 2024) is None
+
+        backend.record_game_list_fetch('123', 2024)
+
+        assert datetime.now() - backend.get_game_list_fetched_at('123', 2024) < timedelta(minutes=1)
+
+    def test_pitch_data_roundtrip(self, backend, sample_data):
+        """投球データの保存・取得と有効期限のテスト"""
+        assert backend.get_cached_pitch_data('123', '2023-04-01') is None
+
+        backend.save_pitch_data('123', '2023-04-01', sample_data)
+        backend.flush()
+
+        pd.testing.assert_frame_equal(backend.get_cached_pitch_data('123', '2023-04-01'), sample_data)
+        assert backend.get_pitch_data_cached_at('123', '2023-04-01') is not None
+
+        old = (datetime.now() - timedelta(days=10)).isoformat()
+        backend.save_pitch_data('123', '2023-04-02', sample_data, cached_at=old)
+        backend.flush()
+
+        assert backend.get_cached_pitch_data('123', '2023-04-02', max_age_days=7) is None
+        assert backend.get_pitch_data_cached_at('123', '2023-04-02') == datetime.fromisoformat(old)
+
+
+class TestSQLiteStorageBackend:
+    """SQLiteStorageBackendクラスのテスト"""
+
+    def test_opens_pre_migration_database(self, tmp_path):
+        """マイグレーション前（season・game_pkのない試合テーブル）のデータベースを開けることのテスト"""
+        db_path = str(tmp_path / 'db.sqlite')
+        conn = sqlite3.connect(db_path)
+        conn.executescript('''
+        CREATE TABLE pitchers (id TEXT PRIMARY KEY, name TEXT NOT NULL, team TEXT, throws TEXT, updated_at TEXT);
+        CREATE TABLE games (id TEXT PRIMARY KEY, date TEXT NOT NULL, pitcher_id TEXT NOT NULL,
+                            opponent TEXT, stadium TEXT, home_away TEXT);
+        INSERT INTO games (id, date, pitcher_id, opponent) VALUES ('123_2023-04-01', '2023-04-01', '123', 'NYY');
+        ''')
+        conn.commit()
+        conn.close()
+
+        backend = SQLiteStorageBackend(db_path=db_path)
+
+        assert [g.opponent for g in backend.get_games_by_pitcher('123', season=2023)] == ['NYY']
+        conn = sqlite3.connect(db_path)
+        assert conn.execute('PRAGMA user_version').fetchone()[0] == len(DataRepository.SCHEMA_MIGRATIONS)
+        conn.close()
+
+        # 同じファイルをDataRepositoryからも開ける
+        repository = DataRepository(cache_dir=str(tmp_path / 'cache'), db_path=db_path)
+        assert repository.get_game_pk('123', '2023-04-01') is None
+
+    def test_migrates_database_created_by_backend(self, tmp_path):
+        """新しいスキーマで作成済みでマイグレーションが記録されていないデータベースも移行できることのテスト"""
+        db_path = str(tmp_path / 'db.sqlite')
+        SQLiteStorageBackend(db_path=db_path).save_game_info(Game(date='2023-04-01', pitcher_id='123', game_pk=1))
+        conn = sqlite3.connect(db_path)
+        conn.execute('PRAGMA user_version = 0')
+        conn.commit()
+        conn.close()
+
+        backend = SQLiteStorageBackend(db_path=db_path)
+
+        assert backend.get_game_pk('123', '2023-04-01') == 1
+
+
+class TestKeyValueStorageBackend:
+    """KeyValueStorageBackendクラスのテスト"""
+
+    def test_shared_between_nodes(self, fake_redis, sample_data):
+        """別のノード（別クライアント）からも同じキャッシュを参照できることのテスト"""
+        host, port = fake_redis.server_address
+        node_a = KeyValueStorageBackend(RespClient(host, port))
+        node_b = KeyValueStorageBackend(RespClient(host, port))
+
+        node_a.save_pitch_data('123', '2023-04-01', sample_data)
+
+        pd.testing.assert_frame_equal(node_b.get_cached_pitch_data('123', '2023-04-01'), sample_data)
+
+    def test_ignores_mismatched_payload(self, fake_redis, sample_data):
+        """本体とメタデータのチェックサムが一致しない場合は無視することのテスト"""
+        host, port = fake_redis.server_address
+        backend = KeyValueStorageBackend(RespClient(host, port))
+        backend.save_pitch_data('123', '2023-04-01', sample_data)
+
+        fake_redis.store[b'mlb_pitch:pitch:123:2023-04-01'] = b'torn'
+
+        assert backend.get_cached_pitch_data('123', '2023-04-01') is None
+
+
+def test_create_storage_backend(tmp_path):
+    """設定からバックエンドを作成するテスト"""
+    config = {'cache_dir': str(tmp_path), 'db_path': str(tmp_path / 'db.sqlite'), 'cache_write_behind': False}
+
+    assert isinstance(create_storage_backend(config), DataRepository)
+    assert isinstance(create_storage_backend({**config, 'storage_backend': 'sqlite'}), SQLiteStorageBackend)
+    assert isinstance(create_storage_backend({**config, 'storage_backend': 'redis'}), KeyValueStorageBackend)
+
+    with pytest.raises(ValueError):
+        create_storage_backend({**config, 'storage_backend': 'unknown'})
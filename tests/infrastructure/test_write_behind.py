@@ -0,0 +1,70 @@
+import threading
+
+from src.infrastructure.write_behind import WriteBehindQueue
+
+
+class TestWriteBehindQueue:
+    """WriteBehindQueueクラスのテスト"""
+    
+    def test_submit_and_flush(self):
+        """キューに追加した書き込みがflushで完了することのテスト"""
+        written = []
+        write_queue = WriteBehindQueue(lambda key, value: written.append((key, value)))
+        
+        write_queue.submit('a', 'a', 1)
+        write_queue.submit('b', 'b', 2)
+        
+        assert write_queue.flush(timeout=5)
+        assert sorted(written) == [('a', 1), ('b', 2)]
+        assert write_queue.pending_count == 0
+        write_queue.close()
+    
+    def test_pending_value_visible_until_written(self):
+        """書き込み完了までget_pendingで値を参照できることのテスト"""
+        release = threading.Event()
+        written = []
+        
+        def slow_writer(value):
+            release.wait(5)
+            written.append(value)
+        
+        write_queue = WriteBehindQueue(slow_writer)
+        write_queue.submit('key', 'first')
+        write_queue.submit('key', 'second')
+        
+        assert write_queue.get_pending('key') == ('second',)
+        
+        release.set()
+        assert write_queue.flush(timeout=5)
+        
+        # 最新の値が最後に書き込まれる
+        assert written[-1] == 'second'
+        assert write_queue.get_pending('key') is None
+        write_queue.close()
+    
+    def test_writer_error_does_not_stop_queue(self):
+        """書き込みエラーが発生しても後続の書き込みが行われることのテスト"""
+        written = []
+        
+        def writer(value):
+            if value == 'bad':
+                raise IOError('disk full')
+            written.append(value)
+        
+        write_queue = WriteBehindQueue(writer)
+        write_queue.submit('bad', 'bad')
+        write_queue.submit('good', 'good')
+        
+        assert write_queue.flush(timeout=5)
+        assert written == ['good']
+        write_queue.close()
+    
+    def test_close_flushes_pending_writes(self):
+        """停止時に書き込み待ちが処理されることのテスト"""
+        written = []
+        write_queue = WriteBehindQueue(written.append, max_pending=2)
+        for i in range(10):
+            write_queue.submit(i, i)
+        
+        assert write_queue.close(timeout=5)
+        assert sorted(written) == list(range(10))
@@ -0,0 +1,73 @@
+import threading
+
+import pandas as pd
+import pytest
+
+# ServiceFactoryは描画・UIのモジュールを読み込むため、それらがない環境ではスキップする
+pytest.importorskip('matplotlib')
+pytest.importorskip('plotly')
+pytest.importorskip('streamlit')
+
+from src.service_factory import ServiceFactory
+
+
+def writer_threads():
+    return [t for t in threading.enumerate() if t.name == 'pitch-data-writer' and t.is_alive()]
+
+
+class TestServiceFactory:
+    """ServiceFactoryクラスのテスト"""
+
+    @pytest.fixture
+    def config(self, tmp_path):
+        yield {
+            'cache_dir': str(tmp_path / 'cache'),
+            'db_path': str(tmp_path / 'test.db'),
+            'log_dir': str(tmp_path / 'logs'),
+            'cache_write_behind': True
+        }
+        ServiceFactory.close_shared()
+
+    def test_shared_factory_reused_across_reruns(self, config):
+        """再実行のたびにファクトリを取得してもリポジトリと書き込みスレッドが増えないことのテスト"""
+        before = len(writer_threads())
+        data = pd.DataFrame({'pitch_type': ['FF'], 'release_speed': [95.0]})
+
+        first = ServiceFactory.shared(dict(config))
+        first.create_data_repository().save_pitch_data('123', '2023-04-01', data)
+        second = ServiceFactory.shared(dict(config))
+        repository = second.create_data_repository()
+        repository.save_pitch_data('123', '2023-04-02', data)
+
+        assert second is first
+        assert repository is first.create_data_repository()
+        assert len(writer_threads()) - before <= 1
+
+        # 前の再実行で書き込み待ちになったデータも同じリポジトリから読める
+        assert repository.get_cached_pitch_data('123', '2023-04-01') is not None
+
+    def test_close_shared_flushes_pending_writes(self, config):
+        """close_sharedで書き込み待ちのデータが保存されることのテスト"""
+        data = pd.DataFrame({'pitch_type': ['FF'], 'release_speed': [95.0]})
+        ServiceFactory.shared(config).create_data_repository().save_pitch_data('123', '2023-04-01', data)
+
+        ServiceFactory.close_shared()
+
+        reopened = ServiceFactory(dict(config, cache_write_behind=False)).create_data_repository()
+        assert reopened.get_cached_pitch_data('123', '2023-04-01') is not None
+
+    def test_shared_factory_shares_refresher_and_client(self, config):
+        """再実行間でバックグラウンド更新・APIクライアント・ユースケースが共有されることのテスト"""
+        first = ServiceFactory.shared(dict(config)).create_pitcher_game_analysis_use_case()
+        release = threading.Event()
+        assert first.refresher.schedule(('pitch_data', '123', '2023-04-01'), lambda: release.wait(5))
+
+        second = ServiceFactory.shared(dict(config)).create_pitcher_game_analysis_use_case()
+        try:
+            assert second is first
+            assert second.client is first.client
+            # 前の再実行で登録した更新は実行中として扱われ、重複して登録されない
+            assert second.refresher.is_refreshing(('pitch_data', '123', '2023-04-01'))
+            assert not second.refresher.schedule(('pitch_data', '123', '2023-04-01'), lambda: None)
+        finally:
+            release.set()